@@ -0,0 +1 @@
+"""Offline component benchmarks of the ingestors and the knowledge graph pipeline, run with `python -m benchmarks`."""
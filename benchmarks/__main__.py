@@ -0,0 +1,87 @@
+import argparse
+import fnmatch
+import os
+import sys
+
+from benchmarks.cases import DEFAULT_EMBEDDING_MODEL, all_cases
+from benchmarks.harness import (
+    DEFAULT_MIN_TIME,
+    DEFAULT_THRESHOLD,
+    BenchmarkResult,
+    EnvironmentMismatch,
+    compare,
+    load_results,
+    results_document,
+    run_cases,
+    write_results,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Runs the ingest and knowledge graph component benchmarks and compares them with a baseline.",
+    )
+    parser.add_argument("--filter", action="append", default=[], help="Glob of case names to run, e.g. 'kg.*'. Repeatable.")
+    parser.add_argument("--iterations", type=int, default=10, help="Minimum timed calls per case.")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Minimum seconds of timed calls per case.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed calls per case before timing.")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where the results JSON is written.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=None, help=f"Allowed latency growth as a fraction, overrides the baseline's thresholds (default {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--allow-environment-mismatch", action="store_true", help="Compare with a baseline recorded on a different environment, with a warning.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results to the baseline, keeping its thresholds.")
+    parser.add_argument("--ner-model", default=None, help="NER model to load instead of the tiny offline BERT.")
+    parser.add_argument("--spacy-model", default=None, help="spaCy model to load instead of en_core_web_lg or a blank pipeline.")
+    parser.add_argument("--embedding-model", default=DEFAULT_EMBEDDING_MODEL, help="fastembed model of the EmbeddingStore.")
+    return parser.parse_args(argv)
+
+
+def describe(result: BenchmarkResult) -> str:
+    if result.skipped:
+        return f"{result.name:<42} skipped: {result.skipped}"
+    return (
+        f"{result.name:<42} p50 {result.p50_ms:>10.3f} ms  p95 {result.p95_ms:>10.3f} ms  "
+        f"{result.throughput_per_s:>12.2f} {result.unit}/s"
+    )
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    cases = all_cases(args.ner_model, args.spacy_model, args.embedding_model)
+    if args.filter:
+        cases = [case for case in cases if any(fnmatch.fnmatch(case.name, pattern) for pattern in args.filter)]
+    results = run_cases(cases, iterations=args.iterations, warmup=args.warmup, min_time=args.min_time, progress=lambda result: print(describe(result), flush=True))
+
+    baseline = load_results(args.baseline) if os.path.exists(args.baseline) else None
+    write_results(args.output, results_document(results))
+    if args.update_baseline:
+        thresholds = baseline.get("thresholds") if baseline else None
+        write_results(args.baseline, results_document(results, thresholds or {"default": DEFAULT_THRESHOLD}))
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, nothing to compare.")
+        return 0
+
+    try:
+        comparisons = compare(load_results(args.output), baseline, args.threshold, args.allow_environment_mismatch)
+    except EnvironmentMismatch as e:
+        print(f"{e}. Record a baseline on this host with --update-baseline, or pass --allow-environment-mismatch.")
+        return 2
+    regressions = []
+    for comparison in comparisons:
+        if comparison.regressed:
+            regressions.append(comparison)
+            print(
+                f"REGRESSION {comparison.name} {comparison.metric}: {comparison.baseline:.3f} -> "
+                f"{comparison.current:.3f} ms ({comparison.change:+.1%}, allowed {comparison.threshold:+.0%})"
+            )
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
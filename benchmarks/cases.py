@@ -0,0 +1,217 @@
+import asyncio
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from benchmarks import fixtures
+from benchmarks.harness import BenchmarkCase, SkipBenchmark
+
+"""
+    The benchmark cases: one per ingestor over a file of tests/data, and one per hot path of the
+    knowledge graph pipeline over sentences of the corpus PDF and triples built from them.
+"""
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+TRIPLE_COUNT = 256
+EMBEDDED_TRIPLE_COUNT = 64
+
+
+def _poll(file_path: str, data: bytes):
+    async def poll():
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield _collected_bytes(file_path, data[offset:offset + CHUNK_SIZE])
+        yield _collected_bytes(file_path, None, eof=True)
+
+    return poll()
+
+
+def _collected_bytes(file_path: str, data: Optional[bytes], eof: bool = False):
+    from querent.common.types.collected_bytes import CollectedBytes
+
+    return CollectedBytes(file=file_path, data=data, error=None, eof=eof, doc_source=f"file://{os.path.dirname(file_path)}")
+
+
+def _require_tesseract():
+    import pytesseract
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        raise SkipBenchmark(f"tesseract is not available: {e}")
+
+
+def ingest_case(name: str, extension: str, relative_path: str, requires=None) -> BenchmarkCase:
+    file_path = fixtures.data_path(relative_path)
+
+    def setup():
+        if requires is not None:
+            requires()
+        from querent.ingestors.ingestor_manager import IngestorFactoryManager
+
+        with open(file_path, "rb") as fixture:
+            data = fixture.read()
+        manager = IngestorFactoryManager()
+
+        async def run():
+            factory = await manager.get_factory(extension)
+            ingestor = await factory.create(extension, [])
+            return [token async for token in ingestor.ingest(_poll(file_path, data))]
+
+        async def check():
+            errors = [token.error for token in await run() if getattr(token, "error", None)]
+            if errors:
+                raise SkipBenchmark(f"the {extension} ingestor failed: {errors[0]}")
+
+        asyncio.run(check())
+        return run
+
+    return BenchmarkCase(
+        name=name,
+        group="ingest",
+        setup=setup,
+        items=lambda: os.path.getsize(file_path) / 1e6,
+        unit="MB",
+        params={"file": relative_path},
+    )
+
+
+def _ner(ner_model: Optional[str], spacy_model: Optional[str]):
+    from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+
+    fixtures.use_spacy(spacy_model)
+    tokenizer, model = fixtures.load_ner(ner_model)
+    return NER_LLM(provided_tokenizer=tokenizer, provided_model=model)
+
+
+def _entity_pairs(ner, content: str):
+    _, doc_entity_pairs = ner.get_entity_pairs(False, [], [], content)
+    if not doc_entity_pairs:
+        raise SkipBenchmark("the NER model found no entity pairs in the corpus")
+    return doc_entity_pairs
+
+
+def kg_cases(ner_model: Optional[str], spacy_model: Optional[str], embedding_model: str) -> List[BenchmarkCase]:
+    model_params = {"ner_model": ner_model or "tiny-bert", "spacy_model": spacy_model or "default"}
+    sentences = fixtures.CORPUS_SENTENCES
+    searches = []
+    pair_count = []
+
+    def entity_pairs():
+        ner = _ner(ner_model, spacy_model)
+        content = fixtures.corpus_document()
+        return lambda: ner.get_entity_pairs(False, [], [], content)
+
+    def entity_attention():
+        from querent.kg.ner_helperfunctions.attn_scores import EntityAttentionExtractor
+        from querent.kg.ner_helperfunctions.sentence_encoding_cache import SentenceEncodingCache
+
+        ner = _ner(ner_model, spacy_model)
+        doc_entity_pairs = _entity_pairs(ner, fixtures.corpus_document())
+        pair_count.append(sum(len(pairs) for pairs in doc_entity_pairs))
+        model, tokenizer = ner.ner_model, ner.ner_tokenizer
+
+        def run():
+            # A new cache on every call, so the forward passes are timed rather than cache hits
+            extractor = EntityAttentionExtractor(model, tokenizer, encoding_cache=SentenceEncodingCache(model, tokenizer))
+            return extractor.extract_and_append_attention_weights(doc_entity_pairs)
+
+        return run
+
+    def embedding_store():
+        from querent.kg.rel_helperfunctions.embedding_store import EmbeddingStore
+
+        try:
+            store = EmbeddingStore(model_name=embedding_model, cache_size=0)
+        except Exception as e:
+            raise SkipBenchmark(f"the embedding model could not be loaded: {e}")
+        triples = fixtures.triple_records(EMBEDDED_TRIPLE_COUNT, dimensions=8)
+        if store.generate_embeddings(triples, relationship_finder=True) is None:
+            raise SkipBenchmark("the embedding model failed to embed the triples")
+        return lambda: store.generate_embeddings(triples, relationship_finder=True)
+
+    def cluster_triples():
+        from querent.kg.ner_helperfunctions.filter_triples import TripleFilter
+
+        triple_filter = TripleFilter(score_threshold=0.6, attention_score_threshold=0.1, similarity_threshold=0.5, min_cluster_size=5, min_samples=3)
+        triples = fixtures.triple_records(TRIPLE_COUNT)
+        return lambda: triple_filter.cluster_triples(triples)
+
+    def perform_search():
+        from querent.kg.ner_helperfunctions.sentence_encoding_cache import SentenceEncodingCache
+        from querent.kg.rel_helperfunctions.attn_based_relationship_model_getter import get_model
+        from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import (
+            EntityPair,
+            as_attention_columns,
+            perform_search,
+        )
+
+        ner = _ner(ner_model, spacy_model)
+        model, tokenizer = ner.ner_model, ner.ner_tokenizer
+        extractor = get_model("bert", model_tokenizer=tokenizer, model=model, encoding_cache=SentenceEncodingCache(model, tokenizer))
+        rng = np.random.default_rng(fixtures.SEED)
+        searches.clear()
+        for sentence in fixtures.corpus_sentences():
+            spans = fixtures.entity_spans(sentence, rng)
+            if spans is None:
+                continue
+            context = sentence.replace("\n", " ").lower()
+            head_positions = ner.find_subword_indices(context, spans[0])
+            tail_positions = ner.find_subword_indices(context, spans[1])
+            if not head_positions or not tail_positions or head_positions[0][0] >= tail_positions[0][0]:
+                continue
+            # Built as process_tokens builds them: a float32 matrix shared by the head and tail searches
+            attention_matrix = as_attention_columns(extractor.attention_matrix(context)).T
+            pair = EntityPair({"entity": spans[0]}, {"entity": spans[1]}, context, head_positions, tail_positions)
+            searches.append((attention_matrix, pair))
+        if not searches:
+            raise SkipBenchmark("no entity pairs were found in the corpus sentences")
+
+        def run():
+            for attention_matrix, pair in searches:
+                for start_idx in (pair.head_entity["start_idx"], pair.tail_entity["start_idx"]):
+                    perform_search(start_idx, attention_matrix, pair, search_candidates=5, require_contiguous=True, max_relation_length=8, num_initial_tokens=extractor.num_start_tokens())
+
+        return run
+
+    def triple_to_json():
+        from querent.kg.rel_helperfunctions.triple_to_json import TripleToJsonConverter
+
+        rng = np.random.default_rng(fixtures.SEED)
+        triples = [
+            triple.replace(context_embeddings=rng.normal(size=384).astype(np.float32))
+            for triple in fixtures.triple_records(TRIPLE_COUNT, dimensions=8)
+        ]
+
+        def run():
+            for triple in triples:
+                TripleToJsonConverter.convert_graphjson(triple)
+                TripleToJsonConverter.convert_vectorjson(triple, None, triple.context_embeddings)
+
+        return run
+
+    return [
+        BenchmarkCase("kg.ner_llm.get_entity_pairs", "kg", entity_pairs, items=lambda: sentences, unit="sentences", params={"sentences": sentences, **model_params}),
+        BenchmarkCase("kg.entity_attention_extractor", "kg", entity_attention, items=lambda: pair_count[-1], unit="pairs", params={"sentences": sentences, **model_params}),
+        BenchmarkCase("kg.embedding_store.generate_embeddings", "kg", embedding_store, items=lambda: EMBEDDED_TRIPLE_COUNT, unit="triples", params={"triples": EMBEDDED_TRIPLE_COUNT, "embedding_model": embedding_model}),
+        BenchmarkCase("kg.triple_filter.cluster_triples", "kg", cluster_triples, items=lambda: TRIPLE_COUNT, unit="triples", params={"triples": TRIPLE_COUNT, "dimensions": 1536}),
+        BenchmarkCase("kg.perform_search", "kg", perform_search, items=lambda: 2 * len(searches), unit="searches", params={"sentences": sentences, **model_params}),
+        BenchmarkCase("kg.triple_to_json", "kg", triple_to_json, items=lambda: TRIPLE_COUNT, unit="triples", params={"triples": TRIPLE_COUNT}),
+    ]
+
+
+def ingest_cases() -> List[BenchmarkCase]:
+    return [
+        # The paper's figures go through OCR; the tables PDF has text and tables only
+        ingest_case("ingest.pdf", "pdf", os.path.join("pdf", "test_paper_1.pdf"), requires=_require_tesseract),
+        ingest_case("ingest.pdf_tables", "pdf", os.path.join("pdf", "dummy_pdf_with_tables.pdf")),
+        ingest_case("ingest.docx", "docx", os.path.join("doc", "7283738976.docx")),
+        ingest_case("ingest.csv", "csv", os.path.join("csv", "demo_data.csv")),
+        ingest_case("ingest.html", "html", os.path.join("html", "gnn_and_cnn.html")),
+        ingest_case("ingest.image_ocr", "jpg", os.path.join("image", "What-is-Geology.jpg"), requires=_require_tesseract),
+    ]
+
+
+def all_cases(ner_model: Optional[str] = None, spacy_model: Optional[str] = None, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> List[BenchmarkCase]:
+    return ingest_cases() + kg_cases(ner_model, spacy_model, embedding_model)
@@ -0,0 +1,190 @@
+import os
+import tempfile
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+"""
+    Inputs of the component benchmarks, built from the files in tests/data.
+
+    Everything here works offline on CPU. When no NER model is named, a small randomly initialized
+    BERT token classifier is built over a vocabulary of the benchmark corpus: its outputs are
+    meaningless, but it has the shapes, tokenizer and attention outputs of a real BERT model, and
+    the bias of its "O" label is calibrated so a realistic share of the tokens are tagged as
+    entities. When no spaCy model is named or installed, a blank English pipeline with a
+    sentencizer is used. Both are cached, so every case shares one instance.
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "tests", "data")
+
+CORPUS_FILE = os.path.join(DATA_DIR, "pdf", "test_paper_1.pdf")
+CORPUS_SENTENCES = 48
+
+NER_LABELS = ["O", "B-MISC", "I-MISC", "B-PER", "I-PER", "B-ORG", "I-ORG", "B-LOC", "I-LOC"]
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+ENTITY_TOKEN_SHARE = 0.12
+SEED = 13
+
+
+def data_path(*parts: str) -> str:
+    return os.path.join(DATA_DIR, *parts)
+
+
+@lru_cache(maxsize=None)
+def corpus_text() -> str:
+    import fitz
+
+    with fitz.open(CORPUS_FILE) as document:
+        return " ".join(page.get_text() for page in document)
+
+
+@lru_cache(maxsize=None)
+def corpus_sentences(count: int = CORPUS_SENTENCES) -> Tuple[str, ...]:
+    """Sentences of the corpus with at least six words, joined across the PDF's line breaks."""
+    from unidecode import unidecode
+
+    doc = load_spacy()(unidecode(" ".join(corpus_text().split())))
+    sentences = [sent.text.strip() for sent in doc.sents if len(sent.text.split()) >= 6]
+    return tuple(sentences[:count])
+
+
+def corpus_document(count: int = CORPUS_SENTENCES) -> str:
+    return " ".join(corpus_sentences(count))
+
+
+@lru_cache(maxsize=None)
+def load_spacy(model: Optional[str] = None):
+    import spacy
+
+    try:
+        return spacy.load(model or "en_core_web_lg")
+    except OSError:
+        if model:
+            raise
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def use_spacy(model: Optional[str] = None):
+    """Sets the spaCy pipeline shared by NER_LLM and the helpers that use it."""
+    from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+    from querent.kg.ner_helperfunctions.spacy_pipeline import SpacyPipeline
+
+    if not isinstance(NER_LLM.nlp, SpacyPipeline):
+        NER_LLM.nlp = SpacyPipeline(load_spacy(model))
+    return NER_LLM.nlp
+
+
+def _build_vocabulary(sentences: List[str]) -> List[str]:
+    from transformers.models.bert.tokenization_bert import BasicTokenizer
+
+    basic = BasicTokenizer(do_lower_case=True)
+    words = dict.fromkeys(word for sentence in sentences for word in basic.tokenize(sentence))
+    return SPECIAL_TOKENS + sorted(word for word in words if word not in SPECIAL_TOKENS)
+
+
+def _calibrate_entities(model, tokenizer, sentences: List[str]):
+    import torch
+
+    with torch.no_grad():
+        inputs = tokenizer(list(sentences), return_tensors="pt", padding=True, truncation=True, max_length=128)
+        logits = model(**inputs).logits[inputs["attention_mask"].bool()]
+        margins = logits[:, 1:].max(dim=-1).values - logits[:, 0]
+        model.classifier.bias[0] += float(torch.quantile(margins, 1 - ENTITY_TOKEN_SHARE))
+
+
+@lru_cache(maxsize=None)
+def load_ner(model_name: Optional[str] = None):
+    """Returns the (tokenizer, model) pair of the NER model, the tiny offline model when no name is given."""
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+    if model_name:
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForTokenClassification.from_pretrained(model_name, output_attentions=True)
+        return tokenizer, model.eval()
+
+    import torch
+    from transformers import BertConfig, BertForTokenClassification, BertTokenizerFast
+
+    sentences = list(corpus_sentences())
+    vocabulary = _build_vocabulary(sentences)
+    vocabulary_file = os.path.join(tempfile.mkdtemp(prefix="querent-benchmarks-"), "vocab.txt")
+    with open(vocabulary_file, "w", encoding="utf-8") as vocab:
+        vocab.write("\n".join(vocabulary) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=vocabulary_file, do_lower_case=True)
+
+    torch.manual_seed(SEED)
+    config = BertConfig(
+        vocab_size=len(vocabulary),
+        hidden_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=256,
+        max_position_embeddings=512,
+        num_labels=len(NER_LABELS),
+        id2label=dict(enumerate(NER_LABELS)),
+        label2id={label: idx for idx, label in enumerate(NER_LABELS)},
+        output_attentions=True,
+    )
+    model = BertForTokenClassification(config).eval()
+    with torch.no_grad():
+        # A wider spread of logits, so entity labels differ between tokens
+        model.classifier.weight.normal_(0.0, 0.5)
+    _calibrate_entities(model, tokenizer, sentences)
+    return tokenizer, model
+
+
+def entity_spans(sentence: str, rng: np.random.Generator) -> Optional[Tuple[str, str]]:
+    """Two distinct words of a sentence, at least four words apart, standing in for a pair of entities."""
+    words = [word.strip(".,;:()[]\"'").lower() for word in sentence.split()]
+    words = [word for word in words if word.isalpha() and len(word) > 3]
+    if len(words) < 6:
+        return None
+    head = int(rng.integers(0, len(words) - 5))
+    tail = int(rng.integers(head + 4, len(words)))
+    if words[head] == words[tail]:
+        return None
+    return words[head], words[tail]
+
+
+def triple_records(count: int, dimensions: int = 1536, clusters: int = 8):
+    """
+    TripleRecords over the corpus sentences, with seeded entity embeddings drawn around a few
+    centers so the clustering finds clusters, as it does for embeddings of related entities.
+    """
+    from querent.kg.rel_helperfunctions.triple_record import TripleRecord
+
+    rng = np.random.default_rng(SEED)
+    centers = rng.normal(size=(clusters, dimensions)).astype(np.float32)
+    sentences = corpus_sentences()
+    records = []
+    while len(records) < count:
+        sentence = sentences[len(records) % len(sentences)]
+        spans = entity_spans(sentence, rng)
+        if spans is None:
+            spans = ("corpus", f"sentence {len(records)}")
+        center = centers[len(records) % clusters]
+        entity1, entity2 = (center + rng.normal(scale=0.3, size=dimensions).astype(np.float32) for _ in range(2))
+        records.append(TripleRecord(
+            spans[0],
+            spans[1],
+            context=sentence,
+            current_sentence=sentence,
+            file_path=CORPUS_FILE,
+            entity1_label="B-MISC",
+            entity2_label="B-ORG",
+            entity1_nn_chunk=spans[0],
+            entity2_nn_chunk=spans[1],
+            entity1_score=float(rng.uniform(0.6, 1.0)),
+            entity2_score=float(rng.uniform(0.6, 1.0)),
+            pair_attnscore=float(rng.uniform(0.1, 0.5)),
+            entity1_embedding=entity1,
+            entity2_embedding=entity2,
+            predicate="relates to",
+            predicate_type="related",
+            score=float(rng.uniform(0.1, 1.0)),
+        ))
+    return records
@@ -0,0 +1,231 @@
+import asyncio
+import inspect
+import json
+import os
+import platform
+import time
+import warnings
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+"""
+    Timing, result files and baseline comparison for the component benchmarks.
+
+    A BenchmarkCase prepares its inputs in `setup`, which is not timed, and returns the callable
+    to time; coroutine functions are run to completion on one event loop. Each case is called
+    `warmup` times, then `iterations` times or for `min_time` seconds, whichever is longer, and
+    its latencies are summarized as p50, p95, mean and min in milliseconds, with the throughput in
+    case units per second. Results are written as JSON; a results file can be stored as the
+    baseline later runs are compared against.
+"""
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+COMPARED_METRICS = ("p50_ms", "p95_ms")
+# Calls of fast cases are repeated for at least this long, up to MAX_ITERATIONS, to steady their percentiles
+DEFAULT_MIN_TIME = 1.0
+MAX_ITERATIONS = 10000
+# Metadata that must match between a run and its baseline for their latencies to be comparable
+ENVIRONMENT_KEYS = ("python", "system", "machine", "cpu_count", "torch_threads")
+
+
+class SkipBenchmark(Exception):
+    """Raised by a case's setup when a model or tool it needs is not available."""
+
+
+class EnvironmentMismatch(Exception):
+    """Raised by `compare` when the baseline was recorded on a different kind of host."""
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], Any]]
+    # Units processed per call, e.g. sentences or megabytes, for the throughput
+    items: Callable[[], float] = lambda: 1
+    unit: str = "calls"
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    unit: str
+    iterations: int = 0
+    items_per_call: float = 0
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    mean_ms: Optional[float] = None
+    min_ms: Optional[float] = None
+    throughput_per_s: Optional[float] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    skipped: Optional[str] = None
+
+    @classmethod
+    def from_samples(cls, case: BenchmarkCase, samples: List[float], items_per_call: float) -> "BenchmarkResult":
+        latencies = np.asarray(samples) * 1000
+        mean_s = float(np.mean(samples))
+        return cls(
+            name=case.name,
+            group=case.group,
+            unit=case.unit,
+            iterations=len(samples),
+            items_per_call=items_per_call,
+            p50_ms=round(float(np.percentile(latencies, 50)), 4),
+            p95_ms=round(float(np.percentile(latencies, 95)), 4),
+            mean_ms=round(float(np.mean(latencies)), 4),
+            min_ms=round(float(np.min(latencies)), 4),
+            throughput_per_s=round(items_per_call / mean_s, 4) if mean_s > 0 else None,
+            params=dict(case.params),
+        )
+
+
+@dataclass
+class Comparison:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else 0.0
+
+    @property
+    def regressed(self) -> bool:
+        return self.change > self.threshold
+
+
+def run_case(case: BenchmarkCase, iterations: int, warmup: int, loop: asyncio.AbstractEventLoop, min_time: float = DEFAULT_MIN_TIME) -> BenchmarkResult:
+    try:
+        function = case.setup()
+    except SkipBenchmark as e:
+        return BenchmarkResult(name=case.name, group=case.group, unit=case.unit, params=dict(case.params), skipped=str(e))
+
+    def call():
+        if inspect.iscoroutinefunction(function):
+            return loop.run_until_complete(function())
+        return function()
+
+    for _ in range(warmup):
+        call()
+    samples = []
+    elapsed = 0.0
+    while len(samples) < max(1, iterations) or (elapsed < min_time and len(samples) < MAX_ITERATIONS):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+        elapsed += samples[-1]
+    return BenchmarkResult.from_samples(case, samples, float(case.items()))
+
+
+def run_cases(cases: List[BenchmarkCase], iterations: int = 10, warmup: int = 1, min_time: float = DEFAULT_MIN_TIME, progress: Callable[[BenchmarkResult], None] = None) -> List[BenchmarkResult]:
+    loop = asyncio.new_event_loop()
+    try:
+        results = []
+        for case in cases:
+            result = run_case(case, iterations, warmup, loop, min_time)
+            if progress is not None:
+                progress(result)
+            results.append(result)
+        return results
+    finally:
+        loop.close()
+
+
+def environment() -> Dict[str, Any]:
+    metadata = {
+        "python": platform.python_version(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    try:
+        import torch
+
+        metadata["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return metadata
+
+
+def results_document(results: List[BenchmarkResult], thresholds: Optional[Dict[str, float]] = None) -> dict:
+    document = {
+        "version": RESULTS_VERSION,
+        "metadata": environment(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    if thresholds:
+        document["thresholds"] = thresholds
+    return document
+
+
+def write_results(path: str, document: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as results_file:
+        json.dump(document, results_file, indent=2, sort_keys=True)
+        results_file.write("\n")
+    os.replace(f"{path}.tmp", path)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+
+def environment_differences(current: dict, baseline: dict) -> Dict[str, Tuple[Any, Any]]:
+    """The ENVIRONMENT_KEYS whose values differ between two results documents, as (baseline, current)."""
+    current_metadata, baseline_metadata = current.get("metadata", {}), baseline.get("metadata", {})
+    differences = {}
+    for key in ENVIRONMENT_KEYS:
+        previous, value = baseline_metadata.get(key), current_metadata.get(key)
+        if key == "python":
+            # Patch releases do not change performance enough to matter
+            previous, value = (version.rsplit(".", 1)[0] if version else None for version in (previous, value))
+        if previous != value:
+            differences[key] = (previous, value)
+    return differences
+
+
+def compare(current: dict, baseline: dict, threshold: Optional[float] = None, allow_environment_mismatch: bool = False) -> List[Comparison]:
+    """
+    Compares the latencies of `current` with `baseline`, both results documents. A case regresses
+    when a metric grows by more than its threshold: `threshold` when given, otherwise the case's
+    entry in the baseline's "thresholds", then its "default", then DEFAULT_THRESHOLD. Cases that
+    were skipped or ran with different params in either document are not compared.
+
+    Raises EnvironmentMismatch when the two documents come from hosts with a different Python,
+    platform, CPU count or torch thread count; with `allow_environment_mismatch`, it warns instead.
+    """
+    differences = environment_differences(current, baseline)
+    if differences:
+        message = "The baseline was recorded on a different environment: " + ", ".join(
+            f"{key} {previous} != {value}" for key, (previous, value) in differences.items()
+        )
+        if not allow_environment_mismatch:
+            raise EnvironmentMismatch(message)
+        warnings.warn(message)
+    thresholds = baseline.get("thresholds", {})
+    comparisons = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or result.get("skipped") or previous.get("skipped"):
+            continue
+        if result.get("params", {}) != previous.get("params", {}):
+            continue
+        limit = threshold if threshold is not None else thresholds.get(name, thresholds.get("default", DEFAULT_THRESHOLD))
+        for metric in COMPARED_METRICS:
+            if previous.get(metric) is not None and result.get(metric) is not None:
+                comparisons.append(Comparison(name, metric, previous[metric], result[metric], limit))
+    return comparisons
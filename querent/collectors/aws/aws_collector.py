@@ -1,5 +1,8 @@
-import io
-from typing import AsyncGenerator
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Optional
+from botocore.config import Config as BotocoreConfig
 from botocore.exceptions import (
     NoCredentialsError,
 )
@@ -9,6 +12,9 @@ from querent.common.types.collected_bytes import (
 from querent.config.collector.collector_config import CollectorBackend, S3CollectConfig
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool, iter_stream
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.uri import Uri
 import boto3
 
@@ -16,15 +22,35 @@ from querent.logging.logger import setup_logger
 
 
 class AWSCollector(Collector):
-    def __init__(self, config: S3CollectConfig, prefix: str):
+    def __init__(self, config: S3CollectConfig, prefix: Optional[Uri] = None):
         self.bucket_name = config.bucket
         self.region = config.region
         self.access_key = config.access_key
         self.secret_key = config.secret_key
+        self.endpoint_url = config.endpoint_url
         self.chunk_size = 1024  # Default value
         if config.chunk and config.chunk.isdigit():
             self.chunk_size = int(config.chunk)
+        self.prefix = config.prefix or self.prefix_from_uri(prefix)
+        self.delimiter = config.delimiter
+        self.multipart_threshold = 8 * 1024 * 1024
+        if config.multipart_threshold and config.multipart_threshold.isdigit():
+            self.multipart_threshold = int(config.multipart_threshold)
+        self.multipart_chunksize = 8 * 1024 * 1024
+        if config.multipart_chunksize and config.multipart_chunksize.isdigit():
+            self.multipart_chunksize = max(1, int(config.multipart_chunksize))
+        self.multipart_concurrency = 4
+        if config.multipart_concurrency and config.multipart_concurrency.isdigit():
+            self.multipart_concurrency = max(1, int(config.multipart_concurrency))
+        self.s3_client = None
+        self.range_executor = None
         self.logger = setup_logger(__name__, "AWSCollector")
+        self.runtime = CollectorRuntime.from_config(config, name="AWSCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        # Keys outside the listed prefix must not be reported as deleted, so it scopes the manifest
+        self.manifest = open_sync_manifest(
+            config, f"s3://{self.bucket_name}/{self.region}/{self.prefix}{self.delimiter}"
+        )
 
     async def connect(self):
         # Initialize the S3 client with proper error handling for credentials
@@ -34,46 +60,108 @@ class AWSCollector(Collector):
                 aws_access_key_id=self.access_key,
                 aws_secret_access_key=self.secret_key,
                 region_name=self.region,
+                endpoint_url=self.endpoint_url,
+                config=BotocoreConfig(
+                    max_pool_connections=self.runtime.max_workers + self.multipart_concurrency,
+                    s3={"addressing_style": "path"} if self.endpoint_url else None,
+                ),
             )
         except NoCredentialsError:
             raise Exception("AWS credentials are not set properly.")
 
     async def disconnect(self):
         # No asynchronous disconnect needed for boto3
-        pass
+        self.runtime.close()
+        if self.range_executor is not None:
+            self.range_executor.shutdown(wait=False, cancel_futures=True)
+            self.range_executor = None
+
+    def prefix_from_uri(self, uri: Optional[Uri]) -> str:
+        # s3://bucket/some/prefix lists the keys under some/prefix
+        if not isinstance(uri, Uri):
+            return ""
+        bucket, _, prefix = uri.path.partition("/")
+        return prefix if bucket == self.bucket_name else ""
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
         if not self.s3_client:
             await self.connect()
 
+        doc_source = f"s3://{self.bucket_name}/{self.region}"
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
+            items = self.list_items(doc_source)
+            async for collected_bytes in self.download_pool.download(items, self.manifest):
+                yield collected_bytes
 
-            for obj in response.get("Contents", []):
-                file = self.download_object_as_byte_stream(obj["Key"])
-                async for chunk in self.read_chunks(file):
-                    yield CollectedBytes(file=obj["Key"], data=chunk, error=None, doc_source=f"s3://{self.bucket_name}/{self.region}")
-                yield CollectedBytes(file=obj["Key"], data=None, error=None, eof=True, doc_source=f"s3://{self.bucket_name}/{self.region}")
+            if self.manifest is not None:
+                for tombstone in self.manifest.tombstones(doc_source):
+                    yield tombstone
+                self.manifest.commit()
 
         except PermissionError as exc:
-            self.logger.error(f"Getting Permission Error on file {file}, as {exc}")
+            self.logger.error(f"Getting Permission Error on bucket {self.bucket_name}, as {exc}")
         except OSError as exc:
-            self.logger.error(f"Getting OS Error on file {file}, as {exc}")
+            self.logger.error(f"Getting OS Error on bucket {self.bucket_name}, as {exc}")
         finally:
             await self.disconnect()  # Disconnect when done
 
-    async def read_chunks(self, file):
-        while True:
-            chunk = file.read(self.chunk_size)
-            if not chunk:
-                break
-            yield chunk
-
-    def download_object_as_byte_stream(self, object_key):
-        byte_stream = io.BytesIO()
-        self.s3_client.download_fileobj(self.bucket_name, object_key, byte_stream)
-        byte_stream.seek(0)  # Rewind the stream to the beginning
-        return byte_stream
+    async def list_items(self, doc_source: str) -> AsyncGenerator[DownloadItem, None]:
+        """Lists every page of the bucket, so objects are downloaded while later pages load."""
+        list_arguments = {"Bucket": self.bucket_name, "Prefix": self.prefix}
+        if self.delimiter:
+            list_arguments["Delimiter"] = self.delimiter
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        async for page in self.runtime.iterate(paginator.paginate(**list_arguments)):
+            for obj in page.get("Contents", []):
+                yield DownloadItem(
+                    file=obj["Key"],
+                    open=functools.partial(self.open_object, obj["Key"], obj.get("Size"), obj.get("ETag")),
+                    doc_source=doc_source,
+                    size=obj.get("Size"),
+                    version=obj.get("ETag"),
+                )
+
+    def open_object(self, object_key, size=None, etag=None):
+        if size is not None and size >= self.multipart_threshold:
+            return self.read_ranges(object_key, size, etag)
+        body = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_key)["Body"]
+        return iter_stream(body, self.chunk_size)
+
+    def get_range(self, object_key, start, end, etag=None):
+        arguments = {"Bucket": self.bucket_name, "Key": object_key, "Range": f"bytes={start}-{end}"}
+        if etag:
+            # Fails instead of mixing parts of two versions when the object changes meanwhile
+            arguments["IfMatch"] = etag
+        return self.s3_client.get_object(**arguments)["Body"].read()
+
+    def read_ranges(self, object_key, size, etag=None):
+        """
+        Fetches a large object as `multipart_chunksize` ranged GETs, keeping up to
+        `multipart_concurrency` of them in flight and yielding the parts in order.
+        """
+        if self.range_executor is None:
+            self.range_executor = ThreadPoolExecutor(
+                max_workers=self.multipart_concurrency, thread_name_prefix="AWSCollectorRange"
+            )
+        ranges = iter(range(0, size, self.multipart_chunksize))
+        parts = deque()
+
+        def fetch_next_part():
+            start = next(ranges, None)
+            if start is not None:
+                end = min(start + self.multipart_chunksize, size) - 1
+                parts.append(self.range_executor.submit(self.get_range, object_key, start, end, etag))
+
+        try:
+            for _ in range(self.multipart_concurrency):
+                fetch_next_part()
+            while parts:
+                part = parts.popleft().result()
+                fetch_next_part()
+                yield part
+        finally:
+            for part in parts:
+                part.cancel()
 
 
 class AWSCollectorFactory(CollectorFactory):
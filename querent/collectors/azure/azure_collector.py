@@ -1,11 +1,14 @@
+import functools
 from typing import AsyncGenerator
-import io
 
 from azure.storage.blob import BlobServiceClient
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.config.collector.collector_config import CollectorBackend, AzureCollectConfig
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool, iter_stream
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.uri import Uri
 from querent.logging.logger import setup_logger
 
@@ -23,6 +26,9 @@ class AzureCollector(Collector):
         self.blob_service_client = None
         self.container_client = None
         self.logger = setup_logger(__name__, "AzureCollector")
+        self.runtime = CollectorRuntime.from_config(config, name="AzureCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        self.manifest = open_sync_manifest(config, f"azure://{self.container_name}/{self.account_url}")
 
     async def connect(self):
         try:
@@ -44,21 +50,23 @@ class AzureCollector(Collector):
             raise e
 
     async def disconnect(self):
-        pass  # No asynchronous disconnect needed for the Azure Blob Storage client
+        # No asynchronous disconnect needed for the Azure Blob Storage client
+        self.runtime.close()
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
         try:
             if not self.container_client:
                 await self.connect()
 
+            doc_source = f"azure://{self.container_name}/{self.account_url}"
             blob_list = self.container_client.list_blobs(name_starts_with=self.prefix)
-            for blob in blob_list:
-                file = self.download_blob_as_byte_stream(
-                    self.container_client, blob.name
-                )
-                async for chunk in self.read_chunks(file):
-                    yield CollectedBytes(file=blob.name, data=chunk, error=None, doc_source=f"azure://{self.container_name}/{self.account_url}")
-                yield CollectedBytes(file=blob.name, data=None, error=None, eof=True, doc_source=f"azure://{self.container_name}/{self.account_url}")
+            async for collected_bytes in self.download_pool.download(self.list_items(blob_list, doc_source), self.manifest):
+                yield collected_bytes
+
+            if self.manifest is not None:
+                for tombstone in self.manifest.tombstones(doc_source):
+                    yield tombstone
+                self.manifest.commit()
         except Exception as e:
             # Handle exceptions gracefully, e.g., log the error
             self.logger.error(f"Error polling Azure Blob Storage: {e}")
@@ -67,24 +75,21 @@ class AzureCollector(Collector):
             # Disconnect the client when done
             await self.disconnect()
 
-    async def read_chunks(self, file):
-        while True:
-            chunk = file.read(self.chunk_size)
-            if not chunk:
-                break
-            yield chunk
-
-    def download_blob_as_byte_stream(self, container_client, blob_name):
-        blob_client = container_client.get_blob_client(blob_name)
-        blob_properties = blob_client.get_blob_properties()
-        byte_stream = io.BytesIO()
-
-        if blob_properties["size"] > 0:
-            stream = blob_client.download_blob()
-            byte_stream.write(stream.readall())
-            byte_stream.seek(0)  # Rewind the stream to the beginning
+    async def list_items(self, blob_list, doc_source: str) -> AsyncGenerator[DownloadItem, None]:
+        async for blob in self.runtime.iterate(blob_list):
+            yield DownloadItem(
+                file=blob.name,
+                open=functools.partial(self.open_blob, blob.name, blob.size),
+                doc_source=doc_source,
+                size=blob.size,
+                version=blob.etag,
+            )
 
-        return byte_stream
+    def open_blob(self, blob_name, size):
+        if not size:
+            return iter(())
+        blob_client = self.container_client.get_blob_client(blob_name)
+        return iter_stream(blob_client.download_blob(), self.chunk_size)
 
 
 class AzureCollectorFactory(CollectorFactory):
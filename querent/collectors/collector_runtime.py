@@ -0,0 +1,103 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class CollectorRuntime:
+    """
+    Runs the blocking calls of sync SDKs (boto3, google-cloud, jira, imaplib, ...) on a
+    bounded thread pool owned by one collector, so they never stall the event loop that
+    also drives the ingestors and engines.
+
+    Example:
+        self.runtime = CollectorRuntime.from_config(config, name="AWSCollector")
+        response = await self.runtime.run(self.s3_client.list_objects_v2, Bucket=bucket)
+        async for blob in self.runtime.iterate(container_client.list_blobs()):
+            ...
+
+    Attributes:
+        max_workers (int): Number of threads blocking calls run on.
+        prefetch (int): Number of items `iterate` pulls ahead of the consumer.
+    """
+
+    def __init__(self, max_workers: int = 4, prefetch: int = 2, name: str = "collector"):
+        self.max_workers = max(1, max_workers)
+        self.prefetch = max(1, prefetch)
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls, config, name: str = "collector") -> "CollectorRuntime":
+        max_workers = 4
+        io_workers = getattr(config, "io_workers", None)
+        if io_workers and str(io_workers).isdigit():
+            max_workers = int(io_workers)
+        prefetch = 2
+        io_prefetch = getattr(config, "io_prefetch", None)
+        if io_prefetch and str(io_prefetch).isdigit():
+            prefetch = int(io_prefetch)
+        return cls(max_workers=max_workers, prefetch=prefetch, name=name)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created lazily so a collector can poll again after disconnect closed the runtime
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Runs a blocking call on the pool and waits for its result without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def iterate(self, iterable: Iterable[T], prefetch: Optional[int] = None) -> AsyncGenerator[T, None]:
+        """
+        Iterates a blocking iterable (paged listings, chunked downloads, generators) on the
+        pool, keeping up to `prefetch` items ready ahead of the consumer. Exceptions raised
+        by the iterable are re-raised at the position they occurred.
+        """
+        queue = asyncio.Queue(maxsize=prefetch or self.prefetch)
+
+        async def produce():
+            try:
+                iterator = await self.run(iter, iterable)
+                while True:
+                    item = await self.run(next, iterator, _DONE)
+                    if item is _DONE:
+                        break
+                    await queue.put(item)
+            except Exception as e:
+                await queue.put(_Failure(e))
+                return
+            await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            producer.cancel()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,252 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterable, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.sync_manifest import SyncManifest
+from querent.common.types.collected_bytes import CollectedBytes
+from querent.logging.logger import setup_logger
+
+_DONE = object()
+
+
+class _Finished:
+    def __init__(self, index: int):
+        self.index = index
+
+
+@dataclass
+class DownloadItem:
+    """
+    One object to download. `open` is a blocking callable, run on the collector runtime,
+    returning an iterator over the object's chunks so large objects are streamed. `key`
+    identifies the object in the sync manifest when its file name is not unique.
+    """
+
+    file: str
+    open: Callable[[], Iterator[bytes]]
+    doc_source: str
+    size: Optional[int] = None
+    version: Optional[str] = None
+    content_hash: Optional[str] = None
+    key: Optional[str] = None
+
+    @property
+    def manifest_key(self) -> str:
+        return self.key or self.file
+
+
+def next_block(chunks: Iterator[bytes], block_size: int) -> Tuple[List[bytes], bool, Optional[Exception]]:
+    """
+    Pulls chunks from a blocking iterator until `block_size` bytes were read or it ends.
+    Returns the chunks, whether the iterator ended, and the error it raised, if any, so the
+    chunks read before a failure are still delivered.
+    """
+    block = []
+    size = 0
+    try:
+        while size < block_size:
+            chunk = next(chunks, _DONE)
+            if chunk is _DONE:
+                return block, True, None
+            if chunk:
+                block.append(chunk)
+                size += len(chunk)
+    except Exception as e:
+        return block, True, e
+    return block, False, None
+
+
+def iter_stream(stream, chunk_size: int) -> Iterator[bytes]:
+    """Turns a blocking file-like object into an iterator of `chunk_size` chunks."""
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+
+class DownloadPool:
+    """
+    Downloads objects of a collector concurrently, keeping up to `max_in_flight` downloads
+    running and at most `byte_budget` bytes downloaded but not yet consumed.
+
+    With `ordered` set, the chunks of each object are yielded one object after the other in
+    listing order; the object being yielded is never held back by the budget, so the
+    downloads behind it cannot starve it. Otherwise chunks are yielded as they complete and
+    the chunks of different objects interleave, which the ingestors handle per file.
+
+    Each download pulls `block_size` bytes of chunks per blocking call, so small chunks do not
+    cost one executor hop each; a download may read up to one block beyond the budget.
+
+    A failed download yields an error CollectedBytes for that object followed by its eof,
+    and the remaining objects are still downloaded. The chunks yielded before the error are
+    only part of the object, so consumers must discard them; IngestorFactoryManager raises
+    the error in the file's ingestor. A cancelled download closes its source. When a sync
+    manifest is passed, objects it reports as unchanged are skipped and completed downloads
+    are recorded in it.
+
+    Attributes:
+        runtime (CollectorRuntime): Runtime the blocking downloads run on.
+        max_in_flight (int): Number of objects downloaded at the same time.
+        byte_budget (int): Bytes that may be buffered ahead of the consumer.
+        ordered (bool): Whether objects are yielded in listing order.
+        block_size (int): Bytes pulled from a source per blocking call.
+    """
+
+    def __init__(
+        self,
+        runtime: CollectorRuntime,
+        max_in_flight: int = 4,
+        byte_budget: int = 64 * 1024 * 1024,
+        ordered: bool = True,
+        block_size: int = 1024 * 1024,
+    ):
+        self.runtime = runtime
+        self.max_in_flight = max(1, max_in_flight)
+        self.byte_budget = max(1, byte_budget)
+        self.ordered = ordered
+        self.block_size = max(1, min(block_size, self.byte_budget))
+        self.logger = setup_logger(__name__, "DownloadPool")
+        self._buffered = 0
+        self._head = 0
+        self._budget_changed = asyncio.Condition()
+
+    @classmethod
+    def from_config(cls, config, runtime: CollectorRuntime, ordered: bool = True) -> "DownloadPool":
+        max_in_flight = runtime.max_workers
+        if getattr(config, "download_concurrency", None) and str(config.download_concurrency).isdigit():
+            max_in_flight = int(config.download_concurrency)
+        byte_budget = 64 * 1024 * 1024
+        if getattr(config, "download_budget", None) and str(config.download_budget).isdigit():
+            byte_budget = int(config.download_budget)
+        block_size = 1024 * 1024
+        if getattr(config, "download_block_size", None) and str(config.download_block_size).isdigit():
+            block_size = int(config.download_block_size)
+        return cls(runtime, max_in_flight=max_in_flight, byte_budget=byte_budget, ordered=ordered, block_size=block_size)
+
+    async def _reserve(self, index: int, size: int):
+        async with self._budget_changed:
+            await self._budget_changed.wait_for(
+                lambda: (self.ordered and index == self._head)
+                or self._buffered == 0
+                or self._buffered + size <= self.byte_budget
+            )
+            self._buffered += size
+
+    async def _release(self, size: int, advance_head: bool = False):
+        async with self._budget_changed:
+            self._buffered -= size
+            if advance_head:
+                self._head += 1
+            self._budget_changed.notify_all()
+
+    async def _fetch(self, index: int, item: DownloadItem, output: asyncio.Queue, manifest: Optional[SyncManifest]):
+        chunks = None
+        pull = None
+        try:
+            chunks = await self.runtime.run(item.open)
+            done = False
+            while not done:
+                # Shielded, so a cancelled download can wait for the pull running on its source
+                pull = asyncio.ensure_future(self.runtime.run(next_block, chunks, self.block_size))
+                block, done, error = await asyncio.shield(pull)
+                pull = None
+                for chunk in block:
+                    await self._reserve(index, len(chunk))
+                    await output.put(CollectedBytes(file=item.file, data=chunk, error=None, doc_source=item.doc_source))
+                if error is not None:
+                    raise error
+            if manifest is not None:
+                manifest.record(item.manifest_key, item.version, item.size, item.content_hash, name=item.file)
+        except asyncio.CancelledError:
+            if chunks is not None:
+                self._close_source(chunks, pull)
+            raise
+        except Exception as e:
+            self.logger.error(f"Error downloading {item.file}: {e}")
+            await output.put(CollectedBytes(file=item.file, data=None, error=str(e), doc_source=item.doc_source))
+        await output.put(CollectedBytes(file=item.file, data=None, error=None, eof=True, doc_source=item.doc_source))
+        await output.put(_Finished(index))
+
+    def _close_source(self, chunks: Iterator[bytes], pull: Optional[asyncio.Future]):
+        """Closes the chunk iterator of a cancelled download, once no pull is running on it."""
+        close = getattr(chunks, "close", None)
+        if close is None:
+            return
+
+        def close_source(pull: Optional[asyncio.Future] = None):
+            if pull is not None and not pull.cancelled():
+                # Retrieved so a failed pull is not reported as an unhandled error
+                pull.exception()
+            try:
+                close()
+            except Exception as e:
+                self.logger.error(f"Error closing a cancelled download: {e}")
+
+        if pull is None or pull.done():
+            close_source(pull)
+        else:
+            pull.add_done_callback(close_source)
+
+    async def download(
+        self,
+        items: Union[Iterable[DownloadItem], AsyncIterable[DownloadItem]],
+        manifest: Optional[SyncManifest] = None,
+    ) -> AsyncGenerator[CollectedBytes, None]:
+        self._buffered = 0
+        self._head = 0
+        if not hasattr(items, "__aiter__"):
+            items = self._as_async(items)
+        items = items.__aiter__()
+        # Downloads by listing index, in listing order
+        in_flight = {}
+        shared_output = asyncio.Queue()
+        next_index = 0
+        exhausted = False
+
+        async def start_next() -> bool:
+            nonlocal next_index, exhausted
+            if exhausted:
+                return False
+            while True:
+                try:
+                    item = await items.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    return False
+                if manifest is None or manifest.is_changed(item.manifest_key, item.version, item.size):
+                    break
+            output = asyncio.Queue() if self.ordered else shared_output
+            in_flight[next_index] = (output, asyncio.create_task(self._fetch(next_index, item, output, manifest)))
+            next_index += 1
+            return True
+
+        try:
+            while len(in_flight) < self.max_in_flight and await start_next():
+                pass
+            while in_flight:
+                output = in_flight[next(iter(in_flight))][0] if self.ordered else shared_output
+                collected_bytes = await output.get()
+                if isinstance(collected_bytes, _Finished):
+                    del in_flight[collected_bytes.index]
+                    if self.ordered:
+                        await self._release(0, advance_head=True)
+                    await start_next()
+                    continue
+                if collected_bytes.data is not None:
+                    await self._release(len(collected_bytes.data))
+                yield collected_bytes
+        finally:
+            for _, task in in_flight.values():
+                task.cancel()
+
+    @staticmethod
+    async def _as_async(items: Iterable[DownloadItem]) -> AsyncGenerator[DownloadItem, None]:
+        for item in items:
+            yield item
@@ -1,7 +1,11 @@
-import asyncio
-from pathlib import Path
-from typing import AsyncGenerator
+import functools
 import io
+import json
+import os
+import threading
+from typing import AsyncGenerator, Iterator, List, Optional
+import google_auth_httplib2
+import httplib2
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
@@ -9,6 +13,9 @@ from googleapiclient.http import MediaIoBaseDownload
 
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.uri import Uri
 from querent.config.collector.collector_config import (
@@ -16,12 +23,55 @@ from querent.config.collector.collector_config import (
     DriveCollectorConfig,
 )
 from querent.common import common_errors
-import requests
 
 from querent.logging.logger import setup_logger
 
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# Google Docs files have no content of their own and are exported to these types
+EXPORT_MIME_TYPES = {
+    "application/vnd.google-apps.document": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+FILE_FIELDS = "id, name, mimeType, size, version, md5Checksum, parents, trashed"
+
+
+class ThreadLocalHttp:
+    """
+    httplib2 connections are not thread safe. This executes every request of the Drive
+    service on a connection owned by the calling thread, so downloads can run in parallel
+    on the collector runtime while each thread keeps its connection alive between requests.
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self.local = threading.local()
+        self.connections = []
+
+    def connection(self) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self.local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self.local.http = http
+            self.connections.append(http)
+        return http
+
+    def request(self, *args, **kwargs):
+        return self.connection().request(*args, **kwargs)
+
+    def close(self):
+        for http in self.connections:
+            http.close()
+        self.connections = []
+
 
 class DriveCollector(Collector):
+    """
+    Collects the files of a Google Drive folder, optionally of one mime type.
+
+    The listing is paged with `nextPageToken`, and files are exported or downloaded
+    concurrently through a DownloadPool. With `drive_changes_file` set, the first run lists
+    everything and later runs only read the changes feed from the page token it saved.
+    """
+
     def __init__(self, config: DriveCollectorConfig):
         self.items_to_ignore = []
         self.refresh_token = config.drive_refresh_token
@@ -30,13 +80,24 @@ class DriveCollector(Collector):
         self.client_id = config.drive_client_id
         self.client_secret = config.drive_client_secret
         self.creds = None
+        self.http = None
         self.drive_service = None
         self.chunk_size = 1024
         if config.chunk_size and config.chunk_size.isdigit():
             self.chunk_size = int(config.chunk_size)
+        self.page_size = 1000
+        if config.drive_page_size and str(config.drive_page_size).isdigit():
+            self.page_size = max(1, int(config.drive_page_size))
         self.specific_file_type = config.specific_file_type
         self.folder_to_crawl = config.folder_to_crawl
+        self.drive_id = config.drive_id
+        self.api_endpoint = config.drive_api_endpoint
+        self.changes_file = config.drive_changes_file
+        self.next_page_token = None
         self.logger = setup_logger(__name__, "DriveCollector")
+        self.runtime = CollectorRuntime.from_config(config, name="DriveCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        self.manifest = open_sync_manifest(config, f"drive://{self.folder_to_crawl}")
         try:
             with open("./.gitignore", "r", encoding="utf-8") as gitignore_file:
                 self.items_to_ignore = set(
@@ -56,9 +117,13 @@ class DriveCollector(Collector):
                 client_secret=self.client_secret,
             )
             if self.creds and self.creds.expired and self.creds.refresh_token:
-                self.creds.refresh(Request())
+                await self.runtime.run(self.creds.refresh, Request())
 
-            self.drive_service = build("drive", "v3", credentials=self.creds)
+            self.http = ThreadLocalHttp(self.creds)
+            client_options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+            self.drive_service = build(
+                "drive", "v3", http=self.http, client_options=client_options, cache_discovery=False
+            )
         except Exception as e:
             self.logger.error(f"Error connecting to Google Drive: {e}")
             raise common_errors.ConnectionError(
@@ -67,29 +132,44 @@ class DriveCollector(Collector):
 
     async def disconnect(self):
         try:
-            if self.drive_service:
-                # Close the Google Drive connection
-                self.drive_service.close()
+            if self.http:
+                # Close the connections of every runtime thread
+                self.http.close()
+            self.runtime.close()
         except Exception as e:
             self.logger.error(f"Error disconnecting from Google Drive: {e}")
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
+        doc_source = f"drive://{self.folder_to_crawl}"
         try:
-            query = ""
-            if self.specific_file_type:
-                query = f"mimeType='{self.specific_file_type}'"
-            if self.folder_to_crawl:
-                if self.specific_file_type:
-                    query += " and "
-                query = f"'{self.folder_to_crawl}' in parents"
-            results = self.drive_service.files().list(q=query).execute()
-            files = results.get("files", [])
-            if not files:
-                self.logger.info("No files found in Google Drive")
-            for file in files:
-                async for chunk in self.read_chunks(file["id"]):
-                    yield CollectedBytes(data=chunk, file=file["name"], doc_source=f"drive://{self.folder_to_crawl}")
-                yield CollectedBytes(data=None, file=file["name"], eof=True, doc_source=f"drive://{self.folder_to_crawl}")
+            page_token = self.load_changes_token()
+            removed = []
+            if page_token is None:
+                complete = True
+                if self.changes_file:
+                    # Taken before listing, so files changed while listing are fetched next run
+                    self.next_page_token = await self.runtime.run(self.get_start_page_token)
+                items = self.list_items(doc_source)
+            else:
+                complete = False
+                self.next_page_token = page_token
+                items = self.list_changes(page_token, doc_source, removed)
+
+            failed = False
+            async for collected_bytes in self.download_pool.download(items, self.manifest):
+                failed = failed or collected_bytes.is_error()
+                yield collected_bytes
+
+            if self.manifest is not None:
+                for file_id in removed:
+                    self.manifest.forget(file_id)
+                for tombstone in self.manifest.tombstones(doc_source, complete):
+                    yield tombstone
+                self.manifest.commit(complete)
+            # A failed download keeps the previous token, so its change is read again next run;
+            # the manifest skips the files that were downloaded
+            if self.changes_file and self.next_page_token and not failed:
+                self.save_changes_token(self.next_page_token)
         except Exception as e:
             raise common_errors.PollingError(
                 f"Failed to poll Google Drive: {str(e)}"
@@ -97,39 +177,141 @@ class DriveCollector(Collector):
         finally:
             await self.disconnect()
 
-    async def read_chunks(self, file_id):
-        file_metadata = (
-            self.drive_service.files().get(fileId=file_id, fields="mimeType").execute()
+    def build_query(self) -> str:
+        clauses = ["trashed = false"]
+        if self.specific_file_type:
+            clauses.append(f"mimeType = '{self.specific_file_type}'")
+        if self.folder_to_crawl:
+            clauses.append(f"'{self.folder_to_crawl}' in parents")
+        return " and ".join(clauses)
+
+    def drive_args(self) -> dict:
+        args = {"supportsAllDrives": True}
+        if self.drive_id:
+            args["driveId"] = self.drive_id
+        return args
+
+    def list_files(self) -> Iterator[dict]:
+        """Pages through the files matching the query, one `files.list` request per page."""
+        args = dict(self.drive_args(), includeItemsFromAllDrives=True)
+        if self.drive_id:
+            args["corpora"] = "drive"
+        page_token = None
+        while True:
+            response = self.drive_service.files().list(
+                q=self.build_query(),
+                pageSize=self.page_size,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                **args,
+            ).execute()
+            for file in response.get("files", []):
+                yield file
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def list_items(self, doc_source: str) -> AsyncGenerator[DownloadItem, None]:
+        found = False
+        async for file in self.runtime.iterate(self.list_files()):
+            found = True
+            if file["mimeType"] != FOLDER_MIME_TYPE:
+                yield self.download_item(file, doc_source)
+        if not found:
+            self.logger.info("No files found in Google Drive")
+
+    def get_start_page_token(self) -> str:
+        return self.drive_service.changes().getStartPageToken(**self.drive_args()).execute()["startPageToken"]
+
+    def iter_changes(self, page_token: str) -> Iterator[dict]:
+        """Pages through the changes feed from `page_token`, then stores the token to resume from."""
+        args = dict(self.drive_args(), includeItemsFromAllDrives=True)
+        while page_token:
+            response = self.drive_service.changes().list(
+                pageToken=page_token,
+                pageSize=self.page_size,
+                fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}))",
+                **args,
+            ).execute()
+            for change in response.get("changes", []):
+                yield change
+            if "newStartPageToken" in response:
+                self.next_page_token = response["newStartPageToken"]
+            page_token = response.get("nextPageToken")
+
+    async def list_changes(self, page_token: str, doc_source: str, removed: List[str]) -> AsyncGenerator[DownloadItem, None]:
+        async for change in self.runtime.iterate(self.iter_changes(page_token)):
+            file = change.get("file")
+            if change.get("removed") or file is None or not self.matches(file):
+                # Deleted, trashed, or moved out of the crawled folder
+                removed.append(change["fileId"])
+            elif file["mimeType"] != FOLDER_MIME_TYPE:
+                yield self.download_item(file, doc_source)
+
+    def matches(self, file: dict) -> bool:
+        """Whether a file from the changes feed matches the listing query."""
+        if file.get("trashed"):
+            return False
+        if self.specific_file_type and file.get("mimeType") != self.specific_file_type:
+            return False
+        return not self.folder_to_crawl or self.folder_to_crawl in file.get("parents", [])
+
+    def download_item(self, file: dict, doc_source: str) -> DownloadItem:
+        # Drive file names are not unique, so the manifest is keyed by file id and keeps the name for tombstones
+        return DownloadItem(
+            file=file["name"],
+            open=functools.partial(self.read_chunks, file),
+            doc_source=doc_source,
+            size=int(file["size"]) if "size" in file else None,
+            version=file.get("version"),
+            content_hash=file.get("md5Checksum"),
+            key=file["id"],
         )
-        mime_type = file_metadata.get("mimeType")
 
+    def read_chunks(self, file: dict) -> Iterator[bytes]:
+        mime_type = file["mimeType"]
         if mime_type.startswith("application/vnd.google-apps."):
-            if mime_type == "application/vnd.google-apps.document":
-                export_mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            elif mime_type == "application/vnd.google-apps.folder":
-                return
-            else:
+            export_mime_type = EXPORT_MIME_TYPES.get(mime_type)
+            if export_mime_type is None:
                 raise common_errors.PollingError(
                     f"Unsupported Google Docs file type: {mime_type}"
                 )
-
             request = self.drive_service.files().export_media(
-                fileId=file_id, mimeType=export_mime_type
+                fileId=file["id"], mimeType=export_mime_type
             )
         else:
             # It's a binary file, we can proceed with normal download
-            request = self.drive_service.files().get_media(fileId=file_id)
+            request = self.drive_service.files().get_media(fileId=file["id"], supportsAllDrives=True)
 
         fh = io.BytesIO()
         downloader = MediaIoBaseDownload(fh, request, chunksize=self.chunk_size)
         done = False
         while not done:
-            status, done = downloader.next_chunk()
-            if status:
+            _, done = downloader.next_chunk()
+            if fh.tell():
                 yield fh.getvalue()
                 fh.seek(0)
                 fh.truncate(0)
 
+    def changes_key(self) -> str:
+        return f"{self.drive_id or ''}|{self.folder_to_crawl or ''}|{self.specific_file_type or ''}"
+
+    def load_changes_token(self) -> Optional[str]:
+        if not self.changes_file or not os.path.exists(self.changes_file):
+            return None
+        with open(self.changes_file, "r", encoding="utf-8") as changes_file:
+            return json.load(changes_file).get(self.changes_key())
+
+    def save_changes_token(self, page_token: str):
+        tokens = {}
+        if os.path.exists(self.changes_file):
+            with open(self.changes_file, "r", encoding="utf-8") as changes_file:
+                tokens = json.load(changes_file)
+        tokens[self.changes_key()] = page_token
+        with open(f"{self.changes_file}.tmp", "w", encoding="utf-8") as changes_file:
+            json.dump(tokens, changes_file)
+        os.replace(f"{self.changes_file}.tmp", self.changes_file)
+
 
 class DriveCollectorFactory(CollectorFactory):
     def backend(self) -> CollectorBackend:
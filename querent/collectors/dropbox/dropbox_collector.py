@@ -1,3 +1,4 @@
+import functools
 from typing import AsyncGenerator
 
 import dropbox
@@ -7,6 +8,9 @@ from querent.config.collector.collector_config import DropboxConfig
 from querent.collectors.collector_base import Collector
 from querent.config.collector.collector_config import CollectorBackend
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common import common_errors
 from querent.common.uri import Uri
 from querent.logging.logger import setup_logger
@@ -22,6 +26,9 @@ class DropboxCollector(Collector):
             self.chunk_size = int(config.chunk_size)
         self.refresh_token = config.dropbox_refresh_token
         self.logger = setup_logger(__name__, "DropboxCollector")
+        self.runtime = CollectorRuntime.from_config(config, name="DropboxCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        self.manifest = open_sync_manifest(config, f"dropbox://{self.folder_path}")
         self.dbx = None
 
     async def connect(self):
@@ -50,27 +57,34 @@ class DropboxCollector(Collector):
         try:
             if self.dbx:
                 self.dbx.close()
+            self.runtime.close()
         except Exception as e:
             self.logger.error(f"Error disconnecting from Dropbox: {e}")
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
+        doc_source = f"dropbox://{self.folder_path}"
         try:
-            files_list = self.dbx.files_list_folder(self.folder_path).entries
-            for entry in files_list:
-                name = f"/{entry.name}"
-                try:
-                    file_metadata, response = self.dbx.files_download(name)
-                except dropbox.exceptions.AuthError as auth_error:
-                    self.logger.warning(
-                        f"Token expired. Refreshing access token and retrying."
-                    )
-                    self.connect()  # Attempt to refresh access token
-                    file_metadata, response = self.dbx.files_download(name)
+            files_list = (await self.runtime.run(self.dbx.files_list_folder, self.folder_path)).entries
+            items = [
+                DownloadItem(
+                    file=entry.name,
+                    open=functools.partial(self.open_file, f"/{entry.name}"),
+                    doc_source=doc_source,
+                    size=entry.size,
+                    version=entry.rev,
+                    content_hash=entry.content_hash,
+                )
+                for entry in files_list
+                # Folders cannot be downloaded
+                if isinstance(entry, dropbox.files.FileMetadata)
+            ]
+            async for collected_bytes in self.download_pool.download(items, self.manifest):
+                yield collected_bytes
 
-                file_content_bytes = response.content
-                async for chunk in self.stream_blob(file_content_bytes):
-                    yield CollectedBytes(file=entry.name, data=chunk, doc_source=f"dropbox://{self.folder_path}")
-                yield CollectedBytes(file=entry.name, data=None, eof=True, doc_source=f"dropbox://{self.folder_path}")
+            if self.manifest is not None:
+                for tombstone in self.manifest.tombstones(doc_source):
+                    yield tombstone
+                self.manifest.commit()
         except dropbox.exceptions.ApiError as e:
             self.logger.error(f"Error polling Dropbox: {e}")
             raise common_errors.PollingError(
@@ -79,11 +93,23 @@ class DropboxCollector(Collector):
         finally:
             await self.disconnect()
 
-    async def stream_blob(self, content_bytes):
-        offset = 0
-        while offset < len(content_bytes):
-            yield content_bytes[offset : offset + self.chunk_size]
-            offset = offset + self.chunk_size
+    def open_file(self, name):
+        try:
+            file_metadata, response = self.dbx.files_download(name)
+        except dropbox.exceptions.AuthError as auth_error:
+            self.logger.warning(
+                f"Token expired. Refreshing access token and retrying."
+            )
+            self.dbx.refresh_access_token()
+            file_metadata, response = self.dbx.files_download(name)
+        return self.stream_response(response)
+
+    def stream_response(self, response):
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                yield chunk
+        finally:
+            response.close()
 
 
 class DropBoxCollectorFactory(CollectorFactory):
@@ -1,9 +1,12 @@
-import asyncio
 import imaplib
-from typing import AsyncGenerator
+import json
+import os
+import re
+from typing import AsyncGenerator, Dict, Iterator, List, Optional, Tuple
 
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
 from querent.collectors.email.imap import ImapEmail
 from querent.common import common_errors
 from querent.common.types.collected_bytes import CollectedBytes
@@ -14,17 +17,54 @@ from querent.config.collector.collector_config import (
 )
 from querent.logging.logger import setup_logger
 
+UID_PATTERN = re.compile(rb"\bUID (\d+)")
+SIZE_PATTERN = re.compile(rb"\bRFC822\.SIZE (\d+)")
+
+
+def uid_set(uids: List[int]) -> str:
+    """Formats sorted UIDs as an IMAP sequence set, runs collapsed: [1, 2, 3, 7] -> "1:3,7"."""
+    ranges = []
+    for uid in uids:
+        if ranges and uid == ranges[-1][1] + 1:
+            ranges[-1][1] = uid
+        else:
+            ranges.append([uid, uid])
+    return ",".join(str(first) if first == last else f"{first}:{last}" for first, last in ranges)
+
 
 class EmailCollector(Collector):
+    """
+    Collects the messages of an IMAP folder by UID, `imap_batch_size` messages per UID FETCH.
+
+    The sizes of a batch are fetched first, and the batch is split so each UID FETCH returns
+    at most `imap_batch_bytes` bytes of messages; with the batch prefetched while the previous
+    one is yielded, this bounds the memory held by large mailboxes. With
+    `imap_max_message_size` set, larger messages are skipped. With `imap_watermark_file` set, the highest UID collected is kept
+    per folder, and later runs only fetch messages above it unless the folder's UIDVALIDITY
+    changed. Messages are fetched with BODY.PEEK[], so they are not marked as seen.
+    """
+
     def __init__(self, config: EmailCollectorConfig):
         self.config = config
         self.imap_email = ImapEmail()
+        self.imap_connection = None
+        # IMAP connections are not thread safe, so all calls go through a single thread
+        self.runtime = CollectorRuntime(max_workers=1, name="EmailCollector")
+        self.batch_size = 500
+        if self.config.imap_batch_size and str(self.config.imap_batch_size).isdigit():
+            self.batch_size = max(1, int(self.config.imap_batch_size))
+        self.batch_bytes = 32 * 1024 * 1024
+        if self.config.imap_batch_bytes and str(self.config.imap_batch_bytes).isdigit():
+            self.batch_bytes = max(1, int(self.config.imap_batch_bytes))
+        self.max_message_size = None
+        if self.config.imap_max_message_size and str(self.config.imap_max_message_size).isdigit():
+            self.max_message_size = int(self.config.imap_max_message_size)
         self.logger = setup_logger(__name__, "EmailCollector")
 
     async def connect(self):
         try:
             # Open an IMAP connection using the provided configuration
-            self.imap_connection = self.imap_email.imap_open(self.config)
+            self.imap_connection = await self.runtime.run(self.imap_email.imap_open, self.config)
             # Other connection-related setup can be done here if needed
 
         except imaplib.IMAP4.error as e:
@@ -37,34 +77,28 @@ class EmailCollector(Collector):
         try:
             if self.imap_connection:
                 # Close the IMAP connection
-                await asyncio.get_event_loop().run_in_executor(
-                    None, self.imap_connection.logout
-                )
+                await self.runtime.run(self.imap_connection.logout)
         except Exception as e:
             self.logger.error(f"Error disconnecting from IMAP server: {e}")
+        finally:
+            self.runtime.close()
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
+        doc_source = f"email://{self.config.imap_server}/{self.config.imap_folder}"
         try:
-            _, messages = self.imap_connection.select(self.config.imap_folder)
-            num_of_messages = int(messages[0])
-
-            # Fetch the emails
-            for i in range(num_of_messages, 0, -1):
-                _, data = self.imap_connection.fetch(str(i), "(RFC822)")
-                for response_part in data:
-                    if isinstance(response_part, tuple):
-                        message = response_part[1]
-                        yield CollectedBytes(
-                            data=message,
-                            file=f"{self.config.imap_username}:{self.config.imap_folder}/{i}.email",
-                            doc_source=f"email://{self.config.imap_server}/{self.config.imap_folder}"
-                        )
-                yield CollectedBytes(
-                    data=None,
-                    file=f"{self.config.imap_username}:{self.config.imap_folder}/{i}.email",
-                    eof=True,
-                    doc_source=f"email://{self.config.imap_server}/{self.config.imap_folder}"
-                )
+            uid_validity = await self.runtime.run(self.select_folder)
+            last_uid = self.load_watermark(uid_validity)
+            uids = await self.runtime.run(self.search_uids, last_uid)
+
+            # The next batch is fetched while the messages of the current one are yielded
+            async for messages in self.runtime.iterate(self.fetch_batches(uids), prefetch=1):
+                for uid, message in messages:
+                    file = f"{self.config.imap_username}:{self.config.imap_folder}/{uid}.email"
+                    yield CollectedBytes(data=message, file=file, doc_source=doc_source)
+                    yield CollectedBytes(data=None, file=file, eof=True, doc_source=doc_source)
+
+            if self.config.imap_watermark_file and uids:
+                self.save_watermark(uid_validity, uids[-1])
         except imaplib.IMAP4.error as e:
             self.logger.error(f"Error fetching emails from IMAP server: {e}")
             raise common_errors.ConnectionError(
@@ -73,6 +107,95 @@ class EmailCollector(Collector):
         finally:
             await self.disconnect()
 
+    @staticmethod
+    def check(response: Tuple[str, list]) -> list:
+        typ, data = response
+        if typ != "OK":
+            raise imaplib.IMAP4.error(f"{typ}: {data}")
+        return data
+
+    def select_folder(self) -> Optional[str]:
+        """Selects the configured folder and returns its UIDVALIDITY."""
+        self.check(self.imap_connection.select(self.config.imap_folder))
+        # Reported by the server in the response to SELECT
+        _, data = self.imap_connection.response("UIDVALIDITY")
+        if not data or data[-1] is None:
+            return None
+        value = data[-1]
+        return value.decode() if isinstance(value, bytes) else str(value)
+
+    def search_uids(self, last_uid: int) -> List[int]:
+        data = self.check(self.imap_connection.uid("SEARCH", None, f"UID {last_uid + 1}:*"))
+        # "n:*" matches the highest UID even when it is below n, so filter again
+        return sorted(uid for uid in (int(uid) for uid in b" ".join(data).split()) if uid > last_uid)
+
+    def fetch_sizes(self, uids: List[int]) -> Dict[int, int]:
+        sizes = {}
+        for part in self.check(self.imap_connection.uid("FETCH", uid_set(uids), "(RFC822.SIZE)")):
+            header = part[0] if isinstance(part, tuple) else part
+            uid = UID_PATTERN.search(header or b"")
+            size = SIZE_PATTERN.search(header or b"")
+            if uid and size:
+                sizes[int(uid.group(1))] = int(size.group(1))
+        return sizes
+
+    def split_by_size(self, uids: List[int], sizes: Dict[int, int]) -> Iterator[List[int]]:
+        """Splits `uids` into runs of at most `batch_bytes` bytes of messages."""
+        batch, batch_bytes = [], 0
+        for uid in uids:
+            size = sizes.get(uid, 0)
+            if batch and batch_bytes + size > self.batch_bytes:
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(uid)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    def fetch_batches(self, uids: List[int]) -> Iterator[List[Tuple[int, bytes]]]:
+        """Fetches the messages with `uids`, yielding them one batch of (uid, message) at a time."""
+        for start in range(0, len(uids), self.batch_size):
+            batch = uids[start:start + self.batch_size]
+            sizes = self.fetch_sizes(batch)
+            if self.max_message_size is not None:
+                skipped = {uid for uid in batch if sizes.get(uid, 0) > self.max_message_size}
+                if skipped:
+                    self.logger.info(f"Skipping {len(skipped)} messages larger than {self.max_message_size} bytes")
+                    batch = [uid for uid in batch if uid not in skipped]
+            for fetched in self.split_by_size(batch, sizes):
+                messages = []
+                for part in self.check(self.imap_connection.uid("FETCH", uid_set(fetched), "(BODY.PEEK[])")):
+                    if isinstance(part, tuple):
+                        uid = UID_PATTERN.search(part[0])
+                        if uid:
+                            messages.append((int(uid.group(1)), part[1]))
+                yield sorted(messages, key=lambda message: message[0])
+
+    def load_watermark(self, uid_validity: Optional[str]) -> int:
+        path = self.config.imap_watermark_file
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as watermark_file:
+            watermark = json.load(watermark_file).get(self.watermark_key())
+        if not watermark or watermark.get("uidvalidity") != uid_validity:
+            # UIDs of a folder are only comparable under the same UIDVALIDITY
+            return 0
+        return int(watermark["uid"])
+
+    def save_watermark(self, uid_validity: Optional[str], last_uid: int):
+        path = self.config.imap_watermark_file
+        watermarks = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as watermark_file:
+                watermarks = json.load(watermark_file)
+        watermarks[self.watermark_key()] = {"uidvalidity": uid_validity, "uid": last_uid}
+        with open(f"{path}.tmp", "w", encoding="utf-8") as watermark_file:
+            json.dump(watermarks, watermark_file)
+        os.replace(f"{path}.tmp", path)
+
+    def watermark_key(self) -> str:
+        return f"{self.config.imap_server}|{self.config.imap_username}|{self.config.imap_folder}"
+
 
 class EmailCollectorFactory(CollectorFactory):
     def backend(self) -> CollectorBackend:
@@ -4,21 +4,24 @@ from querent.config.collector.collector_config import EmailCollectorConfig
 
 
 class ImapEmail:
-    def imap_open(self, config: EmailCollectorConfig) -> imaplib.IMAP4_SSL:
+    def imap_open(self, config: EmailCollectorConfig) -> imaplib.IMAP4:
         """
         Function to open an IMAP connection to the email server.
 
         Args:
             config (EmailCollectorConfig): The email collector config.
         Returns:
-            imaplib.IMAP4_SSL: The IMAP connection.
+            imaplib.IMAP4: The IMAP connection, over SSL unless `imap_ssl` is false.
         """
-        conn = imaplib.IMAP4_SSL(
-            config.imap_server,
-            config.imap_port,
-            config.imap_keyfile,
-            config.imap_certfile,
-        )
+        if str(config.imap_ssl).lower() == "false":
+            conn = imaplib.IMAP4(config.imap_server, int(config.imap_port))
+        else:
+            conn = imaplib.IMAP4_SSL(
+                config.imap_server,
+                config.imap_port,
+                config.imap_keyfile,
+                config.imap_certfile,
+            )
         conn.login(config.imap_username, config.imap_password)
         conn.select(config.imap_folder)
         return conn
@@ -1,31 +1,74 @@
 import asyncio
 import fnmatch
+import hashlib
+import mmap
+import os
 import re
+from collections import deque
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Tuple
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.uri import Uri
 from querent.config.collector.collector_config import CollectorBackend, FSCollectorConfig
-import aiofiles
 from querent.common import common_errors
 
 
+class IgnoreMatcher:
+    """
+    Compiled matcher for .gitignore style patterns.
+
+    Patterns without a slash are matched against every file and directory name, patterns
+    with a slash against the path relative to the collector root. Negated patterns are
+    not supported and are skipped.
+    """
+
+    def __init__(self, patterns: List[str]):
+        name_patterns = []
+        path_patterns = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#") or pattern.startswith("!"):
+                continue
+            pattern = pattern.strip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                path_patterns.append(fnmatch.translate(pattern))
+            else:
+                name_patterns.append(fnmatch.translate(pattern))
+        self.name_regex = re.compile("|".join(name_patterns)) if name_patterns else None
+        self.path_regex = re.compile("|".join(path_patterns)) if path_patterns else None
+
+    def matches(self, name: str, relative_path: str) -> bool:
+        if self.name_regex is not None and self.name_regex.match(name):
+            return True
+        return self.path_regex is not None and self.path_regex.match(relative_path) is not None
+
+
 class FSCollector(Collector):
     def __init__(self, config: FSCollectorConfig):
         self.root_dir = Path(config.root_path)
-        self.items_to_ignore = []
         self.chunk_size = 1024
         if config.chunk_size and config.chunk_size.isdigit():
             self.chunk_size = int(config.chunk_size)
+        self.max_concurrent_reads = 8
+        if config.max_concurrent_reads and config.max_concurrent_reads.isdigit():
+            self.max_concurrent_reads = max(1, int(config.max_concurrent_reads))
+        self.mmap_threshold = 8 * 1024 * 1024
+        if config.mmap_threshold and config.mmap_threshold.isdigit():
+            self.mmap_threshold = int(config.mmap_threshold)
+        self.max_read_ahead_bytes = 64 * 1024 * 1024
+        if config.max_read_ahead_bytes and config.max_read_ahead_bytes.isdigit():
+            self.max_read_ahead_bytes = int(config.max_read_ahead_bytes)
+        self.manifest = open_sync_manifest(config, f"file://{self.root_dir}")
         try:
             with open("./.gitignore", "r", encoding="utf-8") as gitignore_file:
-                self.items_to_ignore = set(
-                    gitignore_file.read().replace("/", "").replace("*", "").splitlines()
-                )
+                self.ignore_matcher = IgnoreMatcher(gitignore_file.read().splitlines())
         except Exception as e:
-            self.items_to_ignore = []
+            self.ignore_matcher = IgnoreMatcher([])
 
     async def connect(self):
         pass
@@ -36,47 +79,117 @@ class FSCollector(Collector):
     # collect those files
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
-        async for file_path in self.walk_files(self.root_dir):
-            try:
-                async with aiofiles.open(file_path, "rb") as file:
-                    file_path_str = str(file_path)
-                    async for chunk in self.read_chunks(file):
-                        yield CollectedBytes(file=file_path_str, data=chunk, error=None, doc_source=f"file://{self.root_dir}")
-                    yield CollectedBytes(
-                        file=file_path_str, data=None, error=None, eof=True, doc_source=f"file://{self.root_dir}"
-                    )
-            except PermissionError as exc:
-                raise common_errors.PermissionError(
-                    f"Unable to open this file {file_path}, getting error as {exc}"
-                ) from exc
-            except OSError as exc:
-                raise common_errors.OSError(
-                    f"Getting OS Error on file {file_path}, as {exc}"
-                ) from exc
-            except Exception as exc:
-                raise common_errors.UnknownError(
-                    f"Getting unknown error on file {file_path}, as {exc}"
-                ) from exc
-
-    async def read_chunks(self, file):
-        while True:
-            chunk = await file.read(self.chunk_size)
-            if not chunk:
-                break
-            yield chunk
-        await file.close()
-
-    async def walk_files(self, root: Path) -> AsyncGenerator[Path, None]:
-        for item in root.iterdir():
-            item_split = set(str(item).split("/"))
-            item_split.discard("")  # Use discard instead of remove to avoid KeyError
-            if item_split and item_split.intersection(self.items_to_ignore):
-                continue
-            if item.is_file():
-                yield item
-            elif item.is_dir():
-                async for file_path in self.walk_files(item):
-                    yield file_path
+        doc_source = f"file://{self.root_dir}"
+        # Files are read ahead concurrently but emitted one after the other, in walk order. Up to
+        # max_concurrent_reads files and max_read_ahead_bytes bytes are read ahead of the consumer;
+        # memory-mapped files are read lazily and do not count against the bytes.
+        pending = deque()
+        pending_bytes = 0
+        try:
+            async for file_path, size in self.walk_files(self.root_dir):
+                read_ahead = size if size < self.mmap_threshold else 0
+                while pending and (
+                    len(pending) >= self.max_concurrent_reads
+                    or pending_bytes + read_ahead > self.max_read_ahead_bytes
+                ):
+                    previous_path, read_task, previous_read_ahead = pending.popleft()
+                    async for collected_bytes in self.collect_file(previous_path, read_task, doc_source):
+                        yield collected_bytes
+                    pending_bytes -= previous_read_ahead
+                pending.append((file_path, asyncio.create_task(asyncio.to_thread(self.read_file, file_path)), read_ahead))
+                pending_bytes += read_ahead
+            while pending:
+                file_path, read_task, _ = pending.popleft()
+                async for collected_bytes in self.collect_file(file_path, read_task, doc_source):
+                    yield collected_bytes
+            if self.manifest is not None:
+                for tombstone in self.manifest.tombstones(doc_source):
+                    yield tombstone
+                self.manifest.commit()
+        finally:
+            for _, read_task, _ in pending:
+                read_task.cancel()
+
+    async def collect_file(self, file_path: Path, read_task: asyncio.Task, doc_source: str) -> AsyncGenerator[CollectedBytes, None]:
+        try:
+            content, version, size, content_hash = await read_task
+        except PermissionError as exc:
+            raise common_errors.PermissionError(
+                f"Unable to open this file {file_path}, getting error as {exc}"
+            ) from exc
+        except OSError as exc:
+            raise common_errors.OSError(
+                f"Getting OS Error on file {file_path}, as {exc}"
+            ) from exc
+        except Exception as exc:
+            raise common_errors.UnknownError(
+                f"Getting unknown error on file {file_path}, as {exc}"
+            ) from exc
+        file_path_str = str(file_path)
+        if self.manifest is not None:
+            # Files with the same mtime and size were already marked as seen by is_changed
+            if content is None:
+                return
+            # Touched files whose content did not change are recorded with their new mtime but not emitted again
+            unchanged = self.manifest.has_content(file_path_str, content_hash)
+            self.manifest.record(file_path_str, version, size, content_hash)
+            if unchanged:
+                return
+        for chunk in self.read_chunks(content):
+            yield CollectedBytes(file=file_path_str, data=chunk, error=None, doc_source=doc_source)
+        yield CollectedBytes(file=file_path_str, data=None, error=None, eof=True, doc_source=doc_source)
+
+    def read_file(self, file_path: Path):
+        """
+        Reads a file in a worker thread. Files above `mmap_threshold` are memory-mapped
+        instead of being read, so their chunks are zero-copy slices of the mapping.
+
+        Returns the content (None when the sync manifest reports the file as unchanged),
+        its version (mtime), its size and, when a manifest is used, its content hash.
+        """
+        with open(file_path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            size = stat.st_size
+            version = str(stat.st_mtime_ns)
+            if self.manifest is not None and not self.manifest.is_changed(str(file_path), version, size):
+                return None, version, size, None
+            if size == 0:
+                content = b""
+            elif size >= self.mmap_threshold:
+                content = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                content = file.read()
+        content_hash = hashlib.sha1(content).hexdigest() if self.manifest is not None else None
+        return content, version, size, content_hash
+
+    def read_chunks(self, content):
+        for start in range(0, len(content), self.chunk_size):
+            yield content[start:start + self.chunk_size]
+
+    def scan_dir(self, directory: Path) -> List[Tuple[Path, bool, int]]:
+        """
+        Lists a directory once with os.scandir, returning its entries in directory order
+        with whether they are files and, for files, their size.
+        """
+        entries = []
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                relative_path = os.path.relpath(entry.path, self.root_dir)
+                if self.ignore_matcher.matches(entry.name, relative_path):
+                    continue
+                if entry.is_file():
+                    entries.append((Path(entry.path), True, entry.stat().st_size))
+                elif entry.is_dir():
+                    entries.append((Path(entry.path), False, 0))
+        return entries
+
+    async def walk_files(self, root: Path) -> AsyncGenerator[Tuple[Path, int], None]:
+        for item, is_file, size in await asyncio.to_thread(self.scan_dir, root):
+            if is_file:
+                yield item, size
+            else:
+                async for file_path, file_size in self.walk_files(item):
+                    yield file_path, file_size
 
 
 class FSCollectorFactory(CollectorFactory):
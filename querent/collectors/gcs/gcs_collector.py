@@ -1,3 +1,4 @@
+import functools
 import json
 from typing import AsyncGenerator
 
@@ -7,6 +8,9 @@ from querent.config.collector.collector_config import GcsCollectConfig
 from querent.config.collector.collector_config import CollectorBackend
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.uri import Uri
 from querent.common import common_errors
 from google.cloud import storage
@@ -26,6 +30,9 @@ class GCSCollector(Collector):
         if config.chunk and config.chunk.isdigit():
             self.chunk_size = int(config.chunk)
         self.logger = setup_logger(__name__, "GCSCollector")
+        self.runtime = CollectorRuntime.from_config(config, name="GCSCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        self.manifest = open_sync_manifest(config, f"gcs://{self.bucket_name}")
 
     async def connect(self):
         if not self.client:
@@ -42,6 +49,7 @@ class GCSCollector(Collector):
             if self.client is not None:
                 self.client.close()
                 self.client = None
+            self.runtime.close()
         except Exception as exc:
             self.logger.error(f"Error disconnecting from GCS: {exc}")
 
@@ -50,13 +58,17 @@ class GCSCollector(Collector):
         if not self.client:
             await self.connect()
 
+        doc_source = f"gcs://{self.bucket_name}"
         try:
-            bucket = self.client.get_bucket(self.bucket_name)
-            blobs = list(bucket.list_blobs())  # Convert to a list
-            for blob in blobs:
-                async for chunk in self.stream_blob(blob):
-                    yield CollectedBytes(file=blob.name, data=chunk, error=None, doc_source=f"gcs://{self.bucket_name}")
-                yield CollectedBytes(file=blob.name, data=None, error=None, eof=True, doc_source=f"gcs://{self.bucket_name}")
+            bucket = await self.runtime.run(self.client.get_bucket, self.bucket_name)
+            # Listing pages are fetched on the runtime while earlier blobs are downloaded
+            async for collected_bytes in self.download_pool.download(self.list_items(bucket, doc_source), self.manifest):
+                yield collected_bytes
+
+            if self.manifest is not None:
+                for tombstone in self.manifest.tombstones(doc_source):
+                    yield tombstone
+                self.manifest.commit()
         except Exception as e:
             # Handle exceptions gracefully, e.g., log the error
             self.logger.error(f"Error connecting to GCS: {e}")
@@ -64,7 +76,18 @@ class GCSCollector(Collector):
             # Disconnect the client when done
             await self.disconnect()
 
-    async def stream_blob(self, blob):
+    async def list_items(self, bucket, doc_source: str) -> AsyncGenerator[DownloadItem, None]:
+        async for blob in self.runtime.iterate(bucket.list_blobs()):
+            yield DownloadItem(
+                file=blob.name,
+                open=functools.partial(self.read_blob, blob),
+                doc_source=doc_source,
+                size=blob.size,
+                version=str(blob.generation) if blob.generation is not None else None,
+                content_hash=blob.md5_hash,
+            )
+
+    def read_blob(self, blob):
         try:
             with blob.open("rb") as blob_file:
                 while True:
@@ -74,15 +97,11 @@ class GCSCollector(Collector):
                     yield chunk
         except PermissionError as exc:
             raise common_errors.PermissionError(
-                f"Unable to open this file {blob_file}, getting error as {exc}"
+                f"Unable to open this file {blob.name}, getting error as {exc}"
             ) from exc
         except OSError as exc:
             raise common_errors.OSError(
-                f"Getting OS Error on file {blob_file}, as {exc}"
-            ) from exc
-        except Exception as exc:
-            raise common_errors.UnknownError(
-                f"Getting OS Error on file {blob_file}, as {exc}"
+                f"Getting OS Error on file {blob.name}, as {exc}"
             ) from exc
 
 
@@ -1,5 +1,7 @@
-import requests
-from typing import AsyncGenerator
+import asyncio
+import json
+import os
+from typing import AsyncGenerator, Dict, List, Optional
 from querent.common.types.collected_bytes import CollectedBytes
 import aiohttp
 
@@ -7,17 +9,66 @@ import aiohttp
 from querent.config.collector.collector_config import GithubConfig, CollectorBackend
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.sync_manifest import open_sync_manifest
 from querent.common.uri import Uri
 from querent.logging.logger import setup_logger
 
+_FETCH_DONE = object()
+
+
+class ETagCache:
+    """
+    Remembers the ETag and body of GitHub API responses, so unchanged resources are
+    revalidated with `If-None-Match` (a 304 does not count against the rate limit).
+    The cache is kept in memory and, when `path` is set, in a JSON file across runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as cache_file:
+                self.entries = json.load(cache_file)
+
+    def headers(self, url: str) -> Dict[str, str]:
+        entry = self.entries.get(url)
+        return {"If-None-Match": entry["etag"]} if entry else {}
+
+    def get(self, url: str):
+        return self.entries[url]["body"]
+
+    def put(self, url: str, etag: Optional[str], body):
+        if etag:
+            self.entries[url] = {"etag": etag, "body": body}
+
+    def save(self):
+        if self.path:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(self.entries, cache_file)
+            os.replace(temp_path, self.path)
+
 
 class GithubCollector(Collector):
-    """Class for github collector"""
+    """
+    Class for github collector
+
+    Lists the whole repository with one recursive git trees request and downloads the
+    blobs concurrently. API responses are revalidated with their ETag, and with a sync
+    manifest only blobs whose sha changed are downloaded again.
+    """
 
     def __init__(self, config: GithubConfig):
         self.user_name = config.github_username
         self.repository = config.repository
         self.access_token = config.github_access_token
+        self.branch = config.github_branch
+        self.api_url = (config.github_api_url or "https://api.github.com").rstrip("/")
+        self.concurrency = 8
+        if config.github_concurrency and config.github_concurrency.isdigit():
+            self.concurrency = max(1, int(config.github_concurrency))
+        self.etag_cache = ETagCache(config.github_etag_cache)
+        self.manifest = open_sync_manifest(config, f"github://{self.user_name}/{self.repository}")
         self.logger = setup_logger(__name__, "GithubCollector")
 
     async def connect(self):
@@ -27,37 +78,116 @@ class GithubCollector(Collector):
         pass
 
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
-        api_url = (
-            f"https://api.github.com/repos/{self.user_name}/{self.repository}/contents/"
-        )
-
-        async for item in self.fetch_files_in_folder(api_url=api_url):
-            yield item
-
-    async def fetch_files_in_folder(self, api_url):
+        repo_url = f"{self.api_url}/repos/{self.user_name}/{self.repository}"
+        headers = {"Authorization": f"token {self.access_token}", "Accept": "application/vnd.github+json"}
         try:
-            async with aiohttp.ClientSession() as session:
-                headers = {"Authorization": f"token {self.access_token}"}
-                async with session.get(api_url, headers=headers) as response:
-                    response.raise_for_status()
-                    contents = await response.json()
-                    for item in contents:
-                        if item["type"] == "file":
-                            file_url = item["download_url"]
-                            async with session.get(file_url, headers=headers) as file_response:
-                                file_response.raise_for_status()
-                                file_contents = await file_response.read()
-                                # Assume process_data() is correctly implemented for your file type
-                                yield CollectedBytes(file=item["name"], data=file_contents, doc_source=f"github://{self.repository}")
-
-                            yield CollectedBytes(file = item["name"], data = None, eof = True, doc_source=f"github://{self.repository}")
-                        elif item["type"] == "dir":
-                            # Recursively fetch files in subfolders
-                            async for sub_item in self.fetch_files_in_folder(item["url"]):
-                                yield sub_item
-
-        except requests.exceptions.RequestException as e:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+                branch = self.branch
+                if not branch:
+                    branch = (await self.get_json(session, repo_url))["default_branch"]
+                blobs = await self.fetch_tree(session, repo_url, branch)
+                if self.manifest is not None:
+                    blobs = [blob for blob in blobs if self.manifest.is_changed(blob["path"], blob["sha"], blob.get("size"))]
+
+                async for item in self.fetch_blobs(session, repo_url, blobs):
+                    yield item
+
+                if self.manifest is not None:
+                    for tombstone in self.manifest.tombstones(f"github://{self.repository}"):
+                        yield tombstone
+                    self.manifest.commit()
+        except aiohttp.ClientError as e:
             self.logger.error(f"Error connecting to Github: {e}")
+        finally:
+            self.etag_cache.save()
+
+    async def get_json(self, session: aiohttp.ClientSession, url: str, params: Optional[dict] = None):
+        cache_key = url if not params else f"{url}?{'&'.join(f'{k}={v}' for k, v in sorted(params.items()))}"
+        async with session.get(url, params=params, headers=self.etag_cache.headers(cache_key)) as response:
+            if response.status == 304:
+                return self.etag_cache.get(cache_key)
+            response.raise_for_status()
+            body = await response.json()
+            self.etag_cache.put(cache_key, response.headers.get("ETag"), body)
+            return body
+
+    async def fetch_tree(self, session: aiohttp.ClientSession, repo_url: str, tree_sha: str) -> List[dict]:
+        """Returns the blobs of the tree, in one request unless GitHub truncates the listing."""
+        tree = await self.get_json(session, f"{repo_url}/git/trees/{tree_sha}", {"recursive": "1"})
+        if not tree.get("truncated"):
+            return [entry for entry in tree["tree"] if entry["type"] == "blob"]
+        # Too large for one listing: walk it one tree at a time
+        self.logger.warning(f"Tree of {self.repository} is truncated, listing it tree by tree")
+        blobs = []
+        pending = [("", tree_sha)]
+        while pending:
+            trees = await asyncio.gather(
+                *[self.get_json(session, f"{repo_url}/git/trees/{sha}") for _, sha in pending]
+            )
+            next_pending = []
+            for (prefix, _), subtree in zip(pending, trees):
+                for entry in subtree["tree"]:
+                    entry = dict(entry, path=f"{prefix}{entry['path']}")
+                    if entry["type"] == "blob":
+                        blobs.append(entry)
+                    elif entry["type"] == "tree":
+                        next_pending.append((f"{entry['path']}/", entry["sha"]))
+            pending = next_pending
+        return blobs
+
+    async def fetch_blobs(self, session: aiohttp.ClientSession, repo_url: str, blobs: List[dict]) -> AsyncGenerator[CollectedBytes, None]:
+        """Downloads up to `concurrency` blobs at a time, yielding each one as it completes."""
+        doc_source = f"github://{self.repository}"
+        pending = asyncio.Queue()
+        for blob in blobs:
+            pending.put_nowait(blob)
+        downloaded = asyncio.Queue(maxsize=self.concurrency)
+
+        async def download():
+            cancelled = False
+            try:
+                while not pending.empty():
+                    blob = pending.get_nowait()
+                    try:
+                        # Blobs are immutable, so they are never revalidated
+                        async with session.get(
+                            f"{repo_url}/git/blobs/{blob['sha']}", headers={"Accept": "application/vnd.github.raw"}
+                        ) as response:
+                            response.raise_for_status()
+                            contents = await response.read()
+                    except Exception as e:
+                        # Timeouts and other failures of one blob must not stop the worker
+                        self.logger.error(f"Error downloading {blob['path']} from Github: {e!r}")
+                        contents = e
+                    await downloaded.put((blob, contents))
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # The consumer waits for every worker's _FETCH_DONE, unless it cancelled them
+                if not cancelled:
+                    await downloaded.put(_FETCH_DONE)
+
+        workers = [asyncio.create_task(download()) for _ in range(min(self.concurrency, len(blobs)))]
+        try:
+            running = len(workers)
+            while running:
+                result = await downloaded.get()
+                if result is _FETCH_DONE:
+                    running -= 1
+                    continue
+                blob, file_contents = result
+                if isinstance(file_contents, Exception):
+                    yield CollectedBytes(file=blob["path"], data=None, error=str(file_contents) or repr(file_contents), doc_source=doc_source)
+                else:
+                    yield CollectedBytes(file=blob["path"], data=file_contents, doc_source=doc_source)
+                    if self.manifest is not None:
+                        self.manifest.record(blob["path"], blob["sha"], blob.get("size"))
+                yield CollectedBytes(file=blob["path"], data=None, eof=True, doc_source=doc_source)
+        finally:
+            for worker in workers:
+                worker.cancel()
 
 
 class GithubCollectorFactory(CollectorFactory):
@@ -65,7 +195,7 @@ class GithubCollectorFactory(CollectorFactory):
         pass
 
     def backend(self) -> CollectorBackend:
-        return CollectorBackend.Slack
+        return CollectorBackend.Github
 
     def resolve(self, uri: Uri, config: GithubConfig) -> Collector:
         return GithubCollector(config)
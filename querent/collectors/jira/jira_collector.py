@@ -1,9 +1,16 @@
+import functools
 import json
-from typing import AsyncGenerator
+import os
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import AsyncGenerator, Dict, Iterator, List, Optional
+from zoneinfo import ZoneInfo
 import requests
 
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
 from querent.common import common_errors
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.uri import Uri
@@ -15,11 +22,26 @@ from jira import JIRA
 
 from querent.logging.logger import setup_logger
 
+# Largest offset from UTC of any time zone, JQL dates are read in the user's zone
+MAX_UTC_OFFSET = timedelta(hours=14)
+
 
 class JiraCollector(Collector):
     def __init__(self, config: JiraCollectorConfig):
         self.config = config
         self.jira = None  # Initialize to None
+        self.auth = None
+        self.runtime = CollectorRuntime.from_config(config, name="JiraCollector")
+        self.download_pool = DownloadPool.from_config(config, self.runtime)
+        self.session = None
+        self.page_size = 50
+        if self.config.jira_max_results and str(self.config.jira_max_results).isdigit():
+            self.page_size = max(1, int(self.config.jira_max_results))
+        self.start_at = 0
+        if self.config.jira_start_at and str(self.config.jira_start_at).isdigit():
+            self.start_at = int(self.config.jira_start_at)
+        # Time zone JQL dates are read in, looked up on the first incremental poll
+        self.user_timezone: Optional[tzinfo] = None
         self.logger = setup_logger(__name__, "JiraCollector")
 
     def convert_to_boolean(self, val: str):
@@ -44,6 +66,7 @@ class JiraCollector(Collector):
                 self.config.jira_certfile,
                 self.config.jira_keyfile,
             )
+        self.auth = basic_auth or token_auth
 
         return JIRA(
             self.config.jira_server,
@@ -54,7 +77,8 @@ class JiraCollector(Collector):
 
     async def connect(self):
         try:
-            self.jira = self.create_jira_client()
+            # Creating the client already talks to the server
+            self.jira = await self.runtime.run(self.create_jira_client)
         except Exception as e:
             self.logger.error(f"Error connecting to Jira: {e}")
             raise common_errors.ConnectionError(
@@ -63,45 +87,146 @@ class JiraCollector(Collector):
 
     async def disconnect(self):
         self.jira = None
+        self.runtime.close()
+        if self.session is not None:
+            self.session.close()
+            self.session = None
 
-    async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
+    def create_session(self) -> requests.Session:
+        """Pooled session for attachment downloads, authenticated like the Jira client."""
+        session = requests.Session()
+        session.auth = self.auth
+        session.verify = self.convert_to_boolean(self.config.jira_verify)
+        if self.config.jira_keyfile and self.config.jira_certfile:
+            session.cert = (self.config.jira_certfile, self.config.jira_keyfile)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.download_pool.max_in_flight)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def load_watermark(self) -> Optional[str]:
+        path = self.config.jira_watermark_file
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as watermark_file:
+            return json.load(watermark_file).get(self.watermark_key())
+
+    def save_watermark(self, watermark: str):
+        path = self.config.jira_watermark_file
+        watermarks = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as watermark_file:
+                watermarks = json.load(watermark_file)
+        watermarks[self.watermark_key()] = watermark
+        with open(f"{path}.tmp", "w", encoding="utf-8") as watermark_file:
+            json.dump(watermarks, watermark_file)
+        os.replace(f"{path}.tmp", path)
+
+    def watermark_key(self) -> str:
+        return f"{self.config.jira_server}|{self.config.jira_query}"
+
+    def load_user_timezone(self) -> Optional[tzinfo]:
         try:
-            if not self.jira:
-                raise common_errors.ConnectionError(
-                    "Jira client not initialized. Call connect() before polling."
-                )
+            return ZoneInfo(self.jira.myself()["timeZone"])
+        except Exception as e:
+            self.logger.warning(f"Unable to read the time zone of the Jira user, widening the watermark instead: {e}")
+            return None
+
+    def build_query(self, watermark: Optional[str]) -> str:
+        """
+        Restricts the query to issues updated since `watermark` in incremental mode. Jira
+        compares at minute precision, so issues of the watermark's minute are fetched again.
+        JQL reads dates in the user's time zone; when it is unknown the watermark is moved back
+        by the largest UTC offset, so no zone can make the query skip updates.
+        """
+        if not self.config.jira_watermark_file:
+            return self.config.jira_query
+        query = re.split(r"\border\s+by\b", self.config.jira_query, flags=re.IGNORECASE)[0].strip()
+        if watermark:
+            if self.user_timezone is not None:
+                since = self.parse_time(watermark).astimezone(self.user_timezone)
+            else:
+                since = self.parse_time(watermark).astimezone(timezone.utc) - MAX_UTC_OFFSET
+            updated = since.strftime("%Y/%m/%d %H:%M")
+            query = f'({query}) AND updated >= "{updated}"' if query else f'updated >= "{updated}"'
+        return f"{query} ORDER BY updated ASC"
 
+    def search_pages(self, query: str) -> Iterator[list]:
+        """Pages through the search results with startAt, `jira_max_results` issues per request."""
+        start_at = self.start_at
+        while True:
             issues = self.jira.search_issues(
-                self.config.jira_query,
-                startAt=self.config.jira_start_at,
-                maxResults=self.config.jira_max_results,
+                query,
+                startAt=start_at,
+                maxResults=self.page_size,
                 fields=self.config.jira_fields,
                 expand=self.config.jira_expand,
                 json_result=False,
             )
+            if not issues:
+                return
+            yield issues
+            start_at += len(issues)
+            total = getattr(issues, "total", None)
+            if total is not None and start_at >= total:
+                return
 
-            for issue in issues:
-                json_issue = json.dumps(issue.raw).encode("utf-8")
-                yield CollectedBytes(
-                    data=json_issue, file=f"jira_issue_{issue.key}.json.jira", doc_source=f"jira://{self.config.jira_server}/{self.config.jira_project}"
-                )
-                yield CollectedBytes(
-                    data=None, file=f"jira_issue_{issue.key}.json.jira", eof=True, doc_source=f"jira://{self.config.jira_server}/{self.config.jira_project}"
+    async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
+        try:
+            if not self.jira:
+                raise common_errors.ConnectionError(
+                    "Jira client not initialized. Call connect() before polling."
                 )
 
-                if hasattr(issue.fields, 'attachment') and isinstance(issue.fields.attachment, list):
-                    for attachment in issue.fields.attachment:
-                        try:
-                            attachment_bytes = self.download_attachment(attachment.content, self.auth)
-                            yield CollectedBytes(
-                                data=attachment_bytes, file=f"jira_attachment_{attachment.filename}", doc_source=f"jira://{self.config.jira_server}/{self.config.jira_project}"
-                            )
-                            yield CollectedBytes(
-                                data=None, file=f"jira_attachment_{attachment.filename}", eof=True, doc_source=f"jira://{self.config.jira_server}/{self.config.jira_project}"
-                            )
-                        except Exception as e:
-                            self.logger.error(f"Error downloading attachment {attachment.filename}: {str(e)}")
-                
+            if self.session is None:
+                self.session = self.create_session()
+            watermark = self.load_watermark()
+            if watermark and self.user_timezone is None:
+                self.user_timezone = await self.runtime.run(self.load_user_timezone)
+            latest_update = watermark
+            # Update time of the issue of each attachment, and of the issues whose attachments failed
+            attachment_updates: Dict[str, Optional[str]] = {}
+            failed_updates: List[Optional[str]] = []
+            doc_source = f"jira://{self.config.jira_server}/{self.config.jira_project}"
+
+            async def list_items():
+                nonlocal latest_update
+                # The next page is requested while the current one is downloaded
+                async for issues in self.runtime.iterate(self.search_pages(self.build_query(watermark))):
+                    for issue in issues:
+                        updated = getattr(issue.fields, "updated", None)
+                        if updated and (latest_update is None or self.parse_time(updated) > self.parse_time(latest_update)):
+                            latest_update = updated
+                        json_issue = json.dumps(issue.raw).encode("utf-8")
+                        yield DownloadItem(
+                            file=f"jira_issue_{issue.key}.json.jira",
+                            open=functools.partial(iter, [json_issue]),
+                            doc_source=doc_source,
+                        )
+                        if hasattr(issue.fields, 'attachment') and isinstance(issue.fields.attachment, list):
+                            for attachment in issue.fields.attachment:
+                                attachment_updates[f"jira_attachment_{issue.key}_{attachment.filename}"] = updated
+                                yield DownloadItem(
+                                    file=f"jira_attachment_{issue.key}_{attachment.filename}",
+                                    open=functools.partial(self.download_attachment, attachment.content),
+                                    doc_source=doc_source,
+                                )
+
+            async for collected_bytes in self.download_pool.download(list_items()):
+                # The error of a failed attachment is passed on, so the chunks it yielded before failing
+                # are discarded instead of ingested; its issue is fetched again next run
+                if collected_bytes.is_error():
+                    failed_updates.append(attachment_updates.get(collected_bytes.file))
+                yield collected_bytes
+
+            if failed_updates:
+                # Issues come in update order, so stop the watermark at the first issue that failed
+                if all(failed_updates):
+                    latest_update = min(failed_updates, key=self.parse_time)
+                else:
+                    latest_update = watermark
+            if self.config.jira_watermark_file and latest_update:
+                self.save_watermark(latest_update)
 
         except common_errors.ConnectionError as e:
             self.logger.error(f"Error polling Jira issues: {e}")
@@ -113,12 +238,23 @@ class JiraCollector(Collector):
         finally:
             await self.disconnect()
 
-    async def download_attachment(self, attachment_url, auth):
-        response = requests.get(attachment_url, auth=auth)
-        if response.status_code == 200:
-            return response.content
-        else:
-            self.logger.error("Failed to download file: HTTP {}".format(response.status_code))
+    @staticmethod
+    def parse_time(value: str) -> datetime:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+
+    def download_attachment(self, attachment_url) -> Iterator[bytes]:
+        response = self.session.get(attachment_url, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise requests.HTTPError("Failed to download file: HTTP {}".format(response.status_code))
+        return self.stream_response(response)
+
+    def stream_response(self, response) -> Iterator[bytes]:
+        try:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                yield chunk
+        finally:
+            response.close()
 
 
 class JiraCollectorFactory(CollectorFactory):
@@ -6,6 +6,7 @@ from typing import AsyncGenerator
 import os
 
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.collector_runtime import CollectorRuntime
 from querent.config.collector.collector_config import CollectorBackend, SlackCollectorConfig
 from querent.collectors.collector_base import Collector
 from querent.common.types.collected_bytes import CollectedBytes
@@ -29,6 +30,7 @@ class SlackCollector(Collector):
         self.access_token = config.access_token
 
         self.client = WebClient()
+        self.runtime = CollectorRuntime.from_config(config, name="SlackCollector")
         self.logger = setup_logger(__name__, "SlackCollector")
 
     async def connect(self):
@@ -36,7 +38,7 @@ class SlackCollector(Collector):
 
     async def disconnect(self):
         # Add your cleanup logic here if needed
-        pass
+        self.runtime.close()
 
     def convert_to_boolean(self, val: str):
         if type(val) == str:
@@ -46,7 +48,7 @@ class SlackCollector(Collector):
     async def poll(self) -> AsyncGenerator[CollectedBytes, None]:
         try:
             self.client = WebClient(token=self.access_token)
-            response = self.client.conversations_join(channel=self.channel)
+            response = await self.runtime.run(self.client.conversations_join, channel=self.channel)
             if not response["ok"]:
                 self.logger.error(f"Error connecting to Slack: {response['error']}")
         except SlackApiError as exc:
@@ -56,8 +58,11 @@ class SlackCollector(Collector):
         while True:
             try:
                 # Get list of all the conversation history
-                response = self.client.conversations_history(
-                    channel=self.channel, cursor=self.cursor, limit=self.limit
+                response = await self.runtime.run(
+                    self.client.conversations_history,
+                    channel=self.channel,
+                    cursor=self.cursor,
+                    limit=self.limit,
                 )
                 if response["ok"]:
                     messages = response["messages"]
@@ -103,7 +108,7 @@ class SlackCollector(Collector):
     async def fetch_file_bytes(self, url):
         """Fetch image bytes directly without downloading the image to disk."""
         headers = {'Authorization': f'Bearer {self.client.token}'}
-        response = requests.get(url, headers=headers)
+        response = await self.runtime.run(requests.get, url, headers=headers)
         if response.status_code == 200:
             return response.content
         else:
@@ -0,0 +1,207 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from querent.common.types.collected_bytes import CollectedBytes
+
+
+@dataclass
+class ManifestEntry:
+    """What a collector knew about a document the last time it was collected."""
+
+    key: str
+    version: Optional[str] = None
+    size: Optional[int] = None
+    content_hash: Optional[str] = None
+    # File name the document was emitted under, when the key is not the name (e.g. a Drive file id)
+    name: Optional[str] = None
+
+
+class ManifestStore(ABC):
+    """Persists manifest entries per source (e.g. `s3://bucket/region`) across runs."""
+
+    @abstractmethod
+    def load(self, source: str) -> Dict[str, ManifestEntry]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def save(self, source: str, entries: Iterable[ManifestEntry]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove(self, source: str, keys: Iterable[str]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteManifestStore(ManifestStore):
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS manifest ("
+            "source TEXT NOT NULL, key TEXT NOT NULL, version TEXT, size INTEGER, content_hash TEXT, name TEXT, "
+            "PRIMARY KEY (source, key))"
+        )
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(manifest)")]
+        if "name" not in columns:
+            # Manifests written before names were kept
+            self.connection.execute("ALTER TABLE manifest ADD COLUMN name TEXT")
+        self.connection.commit()
+
+    def load(self, source: str) -> Dict[str, ManifestEntry]:
+        rows = self.connection.execute(
+            "SELECT key, version, size, content_hash, name FROM manifest WHERE source = ?", (source,)
+        )
+        return {row[0]: ManifestEntry(*row) for row in rows}
+
+    def save(self, source: str, entries: Iterable[ManifestEntry]):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO manifest (source, key, version, size, content_hash, name) VALUES (?, ?, ?, ?, ?, ?)",
+                [(source, entry.key, entry.version, entry.size, entry.content_hash, entry.name) for entry in entries],
+            )
+
+    def remove(self, source: str, keys: Iterable[str]):
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM manifest WHERE source = ? AND key = ?", [(source, key) for key in keys]
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class FileManifestStore(ManifestStore):
+    """Keeps the manifest in a local JSON file, rewritten atomically on every save."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sources: Dict[str, Dict[str, list]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as manifest_file:
+                self.sources = json.load(manifest_file)
+
+    def load(self, source: str) -> Dict[str, ManifestEntry]:
+        return {
+            key: ManifestEntry(key, *values) for key, values in self.sources.get(source, {}).items()
+        }
+
+    def save(self, source: str, entries: Iterable[ManifestEntry]):
+        records = self.sources.setdefault(source, {})
+        for entry in entries:
+            records[entry.key] = [entry.version, entry.size, entry.content_hash, entry.name]
+        self._write()
+
+    def remove(self, source: str, keys: Iterable[str]):
+        records = self.sources.get(source, {})
+        for key in keys:
+            records.pop(key, None)
+        self._write()
+
+    def _write(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.sources, manifest_file)
+        os.replace(temp_path, self.path)
+
+
+class SyncManifest:
+    """
+    Tracks which documents of a source changed since the previous run.
+
+    Collectors ask `is_changed` before downloading a document, `record` what they emitted,
+    and `commit` once the whole source has been listed. Documents recorded in a previous run
+    but not seen in this one are reported by `deleted_keys`, and emitted as tombstones when
+    `emit_tombstones` is set. Collectors that list incrementally, from a changes feed, pass
+    `complete=False` and report deletions with `forget` instead.
+
+    Attributes:
+        store (ManifestStore): Where the manifest is persisted.
+        source (str): Identity of the collected source, usually the collector's doc_source.
+        emit_tombstones (bool): Whether `tombstones` reports documents deleted at the source.
+    """
+
+    def __init__(self, store: ManifestStore, source: str, emit_tombstones: bool = False):
+        self.store = store
+        self.source = source
+        self.emit_tombstones = emit_tombstones
+        self.entries = store.load(source)
+        self.seen = set()
+        self.forgotten = set()
+        self.pending: List[ManifestEntry] = []
+
+    def is_changed(self, key: str, version: Optional[str] = None, size: Optional[int] = None) -> bool:
+        """Returns False, and marks the document as seen, when it matches the previous run."""
+        entry = self.entries.get(key)
+        if entry is None or version is None or entry.version != version or entry.size != size:
+            return True
+        self.seen.add(key)
+        return False
+
+    def has_content(self, key: str, content_hash: Optional[str]) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and content_hash is not None and entry.content_hash == content_hash
+
+    def record(self, key: str, version: Optional[str] = None, size: Optional[int] = None, content_hash: Optional[str] = None, name: Optional[str] = None):
+        """Records an emitted document; `name` is the file it was emitted under, if not its key."""
+        self.seen.add(key)
+        entry = ManifestEntry(key, version, size, content_hash, name if name != key else None)
+        self.entries[key] = entry
+        self.pending.append(entry)
+
+    def forget(self, key: str) -> bool:
+        """Marks a document the source reported as deleted; returns whether it was recorded."""
+        if key not in self.entries:
+            return False
+        self.forgotten.add(key)
+        return True
+
+    def deleted_keys(self, complete: bool = True) -> List[str]:
+        if not complete:
+            return [key for key in self.entries if key in self.forgotten]
+        return [key for key in self.entries if key not in self.seen or key in self.forgotten]
+
+    def tombstones(self, doc_source: str, complete: bool = True) -> List[CollectedBytes]:
+        if not self.emit_tombstones:
+            return []
+        return [
+            CollectedBytes(file=self.entries[key].name or key, data=None, error=None, eof=True, deleted=True, doc_source=doc_source)
+            for key in self.deleted_keys(complete)
+        ]
+
+    def commit(self, complete: bool = True):
+        """
+        Persists this run; only call it after the source was listed successfully. With
+        `complete` unset, documents not seen in this run are kept, only forgotten ones removed.
+        """
+        deleted = self.deleted_keys(complete)
+        if self.pending:
+            self.store.save(self.source, self.pending)
+        if deleted:
+            self.store.remove(self.source, deleted)
+            for key in deleted:
+                del self.entries[key]
+        self.pending = []
+        self.seen = set()
+        self.forgotten = set()
+
+
+def open_sync_manifest(config, source: str) -> Optional[SyncManifest]:
+    """
+    Opens the manifest configured with `sync_manifest` on a collector config, if any.
+    Paths ending in `.json` use a FileManifestStore, anything else a SQLite database.
+    """
+    path = getattr(config, "sync_manifest", None)
+    if not path:
+        return None
+    if path.endswith(".json"):
+        store = FileManifestStore(path)
+    else:
+        store = SQLiteManifestStore(path)
+    emit_tombstones = str(getattr(config, "sync_tombstones", False)).lower() in ("true", "1", "yes")
+    return SyncManifest(store, source, emit_tombstones=emit_tombstones)
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str, base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Normalizes a URL so the same page is only crawled once: resolves it against
+    `base_url`, lowercases scheme and host, drops default ports and fragments and sorts
+    the query. Returns None for URLs that are not http(s).
+    """
+    if base_url is not None:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class CrawlFrontier:
+    """
+    URLs left to crawl, in breadth first order.
+
+    Every URL is normalized and admitted at most once, and only when it is on an allowed
+    domain, within `max_depth` links of the start page and within the `max_pages` budget.
+    Workers take URLs with `get` and call `task_done` once a page is processed; `join`
+    returns when the crawl has no pages left, which is how the crawl terminates.
+
+    Attributes:
+        max_depth (int): Links followed from the start URLs.
+        max_pages (int): Pages admitted in total.
+        allowed_domains (Set[str]): Hosts that may be crawled, subdomains included.
+    """
+
+    def __init__(self, start_urls: Iterable[str], max_depth: int = 3, max_pages: int = 1000, allowed_domains: Optional[Iterable[str]] = None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.seen: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        start_urls = [url for url in (normalize_url(url) for url in start_urls) if url]
+        self.allowed_domains = set(allowed_domains or []) or {urlsplit(url).hostname for url in start_urls}
+        for url in start_urls:
+            self.add(url, 0)
+
+    def is_allowed(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.allowed_domains)
+
+    def add(self, url: str, depth: int, base_url: Optional[str] = None) -> bool:
+        url = normalize_url(url, base_url)
+        if url is None or url in self.seen or depth > self.max_depth:
+            return False
+        if len(self.seen) >= self.max_pages or not self.is_allowed(url):
+            return False
+        self.seen.add(url)
+        self.queue.put_nowait((url, depth))
+        return True
+
+    async def get(self) -> Tuple[str, int]:
+        return await self.queue.get()
+
+    def task_done(self):
+        self.queue.task_done()
+
+    async def join(self):
+        await self.queue.join()
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least `delay` seconds apart."""
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self.next_request: Dict[str, float] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    async def wait(self, url: str):
+        if self.delay <= 0:
+            return
+        host = urlsplit(url).netloc
+        lock = self.locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            delay = self.next_request.get(host, 0) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_request[host] = loop.time() + self.delay
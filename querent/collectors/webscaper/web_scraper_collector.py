@@ -1,21 +1,44 @@
 import asyncio
 from aiohttp import ClientSession, TCPConnector
+from bs4 import BeautifulSoup
 from querent.collectors.collector_base import Collector
 from querent.collectors.collector_factory import CollectorFactory
+from querent.collectors.webscaper.crawl_frontier import CrawlFrontier, HostRateLimiter
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.config.collector.collector_config import CollectorBackend, WebScraperConfig
 from querent.common.uri import Uri
-from querent.tools.web_page_extractor import WebpageExtractor
-from urllib.parse import urlparse, urljoin
+from querent.logging.logger import setup_logger
+from urllib.parse import urljoin
+
+_CRAWL_DONE = object()
 
 
 class WebScraperCollector(Collector):
     def __init__(self, config: WebScraperConfig):
         self.website_url = config.website_url
+        self.max_depth = 3
+        if config.max_depth and config.max_depth.isdigit():
+            self.max_depth = int(config.max_depth)
+        self.max_pages = 1000
+        if config.max_pages and config.max_pages.isdigit():
+            self.max_pages = int(config.max_pages)
+        self.concurrency = 5
+        if config.crawl_concurrency and config.crawl_concurrency.isdigit():
+            self.concurrency = max(1, int(config.crawl_concurrency))
+        try:
+            self.crawl_delay = float(config.crawl_delay)
+        except (TypeError, ValueError):
+            self.crawl_delay = 0.5
+        self.allowed_domains = [
+            domain.strip().lower() for domain in (config.allowed_domains or "").split(",") if domain.strip()
+        ]
         self.semaphore = asyncio.Semaphore(
-            5
+            self.concurrency
         )  # Adjust the limit as needed (e.g., 5 requests at a time)
         self.poll_lock = asyncio.Lock()  # Lock for the poll method
+        self.session = None
+        self.rate_limiter = HostRateLimiter(self.crawl_delay)
+        self.logger = setup_logger(__name__, "WebScraperCollector")
 
     async def connect(self):
         pass  # Any setup logic before scraping
@@ -25,31 +48,81 @@ class WebScraperCollector(Collector):
 
     async def poll(self):
         async with self.poll_lock:
-            urls_to_scrape = [self.website_url]
-            while urls_to_scrape:
-                url = urls_to_scrape.pop()
+            frontier = CrawlFrontier(
+                [self.website_url],
+                max_depth=self.max_depth,
+                max_pages=self.max_pages,
+                allowed_domains=self.allowed_domains,
+            )
+            pages = asyncio.Queue(maxsize=self.concurrency)
+            # One pooled session for the whole crawl
+            async with ClientSession(connector=TCPConnector(ssl=False, limit=self.concurrency)) as session:
+                self.session = session
+                workers = [
+                    asyncio.create_task(self.crawl(frontier, pages)) for _ in range(self.concurrency)
+                ]
+
+                async def close_when_done():
+                    await frontier.join()
+                    await pages.put(_CRAWL_DONE)
+
+                closer = asyncio.create_task(close_when_done())
+                try:
+                    while True:
+                        page = await pages.get()
+                        if page is _CRAWL_DONE:
+                            break
+                        yield page
+                finally:
+                    closer.cancel()
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(closer, *workers, return_exceptions=True)
+                    self.session = None
+
+    async def crawl(self, frontier: CrawlFrontier, pages: asyncio.Queue):
+        while True:
+            url, depth = await frontier.get()
+            try:
                 content = await self.scrape_website(url)
-                yield CollectedBytes(file=None, data=content.data, error=None, doc_source=self.website_url)
-                # Find and add links from this page to the list of URLs to scrape
-                new_urls = self.extract_links(url)
-                urls_to_scrape.extend(new_urls)
+                if content is not None:
+                    await pages.put(
+                        CollectedBytes(file=None, data=content.data, error=None, doc_source=self.website_url)
+                    )
+                    if depth < frontier.max_depth:
+                        # Links come from the HTML just downloaded, the page is not fetched again
+                        links = await asyncio.to_thread(self.extract_links, url, content.data)
+                        for link in links:
+                            frontier.add(link, depth + 1)
+            except Exception as e:
+                self.logger.error(f"Error scraping {url}: {e}")
+            finally:
+                frontier.task_done()
 
     async def scrape_website(self, website_url: str):
         async with self.semaphore:
-            async with ClientSession(connector=TCPConnector(ssl=False)) as session:
-                async with session.get(website_url) as response:
-                    content = await response.text()
-                    max_length = len(content)
-                    return CollectedBytes(
-                        data=content[:max_length], file=None, error=None
-                    )
+            await self.rate_limiter.wait(website_url)
+            if self.session is None:
+                async with ClientSession(connector=TCPConnector(ssl=False)) as session:
+                    return await self.fetch(session, website_url)
+            return await self.fetch(self.session, website_url)
+
+    async def fetch(self, session: ClientSession, website_url: str):
+        async with session.get(website_url) as response:
+            if response.status != 200 or "html" not in response.headers.get("Content-Type", "text/html"):
+                self.logger.warning(f"Skipping {website_url}: HTTP {response.status} {response.content_type}")
+                return None
+            content = await response.text()
+            max_length = len(content)
+            return CollectedBytes(
+                data=content[:max_length], file=None, error=None
+            )
 
-    def extract_links(self, base_url: str):
+    def extract_links(self, base_url: str, html: str):
         # Use a proper HTML parser to extract links
-        extractor = WebpageExtractor()
-        links = extractor.extract_links(base_url)
+        soup = BeautifulSoup(html, "html.parser")
         # Join relative links with the base URL
-        return [urljoin(base_url, link) for link in links]
+        return [urljoin(base_url, link["href"]) for link in soup.find_all("a", href=True)]
 
 
 class WebScraperFactory(CollectorFactory):
@@ -0,0 +1,167 @@
+import io
+import mmap
+import tempfile
+from typing import Optional
+
+# Files above this size are assembled in a temporary file instead of memory
+DEFAULT_SPILL_THRESHOLD = 64 * 1024 * 1024
+
+
+class ChunkBuffer:
+    """
+    Assembles the chunks of a collected file without re-copying what was already received.
+
+    Chunks are appended to a growing bytearray (amortized O(1) per chunk, unlike `bytes += bytes`
+    which copies the whole file on every chunk). Once the file grows past `spill_threshold`
+    bytes, the buffer moves to a temporary file and the assembled data is exposed through a
+    read-only mmap, so large videos or PDFs do not have to fit in memory.
+
+    Example:
+        buffer = ChunkBuffer()
+        buffer.append(chunk.data)
+        text = str(buffer.getbuffer(), "utf-8")
+
+    Attributes:
+        spill_threshold (int): Size in bytes above which the data is kept in a temporary file.
+
+    Methods:
+        append(data: bytes) -> None:
+            Append a chunk.
+        getbuffer() -> memoryview:
+            Return a zero-copy view of the assembled data.
+        getvalue() -> bytes:
+            Return a copy of the assembled data, for APIs that require bytes.
+        close() -> None:
+            Release the memory, the temporary file and its mapping once the data was consumed.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = DEFAULT_SPILL_THRESHOLD):
+        self.spill_threshold = spill_threshold
+        self._buffer = bytearray()
+        self._spill_file = None
+        self._mmap = None
+        self._size = 0
+
+    def append(self, data: bytes):
+        if not data:
+            return
+        if self._spill_file is None and self.spill_threshold is not None and self._size + len(data) > self.spill_threshold:
+            self._spill()
+        if self._spill_file is not None:
+            self._spill_file.write(data)
+            self._mmap = None
+        else:
+            self._buffer += data
+        self._size += len(data)
+
+    def __iadd__(self, data: bytes) -> "ChunkBuffer":
+        self.append(data)
+        return self
+
+    def _spill(self):
+        self._spill_file = tempfile.TemporaryFile()
+        self._spill_file.write(self._buffer)
+        self._buffer = bytearray()
+
+    def getbuffer(self) -> memoryview:
+        if self._spill_file is None:
+            return memoryview(self._buffer)
+        if self._size == 0:
+            return memoryview(b"")
+        if self._mmap is None:
+            self._spill_file.flush()
+            self._mmap = mmap.mmap(self._spill_file.fileno(), self._size, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def getvalue(self) -> bytes:
+        return self.getbuffer().tobytes()
+
+    def is_spilled(self) -> bool:
+        return self._spill_file is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A view of the data is still alive, the mapping is released along with it
+                pass
+            self._mmap = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self._buffer = bytearray()
+        self._size = 0
+
+    def __enter__(self) -> "ChunkBuffer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A read-only, seekable file object over a bytes-like object, for libraries that only accept
+    file objects. Unlike `io.BytesIO(data)`, it does not copy a memoryview or bytearray up front;
+    only the ranges that are read are copied.
+
+    Example:
+        document = Document(BufferReader(collected_bytes.data))
+    """
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        end = min(self._position + len(buffer), len(self._view))
+        size = max(0, end - self._position)
+        buffer[:size] = self._view[self._position:end]
+        self._position += size
+        return size
+
+    def read(self, size: int = -1) -> bytes:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if size is None or size < 0:
+            end = len(self._view)
+        else:
+            end = min(self._position + size, len(self._view))
+        data = self._view[self._position:end].tobytes() if end > self._position else b""
+        self._position = max(self._position, end)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
@@ -2,11 +2,12 @@ from typing import Union
 
 
 class CollectedBytes:
-    def __init__(self, file: str, data: bytes, error: str = None, eof: bool = False, doc_source = str):
+    def __init__(self, file: str, data: bytes, error: str = None, eof: bool = False, doc_source = str, deleted: bool = False):
         self.data = data
         self.error = error
         self.file = file
         self.eof = eof
+        self.deleted = deleted
         self.doc_source = doc_source
         if self.file:
             file = str(file)
@@ -24,6 +25,9 @@ class CollectedBytes:
     def is_eof(self) -> bool:
         return self.eof
 
+    def is_deleted(self) -> bool:
+        return self.deleted
+
     def get_file_path(self) -> str:
         return self.file
 
@@ -9,5 +9,9 @@ class EngineConfigKey(Enum):
     RETRY_INTERVAL = "retry_interval"
     MESSAGE_THROTTLE_LIMIT = "message_throttle_limit"
     MESSAGE_THROTTLE_DELAY = "message_throttle_delay"
+    BATCH_SIZE = "batch_size"
+    BATCH_TIMEOUT_MS = "batch_timeout_ms"
+    EXECUTION_MODE = "execution_mode"
+    PROCESS_WORKERS = "process_workers"
     INNER_CHANNEL = "inner_channel"
     CHANNEL = "channel"
@@ -31,6 +31,17 @@ class CollectorConfig(BaseModel):
     config: Dict[str, str]
     inner_channel: Optional[Any] = None 
     config_source: Optional[Any] = None
+    # Path of the manifest used to skip unchanged documents across runs (.json or SQLite)
+    sync_manifest: Optional[str] = None
+    sync_tombstones: Optional[bool] = False
+    # Threads running blocking SDK calls for the collector, and items fetched ahead of the ingestor
+    io_workers: str = "4"
+    io_prefetch: str = "2"
+    # Objects downloaded at the same time, and bytes they may buffer ahead of the ingestors
+    download_concurrency: str = "4"
+    download_budget: str = "67108864"
+    # Bytes a download pulls from its source per blocking call
+    download_block_size: str = "1048576"
 
     def __init__(self, config_source=None, **kwargs):
 
@@ -106,6 +117,10 @@ class FSCollectorConfig(CollectorConfig):
     id: str
     root_path: str
     chunk_size: str = "1048576"
+    # Number of files and of bytes read ahead concurrently, and the size above which files are memory-mapped
+    max_concurrent_reads: str = "8"
+    max_read_ahead_bytes: str = "67108864"
+    mmap_threshold: str = "8388608"
     channel: Optional[Any] = None
 
     def __init__(self, config_source=None, **kwargs):
@@ -161,6 +176,15 @@ class S3CollectConfig(CollectorConfig):
     access_key: str
     secret_key: str
     chunk: str = "1024"
+    # Key prefix and delimiter applied by S3 when listing; the prefix defaults to the one in the uri
+    prefix: str = ""
+    delimiter: str = ""
+    # Objects at least multipart_threshold bytes are fetched as parallel ranged GETs
+    multipart_threshold: str = "8388608"
+    multipart_chunksize: str = "8388608"
+    multipart_concurrency: str = "4"
+    # For S3 compatible stores such as MinIO
+    endpoint_url: Optional[str] = None
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -239,6 +263,11 @@ class GithubConfig(CollectorConfig):
     github_username: str
     github_access_token: str
     repository: str
+    github_branch: Optional[str] = None
+    github_api_url: str = "https://api.github.com"
+    # Blobs downloaded at the same time, and the file keeping ETags of API responses across runs
+    github_concurrency: str = "8"
+    github_etag_cache: Optional[str] = None
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -255,6 +284,11 @@ class WebScraperConfig(CollectorConfig):
     backend: CollectorBackend = CollectorBackend.WebScraper
     id: str
     website_url: str = Field(..., description="The URL of the website to scrape.")
+    max_depth: str = Field("3", description="Links followed from the start page before stopping.")
+    max_pages: str = Field("1000", description="Pages fetched per crawl.")
+    allowed_domains: str = Field("", description="Comma separated hosts to crawl, the website's host by default.")
+    crawl_concurrency: str = Field("5", description="Pages fetched at the same time.")
+    crawl_delay: str = Field("0.5", description="Seconds between two requests to the same host.")
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -278,6 +312,13 @@ class DriveCollectorConfig(CollectorConfig):
     chunk_size: str = "1048576"
     specific_file_type: Optional[str] = None
     folder_to_crawl: Optional[str] = None
+    # Shared drive to list, instead of the files the user can access
+    drive_id: Optional[str] = None
+    drive_page_size: Optional[str] = "1000"
+    # Base URL of the Drive API, e.g. "https://www.googleapis.com/drive/v3/"
+    drive_api_endpoint: Optional[str] = None
+    # When set, runs after the first only fetch the files changed since, from the changes feed; its page token is kept in this file
+    drive_changes_file: Optional[str] = None
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -300,6 +341,15 @@ class EmailCollectorConfig(CollectorConfig):
     imap_folder: str
     imap_keyfile: Optional[str] = None
     imap_certfile: Optional[str] = None
+    imap_ssl: Optional[bool] = True
+    # Messages are fetched by UID, this many per UID FETCH round trip
+    imap_batch_size: Optional[str] = "500"
+    # Bytes of messages per UID FETCH, from their RFC822.SIZE; a larger message is fetched on its own
+    imap_batch_bytes: Optional[str] = "33554432"
+    # Messages larger than this many bytes are skipped, checked with RFC822.SIZE before downloading
+    imap_max_message_size: Optional[str] = None
+    # When set, only messages with a UID above the previous run's highest are fetched; the watermark is kept in this file
+    imap_watermark_file: Optional[str] = None
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -328,6 +378,8 @@ class JiraCollectorConfig(CollectorConfig):
     jira_keyfile: Optional[str] = None
     jira_certfile: Optional[str] = None
     jira_verify: Optional[bool] = True
+    # When set, only issues updated since the previous run are fetched; the watermark is kept in this file
+    jira_watermark_file: Optional[str] = None
 
     def __init__(self, config_source=None, **kwargs):
         if config_source and "config" in config_source:
@@ -17,6 +17,8 @@ class LLM_Config(EngineConfig):
     rel_model_path: str = 'bert-base-uncased'
     grammar_file_path: str = './querent/kg/rel_helperfunctions/json.gbnf'
     emb_model_name: str = 'sentence-transformers/all-MiniLM-L6-v2'
+    emb_cache_size: int = 10000
+    emb_cache_dir: Optional[str] = None
     user_context: str = Field(default="In a semantic triple (Subject, Predicate & Object) framework, determine which of the above entity is the subject and which is the object based on the context along with the predicate between these entities. Please also identify the subject type, object type & predicate type.")
     enable_filtering: bool = False
     filter_params: dict = Field(default_factory=lambda: {
@@ -34,6 +36,10 @@ class LLM_Config(EngineConfig):
     fixed_relationships: List[str] = Field(default_factory=list, description="List of fixed relationships")
     sample_relationships: List[str] = Field(default_factory=list, description="List of sample relationships")
     huggingface_token: Optional[str] = None
+    ner_batch_size: int = 16
+    ner_sentence_window: Optional[int] = None
+    spacy_batch_size: int = 256
+    spacy_n_process: int = 1
     
     def __init__(self, config_source=None, **kwargs):
         config_data = {}
@@ -17,6 +17,12 @@ class EngineConfig(BaseModel):
     retry_interval: Optional[int] = 2
     message_throttle_limit: Optional[int] = 1000
     message_throttle_delay: Optional[int] = 1
+    batch_size: Optional[int] = 1
+    batch_timeout_ms: Optional[int] = 0
+    # "inline" runs inference on the event loop, "process" runs it in a pool of num_workers processes
+    execution_mode: Optional[str] = "inline"
+    # Overrides the size of the inference process pool, num_workers when unset
+    process_workers: Optional[int] = None
     # Use Field with allow_mutation=False to specify the type
     inner_channel: Optional[Any] = None
     channel: Optional[Any] = None
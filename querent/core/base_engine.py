@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import time
 from querent.callback.event_callback_dispatcher import EventCallbackDispatcher
 from querent.callback.event_callback_interface import EventCallbackInterface
@@ -15,6 +17,7 @@ from querent.logging.logger import setup_logger
 from querent.common.types.ingested_images import IngestedImages
 from querent.common.types.ingested_images import IngestedImages
 import uuid
+from typing import List
 
 """
     BaseEngine is an abstract base class that provides the foundational structure and methods 
@@ -28,6 +31,9 @@ import uuid
         process_tokens(data: IngestedTokens) -> EventState:
             Abstract method to process tokens asynchronously.
 
+        process_tokens_batch(batch: List[IngestedTokens]) -> None:
+            Process a micro-batch of tokens. Defaults to calling process_tokens for each item.
+
         process_messages(data: IngestedMessages) -> EventState:
             Abstract method to process chat asynchronously.
 
@@ -40,14 +46,23 @@ import uuid
         _listen_for_state_changes() -> None:
             Listen for changes in the state and notify subscribers.
 
+        _dequeue_batch() -> list:
+            Block on the input queue and drain up to `batch_size` items, waiting at most `batch_timeout_ms`.
+
         _worker() -> None:
             Worker task to process tokens and manage retries.
 
-        _start_workers(number_of_workers: int) -> list:
-            Start the specified number of worker tasks.
+        _start_workers() -> list:
+            Start the inference process pool when `execution_mode` is "process" and return `num_workers` worker coroutines.
+
+        _start_process_pool() -> None:
+            Start the inference process pool of `process_workers` processes, `num_workers` unless set, shared by all workers.
+
+        _run_in_pool(method_name: str, *args) -> None:
+            Run an engine method in a pool process and publish the states it produced.
 
         _stop_workers() -> None:
-            Stop all worker tasks.
+            Stop all worker tasks and shut down the inference process pool.
 
         subscribe(event_type: EventType, callback: Callable) -> None:
             Subscribe to a specific event type.
@@ -59,6 +74,30 @@ import uuid
             Set the termination event to signal termination of workers and listeners.
     """
 
+# Engine instance owned by a pool process, built once by _initialize_pool_engine
+_pool_engine = None
+_pool_loop = None
+# Returned by BaseEngine._next_or_stop when its stop event is set before an item arrives
+_STOPPED = object()
+
+
+def _initialize_pool_engine(engine_class, config):
+    global _pool_engine, _pool_loop
+    _pool_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_pool_loop)
+    _pool_engine = engine_class(QuerentQueue(), config)
+
+
+def _run_pool_task(method_name, args):
+    async def _collect_states():
+        await getattr(_pool_engine, method_name)(*args)
+        states = []
+        while not _pool_engine.state_queue.empty():
+            states.append(await _pool_engine.state_queue.get_nowait())
+        return states
+
+    return _pool_loop.run_until_complete(_collect_states())
+
 
 class BaseEngine(ABC):
     def __init__(
@@ -77,12 +116,22 @@ class BaseEngine(ABC):
         super().__init__(**kwargs)  # Call the super constructor first
         self.input_queue = input_queue
         self.termination_event = asyncio.Event()
+        # Set once every worker has stopped processing, so state listeners drain and exit
+        self._workers_done = asyncio.Event()
+        self._running_workers = 0
+        self._none_counter = 0
         self.state_queue = QuerentQueue()
         self.num_workers = config.num_workers
         self.max_retries = config.max_retries
         self.retry_interval = config.retry_interval
         self.message_throttle_limit = config.message_throttle_limit
         self.message_throttle_delay = config.message_throttle_delay
+        self.batch_size = max(1, config.batch_size or 1)
+        self.batch_timeout = (config.batch_timeout_ms or 0) / 1000
+        self.execution_mode = config.execution_mode or "inline"
+        self.process_workers = max(1, config.process_workers or config.num_workers or 1)
+        self.engine_config = config
+        self._process_pool = None
         self.logger = setup_logger(config.logger, f"{__name__}.base_engine")
         self.callback_dispatcher = EventCallbackDispatcher()
 
@@ -98,6 +147,16 @@ class BaseEngine(ABC):
         """
         raise NotImplementedError
 
+    async def process_tokens_batch(self, batch: List[IngestedTokens]):
+        """
+        Process a micro-batch of tokens asynchronously. Engines that can share work across
+        documents (e.g. batched model inference) should override this method.
+        Args:
+            batch (List[IngestedTokens]): The input data to process, in queue order.
+        """
+        for data in batch:
+            await self.process_tokens(data)
+
     @abstractmethod
     async def process_messages(self, data: IngestedMessages):
         """
@@ -187,9 +246,33 @@ class BaseEngine(ABC):
         The following methods enables independent processing of tokens and messages.
     """
 
+    async def _next_or_stop(self, queue: QuerentQueue, stop: asyncio.Event):
+        """
+        Wait for the next item of `queue`. Returns _STOPPED once `stop` is set while the queue is
+        empty, so a worker or listener blocked on an idle queue exits when the others are done.
+        """
+        while True:
+            if not queue.empty():
+                return await queue.get_nowait()
+            if stop.is_set():
+                return _STOPPED
+            get = asyncio.ensure_future(queue.get())
+            stopped = asyncio.ensure_future(stop.wait())
+            try:
+                await asyncio.wait({get, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                stopped.cancel()
+                if not get.done():
+                    # A cancelled get leaves its item in the queue
+                    get.cancel()
+            if get.done() and not get.cancelled():
+                return get.result()
+
     async def _listen_for_state_changes(self):
-        while not self.state_queue.empty() or not self.termination_event.is_set():
-            new_state = await self.state_queue.get()
+        while True:
+            new_state = await self._next_or_stop(self.state_queue, self._workers_done)
+            if new_state is _STOPPED:
+                break
             if isinstance(new_state, EventState):
                 image_id = new_state.image_id
                 if new_state.payload == "Terminate":
@@ -221,6 +304,83 @@ class BaseEngine(ABC):
         await self.callback_dispatcher.dispatch_event(event_type, event_state)
         await self.callback_dispatcher.dispatch_webhook(event_type, event_state)
 
+    async def _dequeue_batch(self) -> list:
+        """
+        Wait for the next item on the input queue, then drain up to `batch_size` items.
+        If the queue runs dry before the batch is full, wait at most `batch_timeout_ms`
+        for more items. A None sentinel always closes the batch. Returns an empty batch when
+        the engine terminates while the queue is empty.
+        Returns:
+            list: The dequeued items in queue order.
+        """
+        item = await self._next_or_stop(self.input_queue, self.termination_event)
+        if item is _STOPPED:
+            return []
+        batch = [item]
+        if self.batch_size <= 1:
+            return batch
+        deadline = asyncio.get_running_loop().time() + self.batch_timeout
+        while len(batch) < self.batch_size and batch[-1] is not None:
+            if not self.input_queue.empty():
+                batch.append(await self.input_queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.input_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _group_tokens(self, batch: list) -> list:
+        """
+        Group consecutive IngestedTokens of a dequeued batch into lists so they can be handed
+        to `process_tokens_batch`, keeping every other item in place.
+        """
+        if self.batch_size <= 1:
+            return batch
+        grouped = []
+        for data in batch:
+            if isinstance(data, IngestedTokens) and grouped and isinstance(grouped[-1], list):
+                grouped[-1].append(data)
+            elif isinstance(data, IngestedTokens):
+                grouped.append([data])
+            else:
+                grouped.append(data)
+        return grouped
+
+    def _start_process_pool(self):
+        """
+        Start a pool of `process_workers` processes, `num_workers` unless set, when `execution_mode` is
+        "process". Every process builds its own engine from this engine's config, so models are loaded
+        once per process.
+        The pool is shared by all worker tasks and shut down by `_stop_workers`.
+        """
+        if self.execution_mode != "process" or self._process_pool is not None:
+            return
+        pool_config = self.engine_config.model_copy(
+            update={"execution_mode": "inline", "channel": None, "inner_channel": None}
+        )
+        self._process_pool = ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_pool_engine,
+            initargs=(type(self), pool_config),
+        )
+
+    async def _run_in_pool(self, method_name: str, *args):
+        """
+        Run `method_name` of the pool process engine with `args` and publish the
+        EventStates it produced on this engine's state queue.
+        """
+        states = await asyncio.get_running_loop().run_in_executor(
+            self._process_pool, _run_pool_task, method_name, args
+        )
+        # Published even after another worker terminated the engine, the work is already done
+        for state in states:
+            await self.set_state(new_state=state)
+
     async def _worker(self):
         try:
             if not self.validate():
@@ -231,58 +391,75 @@ class BaseEngine(ABC):
                     f"Invalid {self.__class__.__name__} configuration. Please check the configuration."
                 )
 
+            self._running_workers += 1
+            self._workers_done.clear()
             state_listener = asyncio.create_task(self._listen_for_state_changes())
 
+            async def _dispatch(data):
+                if isinstance(data, list):
+                    await self.process_tokens_batch(data)
+                elif isinstance(data, IngestedMessages):
+                    await self.process_messages(data)
+                elif isinstance(data, IngestedTokens):
+                    await self.process_tokens(data)
+                elif isinstance(data, IngestedImages):
+                    await self.process_images(data)
+                elif isinstance(data, IngestedCode):
+                    await self.process_code(data)
+                elif isinstance(data, IngestedTables):
+                    pass
+                    # await self.process_tables(data)
+                elif data is None:
+                    # Counted across workers, any of them may dequeue the end of input sentinels
+                    self._none_counter += 1
+                    if self._none_counter >= 2:
+                        self.termination_event.set()
+                        current_state = EventState(EventType.Terminate,time.time(), "Terminate", "temp.txt", doc_source="")
+                        await self.set_state(new_state=current_state)
+
+                else:
+                    raise Exception(
+                        f"Invalid data type {type(data)} for {self.__class__.__name__}. Supported type: {IngestedTokens, IngestedMessages, IngestedTables, IngestedImages}"
+                    )
+
             async def _inner_worker():
                 current_message_total = 0
-                none_counter = 0
                 while not self.termination_event.is_set():
-                    retries = 0
-                    await asyncio.sleep(5)
-                    data = await self.input_queue.get()
-                    try:
-                        if isinstance(data, IngestedMessages):
-                            await self.process_messages(data)
-                        elif isinstance(data, IngestedTokens):
-                            await self.process_tokens(data)
-                        elif isinstance(data, IngestedImages):
-                            await self.process_images(data)
-                        elif isinstance(data, IngestedCode):
-                            await self.process_code(data)
-                        elif isinstance(data, IngestedTables):
-                            continue
-                            # await self.process_tables(data)
-                        elif data is None:
-                            none_counter += 1
-                            if none_counter >= 2:
-                                self.termination_event.set()
-                                current_state = EventState(EventType.Terminate,time.time(), "Terminate", "temp.txt")
-                                await self.set_state(new_state=current_state)
-
-                        else:
-                            raise Exception(
-                                f"Invalid data type {type(data)} for {self.__class__.__name__}. Supported type: {IngestedTokens, IngestedMessages, IngestedTables, IngestedImages}"
-                            )
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error processing tokens: {e}. Retrying ({retries}/{self.max_retries})"
-                        )
-                        retries += 1
-
-                        if retries > self.max_retries:
+                    batch = await self._dequeue_batch()
+                    for data in self._group_tokens(batch):
+                        retries = 0
+                        try:
+                            await _dispatch(data)
+                        except Exception as e:
                             self.logger.error(
-                                f"Error processing tokens: {e}. Max retries reached. Terminating."
+                                f"Error processing tokens: {e}. Retrying ({retries}/{self.max_retries})"
                             )
-                            break
-                        
-                        await asyncio.sleep(self.retry_interval)
+                            retries += 1
+
+                            if retries > self.max_retries:
+                                self.logger.error(
+                                    f"Error processing tokens: {e}. Max retries reached. Terminating."
+                                )
+                                return
+
+                            await asyncio.sleep(self.retry_interval)
 
-                    current_message_total += 1
+                    current_message_total += len(batch)
+                    # Yield to the state listener so events are emitted while the queue stays busy
+                    await asyncio.sleep(0)
 
                     if current_message_total >= self.message_throttle_limit:
                         await asyncio.sleep(self.message_throttle_delay)
                         current_message_total = 0
-            await asyncio.gather(state_listener, _inner_worker())
+            async def _run_inner_worker():
+                try:
+                    await _inner_worker()
+                finally:
+                    self._running_workers -= 1
+                    if self._running_workers == 0:
+                        self._workers_done.set()
+
+            await asyncio.gather(state_listener, _run_inner_worker())
         except Exception as e:
             self.logger.error(f"Error while processing tokens: {e}")
         finally:
@@ -291,11 +468,15 @@ class BaseEngine(ABC):
             self.termination_event.set()
 
     async def _start_workers(self):
+        self._start_process_pool()
         self.workers = [self._worker() for _ in range(self.num_workers)]
         return self.workers
 
     async def _stop_workers(self):
         try:
             self.termination_event.set()
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
         except Exception as e:
             self.logger.error(f"Error while stopping workers: {e}")
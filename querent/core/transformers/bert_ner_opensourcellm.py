@@ -1,8 +1,10 @@
+import asyncio
 import json
 import uuid
 from transformers import AutoConfig, AutoTokenizer
 import transformers
 import time
+from typing import List
 from querent.common.types.ingested_table import IngestedTables
 from querent.kg.ner_helperfunctions.fixed_predicate import FixedPredicateExtractor
 from querent.common.types.ingested_images import IngestedImages
@@ -23,6 +25,7 @@ from querent.logging.logger import setup_logger
 from querent.kg.querent_kg import QuerentKG
 from querent.config.graph_config import GraphConfig
 from querent.kg.ner_helperfunctions.attn_scores import EntityAttentionExtractor
+from querent.kg.ner_helperfunctions.sentence_encoding_cache import SentenceEncodingCache
 from querent.kg.ner_helperfunctions.filter_triples import TripleFilter
 from querent.config.core.llm_config import LLM_Config
 from querent.kg.rel_helperfunctions.triple_to_json import TripleToJsonConverter
@@ -40,7 +43,7 @@ class BERTLLM(BaseEngine):
         Embedding=None
     ):
         self.logger = setup_logger(__name__, "BERTLLM")
-        super().__init__(input_queue)
+        super().__init__(input_queue, config)
         self.skip_inferences = config.skip_inferences
         self.enable_filtering = config.enable_filtering
         self.filter_params = config.filter_params or {}
@@ -51,7 +54,11 @@ class BERTLLM(BaseEngine):
         self.user_context = config.user_context
         self.isConfinedSearch = config.is_confined_search
         self.attn_based_rel_extraction = True
-        self.create_emb = EmbeddingStore() if not Embedding else Embedding
+        self.create_emb = EmbeddingStore(
+            model_name=config.emb_model_name,
+            cache_size=config.emb_cache_size,
+            cache_dir=config.emb_cache_dir,
+        ) if not Embedding else Embedding
 
         try:
             self._initialize_components(config)
@@ -83,13 +90,22 @@ class BERTLLM(BaseEngine):
             model_metadata = extractor.dump_metadata()
             rel_model_name = extractor.extract_general_name(model_metadata)
             self.rel_model_initialized = self.model_manager.get_model(rel_model_name, model_path=config.rel_model_path)
-        self.ner_llm_instance = NER_LLM(ner_model_name=self.ner_model_initialized)
+        self.ner_llm_instance = NER_LLM(
+            ner_model_name=self.ner_model_initialized,
+            batch_size=config.ner_batch_size,
+            sentence_window=config.ner_sentence_window
+        )
         self.ner_tokenizer = self.ner_llm_instance.ner_tokenizer
         self.ner_model = self.ner_llm_instance.ner_model
-        self.nlp_model = NER_LLM.set_nlp_model(config.spacy_model_path)
+        NER_LLM.set_nlp_model(
+            config.spacy_model_path,
+            batch_size=config.spacy_batch_size,
+            n_process=config.spacy_n_process
+        )
         self.nlp_model = NER_LLM.get_class_variable()
 
     def _initialize_extractors(self, config):
+        self.encoding_cache = SentenceEncodingCache(self.ner_model, self.ner_tokenizer)
         if not self.skip_inferences and self.attn_based_rel_extraction == False:
             mock_config = Opensource_LLM_Config(
                 qa_template=config.user_context,
@@ -107,10 +123,11 @@ class BERTLLM(BaseEngine):
             config.rel_model_path = self.ner_model_initialized
             model_config = AutoConfig.from_pretrained(config.rel_model_path)
             if 'bert' in model_config.model_type.lower():
-                self.ner_helper_instance = NER_LLM(ner_model_name=config.rel_model_path)
+                # Same weights as the NER model, so share it and its sentence encodings
+                self.ner_helper_instance = self.ner_llm_instance
                 self.ner_helper_tokenizer = self.ner_helper_instance.ner_tokenizer
                 self.ner_helper_model = self.ner_helper_instance.ner_model
-                self.extractor = get_model("bert",model_tokenizer= self.ner_helper_tokenizer,model=self.ner_helper_model)
+                self.extractor = get_model("bert",model_tokenizer= self.ner_helper_tokenizer,model=self.ner_helper_model, encoding_cache=self.encoding_cache)
             elif 'llama' in model_config.model_type.lower() or 'mpt' in model_config.model_type.lower():
                 # model_id = "TheBloke/Llama-2-7B-GGUF"
                 # filename = "llama-2-7b.Q5_K_M.gguf"
@@ -125,7 +142,7 @@ class BERTLLM(BaseEngine):
                 self.extractor = get_model("llama",model_tokenizer= self.ner_helper_tokenizer,model=self.ner_helper_model)
             else:
                 raise ValueError("Selected Model not supported for Attnetion Based Graph Extraction")
-        self.attn_scores_instance = EntityAttentionExtractor(model=self.ner_model, tokenizer=self.ner_tokenizer)
+        self.attn_scores_instance = EntityAttentionExtractor(model=self.ner_model, tokenizer=self.ner_tokenizer, encoding_cache=self.encoding_cache)
 
     def _initialize_entity_context_extractor(self):
         if self.fixed_entities and not self.sample_entities:
@@ -239,24 +256,17 @@ class BERTLLM(BaseEngine):
                         return filtered_triples, file, self.ner_llm_instance
                     else:
                         unique_id = str(hash(data.image))
-                        for triple in filtered_triples:
+                        updated_tuples = [
+                            self.ner_llm_instance.final_ingested_images_tuples(triple, create_embeddings=self.create_emb)
+                            for triple in filtered_triples
+                        ]
+                        final_embs = self._compute_triple_embeddings(updated_tuples, predicate_scores=[1] * len(updated_tuples))
+                        for updated_tuple, final_emb in zip(updated_tuples, final_embs):
                             if not self.termination_event.is_set():
-                                updated_tuple = self.ner_llm_instance.final_ingested_images_tuples(triple, create_embeddings=self.create_emb)
                                 graph_json = json.dumps(TripleToJsonConverter.convert_graphjson(updated_tuple))
                                 if graph_json:
                                     current_state = EventState(event_type=EventType.Graph, timestamp=time.time(), payload=graph_json, file=file, doc_source=doc_source, image_id=unique_id)
                                     await self.set_state(new_state=current_state)
-                                subject, json_str, object_ = updated_tuple
-                                context = json.loads(json_str)
-                                sen_emb = self.create_emb.get_embeddings([context['context']])[0]
-                                sub_emb = self.create_emb.get_embeddings(subject)[0]
-                                obj_emb = self.create_emb.get_embeddings(object_)[0]
-                                predicate_score=1
-                                final_emb = TripleToJsonConverter.dynamic_weighted_average_embeddings(
-                                                                                                            [sub_emb, obj_emb, sen_emb],
-                                                                                                            base_weights=[predicate_score, predicate_score, 3],
-                                                                                                            normalize_weights=True  # Normalize weights to ensure they sum to 1
-                                                                                                        )
                                 vector_json = json.dumps(TripleToJsonConverter.convert_vectorjson(updated_tuple, blob, final_emb))
                                 if vector_json:
                                     current_state = EventState(event_type=EventType.Vector, timestamp=time.time(), payload=vector_json, file=file, doc_source=doc_source, image_id=unique_id)
@@ -297,7 +307,6 @@ class BERTLLM(BaseEngine):
     
     async def process_tokens(self, data: IngestedTokens):
         try:
-            doc_entity_pairs = []
             doc_source = data.doc_source
             if not BERTLLM.validate_ingested_tokens(data):
                 self.set_termination_event()
@@ -306,29 +315,92 @@ class BERTLLM(BaseEngine):
             content, file = self._prepare_content(data)
             if not content:
                 return
-            if self.fixed_entities:
-                content = self.entity_context_extractor.find_entity_sentences(content)
-            doc_entity_pairs = self._get_entity_pairs(content)
-            if not doc_entity_pairs:
-                return
-            
-            doc_entity_pairs = self._process_entity_types(doc_entity_pairs)
-            if not self.entity_context_extractor and not self.predicate_context_extractor:
-                pairs_withattn = self.attn_scores_instance.extract_and_append_attention_weights(doc_entity_pairs)
-            else:
-                pairs_withattn = doc_entity_pairs
-            pairs_with_predicates = self._process_pairs_with_embeddings(pairs_withattn, file)
-            filtered_triples = self._filter_triples(pairs_with_predicates, pairs_withattn)
-            if not filtered_triples:
-                return
+            if self._process_pool is not None:
+                return await self._run_in_pool("_process_content", content, file, doc_source)
+            return await self._process_content(content, file, doc_source)
 
-            if not self.skip_inferences:
-                await self._process_relationships(filtered_triples, file, doc_source)
-            else:
-                return filtered_triples, file
+        except Exception as e:
+            self.logger.debug(f"Invalid {self.__class__.__name__} configuration. Unable to process tokens. {e}")
 
+    async def _process_content(self, content, file, doc_source):
+        analysis = self._analyze_content(content)
+        doc_entity_pairs = self._get_entity_pairs(analysis)
+        return await self._process_document(doc_entity_pairs, file, doc_source, analysis)
+
+    def _analyze_content(self, content):
+        return self._analyze_contents([content])[0]
+
+    def _analyze_contents(self, contents):
+        # Parsed once with spaCy; the analysis is shared by the fixed entity, NER and relationship helpers
+        analyses = self.ner_llm_instance.analyze_documents(contents)
+        if self.fixed_entities:
+            analyses = [self.entity_context_extractor.select_entity_sentences(analysis) for analysis in analyses]
+        return analyses
+
+    async def _process_batch_in_pool(self, documents):
+        async def _run(content, file, doc_source):
+            try:
+                await self._run_in_pool("_process_content", content, file, doc_source)
+            except Exception as e:
+                self.logger.debug(f"Invalid {self.__class__.__name__} configuration. Unable to process tokens. {e}")
+
+        await asyncio.gather(*[_run(content, file, doc_source) for content, file, doc_source in documents])
+
+    async def process_tokens_batch(self, batch: List[IngestedTokens]):
+        documents = []
+        for data in batch:
+            try:
+                if not BERTLLM.validate_ingested_tokens(data):
+                    self.set_termination_event()
+                    break
+                content, file = self._prepare_content(data)
+                if not content:
+                    continue
+                documents.append((content, file, data.doc_source))
+            except Exception as e:
+                self.logger.debug(f"Invalid {self.__class__.__name__} configuration. Unable to process tokens. {e}")
+        if not documents:
+            return
+        if self._process_pool is not None:
+            # Fan the documents out across the pool processes
+            return await self._process_batch_in_pool(documents)
+        try:
+            # The whole batch goes through nlp.pipe at once
+            analyses = self._analyze_contents([content for content, _, _ in documents])
+            documents = [(analysis, file, doc_source) for analysis, (_, file, doc_source) in zip(analyses, documents)]
+            batch_entity_pairs = self.ner_llm_instance.get_entity_pairs_batch(
+                isConfinedSearch=self.isConfinedSearch,
+                contents=[content for content, _, _ in documents],
+                fixed_entities=self.fixed_entities,
+                sample_entities=self.sample_entities
+            )
         except Exception as e:
             self.logger.debug(f"Invalid {self.__class__.__name__} configuration. Unable to process tokens. {e}")
+            return
+        for (analysis, file, doc_source), (_, doc_entity_pairs) in zip(documents, batch_entity_pairs):
+            try:
+                await self._process_document(doc_entity_pairs, file, doc_source, analysis)
+            except Exception as e:
+                self.logger.debug(f"Invalid {self.__class__.__name__} configuration. Unable to process tokens. {e}")
+
+    async def _process_document(self, doc_entity_pairs, file, doc_source, analysis=None):
+        if not doc_entity_pairs:
+            return
+
+        doc_entity_pairs = self._process_entity_types(doc_entity_pairs)
+        if not self.entity_context_extractor and not self.predicate_context_extractor:
+            pairs_withattn = self.attn_scores_instance.extract_and_append_attention_weights(doc_entity_pairs)
+        else:
+            pairs_withattn = doc_entity_pairs
+        pairs_with_predicates = self._process_pairs_with_embeddings(pairs_withattn, file)
+        filtered_triples = self._filter_triples(pairs_with_predicates, pairs_withattn)
+        if not filtered_triples:
+            return
+
+        if not self.skip_inferences:
+            await self._process_relationships(filtered_triples, file, doc_source, analysis)
+        else:
+            return filtered_triples, file
 
     def _prepare_content(self, data):
         if data.data:
@@ -361,7 +433,7 @@ class BERTLLM(BaseEngine):
 
     def _process_pairs_with_embeddings(self, pairs_withattn, file):
         if self.enable_filtering and not self.entity_context_extractor and self.count_entity_pairs(pairs_withattn) > 1 and not self.predicate_context_extractor:
-            self.entity_embedding_extractor = EntityEmbeddingExtractor(self.ner_model, self.ner_tokenizer)
+            self.entity_embedding_extractor = EntityEmbeddingExtractor(self.ner_model, self.ner_tokenizer, encoding_cache=self.encoding_cache)
             pairs_withemb = self.entity_embedding_extractor.extract_and_append_entity_embeddings(pairs_withattn)
         else:
             pairs_withemb = pairs_withattn
@@ -380,7 +452,7 @@ class BERTLLM(BaseEngine):
             filtered_triples = pairs_with_predicates
         return filtered_triples
 
-    async def _process_relationships(self, filtered_triples, file, doc_source):
+    async def _process_relationships(self, filtered_triples, file, doc_source, analysis=None):
         if self.attn_based_rel_extraction == False:    
             relationships = self.semantic_extractor.process_tokens(
                 filtered_triples, 
@@ -388,7 +460,7 @@ class BERTLLM(BaseEngine):
             )
         else:
             filtered_triples = trim_triples(filtered_triples)
-            relationships = process_tokens(filtered_triples=filtered_triples, ner_instance=self.ner_helper_instance, extractor=self.extractor, nlp_model=self.nlp_model)
+            relationships = process_tokens(filtered_triples=filtered_triples, ner_instance=self.ner_helper_instance, extractor=self.extractor, nlp_model=self.nlp_model, document=analysis)
         if not relationships:
             return
 
@@ -407,12 +479,36 @@ class BERTLLM(BaseEngine):
         else:
             return self.create_emb.generate_embeddings(relationships)
 
+    def _compute_triple_embeddings(self, triples, predicate_scores=None):
+        """
+        Embeds the sentence, subject and object of every triple in one batched call and
+        combines them into the weighted vector emitted with each triple.
+        """
+        if not triples:
+            return []
+        contexts = [triple.context for triple in triples]
+        scores = predicate_scores if predicate_scores is not None else [triple.score for triple in triples]
+        count = len(triples)
+        embeddings = self.create_emb.embed_batch(
+            contexts + [triple.subject for triple in triples] + [triple.object for triple in triples]
+        )
+        sen_embs, sub_embs, obj_embs = embeddings[:count], embeddings[count:2 * count], embeddings[2 * count:]
+        return [
+            TripleToJsonConverter.dynamic_weighted_average_embeddings(
+                [sub_embs[idx], obj_embs[idx], sen_embs[idx]],
+                base_weights=[scores[idx], scores[idx], 3],
+                normalize_weights=True  # Normalize weights to ensure they sum to 1
+            )
+            for idx in range(count)
+        ]
+
     async def _process_embedding_triples(self, embedding_triples, file, doc_source):
         if self.sample_relationships:
             embedding_triples = self.predicate_context_extractor.update_embedding_triples_with_similarity(
                 self.predicate_json_emb, embedding_triples)
 
-        for triple in embedding_triples:
+        triple_embeddings = self._compute_triple_embeddings(embedding_triples)
+        for triple, final_emb in zip(embedding_triples, triple_embeddings):
             if self.termination_event.is_set():
                 return
             event_id = str(uuid.uuid4())
@@ -427,17 +523,6 @@ class BERTLLM(BaseEngine):
                     doc_source=doc_source
                 )
                 await self.set_state(new_state=current_state)
-            subject, json_str, object_ = triple
-            context = json.loads(json_str)
-            sen_emb = self.create_emb.get_embeddings([context['context']])[0]
-            sub_emb = self.create_emb.get_embeddings(subject)[0]
-            obj_emb = self.create_emb.get_embeddings(object_)[0]
-            predicate_score=context['score']
-            final_emb = TripleToJsonConverter.dynamic_weighted_average_embeddings(
-                                                                                        [sub_emb, obj_emb, sen_emb],
-                                                                                        base_weights=[predicate_score, predicate_score, 3],
-                                                                                        normalize_weights=True  # Normalize weights to ensure they sum to 1
-                                                                                    )
             vector_json = json.dumps(TripleToJsonConverter.convert_vectorjson(triple=triple, embeddings=final_emb,event_id=event_id))
             if vector_json:
                 current_state = EventState(
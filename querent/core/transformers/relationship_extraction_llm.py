@@ -1,14 +1,13 @@
 import json
 from typing import Any, List, Tuple
 from querent.kg.rel_helperfunctions.embedding_store import EmbeddingStore
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
 from querent.kg.rel_helperfunctions.questionanswer_llama2 import QASystem
 from querent.kg.rel_helperfunctions.rel_normalize import TextNormalizer
 from querent.logging.logger import setup_logger
 from querent.config.core.opensource_llm_config import Opensource_LLM_Config
 from llama_cpp import LlamaGrammar
 
-import ast
-
 """
     A class for extracting relationships from triples and processing them for various representations.
 
@@ -77,16 +76,16 @@ class RelationExtractor():
                 return False
 
             item = data[0]
-            if not isinstance(item, tuple) or len(item) != 3:
+            if not isinstance(item, TripleRecord):
                 self.logger.error(
                     f"Invalid {self.__class__.__name__} configuration. Incorrect Format Error: Item is not a triple"
                 )
                 return False
 
             if not (
-                isinstance(item[0], str)
-                and isinstance(item[2], str)
-                and isinstance(item[1], str)
+                isinstance(item.subject, str)
+                and isinstance(item.object, str)
+                and isinstance(item.context, str)
             ):
                 self.logger.error(
                     f"Invalid {self.__class__.__name__} configuration. Incorrect Format Error: Incorrect item format"
@@ -129,19 +128,16 @@ class RelationExtractor():
         try:   
             if not input1.get("predicate") or not input1.get("subject") or not input1.get("object"):
                 raise ValueError("Missing 'subject', 'predicate', or 'object' in llm output") 
-            input2_data = ast.literal_eval(input2)
-            triple = (
+            triple = TripleRecord(
                 input1.get("subject",""),
-                json.dumps({
-                    "predicate": input1.get("predicate",""),
-                    "predicate_type": input1.get("predicate_type","Unlabeled"),
-                    "context": input2_data.get("context", ""),
-                    "file_path": input2_data.get("file_path", ""),
-                    "subject_type": input1.get("subject_type","Unlabeled"),
-                    "object_type": input1.get("object_type","Unlabeled"),
-                    "score":1
-                }),
-                input1.get("object","")
+                input1.get("object",""),
+                predicate=input1.get("predicate",""),
+                predicate_type=input1.get("predicate_type","Unlabeled"),
+                context=input2.context,
+                file_path=input2.file_path,
+                subject_type=input1.get("subject_type","Unlabeled"),
+                object_type=input1.get("object_type","Unlabeled"),
+                score=1
             )
             return triple
         except Exception as e:
@@ -166,10 +162,8 @@ class RelationExtractor():
         try:
             self.logger.debug(f"Length of identified triples {len(triples)}")
             updated_triples = []
-            for _, predicate_str, _ in triples:
-                data = json.loads(predicate_str)
-                context = data['context']
-                predicate = predicate_str if isinstance(predicate_str, dict) else json.loads(predicate_str)
+            for predicate in triples:
+                context = predicate.context
                 if fixed_entities == False:
                     query = """Please analyze the provided context and two entities. Use this information to answer the users query below.
 Context: {context}
@@ -180,7 +174,7 @@ Answer:"""
                         question = "In the context of a semantic triple framework, first identify which entity is subject and which is the object along with their respective types. Also determine the predicate and predicate type."   
                     else:
                         question = self.config.qa_template
-                    query = query.format(question = question, context = context, entity1=predicate.get('entity1_nn_chunk', ''), entity2=predicate.get('entity2_nn_chunk', ''))
+                    query = query.format(question = question, context = context, entity1=predicate.entity1_nn_chunk, entity2=predicate.entity2_nn_chunk)
                 else:
                     query = """Please analyze the provided context and two entities along with their identified labels. Use this information to answer the users query below.
 Context: {context}
@@ -194,15 +188,15 @@ Answer:"""
                         question = self.config.qa_template
                     query = query.format(question = question, 
                                                 context = context, 
-                                                entity1=predicate.get('entity1_nn_chunk', ''), 
-                                                entity2=predicate.get('entity2_nn_chunk', ''),
-                                                entity1_label=predicate.get('entity1_label', ''), 
-                                                entity2_label=predicate.get('entity2_label', ''))
+                                                entity1=predicate.entity1_nn_chunk, 
+                                                entity2=predicate.entity2_nn_chunk,
+                                                entity1_label=predicate.entity1_label, 
+                                                entity2_label=predicate.entity2_label)
                 answer_relation = self.qa_system.ask_question(prompt=query, llm=self.qa_system.llm, grammar=self.grammar)
                 try:
                     choices_text = answer_relation['choices'][0]['text']
-                    answer_relation = self.replace_entities(choices_text,entity1=predicate.get('entity1_nn_chunk', ''), entity2=predicate.get('entity2_nn_chunk'))
-                    updated_triple= self.create_semantic_triple(answer_relation, predicate_str)
+                    answer_relation = self.replace_entities(choices_text,entity1=predicate.entity1_nn_chunk, entity2=predicate.entity2_nn_chunk)
+                    updated_triple= self.create_semantic_triple(answer_relation, predicate)
                     updated_triples.append(updated_triple)
                 except Exception as e:
                     continue
@@ -212,20 +206,20 @@ Answer:"""
 
     def trim_triples(self, data):
         try:
-            trimmed_data = []
-            for entity1, predicate, entity2 in data:
-                predicate_dict = json.loads(predicate)
-                trimmed_predicate = {
-                    'context': predicate_dict.get('context', ''),
-                    'entity1_nn_chunk': predicate_dict.get('entity1_nn_chunk', ''),
-                    'entity2_nn_chunk': predicate_dict.get('entity2_nn_chunk', ''),
-                    'entity1_label': predicate_dict.get('entity1_label', ''),
-                    'entity2_label': predicate_dict.get('entity2_label', ''),
-                    'file_path': predicate_dict.get('file_path', '')
-                }
-                trimmed_data.append((entity1, trimmed_predicate, entity2))
-
-            return trimmed_data
+            # Only the entities, labels, context and file path are used from here on
+            return [
+                TripleRecord(
+                    triple.subject,
+                    triple.object,
+                    context=triple.context,
+                    entity1_nn_chunk=triple.entity1_nn_chunk,
+                    entity2_nn_chunk=triple.entity2_nn_chunk,
+                    entity1_label=triple.entity1_label,
+                    entity2_label=triple.entity2_label,
+                    file_path=triple.file_path,
+                )
+                for triple in data
+            ]
         
         except Exception as e:
             self.logger.error(f"Error in trimming triples: {e}")
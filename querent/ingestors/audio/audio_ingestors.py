@@ -7,12 +7,14 @@ from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.common_errors import (
     UnknownValueError,
     RequestError,
     IndexErrorException,
     UnknownError,
+    PollingError,
 )
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.logging.logger import setup_logger
@@ -68,7 +70,7 @@ class AudioIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -79,7 +81,7 @@ class AudioIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # we have a new file, process the old one
                     async for text in self.extract_and_process_audio(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedTokens(file=current_file, data=[text], error=None, doc_source= chunk_bytes.doc_source)
                     yield IngestedTokens(
@@ -88,19 +90,27 @@ class AudioIngestor(BaseIngestor):
                         error=None,
                         doc_source= chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            # process the last file
-            async for text in self.extract_and_process_audio(
-                CollectedBytes(file=current_file, data=collected_bytes)
-            ):
-                yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                # process the last file
+                if current_file is not None:
+                    async for text in self.extract_and_process_audio(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                    ):
+                        yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
 
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_audio(
         self, collected_bytes: CollectedBytes
@@ -108,7 +118,7 @@ class AudioIngestor(BaseIngestor):
         # Recognize the text using the recognizer
         try:
             audio_segment = AudioSegment.from_file(
-                io.BytesIO(collected_bytes.data), format=collected_bytes.extension
+                BufferReader(collected_bytes.data), format=collected_bytes.extension
             )
             temp_wave = io.BytesIO()
             audio_segment.export(temp_wave, format="wav")
@@ -1,4 +1,5 @@
 from typing import List, AsyncGenerator
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.ingestors.ingestor_factory import IngestorFactory
@@ -60,7 +61,7 @@ class CodeIngestor(BaseIngestor):
     async def ingest(
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         current_file = None
         try:
             async for chunk_bytes in poll_function:
@@ -71,7 +72,7 @@ class CodeIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     async for line in self.extract_code_from_bytes(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedTokens(
                             file=current_file,
@@ -85,12 +86,13 @@ class CodeIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
             if current_file:
                 async for line in self.extract_code_from_bytes(
-                    CollectedBytes(file=current_file, data=collected_bytes)
+                    CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                 ):
                     yield IngestedTokens(
                         file=current_file,
@@ -104,12 +106,14 @@ class CodeIngestor(BaseIngestor):
                 file=current_file, data=None, error=f"Exception: {exc}", doc_source=chunk_bytes.doc_source,
             )
             raise Exception from exc
+        finally:
+            collected_bytes.close()
 
     async def extract_code_from_bytes(
         self, chunk_bytes: CollectedBytes
     ) -> AsyncGenerator[IngestedTokens, None]:
         try:
-            code_bytes = chunk_bytes.data.decode("UTF-8")
+            code_bytes = str(chunk_bytes.data, "UTF-8")
             yield code_bytes
         except UnicodeDecodeError as exc:
             raise common_errors.UnicodeDecodeError(
@@ -6,6 +6,7 @@ from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common import common_errors
 from querent.common.types.ingested_tokens import IngestedTokens
@@ -36,7 +37,7 @@ class CsvIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -47,7 +48,7 @@ class CsvIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # we have a new file, process the old one
                     async for row in self.extract_and_process_csv(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedTokens(file=current_file, data=[row], error=None, doc_source=chunk_bytes.doc_source)
                     yield IngestedTokens(
@@ -56,19 +57,27 @@ class CsvIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source,
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, common_errors.PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            # process the last file
-            async for row in self.extract_and_process_csv(
-                CollectedBytes(file=current_file, data=collected_bytes)
-            ):
-                yield IngestedTokens(file=current_file, data=[row], error=None,doc_source=chunk_bytes.doc_source)
+            try:
+                # process the last file
+                if current_file is not None:
+                    async for row in self.extract_and_process_csv(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                    ):
+                        yield IngestedTokens(file=current_file, data=[row], error=None,doc_source=chunk_bytes.doc_source)
 
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_csv(
         self, collected_bytes: CollectedBytes
@@ -81,7 +90,7 @@ class CsvIngestor(BaseIngestor):
 
     async def extract_text_from_csv(self, collected_bytes: CollectedBytes) -> str:
         try:
-            text_data = collected_bytes.data.decode("utf-8")
+            text_data = str(collected_bytes.data, "utf-8")
             return text_data
         except UnicodeDecodeError as exc:
             raise common_errors.UnicodeDecodeError(
@@ -13,6 +13,7 @@ from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common import common_errors
 from querent.common.types.ingested_tokens import IngestedTokens
@@ -44,7 +45,7 @@ class DocIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -55,7 +56,7 @@ class DocIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # we have a new file, process the old one
                     async for ingested_data in self.extract_and_process_doc(
-                        CollectedBytes(file=current_file, data=collected_bytes), doc_source=chunk_bytes.doc_source
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), doc_source=chunk_bytes.doc_source
                     ):
                         ingested_data.doc_source = chunk_bytes.doc_source
                         yield ingested_data
@@ -65,18 +66,26 @@ class DocIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, doc_source = chunk_bytes.doc_source, data=None, error=f"Exception: {e}")
+            if isinstance(e, common_errors.PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            # process the last file
-            async for ingested_data in self.extract_and_process_doc(
-                CollectedBytes(file=current_file, data=collected_bytes), doc_source=chunk_bytes.doc_source
-            ):
-                yield ingested_data
-            yield IngestedTokens(file=current_file, data=None, doc_source = chunk_bytes.doc_source, error=None)
+            try:
+                # process the last file
+                if current_file is not None:
+                    async for ingested_data in self.extract_and_process_doc(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), doc_source=chunk_bytes.doc_source
+                    ):
+                        yield ingested_data
+                    yield IngestedTokens(file=current_file, data=None, doc_source = chunk_bytes.doc_source, error=None)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_doc(
         self, collected_bytes: CollectedBytes, doc_source: str
@@ -88,7 +97,7 @@ class DocIngestor(BaseIngestor):
         # Determine file extension
         file_extension = collected_bytes.extension.lower()
         if file_extension == "docx":
-            doc = Document(io.BytesIO(collected_bytes.data))
+            doc = Document(BufferReader(collected_bytes.data))
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
@@ -2,7 +2,9 @@ from typing import List, AsyncGenerator
 import uuid
 from PIL import Image
 import fitz
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
+from querent.common.common_errors import PollingError
 from querent.common.types.ingested_images import IngestedImages
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.ingestors.email.email_reader import EmailReader
@@ -41,7 +43,7 @@ class EmailIngestor(BaseIngestor):
     async def ingest(
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         current_file = None
         try:
             async for chunk_bytes in poll_function:
@@ -52,7 +54,7 @@ class EmailIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     email = await self.extract_and_process_email(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     )
                     yield IngestedTokens(
                         file=current_file,
@@ -66,28 +68,35 @@ class EmailIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            if current_file is not None:
-                email = await self.extract_and_process_email(
-                    CollectedBytes(file=current_file, data=collected_bytes)
-                )
-                yield IngestedTokens(
-                    file=current_file,
-                    data=[email],
-                    error=None,
-                    doc_source=chunk_bytes.doc_source
-                )
-                yield IngestedTokens(
-                    file=current_file,
-                    data=None,
-                    error=None,
-                    doc_source=chunk_bytes.doc_source,
-                )
+            try:
+                if current_file is not None:
+                    email = await self.extract_and_process_email(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                    )
+                    yield IngestedTokens(
+                        file=current_file,
+                        data=[email],
+                        error=None,
+                        doc_source=chunk_bytes.doc_source
+                    )
+                    yield IngestedTokens(
+                        file=current_file,
+                        data=None,
+                        error=None,
+                        doc_source=chunk_bytes.doc_source,
+                    )
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_email(
         self, collected_bytes: CollectedBytes
@@ -99,7 +108,7 @@ class EmailIngestor(BaseIngestor):
     async def extract_text_from_email(self, collected_bytes: CollectedBytes) -> str:
         text = ""
         try:
-            msg = email.message_from_bytes(collected_bytes.data)
+            msg = email.message_from_bytes(bytes(collected_bytes.data))
             email_msg = {}
             (
                 email_msg["From"],
@@ -5,6 +5,7 @@ from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.processors.async_processor import AsyncProcessor
 from querent.config.ingestor.ingestor_config import IngestorBackend
 from querent.common.types.ingested_code import IngestedCode
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 
 
@@ -18,7 +19,7 @@ class GithubIngestor(BaseIngestor):
     async def ingest(
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedCode, None]:
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         current_file = None
         try:
             async for chunk_bytes in poll_function:
@@ -29,7 +30,7 @@ class GithubIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     async for line in self.extract_and_process_code(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedCode(
                             file=current_file,
@@ -43,14 +44,15 @@ class GithubIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source,
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
 
                 collected_bytes += chunk_bytes.data
 
             if current_file:
                 async for line in self.extract_and_process_code(
-                    CollectedBytes(file=current_file, data=collected_bytes)
+                    CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                 ):
                     yield IngestedCode(
                         file=current_file,
@@ -61,11 +63,13 @@ class GithubIngestor(BaseIngestor):
                 yield IngestedCode(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
         except Exception as e:
             yield IngestedCode(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+        finally:
+            collected_bytes.close()
 
     async def extract_and_process_code(
         self, chunk_bytes: CollectedBytes
     ) -> AsyncGenerator[IngestedCode, None]:
-        message_bytes = chunk_bytes.data.decode("UTF-8")
+        message_bytes = str(chunk_bytes.data, "UTF-8")
         yield message_bytes
 
 
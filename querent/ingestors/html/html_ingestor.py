@@ -10,6 +10,7 @@ from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common import common_errors
 from querent.common.types.ingested_tokens import IngestedTokens
@@ -41,7 +42,7 @@ class HtmlIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -51,7 +52,7 @@ class HtmlIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # we have a new file, process the old one
                     async for ingested_data in self.extract_and_process_html(
-                        CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
                     ):
                         yield ingested_data
                     yield IngestedTokens(
@@ -60,18 +61,26 @@ class HtmlIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source,
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, common_errors.PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            # process the last file
-            async for ingested_data in self.extract_and_process_html(
-                CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
-            ):
-                yield ingested_data
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                # process the last file
+                if current_file is not None:
+                    async for ingested_data in self.extract_and_process_html(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
+                    ):
+                        yield ingested_data
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_html(
         self, collected_bytes: CollectedBytes, doc_source: str
@@ -85,7 +94,7 @@ class HtmlIngestor(BaseIngestor):
     ):
         """Function to extract text from xml"""
         try:
-            html_content = collected_bytes.data.decode("UTF-8")
+            html_content = str(collected_bytes.data, "UTF-8")
             soup = BeautifulSoup(html_content, "html.parser")
             elements = []
             tags = ["p", "h1", "h2", "h3", "h4", "h5", "a", "footer", "article"]
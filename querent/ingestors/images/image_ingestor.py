@@ -1,6 +1,7 @@
 from typing import List, AsyncGenerator
 import base64
 import uuid
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.types.ingested_images import IngestedImages
 from querent.ingestors.base_ingestor import BaseIngestor
@@ -15,7 +16,6 @@ from querent.common.common_errors import (
 )
 import pytesseract
 from PIL import Image, UnidentifiedImageError
-import io
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.logging.logger import setup_logger
 
@@ -43,9 +43,9 @@ class ImageIngestor(BaseIngestor):
     async def ingest(
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
+        current_file = None
+        collected_bytes = ChunkBuffer()
         try:
-            current_file = None
-
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
                     continue
@@ -53,29 +53,32 @@ class ImageIngestor(BaseIngestor):
                 if chunk_bytes.file != current_file:
                     if current_file:
                         text = await self.extract_and_process_image(
-                            CollectedBytes(file=current_file, data=collected_bytes)
+                            CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                         )
                         if text is not None:
                             yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
-                            yield IngestedImages(file=current_file, image=str(base64.b64encode(collected_bytes)), image_name=f"{str(uuid.uuid4())}.{chunk_bytes.extension}", page_num=0, text=[], ocr_text=[text], doc_source=chunk_bytes.doc_source)
+                            yield IngestedImages(file=current_file, image=str(base64.b64encode(collected_bytes.getbuffer())), image_name=f"{str(uuid.uuid4())}.{chunk_bytes.extension}", page_num=0, text=[], ocr_text=[text], doc_source=chunk_bytes.doc_source)
                             yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
 
                     current_file = chunk_bytes.file
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
 
                 collected_bytes += chunk_bytes.data
 
             if current_file:
                 text = await self.extract_and_process_image(
-                    CollectedBytes(file=current_file, data=collected_bytes)
+                    CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                 )
                 if text is not None:
                     yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
-                    yield IngestedImages(file=current_file, image=str(base64.b64encode(collected_bytes)), image_name=f"{str(uuid.uuid4())}.{chunk_bytes.extension}", page_num=0, text=[], ocr_text=[text], doc_source=chunk_bytes.doc_source)
+                    yield IngestedImages(file=current_file, image=str(base64.b64encode(collected_bytes.getbuffer())), image_name=f"{str(uuid.uuid4())}.{chunk_bytes.extension}", page_num=0, text=[], ocr_text=[text], doc_source=chunk_bytes.doc_source)
                     yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
 
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+        finally:
+            collected_bytes.close()
 
     async def extract_and_process_image(self, collected_bytes: CollectedBytes) -> str:
         text = await self.extract_text_from_image(collected_bytes)
@@ -85,7 +88,7 @@ class ImageIngestor(BaseIngestor):
 
     async def extract_text_from_image(self, collected_bytes: CollectedBytes) -> str:
         try:
-            image = Image.open(io.BytesIO(collected_bytes.data))
+            image = Image.open(BufferReader(collected_bytes.data))
             image_status = await self.analyze_image(image)
             if not image_status:
                 return
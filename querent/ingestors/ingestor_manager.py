@@ -1,10 +1,11 @@
 import asyncio
 from asyncio import Queue
-from typing import AsyncGenerator, List, Optional
-from cachetools import LRUCache, cachedmethod
+from functools import partial
+from typing import AsyncGenerator, Dict, List, Optional, Set
 from querent.channel.channel_interface import ChannelCommandInterface
 
 from querent.collectors.collector_base import Collector
+from querent.common.common_errors import PollingError
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.config.ingestor.ingestor_config import IngestorBackend
@@ -32,7 +33,16 @@ from querent.processors.async_processor import AsyncProcessor
 
 
 class IngestorFactoryManager:
-    """Factory manager"""
+    """Factory manager
+
+    Chunks of a file are streamed to that file's ingestor through a channel as they are
+    collected, so memory is bounded by the chunks in flight rather than by file sizes.
+    Collectors send chunks of very different sizes, from 1 MiB file chunks to whole
+    messages or blobs, so the chunks queued in all channels share a budget of
+    `byte_budget` bytes; a chunk larger than the budget is let through alone. Each channel
+    also holds at most `channel_size` chunks. Up to `max_parallel_files` files are ingested
+    concurrently.
+    """
 
     PROGRAMMING_LANGUAGES = [
         "py",
@@ -77,7 +87,9 @@ class IngestorFactoryManager:
         self,
         collectors: Optional[List[Collector]] = None,
         processors: Optional[List[AsyncProcessor]] = None,
-        cache_size: Optional[int] = 100,
+        max_parallel_files: Optional[int] = 4,
+        channel_size: Optional[int] = 8,
+        byte_budget: Optional[int] = 64 * 1024 * 1024,
         result_queue: Optional[Queue] = None,
         tokens_feader: Optional[ChannelCommandInterface] = None,
     ):
@@ -112,7 +124,13 @@ class IngestorFactoryManager:
             IngestorBackend.News.value: TextIngestorFactory(is_token_stream=True),
             # Add more mappings as needed
         }
-        self.file_caches = LRUCache(maxsize=cache_size)
+        self.max_parallel_files = max(1, max_parallel_files or 1)
+        self.channel_size = max(1, channel_size or 1)
+        self.byte_budget = max(1, byte_budget or 1)
+        self._active_files = 0
+        self._file_slots_changed = asyncio.Condition()
+        self._buffered = 0
+        self._budget_changed = asyncio.Condition()
         self.result_queue = result_queue
         self.tokens_feader = tokens_feader
         self.logger = setup_logger(__name__, "IngestorFactoryManager")
@@ -137,22 +155,67 @@ class IngestorFactoryManager:
         factory = await self.get_factory(file_extension)
         return factory.supports(file_extension)
 
-    @cachedmethod(cache=lambda self: self.file_caches)
+    async def _acquire_file_slot(self, wait: bool):
+        async with self._file_slots_changed:
+            if wait:
+                await self._file_slots_changed.wait_for(
+                    lambda: self._active_files < self.max_parallel_files
+                )
+            self._active_files += 1
+
+    async def _release_file_slot(self):
+        async with self._file_slots_changed:
+            self._active_files -= 1
+            self._file_slots_changed.notify_all()
+
+    async def _put_chunk(self, channel: asyncio.Queue, chunk: Optional[CollectedBytes]):
+        """Queue a chunk on a file's channel once the byte budget has room for it."""
+        if chunk is not None and chunk.data is not None:
+            size = len(chunk.data)
+            async with self._budget_changed:
+                await self._budget_changed.wait_for(
+                    lambda: self._buffered == 0 or self._buffered + size <= self.byte_budget
+                )
+                self._buffered += size
+        await channel.put(chunk)
+
+    async def _get_chunk(self, channel: asyncio.Queue) -> Optional[CollectedBytes]:
+        """Take the next chunk from a file's channel, returning its bytes to the budget."""
+        chunk = await channel.get()
+        if chunk is not None and chunk.data is not None:
+            async with self._budget_changed:
+                self._buffered -= len(chunk.data)
+                self._budget_changed.notify_all()
+        return chunk
+
     async def ingest_file_async(
         self,
-        file_id: str,
+        file: str,
+        file_extension: str,
+        channel: asyncio.Queue,
     ):
-        collected_bytes_list = None
+        """Ingest the chunks of a single file as they arrive on its channel.
+
+        The channel is closed by an eof chunk or None. An error chunk is raised in the
+        ingestor as a PollingError: collectors stream files, so the chunks before it are
+        only part of the file, and the ingestor drops them and reports the error instead of
+        ingesting a truncated file. Chunks following an error are drained so the collector
+        feeding the channel never blocks on a stopped ingestor.
+        """
+        closed = False
         try:
-            collected_bytes_list = self.file_caches.pop(file_id)
-            file_extension = collected_bytes_list[0].extension
             ingestor = await self.get_ingestor(file_extension)
             if ingestor is not None:
 
                 async def chunk_generator() -> AsyncGenerator[CollectedBytes, None]:
-                    for chunk in collected_bytes_list:
-                        if chunk.eof or chunk.error is not None:
+                    nonlocal closed
+                    while True:
+                        chunk = await self._get_chunk(channel)
+                        if chunk is None or chunk.eof:
+                            closed = True
                             break
+                        if chunk.error is not None:
+                            raise PollingError(f"Error collecting {file}: {chunk.error}")
                         yield chunk
 
                 async for chunk_tokens in ingestor.ingest(chunk_generator()):
@@ -160,39 +223,61 @@ class IngestorFactoryManager:
                         await self.result_queue.put(chunk_tokens)
             else:
                 self.logger.warning(
-                    f"Unsupported file extension {file_extension} for file {collected_bytes_list[0].file}"
+                    f"Unsupported file extension {file_extension} for file {file}"
                 )
         except Exception as e:
-            self.logger.error(
-                f"Error ingesting file {collected_bytes_list[0].file}: {str(e)}"
-            )
+            self.logger.error(f"Error ingesting file {file}: {str(e)}")
+        finally:
+            while not closed:
+                chunk = await self._get_chunk(channel)
+                closed = chunk is None or chunk.eof
+            await self._release_file_slot()
+
+    def _file_task_done(self, file: str, task: asyncio.Task):
+        """Log the failure of a file's ingestion task as soon as it finishes."""
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Ingestion task for file {file} failed: {task.exception()!r}")
 
     async def ingest_collector_async(
         self,
         collector: Collector,
     ):
         """Asynchronously ingest data from a single collector."""
-        async for collected_bytes in collector.poll():
-            current_file = collected_bytes.file
-
-            if current_file not in self.file_caches:
-                if not collected_bytes.eof:
-                    self.file_caches[current_file] = [collected_bytes]
-            else:
-                if not collected_bytes.eof:
-                    self.file_caches[current_file].append(collected_bytes)
-
-            # Check if this is the end of the file
-            if collected_bytes.eof:
-                # Try to ingest the ongoing file even if the cache is full
-                try:
-                    await self.ingest_file_async(current_file)
-                except Exception as e:
-                    self.logger.error(f"Error ingesting file {current_file}: {str(e)}")
-
-                # Wait for ongoing file processing to complete before checking for the next file
-                while current_file in self.file_caches:
-                    await asyncio.sleep(0.1)
+        channels: Dict[str, asyncio.Queue] = {}
+        # Tasks remove themselves when done, so only the files still being ingested are held
+        ingestion_tasks: Set[asyncio.Task] = set()
+        try:
+            async for collected_bytes in collector.poll():
+                current_file = collected_bytes.file
+                if collected_bytes.is_deleted():
+                    self.logger.info(f"File {current_file} was deleted at {collected_bytes.doc_source}")
+                    continue
+                channel = channels.get(current_file)
+                if channel is None:
+                    if collected_bytes.eof:
+                        continue
+                    # Files of this collector that are still streaming can only finish if it keeps
+                    # polling, so only wait for a free slot when none of them is open.
+                    await self._acquire_file_slot(wait=not channels)
+                    channel = asyncio.Queue(maxsize=self.channel_size)
+                    channels[current_file] = channel
+                    task = asyncio.create_task(
+                        self.ingest_file_async(
+                            current_file, collected_bytes.extension, channel
+                        )
+                    )
+                    task.add_done_callback(partial(self._file_task_done, current_file))
+                    task.add_done_callback(ingestion_tasks.discard)
+                    ingestion_tasks.add(task)
+                await self._put_chunk(channel, collected_bytes)
+                if collected_bytes.eof:
+                    del channels[current_file]
+        finally:
+            # Close the files the collector never finished
+            for channel in channels.values():
+                await channel.put(None)
+            # Failures were logged by _file_task_done, so they do not stop the other files
+            await asyncio.gather(*ingestion_tasks, return_exceptions=True)
 
     async def ingest_all_async(self):
         """Asynchronously ingest data from all collectors concurrently."""
@@ -1,5 +1,6 @@
 from typing import AsyncGenerator, List
 import json
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.config.ingestor.ingestor_config import IngestorBackend
 from querent.ingestors.base_ingestor import BaseIngestor
@@ -35,7 +36,7 @@ class JsonIngestor(BaseIngestor):
     ) -> AsyncGenerator[IngestedTokens, None]:
         try:
             current_file = None
-            collected_bytes = b""
+            collected_bytes = ChunkBuffer()
             try:
                 async for chunk_bytes in poll_function:
                     if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -44,7 +45,7 @@ class JsonIngestor(BaseIngestor):
                     if chunk_bytes.file != current_file:
                         if current_file:
                             async for json_objects in self.extract_and_process_json(
-                                CollectedBytes(file=current_file, data=collected_bytes)
+                                CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                             ):
                                 yield IngestedTokens(
                                     file=current_file, data=[json_objects], error=None, doc_source=chunk_bytes.doc_source
@@ -56,7 +57,8 @@ class JsonIngestor(BaseIngestor):
                                 error=None,
                                 doc_source=chunk_bytes.doc_source
                             )
-                        collected_bytes = b""
+                        collected_bytes.close()
+                        collected_bytes = ChunkBuffer()
                         current_file = chunk_bytes.file
 
                     collected_bytes += chunk_bytes.data
@@ -65,21 +67,29 @@ class JsonIngestor(BaseIngestor):
                 yield IngestedTokens(
                     file=current_file, data=None, error="JSON Decode Error", doc_source=chunk_bytes.doc_source
                 )
+            except common_errors.PollingError as e:
+                yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
             finally:
-                async for json_objects in self.extract_and_process_json(
-                    CollectedBytes(file=current_file, data=collected_bytes)
-                ):
-                    yield IngestedTokens(
-                        file=current_file, data=[json_objects], error=None, doc_source=chunk_bytes.doc_source
-                    )
-                yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                try:
+                    if current_file is not None:
+                        async for json_objects in self.extract_and_process_json(
+                            CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                        ):
+                            yield IngestedTokens(
+                                file=current_file, data=[json_objects], error=None, doc_source=chunk_bytes.doc_source
+                            )
+                        yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                finally:
+                    collected_bytes.close()
 
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
 
     async def extract_and_process_json(self, collected_bytes: CollectedBytes):
         try:
-            json_data = collected_bytes.data.decode("utf-8")
+            json_data = str(collected_bytes.data, "utf-8")
             processed_text = await self.process_data(json_data)
             yield processed_text
         except json.JSONDecodeError as exc:
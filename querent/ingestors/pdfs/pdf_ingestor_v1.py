@@ -1,5 +1,5 @@
 from typing import AsyncGenerator, List
-from io import BytesIO
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.common.types.ingested_images import IngestedImages
@@ -45,7 +45,7 @@ class PdfIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens or str, None]: # type: ignore
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
 
         try:
             async for chunk_bytes in poll_function:
@@ -58,10 +58,11 @@ class PdfIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # we have a new file, process the old one
                     async for page_text in self.extract_and_process_pdf(
-                        CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
                     ):
                         yield page_text
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                     yield IngestedTokens(
                         file=current_file,
@@ -73,14 +74,18 @@ class PdfIngestor(BaseIngestor):
         except Exception as e:
             # at the queue level, we can sample out the error
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, common_errors.PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
             # process the last file
             try:
-                async for page_text in self.extract_and_process_pdf(
-                    CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
-                ):
-                    yield page_text
-                yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                if current_file is not None:
+                    async for page_text in self.extract_and_process_pdf(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
+                    ):
+                        yield page_text
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
             except Exception as exc:
                 yield IngestedTokens(
                     file=current_file,
@@ -88,13 +93,16 @@ class PdfIngestor(BaseIngestor):
                     error=f"Exception: {exc}",
                     doc_source=chunk_bytes.doc_source,
                 )
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_pdf(
         self, collected_bytes: CollectedBytes, doc_source: str
     ) -> AsyncGenerator[IngestedTokens, None]:
+        loader = None
         try:
-            path = BytesIO(collected_bytes.data)
-            loader = fitz.open(stream=path.read(), filetype="pdf")
+            # fitz reads the ChunkBuffer's memoryview in place
+            loader = fitz.open(stream=collected_bytes.data, filetype="pdf")
 
             for page in loader:
                 text = page.get_text()
@@ -129,6 +137,10 @@ class PdfIngestor(BaseIngestor):
             raise common_errors.UnknownError(
                 f"Getting unknown error while handling this file: {collected_bytes.file} error - {exc}"
             ) from exc
+        finally:
+            if loader is not None:
+                # Drop the document's hold on the buffer so it can be closed
+                loader.close()
         
     # async def extract_table(self, data):
     #     with pdfplumber.open(io.BytesIO(data.data)) as pdf:
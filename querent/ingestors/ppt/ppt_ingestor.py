@@ -1,5 +1,4 @@
 from typing import List, AsyncGenerator
-from io import BytesIO
 from pptx import Presentation
 from pptx.exc import InvalidXmlError
 from tika import parser
@@ -16,6 +15,7 @@ from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.common import common_errors
 from querent.common.types.ingested_tokens import IngestedTokens
@@ -47,7 +47,7 @@ class PptIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -57,7 +57,7 @@ class PptIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     async for ingested_data in self.extract_and_process_ppt(
-                        CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
                     ):
                         yield ingested_data
                     yield IngestedTokens(
@@ -66,24 +66,32 @@ class PptIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source,
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, common_errors.PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            async for ingested_data in self.extract_and_process_ppt(
-                CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
-            ):
-                yield ingested_data
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                if current_file is not None:
+                    async for ingested_data in self.extract_and_process_ppt(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
+                    ):
+                        yield ingested_data
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_ppt(
         self, collected_bytes: CollectedBytes, doc_source: str
     ) -> AsyncGenerator[str, None]:
         try:
             if collected_bytes.extension == "pptx":
-                ppt_file = BytesIO(collected_bytes.data)
+                ppt_file = BufferReader(collected_bytes.data)
                 presentation = Presentation(ppt_file)
                 i=1
                 for slide in presentation.slides:
@@ -114,7 +122,7 @@ class PptIngestor(BaseIngestor):
                     )
                     i+=1
             elif collected_bytes.extension == "ppt":
-                parsed = parser.from_buffer(collected_bytes.data)
+                parsed = parser.from_buffer(bytes(collected_bytes.data))
                 extracted_text = parsed["content"]
                 processed_text = await self.process_data(extracted_text)
                 yield IngestedTokens(
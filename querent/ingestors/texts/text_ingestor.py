@@ -1,4 +1,5 @@
 from typing import List, AsyncGenerator
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.ingestors.ingestor_factory import IngestorFactory
@@ -36,7 +37,7 @@ class TextIngestor(BaseIngestor):
     async def ingest(
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         current_file = None
         try:
             async for chunk_bytes in poll_function:
@@ -57,7 +58,7 @@ class TextIngestor(BaseIngestor):
                         current_file = chunk_bytes.file
                     elif current_file != chunk_bytes.file:
                         async for line in self.extract_and_process_text(
-                            CollectedBytes(file=current_file, data=collected_bytes)
+                            CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                         ):
                             yield IngestedTokens(
                                 file=current_file,
@@ -71,13 +72,14 @@ class TextIngestor(BaseIngestor):
                             error=None,
                             doc_source=chunk_bytes.doc_source
                         )
-                        collected_bytes = b""
+                        collected_bytes.close()
+                        collected_bytes = ChunkBuffer()
                         current_file = chunk_bytes.file
                     collected_bytes += chunk_bytes.data
 
             if current_file:
                 async for line in self.extract_and_process_text(
-                    CollectedBytes(file=current_file, data=collected_bytes)
+                    CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                 ):
                     yield IngestedTokens(
                         file=current_file,
@@ -88,6 +90,8 @@ class TextIngestor(BaseIngestor):
                 yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+        finally:
+            collected_bytes.close()
 
     async def ingest_token_stream(
         self, chunk_bytes: CollectedBytes
@@ -111,7 +115,7 @@ class TextIngestor(BaseIngestor):
     async def extract_text_from_file(self, collected_bytes: CollectedBytes) -> str:
         text = ""
         try:
-            text = collected_bytes.data.decode("utf-8")
+            text = str(collected_bytes.data, "utf-8")
         except UnicodeDecodeError as exc:
             raise common_errors.UnicodeDecodeError(
                 f"Getting UnicodeDecodeError on this file {collected_bytes.file}"
@@ -1,4 +1,3 @@
-import io
 from typing import List, AsyncGenerator
 import moviepy.editor as mp
 from querent.ingestors.audio.audio_ingestors import AudioIngestor
@@ -6,7 +5,9 @@ from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
+from querent.common.common_errors import PollingError
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.logging.logger import setup_logger
 import ffmpeg
@@ -34,7 +35,7 @@ class VideoIngestor(BaseIngestor):
 
     async def ingest(self, poll_function: AsyncGenerator[CollectedBytes, None]) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -45,7 +46,7 @@ class VideoIngestor(BaseIngestor):
                 elif current_file != chunk_bytes.file:
                     # We have a new file, process the old one
                     async for text in self.extract_and_process_video(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
                     # Ensure a final yield for the last processed text
@@ -55,19 +56,26 @@ class VideoIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            if collected_bytes:  # Check if there's data left to process for the last file
-                async for text in self.extract_and_process_video(
-                    CollectedBytes(file=current_file, data=collected_bytes)
-                ):
-                    yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
-                # Ensure a final yield for the last processed text
-                yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                if current_file is not None and collected_bytes:  # Check if there's data left to process for the last file
+                    async for text in self.extract_and_process_video(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                    ):
+                        yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
+                    # Ensure a final yield for the last processed text
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_video(self, collected_bytes: CollectedBytes) -> AsyncGenerator[str, None]:
         text = ""
@@ -78,7 +86,6 @@ class VideoIngestor(BaseIngestor):
 
 
     async def extract_text_from_video(self, collected_bytes: CollectedBytes) -> AsyncGenerator[str, None]:
-        input_video_stream = io.BytesIO(collected_bytes.data)
         try:
             process = (
                 ffmpeg
@@ -86,8 +93,7 @@ class VideoIngestor(BaseIngestor):
                 .output('pipe:1', format='wav')
                 .run_async(pipe_stdin=True, pipe_stdout=True, pipe_stderr=True, overwrite_output=True)
             )
-            input_video_stream.seek(0)
-            process.stdin.write(input_video_stream.read())
+            process.stdin.write(collected_bytes.data)
             process.stdin.close()
             output_audio_data = process.stdout.read()
             await process.wait()
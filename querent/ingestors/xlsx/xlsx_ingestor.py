@@ -12,7 +12,9 @@ from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.ingestors.base_ingestor import BaseIngestor
 from querent.processors.async_processor import AsyncProcessor
 from querent.config.ingestor.ingestor_config import IngestorBackend
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
+from querent.common.common_errors import PollingError
 from querent.common.types.ingested_tokens import (
     IngestedTokens,
 )  # Added import for the return type
@@ -43,7 +45,7 @@ class XlsxIngestor(BaseIngestor):
         self, poll_function: AsyncGenerator[CollectedBytes, None]
     ) -> AsyncGenerator[IngestedTokens, None]:
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -52,7 +54,7 @@ class XlsxIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     async for data in self.extract_and_process_xlsx(
-                        CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
                     ):
                         yield data
                     yield IngestedTokens(
@@ -61,17 +63,25 @@ class XlsxIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            async for data in self.extract_and_process_xlsx(
-                CollectedBytes(file=current_file, data=collected_bytes), chunk_bytes.doc_source
-            ):
-                yield data
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                if current_file is not None:
+                    async for data in self.extract_and_process_xlsx(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer()), chunk_bytes.doc_source
+                    ):
+                        yield data
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_xlsx(
         self, collected_bytes: CollectedBytes, doc_source
@@ -82,7 +92,7 @@ class XlsxIngestor(BaseIngestor):
     async def extract_text_from_xlsx(
         self, collected_bytes: CollectedBytes, doc_source):
         try:
-            excel_buffer = io.BytesIO(collected_bytes.data)
+            excel_buffer = BufferReader(collected_bytes.data)
             workbook = openpyxl.load_workbook(excel_buffer, data_only=True)
 
             for sheet in workbook:
@@ -6,7 +6,9 @@ from querent.processors.async_processor import AsyncProcessor
 from querent.ingestors.ingestor_factory import IngestorFactory
 from querent.config.ingestor.ingestor_config import IngestorBackend
 from querent.ingestors.base_ingestor import BaseIngestor
+from querent.common.types.chunk_buffer import ChunkBuffer
 from querent.common.types.collected_bytes import CollectedBytes
+from querent.common.common_errors import PollingError
 from querent.common.types.ingested_tokens import (
     IngestedTokens,
 )  # Added import for the return type
@@ -42,7 +44,7 @@ class XmlIngestor(BaseIngestor):
     ) -> AsyncGenerator[IngestedTokens, None]:
         """Ingesting bytes of xml file"""
         current_file = None
-        collected_bytes = b""
+        collected_bytes = ChunkBuffer()
         try:
             async for chunk_bytes in poll_function:
                 if chunk_bytes.is_error() or chunk_bytes.is_eof():
@@ -51,7 +53,7 @@ class XmlIngestor(BaseIngestor):
                     current_file = chunk_bytes.file
                 elif current_file != chunk_bytes.file:
                     async for text in self.extract_and_process_xml(
-                        CollectedBytes(file=current_file, data=collected_bytes)
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
                     ):
                         yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
                     yield IngestedTokens(
@@ -60,18 +62,26 @@ class XmlIngestor(BaseIngestor):
                         error=None,
                         doc_source=chunk_bytes.doc_source
                     )
-                    collected_bytes = b""
+                    collected_bytes.close()
+                    collected_bytes = ChunkBuffer()
                     current_file = chunk_bytes.file
                 collected_bytes += chunk_bytes.data
         except Exception as e:
             yield IngestedTokens(file=current_file, data=None, error=f"Exception: {e}", doc_source=chunk_bytes.doc_source)
+            if isinstance(e, PollingError):
+                # the last file stopped at a collection error, so none of it is ingested
+                current_file = None
         finally:
-            async for text in self.extract_and_process_xml(
-                CollectedBytes(file=current_file, data=collected_bytes)
-            ):
-                yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
+            try:
+                if current_file is not None:
+                    async for text in self.extract_and_process_xml(
+                        CollectedBytes(file=current_file, data=collected_bytes.getbuffer())
+                    ):
+                        yield IngestedTokens(file=current_file, data=[text], error=None, doc_source=chunk_bytes.doc_source)
 
-            yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+                    yield IngestedTokens(file=current_file, data=None, error=None, doc_source=chunk_bytes.doc_source)
+            finally:
+                collected_bytes.close()
 
     async def extract_and_process_xml(
         self, collected_bytes: CollectedBytes
@@ -83,7 +93,7 @@ class XmlIngestor(BaseIngestor):
 
     async def extract_text_from_xml(self, collected_bytes: CollectedBytes) -> str:
         """Function to extract text from xml"""
-        text = collected_bytes.data.decode("UTF-8")
+        text = str(collected_bytes.data, "UTF-8")
         return text
 
     async def process_data(self, text: str) -> str:
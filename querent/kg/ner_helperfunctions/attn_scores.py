@@ -1,4 +1,6 @@
 from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+from querent.kg.ner_helperfunctions.document_analysis import contextual_sentence
+from querent.kg.ner_helperfunctions.sentence_encoding_cache import SentenceEncodingCache
 from querent.logging.logger import setup_logger
 import torch
 import torch.nn.functional as F
@@ -13,6 +15,7 @@ The primary purpose is to determine the significance or relevance of entities in
 Attributes:
     model (torch.nn.Module): The transformer model used for extracting attention weights.
     tokenizer (Tokenizer): The tokenizer associated with the transformer model.
+    encoding_cache (SentenceEncodingCache): Per-sentence forward pass cache, shared with other extractors when provided.
 
 Methods:
     extract_attention_weight(entity, context):
@@ -41,19 +44,18 @@ Note:
 """
 
 class EntityAttentionExtractor:
-    def __init__(self, model, tokenizer):
+    def __init__(self, model, tokenizer, encoding_cache: SentenceEncodingCache = None):
         self.model = model
         self.tokenizer = tokenizer
+        self.encoding_cache = encoding_cache or SentenceEncodingCache(model, tokenizer)
         self.logger = setup_logger(__name__, "EntityAttentionExtractor")
 
     def extract_attention_weight(self, entity, context):
         try:
-            inputs = self.tokenizer(context, return_tensors="pt", truncation=True, padding=True, max_length=512)
-            with torch.no_grad():
-                outputs = self.model(**inputs, output_attentions=True)
-                attentions = outputs.attentions[-1][0] 
+            encoding = self.encoding_cache.encode(context)
+            attentions = encoding.attentions
             entity_token_ids = self.tokenizer.encode(entity, add_special_tokens=False)
-            entity_positions = [i for i, token_id in enumerate(inputs["input_ids"][0]) if token_id in entity_token_ids]
+            entity_positions = [i for i, token_id in enumerate(encoding.input_ids) if token_id in entity_token_ids]
             
             non_zero_attentions = []
             # Iterate over each head's attentions
@@ -89,17 +91,14 @@ class EntityAttentionExtractor:
                     full_context = pair[1]
                     entity1 = pair[0]
                     entity2 = pair[2]
-                    sentences = NER_LLM.split_into_sentences(full_context)
-                    context = None
-                    for sentence in sentences:
-                        if entity1.lower() in sentence.lower() and entity2.lower() in sentence.lower():
-                            context = sentence
-                            break
-                    if not context:
-                        context = full_context
+                    pair_dict = pair[3]
+                    # The pair records the sentences of its context, so they are not split again
+                    sentences = pair_dict.get('context_sentences')
+                    if sentences is None:
+                        sentences = NER_LLM.split_into_sentences(full_context)
+                    context = contextual_sentence(entity1, entity2, full_context, sentences)
                     entity1_attnscore = self.extract_attention_weight(entity1, context)
                     entity2_attnscore = self.extract_attention_weight(entity2, context)
-                    pair_dict = pair[3]
                     pair_dict['entity1_attnscore'] = round(entity1_attnscore,2)
                     pair_dict['entity2_attnscore'] = round(entity2_attnscore,2)
                     # harmonic mean for a pair- useful to penalize entity pairs where one entity has a much lower score than the other.
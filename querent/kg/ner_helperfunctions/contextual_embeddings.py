@@ -1,4 +1,6 @@
 from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+from querent.kg.ner_helperfunctions.document_analysis import contextual_sentence
+from querent.kg.ner_helperfunctions.sentence_encoding_cache import SentenceEncodingCache
 from querent.logging.logger import setup_logger
 import torch
 import numpy as np
@@ -10,6 +12,7 @@ import time
     Attributes:
         model (torch.nn.Module): A pre-trained model used for generating embeddings.
         tokenizer (Tokenizer): A tokenizer compatible with the model for tokenizing input text.
+        encoding_cache (SentenceEncodingCache): Per-sentence forward pass cache, shared with other extractors when provided.
         reducer (umap.UMAP): A UMAP reducer for dimensionality reduction of embeddings.
         logger (logging.Logger): Logger for capturing and reporting errors.
 
@@ -29,24 +32,21 @@ import time
 
 class EntityEmbeddingExtractor:
 
-    def __init__(self, model, tokenizer):
+    def __init__(self, model, tokenizer, encoding_cache: SentenceEncodingCache = None):
         self.logger = setup_logger(__name__, "EntityEmbeddingExtractor")
         try:
             self.model = model
             self.tokenizer = tokenizer
+            self.encoding_cache = encoding_cache or SentenceEncodingCache(model, tokenizer)
         except Exception as e:
             self.logger.error(f"Error Initializing Entity Embedding Extractor Class: {e}")
 
     def extract_entity_embedding(self, entity, context):
         try:
-            
-            inputs = self.tokenizer(context, return_tensors="pt", truncation=True, padding=True, max_length=512)
-            with torch.no_grad():
-                outputs = self.model(**inputs, output_hidden_states=True)
-                all_hidden_states = outputs.hidden_states  # Tuple of hidden states at each layer
-                last_hidden_state = all_hidden_states[-1][0]  # Take the last layer's hidden state
+            encoding = self.encoding_cache.encode(context)
+            last_hidden_state = encoding.last_hidden_state  # Last layer's hidden state
             entity_token_ids = self.tokenizer.encode(entity, add_special_tokens=False)
-            entity_positions = [i for i, token_id in enumerate(inputs["input_ids"][0]) if token_id in entity_token_ids]
+            entity_positions = [i for i, token_id in enumerate(encoding.input_ids) if token_id in entity_token_ids]
             entity_embedding = last_hidden_state[entity_positions].mean(dim=0)
             sentence_embedding = last_hidden_state.mean(dim=0)
             combined_embedding = torch.cat((entity_embedding, sentence_embedding), dim=0)
@@ -58,12 +58,10 @@ class EntityEmbeddingExtractor:
             raise   Exception("Error extracting entity embedding: {}".format(e))
 
     
-    def _get_relevant_context(self, entity1, entity2, full_context):
-        sentences = NER_LLM.split_into_sentences(full_context)
-        for sentence in sentences:
-            if entity1.lower() in sentence.lower() and entity2.lower() in sentence.lower():
-                return sentence
-        return full_context
+    def _get_relevant_context(self, entity1, entity2, full_context, sentences=None):
+        if sentences is None:
+            sentences = NER_LLM.split_into_sentences(full_context)
+        return contextual_sentence(entity1, entity2, full_context, sentences)
     
             
 
@@ -73,7 +71,7 @@ class EntityEmbeddingExtractor:
                 to_remove = []  # List to hold indices of pairs to remove
                 for pair_index, pair in enumerate(inner_list):
                     entity1, full_context, entity2, pair_dict = pair
-                    context = self._get_relevant_context(entity1, entity2, full_context)
+                    context = self._get_relevant_context(entity1, entity2, full_context, pair_dict.get('context_sentences'))
                     entity1_embedding, _ = self.extract_entity_embedding(entity1, context)
                     entity2_embedding, _ = self.extract_entity_embedding(entity2, context)
 
@@ -83,10 +81,11 @@ class EntityEmbeddingExtractor:
                     if is_nan_entity1 or is_nan_entity2:
                         # Record the index of the pair that needs to be removed
                         to_remove.append(pair_index)
+                    # Kept as arrays, process_data stores them in the triple records without copies
                     if not is_nan_entity1:
-                        pair_dict['entity1_embedding'] = entity1_embedding.tolist()
+                        pair_dict['entity1_embedding'] = entity1_embedding.detach().cpu().numpy()
                     if not is_nan_entity2:
-                        pair_dict['entity2_embedding'] = entity2_embedding.tolist()
+                        pair_dict['entity2_embedding'] = entity2_embedding.detach().cpu().numpy()
                 doc_entity_pairs[inner_list_index] = [pair for i, pair in enumerate(inner_list) if i not in to_remove]
 
             return doc_entity_pairs
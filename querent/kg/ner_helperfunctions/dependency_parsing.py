@@ -1,5 +1,6 @@
 import spacy
 from querent.logging.logger import setup_logger
+from querent.kg.ner_helperfunctions.spacy_pipeline import NOUN_CHUNKS, with_profile
 
 """
     A class to perform dependency parsing on a given sentence using SpaCy.
@@ -12,10 +13,9 @@ from querent.logging.logger import setup_logger
         The input sentence for dependency parsing.
     nlp : SpaCy Language object
         The SpaCy model loaded for processing.
-    doc : SpaCy Doc object
-        The processed document after applying the SpaCy model on the sentence.
     noun_chunks : list
-        List of noun chunks identified in the sentence.
+        Texts of the noun chunks identified in the sentence. When they are passed in, taken from
+        the DocumentAnalysis of the whole document, the sentence is not parsed again.
     filtered_chunks : list
         Filtered noun chunks based on certain criteria.
     noun_chunks : list
@@ -32,14 +32,14 @@ from querent.logging.logger import setup_logger
     """
 
 class Dependency_Parsing():
-    def __init__(self, entities=None, sentence=None, model=None):
+    def __init__(self, entities=None, sentence=None, model=None, noun_chunks=None):
         try:
             self.entities = entities
             self.sentence = sentence.replace("\n", " ")
             self.nlp = model
-            self.doc = self.nlp(self.sentence)
-            self.noun_chunks = list(self.doc.noun_chunks)
-            self.noun_chunks = list(self.doc.noun_chunks)
+            if noun_chunks is None:
+                noun_chunks = [chunk.text for chunk in with_profile(self.nlp, NOUN_CHUNKS)(self.sentence).noun_chunks]
+            self.noun_chunks = noun_chunks
             self.compare_entities_with_chunks()
             self.entities = self.process_entities()
         except Exception as e:
@@ -49,9 +49,9 @@ class Dependency_Parsing():
         try:
             for entity in self.entities:
                 for chunk in self.noun_chunks:
-                    if entity['entity'].lower() in chunk.text.lower():
-                        entity['noun_chunk'] = chunk.text
-                        entity['noun_chunk_length'] = len(chunk.text.split())
+                    if entity['entity'].lower() in chunk.lower():
+                        entity['noun_chunk'] = chunk
+                        entity['noun_chunk_length'] = len(chunk.split())
                         break
         except Exception as e:
             raise Exception(f"Error comparing entities with chunks: {e}")
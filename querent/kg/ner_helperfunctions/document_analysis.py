@@ -0,0 +1,145 @@
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional
+
+"""
+    The spaCy analysis of one document, parsed once and shared by the knowledge graph helpers.
+
+    Parsing with a large spaCy pipeline costs more than anything but transformer inference, and
+    the sentence splitting, noun chunks and lemmas of a document are needed by the NER, fixed
+    entity and predicate filters, dependency parsing and relationship extraction. They are kept
+    here as plain values, so an analysis can be queried, narrowed to some sentences with `select`
+    and sent to another process without holding on to the spaCy Doc.
+
+    Attributes:
+    -----------
+    text : str
+        The parsed text; character offsets refer to it.
+    sentences : List[AnalyzedSentence]
+        The sentences of the text, in order.
+"""
+
+AnalyzedToken = namedtuple("AnalyzedToken", ["text", "lemma_", "pos_", "idx"])
+NounChunk = namedtuple("NounChunk", ["text", "start_char", "end_char"])
+
+
+class AnalyzedSentence:
+    """One sentence: its text and character span, noun chunks and tokens with their lemma and POS tag."""
+
+    __slots__ = ("text", "start_char", "end_char", "noun_chunks", "tokens", "_lemmas")
+
+    def __init__(self, text: str, start_char: int, end_char: int, noun_chunks: List[NounChunk], tokens: List[AnalyzedToken]):
+        self.text = text
+        self.start_char = start_char
+        self.end_char = end_char
+        self.noun_chunks = noun_chunks
+        self.tokens = tokens
+        self._lemmas = None
+
+    @property
+    def lemmas(self) -> set:
+        if self._lemmas is None:
+            self._lemmas = {token.lemma_ for token in self.tokens}
+        return self._lemmas
+
+    def __iter__(self):
+        # Iterates like a spaCy span, so helpers written against spaCy tokens can use it
+        return iter(self.tokens)
+
+    def __getstate__(self):
+        return (self.text, self.start_char, self.end_char, self.noun_chunks, self.tokens)
+
+    def __setstate__(self, state):
+        self.text, self.start_char, self.end_char, self.noun_chunks, self.tokens = state
+        self._lemmas = None
+
+
+class DocumentAnalysis:
+    def __init__(self, text: str, sentences: List[AnalyzedSentence]):
+        self.text = text
+        self.sentences = sentences
+        self._by_text = None
+
+    @classmethod
+    def from_doc(cls, doc) -> "DocumentAnalysis":
+        """Builds the analysis from a parsed spaCy Doc."""
+        sentences = []
+        for sent in doc.sents:
+            tokens = [AnalyzedToken(token.text, token.lemma_, token.pos_, token.idx) for token in sent]
+            sentences.append(AnalyzedSentence(sent.text, sent.start_char, sent.end_char, [], tokens))
+        starts = [sentence.start_char for sentence in sentences]
+        try:
+            noun_chunks = list(doc.noun_chunks)
+        except ValueError:
+            # Pipelines without a dependency parser have no noun chunks
+            noun_chunks = []
+        for chunk in noun_chunks:
+            position = bisect_right(starts, chunk.start_char) - 1
+            if position >= 0:
+                sentences[position].noun_chunks.append(
+                    NounChunk(chunk.text.replace("\n", " "), chunk.start_char, chunk.end_char)
+                )
+        return cls(doc.text, sentences)
+
+    @classmethod
+    def parse(cls, nlp, text: str) -> "DocumentAnalysis":
+        return cls.from_doc(nlp(text))
+
+    @property
+    def sentence_texts(self) -> List[str]:
+        return [sentence.text for sentence in self.sentences]
+
+    def select(self, indices: Iterable[int]) -> "DocumentAnalysis":
+        """
+        The analysis of the sentences at `indices` only, whose text is the sentences joined
+        with spaces. Offsets still refer to the original text.
+        """
+        sentences = [self.sentences[index] for index in indices]
+        return DocumentAnalysis(" ".join(sentence.text for sentence in sentences), sentences)
+
+    def select_with_context(self, is_relevant: Callable[[AnalyzedSentence], bool]) -> "DocumentAnalysis":
+        """
+        Selects the relevant sentences together with the sentence before and after each of them,
+        in document order and without repeating a sentence text.
+        """
+        selected = []
+        added_sentences = set()
+        for j, sentence in enumerate(self.sentences):
+            if not is_relevant(sentence):
+                continue
+            for index in range(max(j - 1, 0), min(j + 2, len(self.sentences))):
+                text = self.sentences[index].text
+                if text not in added_sentences:
+                    selected.append(index)
+                    added_sentences.add(text)
+        return self.select(selected)
+
+    def find_sentence(self, text: str) -> Optional[AnalyzedSentence]:
+        """Returns the sentence with this text, ignoring case and line breaks."""
+        if self._by_text is None:
+            by_text: Dict[str, AnalyzedSentence] = {}
+            for sentence in self.sentences:
+                by_text.setdefault(self.normalize(sentence.text), sentence)
+            self._by_text = by_text
+        return self._by_text.get(self.normalize(text))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.replace("\n", " ").lower()
+
+    def __getstate__(self):
+        return (self.text, self.sentences)
+
+    def __setstate__(self, state):
+        self.text, self.sentences = state
+        self._by_text = None
+
+
+def contextual_sentence(entity1: str, entity2: str, context: str, sentences: Optional[List[str]]) -> str:
+    """The first of `sentences` mentioning both entities, or the whole context when none does."""
+    entity1, entity2 = entity1.lower(), entity2.lower()
+    for sentence in sentences or []:
+        lowered = sentence.lower()
+        if entity1 in lowered and entity2 in lowered:
+            return sentence
+    return context
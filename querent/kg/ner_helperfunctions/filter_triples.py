@@ -1,4 +1,3 @@
-import json
 import numpy as np
 import hdbscan
 from scipy.spatial.distance import cosine
@@ -7,6 +6,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 from querent.logging.logger import setup_logger
 from typing import List, Tuple, Dict
 from scipy.spatial.distance import cdist
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
 
 """
     A class used to filter and cluster triples of (entity1, context, entity2) based on various scoring metrics and embedding similarities.
@@ -52,8 +52,8 @@ from scipy.spatial.distance import cdist
         
     Notes
     -----
-    - The class expects triples in the form of (entity1, context, entity2), where 'context' is a JSON string containing various attributes including the embeddings.
-    - The embeddings are expected to be in a format that can be converted to numpy arrays.
+    - The class expects triples as TripleRecord instances, with the entity scores and embeddings set.
+    - The embeddings are float32 numpy arrays, which are used without copies.
     - The class is designed to be flexible and allows for customization of the clustering process through various parameters.
 """
 
@@ -74,31 +74,29 @@ class TripleFilter:
         
         return cosine_similarity(embedding1.reshape(1, -1), embedding2.reshape(1, -1))[0, 0]
 
-    def filter_by_score(self, data: dict) -> bool:
+    def filter_by_score(self, data: TripleRecord) -> bool:
         
-        return data['entity1_score'] >= self.score_threshold and data['entity2_score'] >= self.score_threshold
+        return data.entity1_score >= self.score_threshold and data.entity2_score >= self.score_threshold
 
-    def filter_by_attention_score(self, data: dict) -> bool:
+    def filter_by_attention_score(self, data: TripleRecord) -> bool:
         
-        return data['pair_attnscore'] >= self.attention_score_threshold
+        return data.pair_attnscore >= self.attention_score_threshold
 
-    def filter_by_embedding_similarity(self, data: dict) -> bool:
-        similarity = self.calculate_cosine_similarity(data['entity1_embedding'], data['entity2_embedding'])
+    def filter_by_embedding_similarity(self, data: TripleRecord) -> bool:
+        similarity = self.calculate_cosine_similarity(data.entity1_embedding, data.entity2_embedding)
         
         return similarity >= self.similarity_threshold
 
-    def filter_triples(self, triples: List[Tuple[str, str, str]]) -> Tuple[List[Tuple[str, str, str]], int]:
+    def filter_triples(self, triples: List[TripleRecord]) -> Tuple[List[TripleRecord], int]:
         relevant_triples = []
         initial_count = len(triples)
         for triple in triples:
             try:
-                entity1, json_data, entity2 = triple
-                data = json.loads(json_data)                
-                if not self.filter_by_score(data) or not self.filter_by_attention_score(data):
+                if not self.filter_by_score(triple) or not self.filter_by_attention_score(triple):
                     continue
 
                 relevant_triples.append(triple)
-            except (json.JSONDecodeError, KeyError) as e:
+            except (TypeError, AttributeError) as e:
                 self.logger.error(f"Invalid {self.__class__.__name__} configuration. Unable to filter triples {e}")
                 raise Exception(f"Unable to filter triples: {e}")
         reduction_count = initial_count - len(relevant_triples)
@@ -113,14 +111,12 @@ class TripleFilter:
         else:
             return np.concatenate((entity1_embedding, entity2_embedding))
 
-    def cluster_triples(self, triples: List[Tuple[str, str, str]]) -> Dict[str, any]:
+    def cluster_triples(self, triples: List[TripleRecord]) -> Dict[str, any]:
         try:
+            # hdbscan computes in float64, the float32 embeddings are converted once here
             combined_embeddings = np.array([
-                self.combine_embeddings(
-                    json.loads(triple[1])['entity1_embedding'],
-                    json.loads(triple[1])['entity2_embedding']
-                ) for triple in triples
-            ])
+                self.combine_embeddings(triple.entity1_embedding, triple.entity2_embedding) for triple in triples
+            ], dtype=np.float64)
             scaler = StandardScaler()
             normalized_embeddings = scaler.fit_transform(combined_embeddings)
             distance_matrix = 1 - cosine_similarity(normalized_embeddings)
@@ -191,7 +187,7 @@ class TripleFilter:
         return representatives
   
     
-    def filter_by_cluster_persistence(self, triples: List[Tuple[str, str,str]], cluster_persistence, cluster_labels) -> List[Tuple[str, str, str]]:
+    def filter_by_cluster_persistence(self, triples: List[TripleRecord], cluster_persistence, cluster_labels) -> List[TripleRecord]:
         if self.cluster_persistence_threshold != -1:
             high_persistence_triples = []
             high_persistence_clusters = [index for index, persistence in enumerate(cluster_persistence) if persistence > self.cluster_persistence_threshold]
@@ -1,5 +1,8 @@
 import re
 from typing import List
+from unidecode import unidecode
+from querent.kg.ner_helperfunctions.document_analysis import DocumentAnalysis
+from querent.kg.ner_helperfunctions.spacy_pipeline import LEMMAS, with_profile
 
 """
     FixedEntityExtractor is a class designed to extract specific entities and their related sentences from a given text. It uses spaCy for natural language processing and regular expressions for pattern matching.
@@ -28,8 +31,10 @@ class FixedEntityExtractor:
 
         if fixed_entities:
             try:
-                self.entity_pattern = self.create_combined_pattern(fixed_entities)
-                self.lemmatized_entities = set(self.lemmatize_entities(fixed_entities))
+                # Documents are transliterated to ASCII before NER, so the ASCII spellings match as well
+                entities = list(dict.fromkeys(list(fixed_entities) + [unidecode(entity) for entity in fixed_entities]))
+                self.entity_pattern = self.create_combined_pattern(entities)
+                self.lemmatized_entities = set(self.lemmatize_entities(entities))
             except Exception as e:
                 raise Exception(f"Error in processing fixed entities: {e}")
 
@@ -42,29 +47,27 @@ class FixedEntityExtractor:
 
     def lemmatize_entities(self, entities):
         try:
-            return [self.nlp(entity)[0].lemma_ for entity in entities]
+            return [doc[0].lemma_ for doc in with_profile(self.nlp, LEMMAS).pipe(entities)]
         except Exception as e:
             raise Exception(f"Error in lemmatizing entities: {e}")
 
-    def find_entity_sentences(self, text: str, chunk_size=1000) -> str:
-        try:
-            doc = self.nlp(text)
-        except Exception as e:
-            raise Exception(f"Error processing text with spaCy: {e}")
+    def find_entity_sentences(self, text, chunk_size=1000) -> str:
+        return self.select_entity_sentences(text).text
 
-        relevant_sentences = []
-        added_sentences = set()
-        prev_sentence = None
-        for j, sentence in enumerate(doc.sents):
+    def select_entity_sentences(self, text) -> DocumentAnalysis:
+        """
+        Returns the analysis of the sentences mentioning a fixed entity, with the sentences around
+        them. `text` is a string or the DocumentAnalysis of the document, which is not parsed again.
+        """
+        if not isinstance(text, DocumentAnalysis):
             try:
-                if self.is_entity_present(sentence):
-                    self.add_contextual_sentences(list(doc.sents), j, prev_sentence, relevant_sentences, added_sentences)
+                text = DocumentAnalysis.parse(with_profile(self.nlp, LEMMAS), text)
             except Exception as e:
-                raise Exception(f"Error while checking entity presence and adding contextual sentences: {e}")
-
-            prev_sentence = sentence
-
-        return ' '.join(relevant_sentences)
+                raise Exception(f"Error processing text with spaCy: {e}")
+        try:
+            return text.select_with_context(self.is_entity_present)
+        except Exception as e:
+            raise Exception(f"Error while checking entity presence and adding contextual sentences: {e}")
 
     def is_entity_present(self, sentence):
         try:
@@ -74,23 +77,6 @@ class FixedEntityExtractor:
         except Exception as e:
             raise Exception(f"Error in checking if entity is present: {e}")
 
-
-    def add_contextual_sentences(self, sentences, current_index, prev_sentence, relevant_sentences, added_sentences):
-        if prev_sentence and prev_sentence.text not in added_sentences:
-            relevant_sentences.append(prev_sentence.text)
-            added_sentences.add(prev_sentence.text)
-
-        current_sentence = sentences[current_index]
-        if current_sentence.text not in added_sentences:
-            relevant_sentences.append(current_sentence.text)
-            added_sentences.add(current_sentence.text)
-
-        if current_index < len(sentences) - 1:
-            next_sentence = sentences[current_index + 1]
-            if next_sentence.text not in added_sentences:
-                relevant_sentences.append(next_sentence.text)
-                added_sentences.add(next_sentence.text)
-
     def measure_reduction(self, original_text: str, reduced_text: str) -> float:
         original_length = len(original_text)
         reduced_length = len(reduced_text)
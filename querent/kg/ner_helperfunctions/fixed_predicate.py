@@ -5,6 +5,8 @@ from nltk.corpus import wordnet as wn
 import json
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from querent.kg.ner_helperfunctions.document_analysis import DocumentAnalysis
+from querent.kg.ner_helperfunctions.spacy_pipeline import LEMMAS, with_profile
 
 """
     FixedPredicateExtractor is a class designed for extracting sentences containing specific predicates or predicate types from text. It utilizes spaCy for natural language processing and WordNet for synonym expansion.
@@ -66,45 +68,19 @@ class FixedPredicateExtractor:
 
     def lemmatize_predicates(self, predicates):
         try:
-            return [self.nlp(predicate)[0].lemma_ for predicate in predicates]
+            return [doc[0].lemma_ for doc in with_profile(self.nlp, LEMMAS).pipe(predicates)]
         except Exception as e:
             raise Exception(f"Error lemmatizing predicates: {e}")
 
-    def find_predicate_sentences(self, text: str) -> str:
+    def find_predicate_sentences(self, text) -> str:
+        """`text` is a string or the DocumentAnalysis of the document, which is not parsed again."""
         try:
-            doc = self.nlp(text)
-            relevant_sentences = []
-            added_sentences = set()
-            prev_sentence = None
-
-            for j, sentence in enumerate(doc.sents):
-                if self.is_predicate_present(sentence):
-                    self.add_contextual_sentences(j, list(doc.sents), prev_sentence, relevant_sentences, added_sentences)
-                prev_sentence = sentence
-
-            return ' '.join(relevant_sentences)
+            if not isinstance(text, DocumentAnalysis):
+                text = DocumentAnalysis.parse(with_profile(self.nlp, LEMMAS), text)
+            return text.select_with_context(self.is_predicate_present).text
         except Exception as e:
             raise Exception(f"Error finding predicate sentences in text: {e}")
 
-    def add_contextual_sentences(self, j, sentences, prev_sentence, relevant_sentences, added_sentences):
-        try:
-            if prev_sentence and prev_sentence.text not in added_sentences:
-                relevant_sentences.append(prev_sentence.text)
-                added_sentences.add(prev_sentence.text)
-
-            current_sentence = sentences[j]
-            if current_sentence.text not in added_sentences:
-                relevant_sentences.append(current_sentence.text)
-                added_sentences.add(current_sentence.text)
-
-            if j < len(sentences) - 1:
-                next_sentence = sentences[j + 1]
-                if next_sentence.text not in added_sentences:
-                    relevant_sentences.append(next_sentence.text)
-                    added_sentences.add(next_sentence.text)
-        except Exception as e:
-            raise Exception(f"Error adding contextual sentences: {e}")
-
     def is_predicate_present(self, sentence):
         try:
             sentence_text = sentence.text
@@ -119,18 +95,16 @@ class FixedPredicateExtractor:
             added_tuples = set() 
 
             for predicate_data in doc_predicates:
-                predicate_phrase, json_data, object_phrase = predicate_data
-                tuple_str = str(predicate_data)
-                if tuple_str in added_tuples:
+                tuple_key = (predicate_data.subject, predicate_data.predicate, predicate_data.object, predicate_data.context)
+                if tuple_key in added_tuples:
                     continue
 
-                predicate_info = json.loads(json_data)
-                predicate_type = predicate_info.get("predicate_type", "").lower()
+                predicate_type = (predicate_data.predicate_type or "").lower()
 
                 for user_defined_type in self.predicate_types:
                     if user_defined_type.lower() in predicate_type:
                         filtered_predicates.append(predicate_data)
-                        added_tuples.add(tuple_str)
+                        added_tuples.add(tuple_key)
                         break
 
             return filtered_predicates
@@ -157,28 +131,22 @@ class FixedPredicateExtractor:
 
     def update_embedding_triples_with_similarity(self, predicate_json_emb, embedding_triples):
         try:
-            predicate_json_emb = [json.loads(item) for item in predicate_json_emb]
-            predicate_emb_list = [item["predicate_emb"] for item in predicate_json_emb if item["predicate_emb"] != "Not Implemented"]
-            predicate_emb_matrix = np.array(predicate_emb_list)
+            # predicate_json_emb comes from EmbeddingStore.generate_relationship_embeddings
+            predicate_emb_matrix = np.stack([item["predicate_emb"] for item in predicate_json_emb])
             updated_embedding_triples = []
             for triple in embedding_triples:
-                entity, triple_json, study_field = triple  
-                triple_data = json.loads(triple_json)
-                
-                if triple_data["predicate_emb"] == "Not Implemented":
+                if triple.predicate_emb is None:
                     updated_embedding_triples.append(triple)
                     continue  
                 
-                current_predicate_emb = np.array(triple_data["predicate_emb"]).reshape(1, -1)
-                similarities = cosine_similarity(current_predicate_emb, predicate_emb_matrix)
+                similarities = cosine_similarity(triple.predicate_emb.reshape(1, -1), predicate_emb_matrix)
                 max_similarity_index = np.argmax(similarities)
                 most_similar_predicate_details = predicate_json_emb[max_similarity_index]
                 if similarities[0][max_similarity_index] > 0.5:
-                    triple_data["predicate_type"] = most_similar_predicate_details["type"]
-                    if most_similar_predicate_details["relationship"].lower() != "unlabelled":
-                        triple_data["predicate"] = most_similar_predicate_details["relationship"]
-                    updated_triple_json = json.dumps(triple_data)
-                    updated_embedding_triples.append((entity, updated_triple_json, study_field))
+                    triple.predicate_type = most_similar_predicate_details["type"]
+                    if most_similar_predicate_details.get("relationship", "unlabelled").lower() != "unlabelled":
+                        triple.predicate = most_similar_predicate_details["relationship"]
+                    updated_embedding_triples.append(triple)
             return updated_embedding_triples
         except Exception as e:
             raise Exception(f"Error processing predicate types: {e}")
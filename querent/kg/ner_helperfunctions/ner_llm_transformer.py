@@ -1,5 +1,3 @@
-import json
-import spacy
 from transformers import AutoTokenizer, AutoModelForTokenClassification
 import torch
 import nltk
@@ -8,6 +6,8 @@ from typing import Any, List, Tuple
 from querent.logging.logger import setup_logger
 import os
 from querent.kg.ner_helperfunctions.dependency_parsing import Dependency_Parsing
+from querent.kg.ner_helperfunctions.document_analysis import DocumentAnalysis
+from querent.kg.ner_helperfunctions.spacy_pipeline import ANALYSIS, SENTENCES, SpacyPipeline, with_profile
 from unidecode import unidecode
 import re
 from collections import Counter
@@ -23,6 +23,9 @@ from collections import Counter
         logger (Logger): Logger instance for logging errors and information.
 
     Methods:
+        analyze_document(document: str) -> DocumentAnalysis:
+            Parses a document once with spaCy; the analysis is shared by the other KG helpers.
+
         tokenize_sentence(sentence: str) -> List[str]:
             Tokenizes a given sentence into individual tokens.
 
@@ -32,6 +35,9 @@ from collections import Counter
         extract_entities_from_chunk(chunk: List[str]) -> List[dict]:
             Extracts entities from a given chunk of tokens.
 
+        extract_entities_from_chunks(chunks: List[List[str]]) -> List[List[dict]]:
+            Extracts entities from many chunks at once using padded mini-batches of size `batch_size`.
+
         combine_entities_wordpiece(entities: List[dict], tokens: List[str]) -> List[dict]:
             Combines entities that are split due to wordpiece tokenization.
 
@@ -50,17 +56,22 @@ class NER_LLM:
     nlp = None  # Initialize nlp as None or with a default model
 
     @classmethod
-    def set_nlp_model(cls, model_path):
-        cls.nlp = spacy.load(model_path)
+    def set_nlp_model(cls, model_path, batch_size=256, n_process=1):
+        cls.nlp = SpacyPipeline.load(model_path, batch_size=batch_size, n_process=n_process)
         
     def __init__(
         self, ner_model_name="",
         filler_tokens=None,
         provided_tokenizer=None,
         provided_model=None,
+        batch_size=16,
+        sentence_window=None,
     ):  
         self.logger = setup_logger(__name__, "NER_LLM")
         self.device = "cpu"
+        self.batch_size = max(1, batch_size)
+        # Number of sentences whose chunks are batched together, None batches the whole document
+        self.sentence_window = sentence_window
         if provided_tokenizer:
             self.ner_tokenizer = provided_tokenizer
         else:
@@ -103,7 +114,7 @@ class NER_LLM:
         document = unidecode(document)
         sentences = []
         try:
-            doc = NER_LLM.nlp(document)
+            doc = with_profile(NER_LLM.nlp, SENTENCES)(document)
             sentences = [sent.text for sent in doc.sents]
         except Exception as e:
             raise Exception(
@@ -111,14 +122,29 @@ class NER_LLM:
             )
         return sentences
 
+    @staticmethod
+    def analyze_document(document) -> DocumentAnalysis:
+        return NER_LLM.analyze_documents([document])[0]
+
+    @staticmethod
+    def analyze_documents(documents: List[str]) -> List[DocumentAnalysis]:
+        try:
+            nlp = with_profile(NER_LLM.nlp, ANALYSIS)
+            return [DocumentAnalysis.from_doc(doc) for doc in nlp.pipe(unidecode(document) for document in documents)]
+        except Exception as e:
+            raise Exception(
+                f"An unexpected error occurred while analyzing the document: {e}"
+            )
+
     def tokenize_sentence(self, sentence: str):
         return self.ner_tokenizer.tokenize(sentence)
 
-    def _tokenize_and_chunk(self, data: str) -> List[Tuple[List[str], str, int]]:
+    def _tokenize_and_chunk(self, data) -> List[Tuple[List[str], str, int]]:
         try:
-            sentences = self.split_into_sentences(data)
+            if not isinstance(data, DocumentAnalysis):
+                data = self.analyze_document(data)
             tokenized_sentences = []
-            for idx, sentence in enumerate(sentences):
+            for idx, sentence in enumerate(data.sentence_texts):
                 sentence_tokens = self.tokenize_sentence(sentence)
                 tokenized_sentences.append((sentence_tokens, sentence, idx))
         except Exception as e:
@@ -142,15 +168,18 @@ class NER_LLM:
         try:
             transformed_pairs = []
             sentence_group = {}
+            context_sentences = {}
             for pair, metadata in entity_pairs:
-                combined_sentence = ' '.join(filter(None, [
+                sentences = list(filter(None, [
                     metadata['previous_sentence'],
                     metadata['current_sentence'],
                     metadata['next_sentence']
                 ]))
+                combined_sentence = ' '.join(sentences)
                 current_sentence = metadata['current_sentence']
                 if combined_sentence not in sentence_group:
                     sentence_group[combined_sentence] = []
+                    context_sentences[combined_sentence] = sentences
                 sentence_group[combined_sentence].append(pair + (current_sentence,))
 
             for combined_sentence, pairs in sentence_group.items():
@@ -162,7 +191,9 @@ class NER_LLM:
                         "entity2_label": entity2['label'],
                         "entity1_nn_chunk":entity1['noun_chunk'],
                         "entity2_nn_chunk":entity2['noun_chunk'],
-                        "current_sentence":current_sentence
+                        "current_sentence":current_sentence,
+                        # Lets later helpers find the sentence of a pair without splitting its context again
+                        "context_sentences":context_sentences[combined_sentence]
                     }
                     new_pair = (entity1['entity'], combined_sentence, entity2['entity'], meta_dict)
                     transformed_pairs.append(new_pair)
@@ -184,32 +215,65 @@ class NER_LLM:
         return chunks
 
     def extract_entities_from_chunk(self, chunk: List[str]):
-        results = []
         try:
-            input_ids = self.ner_tokenizer.convert_tokens_to_ids(chunk)
-            input_tensor = torch.tensor([input_ids], device=self.device)
-            attention_mask = torch.ones(input_tensor.shape, device=self.device)
-            with torch.no_grad():
-                outputs = self.ner_model(input_tensor, attention_mask=attention_mask)
-            predictions = torch.argmax(outputs[0], dim=2)
-            scores = torch.nn.functional.softmax(outputs[0], dim=2)
-            label_ids = predictions[0].tolist()
-            label_list = self.ner_model.config.id2label
-            for idx, label_id in enumerate(label_ids):
-                label = label_list[label_id]
-                if label not in ["O", "[CLS]", "[SEP]", "[PAD]"]:
-                    entity_info = {
-                        "entity": chunk[idx],
-                        "label": label,
-                        "score": scores[0][idx][label_id].item(),
-                        "start_idx": idx
-                    }
-                    results.append(entity_info)
+            return self.extract_entities_from_chunks([chunk])[0]
         except Exception as e:
             self.logger.error(f"Error extracting entities from chunk: {e}")
             raise Exception(f"Error extracting entities from chunk: {e}")
+
+    def extract_entities_from_chunks(self, chunks: List[List[str]]) -> List[List[dict]]:
+        results = [[] for _ in chunks]
+        try:
+            pad_token_id = self.ner_tokenizer.pad_token_id or 0
+            label_list = self.ner_model.config.id2label
+            # Sorting by length keeps the padding inside each mini-batch small
+            order = sorted((i for i, chunk in enumerate(chunks) if chunk), key=lambda i: len(chunks[i]))
+            for start in range(0, len(order), self.batch_size):
+                batch_indices = order[start:start + self.batch_size]
+                max_length = len(chunks[batch_indices[-1]])
+                input_tensor = torch.full((len(batch_indices), max_length), pad_token_id, dtype=torch.long, device=self.device)
+                attention_mask = torch.zeros((len(batch_indices), max_length), dtype=torch.long, device=self.device)
+                for row, chunk_idx in enumerate(batch_indices):
+                    input_ids = self.ner_tokenizer.convert_tokens_to_ids(chunks[chunk_idx])
+                    input_tensor[row, :len(input_ids)] = torch.tensor(input_ids, dtype=torch.long)
+                    attention_mask[row, :len(input_ids)] = 1
+                with torch.no_grad():
+                    outputs = self.ner_model(input_tensor, attention_mask=attention_mask)
+                scores, predictions = torch.nn.functional.softmax(outputs[0], dim=2).max(dim=2)
+                scores = scores.tolist()
+                predictions = predictions.tolist()
+                for row, chunk_idx in enumerate(batch_indices):
+                    chunk = chunks[chunk_idx]
+                    for idx in range(len(chunk)):
+                        label = label_list[predictions[row][idx]]
+                        if label not in ["O", "[CLS]", "[SEP]", "[PAD]"]:
+                            entity_info = {
+                                "entity": chunk[idx],
+                                "label": label,
+                                "score": scores[row][idx],
+                                "start_idx": idx
+                            }
+                            results[chunk_idx].append(entity_info)
+        except Exception as e:
+            self.logger.error(f"Error extracting entities from chunks: {e}")
+            raise Exception(f"Error extracting entities from chunks: {e}")
         return results
 
+    def extract_entities_from_sentences(self, tokenized_sentences: List[Tuple[List[str], str, int]]) -> List[List[dict]]:
+        """Runs the NER model over every sentence in padded mini-batches, returning the raw entities per sentence."""
+        sentence_entities = [[] for _ in tokenized_sentences]
+        window = self.sentence_window or len(tokenized_sentences)
+        for start in range(0, len(tokenized_sentences), max(1, window)):
+            chunk_owners = []
+            chunks = []
+            for position in range(start, min(start + window, len(tokenized_sentences))):
+                for chunk in self.get_chunks(tokenized_sentences[position][0]):
+                    chunk_owners.append(position)
+                    chunks.append(chunk)
+            for position, entities in zip(chunk_owners, self.extract_entities_from_chunks(chunks)):
+                sentence_entities[position].extend(entities)
+        return sentence_entities
+
     def combine_entities_wordpiece(self, entities: List[dict], tokens: List[str]):
         combined_entities = []
         i = 0
@@ -341,10 +405,11 @@ class NER_LLM:
 
         return matched_tuples
 
-    def find_subword_indices(self, text, entity):
+    def find_subword_indices(self, text, entity, token_ids=None):
         subwords = self.ner_tokenizer.tokenize(entity)
         subword_ids = self.ner_tokenizer.convert_tokens_to_ids(subwords)
-        token_ids = self.ner_tokenizer.convert_tokens_to_ids(self.ner_tokenizer.tokenize(text))
+        if token_ids is None:
+            token_ids = self.ner_tokenizer.convert_tokens_to_ids(self.ner_tokenizer.tokenize(text))
         subword_positions = []
         for i in range(len(token_ids) - len(subword_ids) + 1):
             if token_ids[i:i + len(subword_ids)] == subword_ids:
@@ -358,20 +423,23 @@ class NER_LLM:
         return token_positions
 
 
-    def extract_entities_from_sentence(self, sentence: str, sentence_idx: int, all_sentences: List[str], fixed_entities_flag: bool, fixed_entities: List[str],entity_types: List[str]):
+    def extract_entities_from_sentence(self, sentence: str, sentence_idx: int, all_sentences: List[str], fixed_entities_flag: bool, fixed_entities: List[str],entity_types: List[str], tokens: List[str] = None, chunk_entities: List[dict] = None, noun_chunks: List[str] = None):
         try:
-            tokens = self.tokenize_sentence(sentence)
-            chunks = self.get_chunks(tokens)
-            all_entities = []
-            for chunk in chunks:
-                if fixed_entities_flag == False:
-                    entities = self.extract_entities_from_chunk(chunk)
-                else:
-                    entities = self.extract_fixed_entities_from_chunk(chunk,fixed_entities, entity_types)
-                all_entities.extend(entities)
+            if tokens is None:
+                tokens = self.tokenize_sentence(sentence)
+            if chunk_entities is not None:
+                all_entities = chunk_entities
+            else:
+                all_entities = []
+                for chunk in self.get_chunks(tokens):
+                    if fixed_entities_flag == False:
+                        entities = self.extract_entities_from_chunk(chunk)
+                    else:
+                        entities = self.extract_fixed_entities_from_chunk(chunk,fixed_entities, entity_types)
+                    all_entities.extend(entities)
             final_entities = self.combine_entities_wordpiece(all_entities, tokens)
             if fixed_entities_flag == False:
-                parsed_entities = Dependency_Parsing(entities=final_entities, sentence=sentence, model=NER_LLM.nlp)
+                parsed_entities = Dependency_Parsing(entities=final_entities, sentence=sentence, model=NER_LLM.nlp, noun_chunks=noun_chunks)
                 entities_withnnchunk = parsed_entities.entities
             else:
                 for entity in final_entities:
@@ -386,28 +454,52 @@ class NER_LLM:
     
     
     def get_entity_pairs(self, isConfinedSearch, fixed_entities, sample_entities, content):
-        entity = []
-        doc_entity_pairs = []
-        tokens = self._tokenize_and_chunk(content)
-        for tokenized_sentence, original_sentence, sentence_idx in tokens:
-            (entities, entity_pairs,) = self.extract_entities_from_sentence(original_sentence, sentence_idx, [s[1] for s in tokens],isConfinedSearch, fixed_entities, sample_entities)
-            if entity_pairs:
-                doc_entity_pairs.append(self.transform_entity_pairs(entity_pairs))
-            if entities:
-                entity.append(entities)
-        return (entity, doc_entity_pairs)
+        return self.get_entity_pairs_batch(isConfinedSearch, fixed_entities, sample_entities, [content])[0]
+
+    def get_entity_pairs_batch(self, isConfinedSearch, fixed_entities, sample_entities, contents: List[Any]):
+        """
+        Same as get_entity_pairs for several documents, sharing NER mini-batches across all of their sentences.
+        Each content is either text or the DocumentAnalysis of it, whose parse is then reused.
+        """
+        unparsed = [position for position, content in enumerate(contents) if not isinstance(content, DocumentAnalysis)]
+        analyses = list(contents)
+        for position, analysis in zip(unparsed, self.analyze_documents([contents[position] for position in unparsed])):
+            analyses[position] = analysis
+        documents = [self._tokenize_and_chunk(analysis) for analysis in analyses]
+        all_tokens = [sentence for tokens in documents for sentence in tokens]
+        if isConfinedSearch == False:
+            all_entities = self.extract_entities_from_sentences(all_tokens)
+        else:
+            all_entities = [None] * len(all_tokens)
+        results = []
+        offset = 0
+        for analysis, tokens in zip(analyses, documents):
+            entity = []
+            doc_entity_pairs = []
+            all_sentences = [s[1] for s in tokens]
+            sentence_entities = all_entities[offset:offset + len(tokens)]
+            offset += len(tokens)
+            for (tokenized_sentence, original_sentence, sentence_idx), chunk_entities in zip(tokens, sentence_entities):
+                noun_chunks = [chunk.text for chunk in analysis.sentences[sentence_idx].noun_chunks]
+                (entities, entity_pairs,) = self.extract_entities_from_sentence(original_sentence, sentence_idx, all_sentences,isConfinedSearch, fixed_entities, sample_entities, tokens=tokenized_sentence, chunk_entities=chunk_entities, noun_chunks=noun_chunks)
+                if entity_pairs:
+                    doc_entity_pairs.append(self.transform_entity_pairs(entity_pairs))
+                if entities:
+                    entity.append(entities)
+            results.append((entity, doc_entity_pairs))
+        return results
     
     def final_ingested_images_tuples(self, filtered_triples, create_embeddings):
-        entity, info_json, second_entity = filtered_triples
-        info = json.loads(info_json)
-        info['subject_type'] = info.pop('entity1_label')
-        info['object_type'] = info.pop('entity2_label')
-        info['predicate'] = "has image"
-        info['predicate_type'] = "has image"
-        info['context_embeddings'] = create_embeddings.get_embeddings([info['context']])[0]
-        updated_json = json.dumps(info)
-        updated_tuple = (info['entity1_nn_chunk'], updated_json, info['entity2_nn_chunk'])
-        return updated_tuple
+        triple = filtered_triples
+        return triple.replace(
+            subject=triple.entity1_nn_chunk,
+            object=triple.entity2_nn_chunk,
+            subject_type=triple.entity1_label,
+            object_type=triple.entity2_label,
+            predicate="has image",
+            predicate_type="has image",
+            context_embeddings=create_embeddings.embed_batch([triple.context])[0],
+        )
     
     def remove_duplicates(self, data):
         seen = set()
@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from cachetools import LRUCache
+import torch
+from querent.logging.logger import setup_logger
+
+"""
+    SentenceEncodingCache: A per-sentence inference cache shared by the attention, embedding and
+    attention-based relationship extractors.
+
+    A single forward pass is run for every distinct tokenized sentence and both the last layer's
+    attention weights and hidden states are kept, so extractors that look at the same context reuse
+    the same model outputs instead of running their own forward passes.
+
+    Attributes:
+        model (torch.nn.Module): The transformer model used for inference.
+        tokenizer (Tokenizer): The tokenizer associated with the transformer model.
+        max_length (int): Maximum number of tokens fed to the model.
+        cache (LRUCache): Encodings keyed by the tokenized input ids of the context.
+
+    Methods:
+        encode(context: str) -> SentenceEncoding:
+            Returns the cached encoding of a context, running the model on a cache miss.
+
+        encode_batch(contexts: List[str]) -> List[SentenceEncoding]:
+            Returns the encodings of several contexts, running all cache misses through padded batches.
+
+        clear():
+            Drops every cached encoding.
+    """
+
+
+@dataclass
+class SentenceEncoding:
+    input_ids: List[int]
+    attentions: torch.Tensor
+    last_hidden_state: torch.Tensor
+    _mean_attention: Optional[torch.Tensor] = None
+
+    def mean_attention(self) -> torch.Tensor:
+        """Average of the last layer's attention heads, as used by the attention based relationship search."""
+        if self._mean_attention is None:
+            self._mean_attention = torch.mean(self.attentions, dim=0)
+        return self._mean_attention
+
+
+class SentenceEncodingCache:
+    def __init__(self, model, tokenizer, max_size=64, max_length=512):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.cache = LRUCache(maxsize=max_size)
+        self.logger = setup_logger(__name__, "SentenceEncodingCache")
+
+    def encode(self, context: str) -> SentenceEncoding:
+        try:
+            inputs = self.tokenizer(context, return_tensors="pt", truncation=True, padding=True, max_length=self.max_length)
+            key = tuple(inputs["input_ids"][0].tolist())
+            encoding = self.cache.get(key)
+            if encoding is None:
+                with torch.no_grad():
+                    outputs = self.model(**inputs, output_attentions=True, output_hidden_states=True)
+                encoding = SentenceEncoding(
+                    input_ids=list(key),
+                    attentions=outputs.attentions[-1][0],
+                    last_hidden_state=outputs.hidden_states[-1][0],
+                )
+                self.cache[key] = encoding
+            return encoding
+        except Exception as e:
+            self.logger.error(f"Error encoding sentence: {e}")
+            raise Exception(f"Error encoding sentence: {e}")
+
+    def encode_batch(self, contexts: List[str], batch_size: int = 16) -> List[SentenceEncoding]:
+        try:
+            keys = [
+                tuple(self.tokenizer(context, truncation=True, max_length=self.max_length)["input_ids"])
+                for context in contexts
+            ]
+            encodings = {key: self.cache[key] for key in dict.fromkeys(keys) if key in self.cache}
+            # Similar lengths share a batch to keep padding low
+            missing = sorted((key for key in dict.fromkeys(keys) if key not in encodings), key=len)
+            for start in range(0, len(missing), batch_size):
+                batch_keys = missing[start:start + batch_size]
+                inputs = self.tokenizer.pad({"input_ids": [list(key) for key in batch_keys]}, return_tensors="pt")
+                with torch.no_grad():
+                    outputs = self.model(**inputs, output_attentions=True, output_hidden_states=True)
+                for row, key in enumerate(batch_keys):
+                    positions = inputs["attention_mask"][row].nonzero().squeeze(-1)
+                    encodings[key] = SentenceEncoding(
+                        input_ids=list(key),
+                        attentions=outputs.attentions[-1][row][:, positions][:, :, positions].clone(),
+                        last_hidden_state=outputs.hidden_states[-1][row][positions].clone(),
+                    )
+                    self.cache[key] = encodings[key]
+            return [encodings[key] for key in keys]
+        except Exception as e:
+            self.logger.error(f"Error encoding sentences: {e}")
+            raise Exception(f"Error encoding sentences: {e}")
+
+    def clear(self):
+        self.cache.clear()
@@ -0,0 +1,111 @@
+from typing import Iterable, Iterator, List, Optional
+import spacy
+
+"""
+    A loaded spaCy pipeline that runs only the components a call site needs.
+
+    The full `en_core_web_lg` pipeline tags, parses, lemmatizes and recognizes entities, but most
+    helpers only need part of that: sentence boundaries, noun chunks or lemmas. Each call site asks
+    for the cheapest profile that gives it what it reads, and every other component is disabled for
+    that call. Bulk calls go through `pipe`, which batches `batch_size` texts at a time and, with
+    `n_process` above 1, parses them in several processes.
+
+    Profiles:
+    ---------
+    full : every component.
+    analysis : POS tags, lemmas, dependency parse and noun chunks; no named entities.
+    noun_chunks : POS tags and the dependency parse.
+    lemmas : POS tags and lemmas, with sentence boundaries from the sentence recognizer.
+    sentences : sentence boundaries only.
+
+    Every profile keeps sentence boundaries: without a senter or sentencizer, the parser is kept,
+    and without a parser, the senter or sentencizer is.
+"""
+
+FULL = "full"
+ANALYSIS = "analysis"
+NOUN_CHUNKS = "noun_chunks"
+LEMMAS = "lemmas"
+SENTENCES = "sentences"
+
+_EMBEDDINGS = ("tok2vec", "transformer")
+_TAGS = ("tagger", "morphologizer", "attribute_ruler")
+_SENTENCE_COMPONENTS = ("senter", "sentencizer")
+
+PROFILES = {
+    FULL: None,
+    ANALYSIS: _EMBEDDINGS + _TAGS + ("lemmatizer", "parser"),
+    NOUN_CHUNKS: _EMBEDDINGS + _TAGS + ("parser",),
+    LEMMAS: _EMBEDDINGS + _TAGS + ("lemmatizer",) + _SENTENCE_COMPONENTS,
+    SENTENCES: _SENTENCE_COMPONENTS,
+}
+
+
+class SpacyPipeline:
+    def __init__(self, nlp, batch_size: int = 256, n_process: int = 1):
+        self.nlp = nlp
+        self.batch_size = max(1, batch_size or 1)
+        self.n_process = max(1, n_process or 1)
+        if "senter" in nlp.disabled:
+            # Shipped disabled because the parser sets sentence boundaries; enabled for the
+            # profiles without a parser, and skipped whenever the parser runs
+            nlp.enable_pipe("senter")
+        self._disabled = {profile: self._resolve(profile) for profile in PROFILES}
+
+    @classmethod
+    def load(cls, model_path: str, batch_size: int = 256, n_process: int = 1) -> "SpacyPipeline":
+        return cls(spacy.load(model_path), batch_size=batch_size, n_process=n_process)
+
+    def _resolve(self, profile: str) -> List[str]:
+        names = self.nlp.pipe_names
+        wanted = PROFILES[profile]
+        keep = set(names) if wanted is None else set(wanted) & set(names)
+        if "parser" in keep:
+            keep.discard("senter")
+        elif not keep & set(_SENTENCE_COMPONENTS):
+            # Pipelines without a parser, e.g. a blank one, set boundaries with a sentencizer
+            keep.update(("parser",) + _EMBEDDINGS if "parser" in names else _SENTENCE_COMPONENTS)
+        return [name for name in names if name not in keep]
+
+    def disabled(self, profile: str = FULL) -> List[str]:
+        """Names of the components `profile` does not run."""
+        try:
+            return self._disabled[profile]
+        except KeyError:
+            raise ValueError(f"Unknown spaCy pipeline profile: {profile}")
+
+    def __call__(self, text: str, profile: str = FULL):
+        return self.nlp(text, disable=self.disabled(profile))
+
+    def pipe(self, texts: Iterable[str], profile: str = FULL, n_process: Optional[int] = None) -> Iterator:
+        return self.nlp.pipe(
+            texts,
+            disable=self.disabled(profile),
+            batch_size=self.batch_size,
+            n_process=n_process or self.n_process,
+        )
+
+    def profile(self, profile: str) -> "ProfiledPipeline":
+        self.disabled(profile)
+        return ProfiledPipeline(self, profile)
+
+
+class ProfiledPipeline:
+    """A SpacyPipeline bound to one profile, called like a spaCy Language."""
+
+    def __init__(self, pipeline: SpacyPipeline, profile: str):
+        self.pipeline = pipeline
+        self.name = profile
+
+    def __call__(self, text: str):
+        return self.pipeline(text, profile=self.name)
+
+    def pipe(self, texts: Iterable[str], n_process: Optional[int] = None) -> Iterator:
+        return self.pipeline.pipe(texts, profile=self.name, n_process=n_process)
+
+
+def with_profile(nlp, profile: str):
+    """`nlp` restricted to `profile`; a plain spaCy Language is returned as it is."""
+    if isinstance(nlp, ProfiledPipeline):
+        nlp = nlp.pipeline
+    return nlp.profile(profile) if isinstance(nlp, SpacyPipeline) else nlp
@@ -1,15 +1,17 @@
 import ast
-import json
 import torch
 from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import SearchContextualRelationship as sc
 from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import EntityPair as ep
-from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import perform_search
+from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import perform_search, as_attention_columns
 from dataclasses import dataclass
 from querent.logging.logger import setup_logger
 from typing import Optional
 from collections import defaultdict
 import numpy
 from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+from querent.kg.ner_helperfunctions.document_analysis import DocumentAnalysis
+from querent.kg.ner_helperfunctions.spacy_pipeline import LEMMAS, with_profile
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
 
 @dataclass
 class Entity:
@@ -147,49 +149,92 @@ def frequency_cutoff(ht_relations: list[SemanticPairs], frequency: int):
     for ht_item in ht_relations:
         ht_item.relations = [rel for rel in ht_item.relations if counter[rel] >= frequency]
 
-def trim_triples(data):
+def trim_triples(data: list[TripleRecord]) -> list[TripleRecord]:
     try:
-        trimmed_data = []
-        for entity1, predicate, entity2 in data:
-            predicate_dict = json.loads(predicate)
-            trimmed_predicate = {
-                'context': predicate_dict.get('context', ''),
-                'entity1_nn_chunk': predicate_dict.get('entity1_nn_chunk', ''),
-                'entity2_nn_chunk': predicate_dict.get('entity2_nn_chunk', ''),
-                'entity1_label': predicate_dict.get('entity1_label', ''),
-                'entity2_label': predicate_dict.get('entity2_label', ''),
-                'file_path': predicate_dict.get('file_path', ''),
-                'current_sentence': predicate_dict.get('current_sentence', '')
-            }
-            trimmed_data.append((entity1, trimmed_predicate, entity2))
-
-        return trimmed_data
+        # Relationship extraction only needs the entities and sentences, so the entity
+        # embeddings are released instead of being carried to the end of the pipeline
+        for triple in data:
+            triple.entity1_embedding = None
+            triple.entity2_embedding = None
+
+        return data
     except Exception as e:
         raise Exception(f'Error in trimming triples: {e}')
 
-def process_tokens(ner_instance : NER_LLM, extractor, filtered_triples, nlp_model):
+@dataclass
+class SentenceAnalysis:
+    token_ids: list[int]
+    token_idx_with_word: list
+    attention_matrix: numpy.ndarray
+    spacy_doc: object
+
+
+def analyze_sentences(ner_instance: NER_LLM, extractor, contexts: list[str], nlp_model, document: DocumentAnalysis = None) -> dict[str, SentenceAnalysis]:
+    """
+    Tokenizes, parses and runs attention inference once per distinct sentence, batching the sentences
+    through the language model. Sentences that cannot be analysed are left out of the result. Sentences
+    found in `document`, the analysis of the document they come from, take its tokens instead of being
+    parsed again.
+    """
+    contexts = list(dict.fromkeys(contexts))
+    # The filters only read the lemmas and POS tags of the tokens
+    nlp_model = with_profile(nlp_model, LEMMAS)
+    try:
+        attention_matrices = extractor.attention_matrices(contexts)
+    except Exception:
+        attention_matrices = [None] * len(contexts)
+    spacy_docs = [document.find_sentence(context) if document is not None else None for context in contexts]
+    unparsed = [position for position, spacy_doc in enumerate(spacy_docs) if spacy_doc is None]
+    try:
+        for position, spacy_doc in zip(unparsed, nlp_model.pipe([contexts[position] for position in unparsed])):
+            spacy_docs[position] = spacy_doc
+    except Exception:
+        pass
+
+    analyses = {}
+    for context, attention_matrix, spacy_doc in zip(contexts, attention_matrices, spacy_docs):
+        try:
+            if attention_matrix is None:
+                attention_matrix = extractor.attention_matrix(context)
+            if spacy_doc is None:
+                spacy_doc = nlp_model(context)
+            token_idx_with_word = ner_instance.tokenize_sentence_with_positions(context)
+            analyses[context] = SentenceAnalysis(
+                token_ids=ner_instance.ner_tokenizer.convert_tokens_to_ids([token for token, _ in token_idx_with_word]),
+                token_idx_with_word=token_idx_with_word,
+                # Converted once to a NumPy matrix, shared by the head and tail searches of every pair
+                attention_matrix=as_attention_columns(attention_matrix).T,
+                spacy_doc=spacy_doc,
+            )
+        except Exception:
+            continue
+    return analyses
+
+
+def process_tokens(ner_instance : NER_LLM, extractor, filtered_triples, nlp_model, document: DocumentAnalysis = None):
     try:
         updated_triples = []
-        for subject, predicate_metadata, object in filtered_triples:
+        contexts = [predicate_metadata.current_sentence.replace("\n"," ").lower() for predicate_metadata in filtered_triples]
+        analyses = analyze_sentences(ner_instance, extractor, contexts, nlp_model, document)
+        for predicate_metadata, context in zip(filtered_triples, contexts):
             try:
-                context = predicate_metadata['current_sentence'].replace("\n"," ").lower()
-                head_positions = ner_instance.find_subword_indices(context, predicate_metadata['entity1_nn_chunk'])
-                tail_positions = ner_instance.find_subword_indices(context, predicate_metadata['entity2_nn_chunk'])
+                subject, object = predicate_metadata.subject, predicate_metadata.object
+                analysis = analyses.get(context)
+                if analysis is None:
+                    continue
+                head_positions = ner_instance.find_subword_indices(context, predicate_metadata.entity1_nn_chunk, token_ids=analysis.token_ids)
+                tail_positions = ner_instance.find_subword_indices(context, predicate_metadata.entity2_nn_chunk, token_ids=analysis.token_ids)
 
                 if head_positions[0][0] > tail_positions[0][0]:
-                    head_entity = {'entity': object, 'noun_chunk':predicate_metadata['entity2_nn_chunk'], 'entity_label':predicate_metadata['entity2_label'] }
-                    tail_entity =  {'entity': subject, 'noun_chunk':predicate_metadata['entity1_nn_chunk'], 'entity_label':predicate_metadata['entity1_label']} 
+                    head_entity = {'entity': object, 'noun_chunk':predicate_metadata.entity2_nn_chunk, 'entity_label':predicate_metadata.entity2_label }
+                    tail_entity =  {'entity': subject, 'noun_chunk':predicate_metadata.entity1_nn_chunk, 'entity_label':predicate_metadata.entity1_label} 
                     entity_pair = ep(head_entity, tail_entity, context, tail_positions, head_positions)
                 else:
-                    head_entity = {'entity': subject, 'noun_chunk':predicate_metadata['entity1_nn_chunk'], 'entity_label':predicate_metadata['entity1_label']}
-                    tail_entity =  {'entity': object, 'noun_chunk':predicate_metadata['entity2_nn_chunk'], 'entity_label':predicate_metadata['entity2_label']} 
+                    head_entity = {'entity': subject, 'noun_chunk':predicate_metadata.entity1_nn_chunk, 'entity_label':predicate_metadata.entity1_label}
+                    tail_entity =  {'entity': object, 'noun_chunk':predicate_metadata.entity2_nn_chunk, 'entity_label':predicate_metadata.entity2_label} 
                     entity_pair = ep(head_entity, tail_entity, context, head_positions, tail_positions)
-                tokenized_sentence = extractor.tokenize_sentence(context)
-                model_input = extractor.model_input(tokenized_sentence)
-                attention_matrix = extractor.inference_attention(model_input)
-                token_idx_with_word = ner_instance.tokenize_sentence_with_positions(context)
-                spacy_doc  = nlp_model(context)
-                filter = IndividualFilter(True, 0.01, token_idx_with_word, spacy_doc)
+                attention_matrix = analysis.attention_matrix
+                filter = IndividualFilter(True, 0.01, analysis.token_idx_with_word, analysis.spacy_doc)
                 
                 ## HEAD Entity Based Attention Search
                 candidate_paths = perform_search(entity_pair.head_entity['start_idx'], attention_matrix, entity_pair, search_candidates=5, require_contiguous=True, max_relation_length=8, num_initial_tokens=extractor.num_start_tokens())
@@ -241,18 +286,16 @@ def remove_duplicates(candidate_paths):
 
 def create_semantic_triple(head_entity, tail_entity, predicate, score, predicate_metadata, subject_type, object_type):
         try:   
-            triple = (
+            triple = TripleRecord(
                 head_entity,
-                json.dumps({
-                    "predicate": predicate,
-                    "predicate_type": "",
-                    "context": predicate_metadata["context"].replace('\n',' '),
-                    "file_path": predicate_metadata["file_path"],
-                    "subject_type": subject_type,
-                    "object_type": object_type,
-                    "score":score,
-                }),
-                tail_entity
+                tail_entity,
+                predicate=predicate,
+                predicate_type="",
+                context=predicate_metadata.context.replace('\n',' '),
+                file_path=predicate_metadata.file_path,
+                subject_type=subject_type,
+                object_type=object_type,
+                score=score,
             )
             return triple
         except Exception as e:
@@ -5,10 +5,36 @@ from transformers import AutoTokenizer
 
 
 class AttnRelationshipExtractor:
-    def __init__(self, model_tokenizer, model):
+    def __init__(self, model_tokenizer, model, encoding_cache=None):
         self.tokenizer = model_tokenizer
         self.model = model
-        
+        self.encoding_cache = encoding_cache
+
+    def attention_matrix(self, sentence: str) -> torch.Tensor:
+        """
+        Returns the mean attention matrix of the last layer for a sentence, reusing the shared
+        SentenceEncodingCache when the extractor was given one.
+        :param sentence: The sentence to run through the language model.
+        :return: A [seq_len, seq_len] tensor including the model's start and end tokens.
+        """
+        if self.encoding_cache is not None:
+            return self.encoding_cache.encode(sentence).mean_attention()
+        tokenized_sentence = self.tokenize_sentence(sentence)
+        with torch.no_grad():
+            return self.inference_attention(self.model_input(tokenized_sentence))
+
+    def attention_matrices(self, sentences: list[str], batch_size: int = 16) -> list[torch.Tensor]:
+        """
+        Returns the mean attention matrix of every sentence, see `attention_matrix`. Sentences that are
+        not cached yet are run through the language model in padded batches.
+        :param sentences: The sentences to run through the language model.
+        :param batch_size: Maximum number of sentences per forward pass.
+        :return: One [seq_len, seq_len] tensor per sentence, in order.
+        """
+        if self.encoding_cache is not None:
+            return [encoding.mean_attention() for encoding in self.encoding_cache.encode_batch(sentences, batch_size=batch_size)]
+        return [self.attention_matrix(sentence) for sentence in sentences]
+
     def init_token_idx_2_word_doc_idx(self) -> list[tuple[str, int]]:
         """
         This function initializes a dictionary of token index to spacy doc index. It should contain only the
@@ -67,8 +93,8 @@ class AttnRelationshipExtractor:
         pass
 
 class BertBasedModel(AttnRelationshipExtractor):
-    def __init__(self, model_tokenizer, model):
-        super().__init__(model_tokenizer, model)
+    def __init__(self, model_tokenizer, model, encoding_cache=None):
+        super().__init__(model_tokenizer, model, encoding_cache)
 
     def init_token_idx_2_word_doc_idx(self) -> list[tuple[str, int]]:
         return [('CLS', -1)]
@@ -91,12 +117,48 @@ class BertBasedModel(AttnRelationshipExtractor):
     def tokenize(self, word):
         return self.tokenizer(str(word), add_special_tokens=False)['input_ids']
 
+    def model_input_batch(self, tokenized_sentences: list[list[int]]) -> dict[str, torch.Tensor]:
+        sequences = [[self.tokenizer.cls_token_id] + sentence + [self.tokenizer.sep_token_id] for sentence in tokenized_sentences]
+        max_length = max(len(sequence) for sequence in sequences)
+        input_ids = torch.full((len(sequences), max_length), self.tokenizer.pad_token_id or 0, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), max_length), dtype=torch.long)
+        for row, sequence in enumerate(sequences):
+            input_ids[row, :len(sequence)] = torch.tensor(sequence, dtype=torch.long)
+            attention_mask[row, :len(sequence)] = 1
+        return {
+            'input_ids': input_ids,
+            'token_type_ids': torch.zeros_like(input_ids),
+            'attention_mask': attention_mask,
+        }
+
     def inference_attention(self, model_input: dict[str, torch.Tensor]) -> torch.Tensor:
         output = self.model(**model_input, output_attentions=True)
         last_att_layer = output.attentions[-1]
         mean = torch.mean(last_att_layer, dim=1)
         return mean[0]
 
+    def inference_attention_batch(self, model_input: dict[str, torch.Tensor]) -> torch.Tensor:
+        """Same as `inference_attention`, keeping one [seq_len, seq_len] matrix per row of the batch."""
+        output = self.model(**model_input, output_attentions=True)
+        last_att_layer = output.attentions[-1]
+        return torch.mean(last_att_layer, dim=1)
+
+    def attention_matrices(self, sentences: list[str], batch_size: int = 16) -> list[torch.Tensor]:
+        if self.encoding_cache is not None:
+            return super().attention_matrices(sentences, batch_size=batch_size)
+        tokenized_sentences = [self.tokenize_sentence(sentence) for sentence in sentences]
+        matrices = [None] * len(sentences)
+        # Similar lengths share a batch to keep padding low
+        order = sorted(range(len(sentences)), key=lambda idx: len(tokenized_sentences[idx]))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            with torch.no_grad():
+                means = self.inference_attention_batch(self.model_input_batch([tokenized_sentences[idx] for idx in rows]))
+            for row, idx in enumerate(rows):
+                length = len(tokenized_sentences[idx]) + 2
+                matrices[idx] = means[row, :length, :length]
+        return matrices
+
     def maximum_tokens(self) -> int:
         return 512
     
@@ -140,9 +202,9 @@ class LlamaBasedModel(AttnRelationshipExtractor):
         return self.tokenizer.encode(sentence, add_special_tokens=False)
 
 
-def get_model(model_name:str, model_tokenizer: str, model: str) -> AttnRelationshipExtractor:
+def get_model(model_name:str, model_tokenizer: str, model: str, encoding_cache=None) -> AttnRelationshipExtractor:
     if model_name == 'bert':
-        return BertBasedModel(model_tokenizer, model)
+        return BertBasedModel(model_tokenizer, model, encoding_cache)
     elif model_name == 'llama':
         return LlamaBasedModel(model_tokenizer, model)
 
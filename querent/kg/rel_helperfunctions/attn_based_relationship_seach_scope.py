@@ -1,5 +1,5 @@
 import torch
-import copy
+from collections import deque
 from typing import List, Tuple, Dict
 import numpy
     
@@ -34,7 +34,16 @@ class SearchContextualRelationship:
     def mean_score(self) -> float:
         if len(self.relation_tokens) == 0:
             return 0
-        return self.total_score / len(self.relation_tokens)
+        return float(self.total_score / len(self.relation_tokens))
+
+    @classmethod
+    def from_path(cls, path: Tuple[int, ...], total_score) -> "SearchContextualRelationship":
+        relation = cls(path[0])
+        relation.current_token = path[-1]
+        relation.visited_tokens = list(path)
+        relation.relation_tokens = list(path[1:])
+        relation.total_score = total_score
+        return relation
 
 
 def sort_by_mean_score(path: SearchContextualRelationship) -> float:
@@ -53,51 +62,78 @@ def is_valid_token(token_id, pair: EntityPair, candidate_paths: List[SearchConte
 
 
 
-def perform_search(entity_start_index, attention_matrix: torch.Tensor, entity_pair: EntityPair, search_candidates: int, require_contiguous: bool, max_relation_length: int, num_initial_tokens: int) -> List[SearchContextualRelationship]:
+def perform_search(entity_start_index, attention_matrix, entity_pair: EntityPair, search_candidates: int, require_contiguous: bool, max_relation_length: int, num_initial_tokens: int) -> List[SearchContextualRelationship]:
     """
         Initialize the perform search function with the following parameters:
-        :param attention_matrix :Mean attention score, average attention each token pays to every other token showing which tokens are most related to each other in the context of the given sentence(s).
+        :param attention_matrix :Mean attention score, average attention each token pays to every other token showing which tokens are most related to each other in the context of the given sentence(s). A torch tensor or a NumPy array.
         :param search_candidates: Number of candidates to select for the next iteration of the search
         :param contiguous_token: When generating relations, consider only those with contiguous tokens
         :param max_relation_length: Maximum quantity of tokens allowed in a relation.
         :patam num_initial_tokens: Different for different models. E.g. 'Bert' adds a '[CLS]' to the start of a sequence, so it is 1.
-        
+
+        Paths are kept as (token tuple, float32 total score) pairs on a FIFO frontier and every expansion
+        scores all next tokens at once, keeping the `search_candidates` best by mean score. Scores are
+        accumulated in float32, like the torch tensors this search used to operate on, so the candidate
+        paths and their order are unchanged.
     """
     try:
-        queue = [
-            SearchContextualRelationship(entity_start_index)
-        ]
+        # How all other tokens attend to an entity e.g. "Emily Stanton"
+        # These scores indicate how much importance the model places on each token when considering "Emily Stanton."
+        # The tokens which consider entity "Emily Stanton" important, highlight entity's relationships and relevance within the sentence.
+        # Row j of attention_columns holds the attention every token pays to token j.
+        attention_columns = as_attention_columns(attention_matrix)
+        num_tokens = attention_columns.shape[0]
+        head_start, head_end = entity_pair.head_entity['start_idx'], entity_pair.head_entity['end_idx']
+        tail_start, tail_end = entity_pair.tail_entity['start_idx'], entity_pair.tail_entity['end_idx']
+        token_ids = numpy.arange(num_tokens)
+        selectable = (
+            (token_ids >= num_initial_tokens) & (token_ids < num_tokens - 1)
+            & ~((token_ids >= head_start) & (token_ids <= head_end))
+            & ~((token_ids >= tail_start) & (token_ids <= tail_end))
+        )
+        tail_tokens = list(range(max(num_initial_tokens, tail_start), min(num_tokens - 1, tail_end + 1)))
+        after_tail = token_ids > tail_end
+
+        queue = deque([((entity_start_index,), numpy.float32(0))])
         candidate_paths = []
-        visited_paths = set()
-        while len(queue) > 0:
-            current_path = queue.pop(0)
-
-            if len(current_path.relation_tokens) > max_relation_length:
-                continue
-
-            if require_contiguous and len(current_path.relation_tokens) > 1 and abs(current_path.relation_tokens[-2] - current_path.relation_tokens[-1]) != 1:
+        while queue:
+            path, total_score = queue.popleft()
+            relation_length = len(path) - 1
+            current_token = path[-1]
+            attention_scores = attention_columns[current_token]
+
+            # Reaching the tail entity closes the path, adding the attention of every tail token
+            finalized_score = total_score
+            if relation_length > 0 and tail_tokens:
+                for token in tail_tokens:
+                    finalized_score = finalized_score + attention_scores[token]
+                candidate_paths.extend([SearchContextualRelationship.from_path(path, finalized_score)] * len(tail_tokens))
+
+            valid = selectable.copy()
+            valid[current_token] = False
+            next_tokens = numpy.flatnonzero(valid)
+            if next_tokens.size == 0:
                 continue
-
-            new_paths = []
-            
-            # How all other tokens attend to an entity e.g. "Emily Stanton"
-            # These scores indicate how much importance the model places on each token when considering "Emily Stanton."
-            # The tokens which consider entity "Emily Stanton" important, highlight entity's relationships and relevance within the sentence.
-            
-            attention_scores = attention_matrix[:, current_path.current_token]
-            for i in range(num_initial_tokens, len(attention_scores) - 1):
-                next_path = tuple(current_path.visited_tokens + [i])
-                if is_valid_token(i, entity_pair, candidate_paths, current_path, attention_scores[i].detach()) and next_path not in visited_paths and current_path.current_token != i:
-                    new_paths.append(
-                        copy.deepcopy(current_path)
-                    )
-                    new_paths[-1].add_token(i, attention_scores[i].detach())
-                    visited_paths.add(next_path)
-            new_paths.sort(key=sort_by_mean_score, reverse=True)
-            queue += new_paths[:search_candidates]
+            next_totals = numpy.where(after_tail[next_tokens], finalized_score, total_score).astype(numpy.float32) + attention_scores[next_tokens]
+            next_means = next_totals / (relation_length + 1)
+            for idx in numpy.argsort(-next_means, kind='stable')[:search_candidates]:
+                token = int(next_tokens[idx])
+                if relation_length + 1 > max_relation_length:
+                    continue
+                if require_contiguous and relation_length > 0 and abs(current_token - token) != 1:
+                    continue
+                queue.append((path + (token,), next_totals[idx]))
 
         return candidate_paths
     except Exception as e:
         raise e
-        
 
+
+def as_attention_columns(attention_matrix) -> numpy.ndarray:
+    """
+    Returns the transposed attention matrix as a contiguous float32 NumPy array, so that the
+    attention paid to a token is a contiguous row.
+    """
+    if isinstance(attention_matrix, torch.Tensor):
+        attention_matrix = attention_matrix.detach().cpu().numpy()
+    return numpy.ascontiguousarray(numpy.asarray(attention_matrix, dtype=numpy.float32).T)
@@ -1,6 +1,6 @@
-import json
 from pydantic import BaseModel
 from typing import List, Tuple, Dict
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
 
 """
     A model representing contextual information about a predicate in a knowledge graph.
@@ -72,20 +72,34 @@ class ContextualPredicate(BaseModel):
 
 
 
-def process_data(data: List[List[Tuple[str, str, str, Dict[str, float], str]]], file_path: str) -> List[Tuple[str, str, str]]:
+def process_data(data: List[List[Tuple[str, str, str, Dict[str, float], str]]], file_path: str) -> List[TripleRecord]:
     result = []
     try:
         for inner_list in data:
             for tup in inner_list:
                 if tup:  # Check if tuple is not empty
-                    extended_tup = (*tup, file_path)
-                    # Convert extended tuple to ContextualPredicate object and then to JSON string
-                    context_metadata_str = ContextualPredicate.from_tuple(extended_tup)
-                    context_metadata_str = json.dumps(context_metadata_str.dict(), ensure_ascii=False)
-                    result.append((tup[0], context_metadata_str, tup[2]))
-                    
+                    # Same fields as ContextualPredicate.from_tuple, kept as a record instead of JSON
+                    metadata = tup[3]
+                    result.append(TripleRecord(
+                        tup[0],
+                        tup[2],
+                        context=tup[1],
+                        entity1_score=float(metadata.get('entity1_score', 0.0)),
+                        entity2_score=float(metadata.get('entity2_score', 0.0)),
+                        entity1_label=metadata.get('entity1_label'),
+                        entity2_label=metadata.get('entity2_label'),
+                        entity1_nn_chunk=metadata.get('entity1_nn_chunk'),
+                        entity2_nn_chunk=metadata.get('entity2_nn_chunk'),
+                        entity1_attnscore=metadata.get('entity1_attnscore', 1),
+                        entity2_attnscore=metadata.get('entity2_attnscore', 1),
+                        pair_attnscore=metadata.get('pair_attnscore', 1),
+                        entity1_embedding=metadata.get('entity1_embedding'),
+                        entity2_embedding=metadata.get('entity2_embedding'),
+                        file_path=file_path,
+                        current_sentence=metadata.get('current_sentence'),
+                    ))
+
         return result
     
     except Exception as e:
         raise ValueError(f"Error processing data: {e}")
-
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from cachetools import LRUCache
+from querent.logging.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within the process
+    fcntl = None
+
+"""
+    EmbeddingCache: A content-hash keyed cache for text embeddings.
+
+    Embeddings are keyed by the SHA-1 of the embedding model name and the text, kept in a bounded
+    in-memory LRU and, when a cache directory is given, persisted in an append-only on-disk tier
+    that is read back through a memory map. Re-runs over overlapping corpora therefore skip
+    recomputing embeddings for texts seen before.
+
+    On-disk layout (inside cache_dir):
+        meta.json   : {"model_name": ..., "dimension": ..., "format": 2}
+        index.bin   : records of a 20-byte SHA-1 digest and the little-endian uint64 row of its vector
+        vectors.f32 : float32 rows of `dimension` values
+        lock        : locked while a batch is appended
+
+    Several caches, e.g. one per worker process, can share a directory: a batch is appended while
+    holding an exclusive lock on the directory, its rows are numbered from the current length of
+    vectors.f32 and every index record names its own row, so rows never collide and a batch whose
+    write was interrupted is never indexed. Rows appended by other caches are picked up on a miss.
+
+    Attributes:
+        model_name (str): The embedding model the cached vectors belong to.
+        max_size (int): Maximum number of embeddings kept in memory.
+        cache_dir (str): Directory of the persistent tier, None keeps the cache in memory only.
+        hits (int): Lookups answered from memory.
+        disk_hits (int): Lookups answered from the on-disk tier.
+        misses (int): Lookups that had to be embedded.
+
+    Methods:
+        get_many(texts: List[str]) -> Dict[str, np.ndarray]:
+            Returns the cached embeddings of the given texts, skipping the ones not cached.
+        put_many(texts: List[str], embeddings: np.ndarray):
+            Stores the embeddings of the given texts in memory and on disk.
+        stats() -> dict:
+            Returns the hit/miss counters.
+    """
+
+_DIGEST_SIZE = 20
+_RECORD = struct.Struct("<20sQ")
+_FORMAT = 2
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, max_size: int = 10000, cache_dir: Optional[str] = None):
+        self.logger = setup_logger(__name__, "EmbeddingCache")
+        self.model_name = model_name
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.memory = LRUCache(maxsize=max_size)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._disk_index: Dict[bytes, int] = {}
+        # Bytes of index.bin already read into _disk_index
+        self._index_offset = 0
+        self._dimension: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        if cache_dir:
+            self._open_disk_tier()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _open_disk_tier(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if os.path.exists(self._path("meta.json")):
+                self._read_meta()
+                self._read_index()
+        except Exception as e:
+            self.logger.error(f"Unable to open embedding cache at {self.cache_dir}, using memory only: {e}")
+            self.cache_dir = None
+            self._disk_index = {}
+
+    def _read_meta(self):
+        with open(self._path("meta.json"), "r") as meta_file:
+            meta = json.load(meta_file)
+        if meta.get("model_name") != self.model_name:
+            raise ValueError(
+                f"Cache at {self.cache_dir} holds embeddings of {meta.get('model_name')}, not {self.model_name}"
+            )
+        if meta.get("format") != _FORMAT:
+            raise ValueError(f"Cache at {self.cache_dir} has format {meta.get('format')}, expected {_FORMAT}")
+        self._dimension = int(meta["dimension"])
+
+    def _read_index(self):
+        """Reads the index records appended since the last read, by this or any other cache."""
+        if not os.path.exists(self._path("index.bin")):
+            return
+        with open(self._path("index.bin"), "rb") as index_file:
+            index_file.seek(self._index_offset)
+            records = index_file.read()
+        records = records[:len(records) - len(records) % _RECORD.size]
+        if not records:
+            return
+        self._index_offset += len(records)
+        for key, row in _RECORD.iter_unpack(records):
+            self._disk_index[key] = row
+        self._map_vectors()
+
+    def _map_vectors(self):
+        rows = os.path.getsize(self._path("vectors.f32")) // (4 * self._dimension)
+        if rows == 0:
+            self._vectors = None
+            return
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, self._dimension))
+
+    def _disk_lookup(self, key: bytes) -> Optional[np.ndarray]:
+        row = self._disk_index.get(key)
+        if row is not None and self._vectors is not None and row < len(self._vectors):
+            return np.array(self._vectors[row])
+        return None
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        refreshed = False
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                embedding = self.memory.get(key)
+                if embedding is not None:
+                    self.hits += 1
+                    found[text] = embedding
+                    continue
+                embedding = self._disk_lookup(key) if self.cache_dir else None
+                if embedding is None and self.cache_dir and not refreshed:
+                    # Other caches on the same directory may have stored it since
+                    refreshed = True
+                    self._refresh_index()
+                    embedding = self._disk_lookup(key)
+                if embedding is not None:
+                    self.disk_hits += 1
+                    self.memory[key] = embedding
+                    found[text] = embedding
+                    continue
+                self.misses += 1
+        return found
+
+    def _refresh_index(self):
+        try:
+            if self._dimension is None and os.path.exists(self._path("meta.json")):
+                self._read_meta()
+            if self._dimension is not None:
+                self._read_index()
+        except Exception as e:
+            self.logger.error(f"Unable to read embedding cache index at {self.cache_dir}: {e}")
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        if len(texts) == 0:
+            return
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._lock:
+            new_keys = []
+            new_rows = []
+            for text, embedding in zip(texts, embeddings):
+                key = self._key(text)
+                self.memory[key] = embedding
+                if self.cache_dir and key not in self._disk_index:
+                    new_keys.append(key)
+                    new_rows.append(embedding)
+            if new_keys:
+                self._append_to_disk(new_keys, np.stack(new_rows))
+
+    def _append_to_disk(self, keys: List[bytes], rows: np.ndarray):
+        try:
+            with open(self._path("lock"), "a+b") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._append_locked(keys, rows)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        except Exception as e:
+            self.logger.error(f"Unable to persist embeddings to {self.cache_dir}: {e}")
+
+    def _append_locked(self, keys: List[bytes], rows: np.ndarray):
+        if os.path.exists(self._path("meta.json")):
+            if self._dimension is None:
+                self._read_meta()
+        else:
+            self._dimension = rows.shape[1]
+            with open(self._path("meta.json"), "w") as meta_file:
+                json.dump({"model_name": self.model_name, "dimension": self._dimension, "format": _FORMAT}, meta_file)
+        if rows.shape[1] != self._dimension:
+            raise ValueError(f"Embedding dimension {rows.shape[1]} does not match cache dimension {self._dimension}")
+        # Keys stored by other caches since the last read are not written twice
+        self._read_index()
+        pending = [(key, row) for key, row in zip(keys, rows) if key not in self._disk_index]
+        if not pending:
+            return
+        row_size = 4 * self._dimension
+        # Drop the torn tail of a write that was interrupted, so new rows and records stay aligned
+        with open(self._path("vectors.f32"), "ab") as vectors_file:
+            size = vectors_file.tell()
+            if size % row_size:
+                vectors_file.truncate(size - size % row_size)
+        with open(self._path("index.bin"), "ab") as index_file:
+            size = index_file.tell()
+            if size % _RECORD.size:
+                index_file.truncate(size - size % _RECORD.size)
+        # Vectors are written before the index records that point to them
+        with open(self._path("vectors.f32"), "ab") as vectors_file:
+            start = vectors_file.tell() // row_size
+            vectors_file.write(np.stack([row for _, row in pending]).tobytes())
+        with open(self._path("index.bin"), "ab") as index_file:
+            index_file.write(b"".join(_RECORD.pack(key, start + offset) for offset, (key, _) in enumerate(pending)))
+        self._read_index()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self._disk_index),
+        }
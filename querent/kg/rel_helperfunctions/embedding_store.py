@@ -1,73 +1,84 @@
 import json
+import numpy as np
 from fastembed import TextEmbedding
+from querent.kg.rel_helperfunctions.embedding_cache import EmbeddingCache
 from querent.logging.logger import setup_logger
 
 
 class EmbeddingStore:
-    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", batch_size=256, cache_size=10000, cache_dir=None):
         self.logger = setup_logger("EmbeddingStore_config", "EmbeddingStore")
         try:
             self.model_name = model_name
+            self.batch_size = batch_size
             self.embeddings = TextEmbedding(model_name=model_name)
+            self.cache = EmbeddingCache(model_name, max_size=cache_size, cache_dir=cache_dir) if cache_size else None
         except Exception as e:
             self.logger.error(
                 f"Invalid {self.__class__.__name__} configuration. Failed to initialize EmbeddingStore: {e}"
             )
             raise Exception(f"Failed to initialize EmbeddingStore: {e}")
 
-    def get_embeddings(self, texts):
+    def embed_batch(self, texts, batch_size=None) -> np.ndarray:
+        """
+        Embeds a list of texts with a single fastembed call. Duplicate texts are embedded once and
+        texts found in the embedding cache are not embedded again.
+        Returns a contiguous float32 array with one row per input text.
+        """
         try:
-            embeddings = []
-            for text in texts:
-                embedding_generator = self.embeddings.embed(text)
-                embedding = list(embedding_generator)[0]
-                embeddings.append(embedding.tolist())
-            return embeddings
+            texts = list(texts)
+            if not texts:
+                return np.empty((0, 0), dtype=np.float32)
+            unique_texts = list(dict.fromkeys(texts))
+            cached = self.cache.get_many(unique_texts) if self.cache is not None else {}
+            missing_texts = [text for text in unique_texts if text not in cached]
+            if missing_texts:
+                missing_embeddings = np.asarray(
+                    list(self.embeddings.embed(missing_texts, batch_size=batch_size or self.batch_size)),
+                    dtype=np.float32,
+                )
+                if self.cache is not None:
+                    self.cache.put_many(missing_texts, missing_embeddings)
+                cached.update(zip(missing_texts, missing_embeddings))
+            return np.ascontiguousarray(np.stack([cached[text] for text in texts]), dtype=np.float32)
         except Exception as e:
             self.logger.error(f"Failed to generate embeddings: {e}")
-            raise Exception(f"Failed to generate embeddings: {e}")    
+            raise Exception(f"Failed to generate embeddings: {e}")
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def get_embeddings(self, texts):
+        return self.embed_batch(texts).tolist()
     
     def generate_embeddings(self, payload, relationship_finder=False, generate_embeddings_with_fixed_relationship = False):
+        """
+        Embeds the context, and with `relationship_finder` the predicate, of every triple in
+        `payload`, a list of TripleRecord, and returns the triples with the embeddings set.
+        """
         try:
-            triples = payload
-            processed_pairs = []
-            for entity, json_string, related_entity in triples:
-                try:
-                    json_string = json_string.replace("\n", "")
-                    data = json.loads(json_string)
-                    context = data.get("context", "").replace('"', '\\"')
-                    predicate = data.get("predicate","").replace('"', '\\"')
-                    predicate_type = data.get("predicate_type","Unlabeled").replace('"', '\\"')
-                    subject_type = data.get("subject_type","Unlabeled").replace('"', '\\"')
-                    object_type = data.get("object_type","Unlabeled").replace('"', '\\"')
-                    score = data.get("score")
-                    context_embeddings = None
-                    predicate_embedding = None
-                    context_embeddings = self.get_embeddings([context])[0]
-                    if relationship_finder and generate_embeddings_with_fixed_relationship:
-                        predicate_embedding = self.get_embeddings([predicate + " ("+predicate_type+")"])[0]
-                    elif relationship_finder:
-                        predicate_embedding = self.get_embeddings([predicate_type])[0]
-                    essential_data = {
-                        "context": context,
-                        "context_embeddings": context_embeddings,
-                        "predicate_type": predicate_type,
-                        "predicate": predicate,
-                        "subject_type": subject_type,
-                        "object_type": object_type,
-                        "predicate_emb": predicate_embedding if predicate_embedding is not None else "Not Implemented",
-                        "score":score
-                    }
-                    updated_json_string = json.dumps(essential_data)
-                    processed_pairs.append(
-                        (entity, updated_json_string, related_entity)
-                    )
-                except json.JSONDecodeError as e:
-                    self.logger.debug(
-                        f"JSON parsing error: {e} in string: {json_string}"
-                    )
+            rows = []
+            for triple in payload:
+                rows.append(triple.replace(
+                    context=(triple.context or "").replace('"', '\\"'),
+                    predicate=(triple.predicate or "").replace('"', '\\"'),
+                    predicate_type=(triple.predicate_type or "Unlabeled").replace('"', '\\"'),
+                    subject_type=(triple.subject_type or "Unlabeled").replace('"', '\\"'),
+                    object_type=(triple.object_type or "Unlabeled").replace('"', '\\"'),
+                ))
+            context_embeddings = self.embed_batch([row.context for row in rows])
+            predicate_embeddings = None
+            if relationship_finder and generate_embeddings_with_fixed_relationship:
+                predicate_embeddings = self.embed_batch([row.predicate + " ("+row.predicate_type+")" for row in rows])
+            elif relationship_finder:
+                predicate_embeddings = self.embed_batch([row.predicate_type for row in rows])
 
-            return processed_pairs
+            for idx, row in enumerate(rows):
+                # Rows of the batch arrays, not copies
+                row.context_embeddings = context_embeddings[idx]
+                row.predicate_emb = predicate_embeddings[idx] if predicate_embeddings is not None else None
+
+            return rows
 
         except Exception as e:
             self.logger.error(f"Error in extracting embeddings: {e}")
@@ -75,26 +86,29 @@ class EmbeddingStore:
     def generate_relationship_embeddings(self, payload):
         try:
             relationships = payload
-            processed_pairs = []
+            parsed_relationships = []
 
             for relation in relationships:
                 try:
                     data = json.loads(relation)
-                    predicate_value = data.get("predicate_value", "").replace('"', '\\"')
-                    relationship = data.get("relationship","unlabelled").replace('"', '\\"')
-                    relationship_type = data.get("type").replace('"', '\\"')
-                    predicate_embedding = None
-                    predicate_embedding = self.get_embeddings([predicate_value])[0]
-                    essential_data = {
-                        "predicate_value": predicate_value,
-                        "predicate_emb" : predicate_embedding,
-                        "relationship" : relationship,
-                        "type" : relationship_type
-                    }
-                    updated_json_string = json.dumps(essential_data)
-                    processed_pairs.append((updated_json_string))
+                    parsed_relationships.append({
+                        "predicate_value": data.get("predicate_value", "").replace('"', '\\"'),
+                        "relationship": data.get("relationship","unlabelled").replace('"', '\\"'),
+                        "type": data.get("type").replace('"', '\\"'),
+                    })
                 except json.JSONDecodeError as e:
                     self.logger.debug(f"JSON parsing error while generating embeddings for fixed realtionships: {e} in string.")
+
+            predicate_embeddings = self.embed_batch([data["predicate_value"] for data in parsed_relationships])
+            processed_pairs = []
+            for data, predicate_embedding in zip(parsed_relationships, predicate_embeddings):
+                essential_data = {
+                    "predicate_value": data["predicate_value"],
+                    "predicate_emb" : predicate_embedding,
+                    "relationship" : data["relationship"],
+                    "type" : data["type"]
+                }
+                processed_pairs.append(essential_data)
                     
             return processed_pairs
 
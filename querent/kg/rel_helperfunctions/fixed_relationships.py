@@ -1,6 +1,7 @@
 import re
 from typing import List
 from nltk.corpus import wordnet as wn
+from querent.kg.ner_helperfunctions.spacy_pipeline import SENTENCES, with_profile
 """
     A class designed to extract sentences from text that contain specified fixed relationships,
     taking into account synonyms for more comprehensive matching.
@@ -45,7 +46,7 @@ class FixedRelationshipExtractor:
         return re.compile(r'\b(?:' + combined_pattern + r')\b', re.IGNORECASE)
 
     def find_relationship_sentences(self, text: str, chunk_size=1000) -> str:
-        doc = self.nlp(text)
+        doc = with_profile(self.nlp, SENTENCES)(text)
         relevant_sentences = set()
         prev_sentence = None
 
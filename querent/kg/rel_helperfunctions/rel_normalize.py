@@ -2,7 +2,6 @@ import re
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
-import json
 from querent.logging.logger import setup_logger
 
 """
@@ -43,11 +42,9 @@ from querent.logging.logger import setup_logger
 
         normalize_triples(triples): Normalizes the context within each triple in the given list of triples.
             Parameters:
-                triples (list of tuples): The list of triples to be normalized. Each triple should be in the
-                                          format (entity1, context_json, entity2), where context_json is a JSON
-                                          string containing the context to be normalized.
+                triples (list of TripleRecord): The list of triples to be normalized.
             Returns:
-                list of tuples: The list of normalized triples.
+                list of TripleRecord: The list of normalized triples, with the context normalized.
     """
 
 
@@ -93,12 +90,7 @@ class TextNormalizer:
         try:
             normalized_triples = []
             for triple in triples:
-                entity1, context_json, entity2 = triple
-                context_dict = json.loads(context_json)
-                normalized_context = self.normalize(context_dict['context'])
-                context_dict['context'] = normalized_context
-                normalized_context_json = json.dumps(context_dict)
-                normalized_triples.append((entity1, normalized_context_json, entity2))
+                normalized_triples.append(triple.replace(context=self.normalize(triple.context)))
             return normalized_triples
         except Exception as e:
             self.logger.error(f"Error in normalizing triples: {e}")
@@ -0,0 +1,87 @@
+import numpy as np
+
+"""
+    A compact record for a (subject, predicate, object) triple and its metadata.
+
+    Triples move through the knowledge graph pipeline as TripleRecord instances, from
+    `process_data` through filtering, relationship extraction and embedding, and are only
+    serialized to JSON when their graph and vector events are emitted. Embeddings are kept
+    as float32 NumPy arrays, so stages pass them on without copying them into float lists.
+
+    Attributes:
+    -----------
+    subject, object : str
+        The two entities of the triple.
+    context, current_sentence, file_path : str
+        The sentences the triple was found in and the file they come from.
+    entity1_*, entity2_*, pair_attnscore :
+        Labels, noun chunks, scores and embeddings of the two entities, set when the entity
+        pair is extracted.
+    predicate, predicate_type, subject_type, object_type, score :
+        The relationship, set once it is extracted.
+    context_embeddings, predicate_emb : np.ndarray
+        Embeddings of the context and of the predicate, set by the EmbeddingStore.
+"""
+
+_FIELDS = {
+    "context": "",
+    "current_sentence": "",
+    "file_path": "",
+    "entity1_label": "",
+    "entity2_label": "",
+    "entity1_nn_chunk": "",
+    "entity2_nn_chunk": "",
+    "entity1_score": 0.0,
+    "entity2_score": 0.0,
+    "entity1_attnscore": 1,
+    "entity2_attnscore": 1,
+    "pair_attnscore": 1,
+    "entity1_embedding": None,
+    "entity2_embedding": None,
+    "predicate": "",
+    "predicate_type": "Unlabeled",
+    "subject_type": "Unlabeled",
+    "object_type": "Unlabeled",
+    "score": 1,
+    "context_embeddings": None,
+    "predicate_emb": None,
+}
+_EMBEDDINGS = ("entity1_embedding", "entity2_embedding", "context_embeddings", "predicate_emb")
+
+
+class TripleRecord:
+    __slots__ = ("subject", "object") + tuple(_FIELDS)
+
+    def __init__(self, subject: str, object: str, **fields):
+        self.subject = subject
+        self.object = object
+        for name, default in _FIELDS.items():
+            value = fields.pop(name, default)
+            setattr(self, name, self.as_embedding(value) if name in _EMBEDDINGS else value)
+        if fields:
+            raise TypeError(f"Unknown triple fields: {', '.join(fields)}")
+
+    @staticmethod
+    def as_embedding(value):
+        """Returns `value` as a float32 array, without a copy when it already is one."""
+        if value is None:
+            return None
+        if hasattr(value, "detach"):
+            value = value.detach().cpu().numpy()
+        return np.asarray(value, dtype=np.float32)
+
+    def replace(self, **fields) -> "TripleRecord":
+        """Returns a copy of the record with `fields` changed; embeddings are shared, not copied."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields)
+        return TripleRecord(**values)
+
+    def to_dict(self) -> dict:
+        data = {"subject": self.subject, "object": self.object}
+        for name in _FIELDS:
+            value = getattr(self, name)
+            data[name] = value.tolist() if isinstance(value, np.ndarray) else value
+        return data
+
+    def __repr__(self):
+        return f"TripleRecord({self.subject!r}, {self.predicate!r}, {self.object!r})"
@@ -1,16 +1,15 @@
-import json
 import re
 import numpy as np
 """
     A class to convert triples into different JSON formats.
 
-    This class provides static methods to convert triples (a tuple of subject, predicate, and object)
-    into specific JSON structures suitable for graph and vector space representations.
+    This class provides static methods to convert triples (TripleRecord instances of subject, predicate,
+    and object) into specific JSON structures suitable for graph and vector space representations.
+    This is the only place triples are serialized, when their events are emitted.
 
     Methods:
     - _normalize_text(text, replace_space=False): Normalizes the text by converting it to lowercase
       and optionally replacing spaces with underscores.
-    - _parse_json_str(json_str): Parses a JSON string and returns a Python dictionary.
     - convert_graphjson(triple): Converts a triple into a JSON object suitable for graph representation.
     - convert_vectorjson(triple): Converts a triple into a JSON object suitable for vector space representation.
     """
@@ -23,31 +22,22 @@ class TripleToJsonConverter:
             normalized_text = TripleToJsonConverter.replace_special_chars_with_underscore(normalized_text)
         return normalized_text
 
-    @staticmethod
-    def _parse_json_str(json_str):
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Error decoding JSON: {e}")
-
     @staticmethod
     def convert_graphjson(triple, event_id = None):
         try:
-            subject, json_str, object_ = triple
-            predicate_info = TripleToJsonConverter._parse_json_str(json_str)
-            if predicate_info is None:
+            if triple is None:
                 return {}
 
             json_object = {
                 "event_id": event_id,
-                "subject": TripleToJsonConverter._normalize_text(subject, replace_space=True),
-                "subject_type": TripleToJsonConverter._normalize_text(predicate_info.get("subject_type", "Unlabeled"), replace_space=True),
-                "object": TripleToJsonConverter._normalize_text(object_, replace_space=True),
-                "object_type": TripleToJsonConverter._normalize_text(predicate_info.get("object_type", "Unlabeled"), replace_space=True),
-                "predicate": TripleToJsonConverter._normalize_text(predicate_info.get("predicate", ""), replace_space=True),
-                "predicate_type": TripleToJsonConverter._normalize_text(predicate_info.get("predicate_type", "Unlabeled"), replace_space=True),
-                "sentence": predicate_info.get("context", "").lower(),
-                "score": predicate_info.get("score", 1)
+                "subject": TripleToJsonConverter._normalize_text(triple.subject, replace_space=True),
+                "subject_type": TripleToJsonConverter._normalize_text(triple.subject_type, replace_space=True),
+                "object": TripleToJsonConverter._normalize_text(triple.object, replace_space=True),
+                "object_type": TripleToJsonConverter._normalize_text(triple.object_type, replace_space=True),
+                "predicate": TripleToJsonConverter._normalize_text(triple.predicate, replace_space=True),
+                "predicate_type": TripleToJsonConverter._normalize_text(triple.predicate_type, replace_space=True),
+                "sentence": triple.context.lower(),
+                "score": triple.score
             }
 
             return json_object
@@ -70,19 +60,17 @@ class TripleToJsonConverter:
     @staticmethod
     def convert_vectorjson(triple, blob = None, embeddings=None, event_id = None):
         try:
-            subject, json_str, object_ = triple
-            data = TripleToJsonConverter._parse_json_str(json_str)
-            if data is None:
+            if triple is None:
                 return {}
 
-            id_format = f"{TripleToJsonConverter._normalize_text(subject,replace_space=True)}-{TripleToJsonConverter._normalize_text(data.get('predicate', ''),replace_space=True)}-{TripleToJsonConverter._normalize_text(object_,replace_space=True)}"
+            id_format = f"{TripleToJsonConverter._normalize_text(triple.subject,replace_space=True)}-{TripleToJsonConverter._normalize_text(triple.predicate,replace_space=True)}-{TripleToJsonConverter._normalize_text(triple.object,replace_space=True)}"
             json_object = {
                 "event_id": event_id,
                 "id": TripleToJsonConverter._normalize_text(id_format),
                 "embeddings": embeddings.tolist(),
-                "size": len(embeddings.tolist()),
-                "namespace": TripleToJsonConverter._normalize_text(data.get("predicate", ""),replace_space=True),
-                "sentence": data.get("context", "").lower(),
+                "size": len(embeddings),
+                "namespace": TripleToJsonConverter._normalize_text(triple.predicate,replace_space=True),
+                "sentence": triple.context.lower(),
                 "blob": blob,
             }
 
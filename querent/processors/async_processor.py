@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class AsyncProcessor(ABC):
     @abstractmethod
     async def process_text(self, data: str) -> str:
         raise NotImplementedError
+
+    async def process_texts(self, data: List[str]) -> List[str]:
+        """Processes many chunks in one call; processors override it when they can batch."""
+        return [await self.process_text(text) for text in data]
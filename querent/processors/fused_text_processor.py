@@ -0,0 +1,45 @@
+from typing import List, Optional
+from unidecode import unidecode
+
+from querent.processors.async_processor import AsyncProcessor
+from querent.processors.text_cleanup_processor import clean_text
+from querent.processors.text_processor import join_split_words
+from querent.processors.vocabulary import load_english_vocabulary
+from querent.logging.logger import setup_logger
+
+
+class FusedTextProcessor(AsyncProcessor):
+    """
+    Does the work of TextCleanupProcessor followed by TextProcessor in one processor.
+
+    The cleanup is one translation over the text plus one regex pass for escape sequences,
+    ASCII text skips transliteration, and words split apart by extraction are joined against
+    a vocabulary loaded once per process. `process_texts` cleans many chunks per call.
+    """
+
+    def __init__(self, vocabulary_path: Optional[str] = None):
+        self.english_vocab = load_english_vocabulary(vocabulary_path)
+        self.logger = setup_logger(__name__, "FusedTextProcessor")
+
+    def clean(self, data: str) -> str:
+        if not data:
+            return data
+        text = clean_text(data)
+        if not text.isascii():
+            # Transliteration can produce quotes again, e.g. from double primes
+            text = unidecode(text).replace('"', " ")
+        return " ".join(join_split_words(text.split(), self.english_vocab))
+
+    async def process_text(self, data: str) -> str:
+        try:
+            return self.clean(data)
+        except Exception as e:
+            self.logger.error(f"Exception while processing data {e}")
+            return ""
+
+    async def process_texts(self, data: List[str]) -> List[str]:
+        try:
+            return [self.clean(text) for text in data]
+        except Exception as e:
+            self.logger.error(f"Exception while processing data {e}")
+            return [await self.process_text(text) for text in data]
@@ -3,16 +3,33 @@ import re
 from querent.processors.async_processor import AsyncProcessor
 from querent.logging.logger import setup_logger
 
+# Quotes and control characters are dropped, line breaks and tabs become spaces
+CLEANUP_TABLE = str.maketrans(
+    {
+        **{chr(code): None for code in [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)]},
+        '"': None,
+        "“": None,
+        "”": None,
+        "\n": " ",
+        "\r": " ",
+        "\t": " ",
+    }
+)
+# Escape sequences left as text by extractors: \n and \t become spaces, \xHH is dropped
+ESCAPE_PATTERN = re.compile(r"\\[nt]|\\x[0-9a-fA-F]{2}")
+
+
+def _replace_escape(match: re.Match) -> str:
+    return " " if len(match.group()) == 2 else ""
+
+
+def clean_text(data: str) -> str:
+    return ESCAPE_PATTERN.sub(_replace_escape, data.translate(CLEANUP_TABLE))
+
 
 class TextCleanupProcessor(AsyncProcessor):
     def __init__(self):
         self.logger = setup_logger(__name__, "TextCleanupProcessor")
 
     async def process_text(self, data: str) -> str:
-        data = data.replace("\"", "").replace('\“', '').replace('\”', '')
-        data = data.replace("\\n", " ").replace("\\t", " ")
-        data = re.sub(r'\\x[0-9a-fA-F]{2}', '', data)
-        data = data.replace("\n", " ").replace("\r", " ").replace("\t", " ")
-        data = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]+', '', data)
-
-        return data
\ No newline at end of file
+        return clean_text(data)
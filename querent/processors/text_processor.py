@@ -1,15 +1,40 @@
+from typing import FrozenSet, List, Optional
 from unidecode import unidecode
-import nltk
-from nltk.corpus import words
 
 from querent.processors.async_processor import AsyncProcessor
+from querent.processors.vocabulary import load_english_vocabulary
 from querent.logging.logger import setup_logger
 
 
+def join_split_words(words_in_line: List[str], vocabulary: FrozenSet[str]) -> List[str]:
+    """
+    Joins words that extraction split apart: a word is joined with its neighbour when the
+    combined form is in the vocabulary and neither of the two words is.
+    """
+    valid = [word.lower() in vocabulary for word in words_in_line]
+    joined = []
+    i = 0
+    while i < len(words_in_line):
+        word = words_in_line[i]
+        # Check if next word exists
+        if i + 1 < len(words_in_line) and i > 0:
+            next_word = words_in_line[i + 1]
+            prev_word = words_in_line[i - 1]
+            if not (valid[i] or valid[i + 1]) and (word + next_word).lower() in vocabulary:
+                word = word + next_word
+                i += 1
+            elif not (valid[i] or valid[i - 1]) and (prev_word + word).lower() in vocabulary:
+                # The previous word is replaced by the word formed with it
+                word = prev_word + word
+                joined.pop()
+        joined.append(word)
+        i += 1
+    return joined
+
+
 class TextProcessor(AsyncProcessor):
-    def __init__(self):
-        nltk.download("words")
-        self.english_vocab = set(w.lower() for w in words.words())
+    def __init__(self, vocabulary_path: Optional[str] = None):
+        self.english_vocab = load_english_vocabulary(vocabulary_path)
         self.logger = setup_logger(__name__, "TextProcessor")
 
     async def process_text(self, data: str) -> str:
@@ -22,41 +47,7 @@ class TextProcessor(AsyncProcessor):
             lines = text.split("\n")
             for index, line in enumerate(lines):
                 words_in_line = line.split()
-                i = 0
-                new_line = ""
-                while i < len(words_in_line):
-                    word = words_in_line[i]
-                    # Check if next word exists
-                    if i + 1 < len(words_in_line) and i > 0:
-                        next_word = words_in_line[i + 1]
-                        prev_word = words_in_line[i - 1]
-                        combined_next_word = word + next_word
-                        combined_prev_word = prev_word + word
-                        # Join words only if the combined form is valid and neither of the individual words is valid
-                        if self.is_valid_word(combined_next_word) and not (
-                            self.is_valid_word(word) or self.is_valid_word(next_word)
-                        ):
-                            word = combined_next_word
-                            i += 1
-                        elif self.is_valid_word(combined_prev_word) and not (
-                            self.is_valid_word(word) or self.is_valid_word(prev_word)
-                        ):
-                            # If individual word formed after joining current word and previous word is valid, then delete the previous word and replace it with new word
-
-                            word = combined_prev_word
-                            last_space_index = new_line.rfind(" ")
-                            if last_space_index != -1:
-                                second_last_space_index = new_line.rfind(
-                                    " ", 0, last_space_index
-                                )
-                                if second_last_space_index == -1:
-                                    second_last_space_index = 0
-                                new_line = (
-                                    new_line[:second_last_space_index]
-                                    + new_line[last_space_index:]
-                                )
-                    new_line += word + " "
-                    i += 1
+                new_line = " ".join(join_split_words(words_in_line, self.english_vocab)) + " "
 
                 if (
                     len(line) > 3
@@ -74,9 +65,7 @@ class TextProcessor(AsyncProcessor):
 
                 processed_lines.append(new_line.strip().replace("\"", " "))
 
-                res = " ".join(processed_lines)
-
-            return res
+            return " ".join(processed_lines)
         except Exception as e:
             self.logger.error(f"Exception while processing data {e}")
             return ""
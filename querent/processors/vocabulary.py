@@ -0,0 +1,39 @@
+import threading
+from typing import Dict, FrozenSet, Optional
+
+import nltk
+
+from querent.logging.logger import setup_logger
+
+_vocabularies: Dict[Optional[str], FrozenSet[str]] = {}
+_lock = threading.Lock()
+logger = setup_logger(__name__, "Vocabulary")
+
+
+def load_english_vocabulary(path: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Lowercased English words, loaded once per process and shared by every text processor.
+
+    The words are read from `path`, one per line, when it is given, and otherwise from the NLTK
+    words corpus on the local NLTK data path. The corpus is only downloaded when it is missing there.
+    """
+    with _lock:
+        vocabulary = _vocabularies.get(path)
+        if vocabulary is None:
+            vocabulary = _read_vocabulary(path)
+            _vocabularies[path] = vocabulary
+        return vocabulary
+
+
+def _read_vocabulary(path: Optional[str]) -> FrozenSet[str]:
+    if path:
+        with open(path, "r", encoding="utf-8") as vocabulary_file:
+            return frozenset(line.strip().lower() for line in vocabulary_file if line.strip())
+    try:
+        nltk.data.find("corpora/words")
+    except LookupError:
+        logger.info("NLTK words corpus not found locally, downloading it")
+        nltk.download("words", quiet=True)
+    from nltk.corpus import words
+
+    return frozenset(word.lower() for word in words.words())
@@ -13,8 +13,7 @@ from querent.querent.querent import Querent
 from querent.querent.resource_manager import ResourceManager
 from querent.common.types.ingested_tokens import IngestedTokens
 from querent.workflow._helpers import *
-from querent.processors.text_cleanup_processor import TextCleanupProcessor
-from querent.processors.text_processor import TextProcessor
+from querent.processors.fused_text_processor import FusedTextProcessor
 import os
 import nltk
 from querent.logging.logger import setup_logger
@@ -44,14 +43,14 @@ async def start_collectors(config: Config, result_queue: QuerentQueue):
     for collector in collectors:
         await collector.connect()
 
-    text_cleanup_processor = TextCleanupProcessor()
-    text_processor = TextProcessor()
+    # Cleanup and word joining in one processor, with the vocabulary loaded once
+    text_processor = FusedTextProcessor()
 
     ingestor_factory_manager = IngestorFactoryManager(
         collectors=collectors,
         result_queue=result_queue,
         tokens_feader=None,
-        processors=[text_cleanup_processor, text_processor]
+        processors=[text_processor]
     )
 
     ingest_task = asyncio.create_task(ingestor_factory_manager.ingest_all_async())
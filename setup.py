@@ -166,7 +166,7 @@ setup(
         "Typing :: Typed",
     ],
     python_requires=">=3.10, <3.11",
-    packages=find_packages(exclude=("tests", "tests.*")),
+    packages=find_packages(exclude=("tests", "tests.*", "benchmarks", "benchmarks.*")),
     install_requires=requirements,
     license="Business Source License 1.1",
 )
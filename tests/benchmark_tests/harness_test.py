@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.cases import ingest_case
+from benchmarks.harness import (
+    BenchmarkCase,
+    EnvironmentMismatch,
+    SkipBenchmark,
+    compare,
+    load_results,
+    results_document,
+    run_cases,
+    write_results,
+)
+
+
+def _document(p50, p95, params=None, skipped=None, thresholds=None):
+    document = {"results": {"case": {"p50_ms": p50, "p95_ms": p95, "params": params or {}, "skipped": skipped}}}
+    if thresholds:
+        document["thresholds"] = thresholds
+    return document
+
+
+def test_compare_flags_latencies_over_the_threshold():
+    baseline = _document(10.0, 20.0, thresholds={"default": 0.25, "case": 0.5})
+    comparisons = {c.metric: c for c in compare(_document(14.0, 31.0), baseline)}
+    assert not comparisons["p50_ms"].regressed
+    assert comparisons["p95_ms"].regressed
+    assert comparisons["p95_ms"].change == pytest.approx(0.55)
+    assert all(c.regressed for c in compare(_document(14.0, 31.0), baseline, threshold=0.1))
+    # Skipped cases and cases run with other params are not compared
+    assert compare(_document(50.0, 90.0, params={"sentences": 8}), baseline) == []
+    assert compare(_document(None, None, skipped="no model"), baseline) == []
+
+
+def test_compare_refuses_a_baseline_from_another_environment():
+    metadata = {"python": "3.10.13", "system": "Linux", "machine": "x86_64", "cpu_count": 8, "torch_threads": 8}
+    baseline = {**_document(10.0, 20.0), "metadata": metadata}
+    # Patch releases of Python are comparable
+    assert len(compare({**_document(10.0, 20.0), "metadata": {**metadata, "python": "3.10.14"}}, baseline)) == 2
+    other_host = {**_document(10.0, 20.0), "metadata": {**metadata, "cpu_count": 1, "torch_threads": 1}}
+    with pytest.raises(EnvironmentMismatch, match="cpu_count 8 != 1"):
+        compare(other_host, baseline)
+    with pytest.warns(UserWarning, match="torch_threads 8 != 1"):
+        assert len(compare(other_host, baseline, allow_environment_mismatch=True)) == 2
+
+
+def test_run_cases_times_and_records_skips(tmp_path):
+    async def sleep_free():
+        return None
+
+    def missing():
+        raise SkipBenchmark("no model")
+
+    cases = [
+        BenchmarkCase("sync", "unit", lambda: lambda: sum(range(100)), items=lambda: 100, unit="numbers", params={"n": 100}),
+        BenchmarkCase("async", "unit", lambda: sleep_free),
+        BenchmarkCase("missing", "unit", missing),
+    ]
+    results = {result.name: result for result in run_cases(cases, iterations=5, warmup=1, min_time=0)}
+    assert results["sync"].iterations == 5
+    assert results["sync"].min_ms <= results["sync"].p50_ms <= results["sync"].p95_ms
+    assert results["sync"].throughput_per_s > 0
+    assert results["async"].p50_ms is not None
+    assert results["missing"].skipped == "no model" and results["missing"].p50_ms is None
+
+    path = str(tmp_path / "results.json")
+    write_results(path, results_document(list(results.values())))
+    document = load_results(path)
+    assert document["results"]["sync"]["params"] == {"n": 100}
+    assert sorted(c.name for c in compare(document, document)) == ["async", "async", "sync", "sync"]
+
+
+def test_csv_ingest_case_runs_offline():
+    (result,) = run_cases([ingest_case("ingest.csv", "csv", "csv/demo_data.csv")], iterations=2, warmup=0, min_time=0)
+    assert result.skipped is None
+    assert result.unit == "MB" and result.items_per_call > 0
@@ -1,4 +1,10 @@
 import asyncio
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
 
 from querent.config.collector.collector_config import S3CollectConfig
 from querent.collectors.collector_resolver import CollectorResolver
@@ -67,5 +73,125 @@ async def test_aws_collector(aws_config):
     await poll_and_print()
 
 
+
+class LocalS3Handler(BaseHTTPRequestHandler):
+    """Just enough of the S3 API (paginated ListObjectsV2 and ranged GetObject) for the collector."""
+
+    objects = {}
+    page_size = 2
+    ranged_requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        bucket, _, key = url.path.lstrip("/").partition("/")
+        if key:
+            self.get_object(key)
+        else:
+            self.list_objects(parse_qs(url.query))
+
+    def list_objects(self, query):
+        prefix = query.get("prefix", [""])[0]
+        delimiter = query.get("delimiter", [""])[0]
+        start = int(query.get("continuation-token", ["0"])[0])
+        keys = sorted(key for key in self.objects if key.startswith(prefix))
+        if delimiter:
+            keys = [key for key in keys if delimiter not in key[len(prefix):]]
+        page = keys[start : start + self.page_size]
+        truncated = start + self.page_size < len(keys)
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(self.objects[key])}</Size>"
+            f"<ETag>&quot;{hashlib.md5(self.objects[key]).hexdigest()}&quot;</ETag>"
+            "<LastModified>2024-01-01T00:00:00.000Z</LastModified></Contents>"
+            for key in page
+        )
+        token = f"<NextContinuationToken>{start + self.page_size}</NextContinuationToken>" if truncated else ""
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<Name>bucket</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>"
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>{token}{contents}</ListBucketResult>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_object(self, key):
+        data = self.objects[key]
+        byte_range = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if byte_range:
+            start, end = int(byte_range.group(1)), int(byte_range.group(2))
+            self.ranged_requests.append((key, start, end))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            data = data[start : end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def local_s3():
+    LocalS3Handler.objects = {
+        "docs/a.txt": b"first document",
+        "docs/b.txt": b"second document",
+        "docs/c.txt": b"third document",
+        "docs/nested/d.txt": b"nested document",
+        "docs/large.bin": bytes(range(256)) * 40,
+        "other/e.txt": b"outside the prefix",
+    }
+    LocalS3Handler.ranged_requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalS3Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_aws_collector_pages_listing_and_fetches_large_objects_in_ranges(local_s3):
+    config = S3CollectConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "bucket": "bucket",
+            "region": "us-east-1",
+            "access_key": "access",
+            "secret_key": "secret",
+            "chunk": "4",
+            "name": "AWS-config",
+            "config": {
+                "endpoint_url": local_s3,
+                "delimiter": "/",
+                "multipart_threshold": "4096",
+                "multipart_chunksize": "1000",
+            },
+            "backend": "s3",
+            "uri": "s3://",
+        },
+    )
+    collector = AWSCollectorFactory().resolve(Uri("s3://bucket/docs/"), config)
+    await collector.connect()
+
+    contents = {}
+    async for result in collector.poll():
+        assert not result.is_error()
+        if not result.eof:
+            contents[result.file] = contents.get(result.file, b"") + bytes(result.data)
+
+    expected = {
+        key: data
+        for key, data in LocalS3Handler.objects.items()
+        if key.startswith("docs/") and "/" not in key[len("docs/"):]
+    }
+    assert contents == expected
+    assert sorted(LocalS3Handler.ranged_requests)[0] == ("docs/large.bin", 0, 999)
+    assert len(LocalS3Handler.ranged_requests) == 11
+
 if __name__ == "__main__":
     asyncio.run(test_aws_collector())
@@ -0,0 +1,48 @@
+import asyncio
+import time
+import pytest
+from querent.collectors.collector_runtime import CollectorRuntime
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_do_not_stall_the_event_loop():
+    runtime = CollectorRuntime(max_workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        runtime.run(time.sleep, 0.2), runtime.run(lambda: time.sleep(0.2) or "done")
+    )
+    ticker_task.cancel()
+    runtime.close()
+
+    assert results == [None, "done"]
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_iterate_prefetches_blocking_iterables_in_order():
+    runtime = CollectorRuntime(max_workers=1, prefetch=3)
+
+    def pages():
+        for page in range(5):
+            time.sleep(0.01)
+            yield page
+        raise ValueError("listing failed")
+
+    received = []
+    with pytest.raises(ValueError):
+        async for page in runtime.iterate(pages()):
+            received.append(page)
+    runtime.close()
+
+    assert received == [0, 1, 2, 3, 4]
+    # The runtime can be used again after being closed
+    assert await runtime.run(sum, [1, 2, 3]) == 6
+    runtime.close()
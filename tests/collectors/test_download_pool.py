@@ -0,0 +1,120 @@
+import asyncio
+import time
+import pytest
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
+
+
+def slow_object(name, chunks=3, delay=0.05, fail=False):
+    def open():
+        def read():
+            for i in range(chunks):
+                time.sleep(delay)
+                if fail and i == 1:
+                    raise IOError(f"{name} failed")
+                yield f"{name}:{i};".encode()
+
+        return read()
+
+    return DownloadItem(file=name, open=open, doc_source="memory://bucket")
+
+
+async def collect(pool, items):
+    files = {}
+    order = []
+    errors = []
+    async for collected_bytes in pool.download(items):
+        if collected_bytes.is_error():
+            errors.append(collected_bytes.file)
+        elif collected_bytes.eof:
+            order.append(collected_bytes.file)
+        else:
+            files[collected_bytes.file] = files.get(collected_bytes.file, b"") + collected_bytes.data
+    return files, order, errors
+
+
+@pytest.mark.asyncio
+async def test_downloads_run_concurrently_and_keep_listing_order():
+    runtime = CollectorRuntime(max_workers=8)
+    pool = DownloadPool(runtime, max_in_flight=8, byte_budget=1024)
+    names = [f"object{i}" for i in range(8)]
+
+    start = time.time()
+    files, order, errors = await collect(pool, [slow_object(name) for name in names])
+    elapsed = time.time() - start
+    runtime.close()
+
+    assert order == names
+    assert errors == []
+    assert files["object3"] == b"object3:0;object3:1;object3:2;"
+    # Sequential downloads would take 8 * 3 * 0.05s
+    assert elapsed < 0.8
+
+
+@pytest.mark.asyncio
+async def test_failed_download_does_not_stop_the_others():
+    runtime = CollectorRuntime(max_workers=2)
+    pool = DownloadPool(runtime, max_in_flight=2, byte_budget=16, ordered=False)
+    items = [slow_object("a"), slow_object("b", fail=True), slow_object("c")]
+
+    files, order, errors = await collect(pool, items)
+    runtime.close()
+
+    assert sorted(order) == ["a", "b", "c"]
+    assert errors == ["b"]
+    assert files["c"] == b"c:0;c:1;c:2;"
+    assert pool._buffered == 0
+
+
+class CountingRuntime(CollectorRuntime):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def run(self, func, *args, **kwargs):
+        self.calls += 1
+        return await super().run(func, *args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_pulled_in_blocks():
+    runtime = CountingRuntime(max_workers=2)
+    pool = DownloadPool(runtime, max_in_flight=1, byte_budget=1024, block_size=40)
+    item = slow_object("object", chunks=30, delay=0)
+
+    files, order, errors = await collect(pool, [item])
+    runtime.close()
+
+    assert files["object"] == b"".join(f"object:{i};".encode() for i in range(30))
+    assert order == ["object"] and errors == []
+    # One call to open the object, then one per 40 byte block of its 9 to 10 byte chunks
+    assert runtime.calls == 1 + 8
+
+
+@pytest.mark.asyncio
+async def test_cancelled_download_closes_its_source():
+    runtime = CollectorRuntime(max_workers=2)
+    pool = DownloadPool(runtime, max_in_flight=2, byte_budget=8, block_size=8)
+    closed = []
+
+    def open():
+        def read():
+            try:
+                for i in range(100):
+                    time.sleep(0.01)
+                    yield f"chunk {i};".encode()
+            finally:
+                closed.append(True)
+
+        return read()
+
+    downloads = pool.download([DownloadItem(file="big", open=open, doc_source="memory://bucket")])
+    first = await downloads.__anext__()
+    assert first.data == b"chunk 0;"
+    await downloads.aclose()
+    for _ in range(50):
+        if closed:
+            break
+        await asyncio.sleep(0.02)
+    runtime.close()
+    assert closed == [True]
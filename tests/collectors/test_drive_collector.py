@@ -1,7 +1,13 @@
 import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 import pytest
 import os
 from querent.collectors.collector_resolver import CollectorResolver
+from querent.collectors.drive.google_drive_collector import DriveCollector
 from querent.config.collector.collector_config import DriveCollectorConfig
 from querent.common.uri import Uri
 import uuid
@@ -51,5 +57,212 @@ async def test_google_drive_collector(drive_config):
     await poll_and_print()
 
 
+class LocalDriveHandler(BaseHTTPRequestHandler):
+    """Just enough of the Drive v3 API (paged files.list, media downloads, exports and changes) for the collector."""
+
+    files = {}
+    contents = {}
+    changes = []
+    page_size = 2
+    requests = []
+    missing = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path[len("/drive/v3/"):]
+        self.requests.append((path, query))
+        if path == "files":
+            self.list_files(query)
+        elif path == "changes/startPageToken":
+            self.send_json({"startPageToken": str(len(self.changes))})
+        elif path == "changes":
+            self.list_changes(query)
+        elif path.endswith("/export"):
+            file_id = path.split("/")[1]
+            self.send_content(f"exported {query['mimeType']}".encode() + self.contents[file_id])
+        elif path.split("/")[1] in self.missing:
+            self.send_response(404)
+            self.end_headers()
+        else:
+            self.send_content(self.contents[path.split("/")[1]])
+
+    def list_files(self, query):
+        folder = re.search(r"'([^']+)' in parents", query["q"]).group(1)
+        matches = [file for file in self.files.values() if folder in file["parents"] and not file["trashed"]]
+        start = int(query.get("pageToken", "0"))
+        page = {"files": matches[start : start + self.page_size]}
+        if start + self.page_size < len(matches):
+            page["nextPageToken"] = str(start + self.page_size)
+        self.send_json(page)
+
+    def list_changes(self, query):
+        start = int(query["pageToken"])
+        page = {"changes": self.changes[start : start + self.page_size]}
+        if start + self.page_size < len(self.changes):
+            page["nextPageToken"] = str(start + self.page_size)
+        else:
+            page["newStartPageToken"] = str(len(self.changes))
+        self.send_json(page)
+
+    def send_json(self, body):
+        self.send_content(json.dumps(body).encode(), "application/json")
+
+    def send_content(self, data, content_type="application/octet-stream"):
+        byte_range = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if byte_range:
+            start, end = int(byte_range.group(1)), min(int(byte_range.group(2)), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            data = data[start : end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def drive_file(file_id, name, content, mime_type="application/pdf", parents=("folder",), version="1"):
+    LocalDriveHandler.contents[file_id] = content
+    return {
+        "id": file_id,
+        "name": name,
+        "mimeType": mime_type,
+        "size": str(len(content)),
+        "version": version,
+        "parents": list(parents),
+        "trashed": False,
+    }
+
+
+@pytest.fixture
+def local_drive():
+    LocalDriveHandler.contents = {}
+    LocalDriveHandler.files = {
+        file["id"]: file
+        for file in [
+            drive_file("a", "a.pdf", b"first document, long enough for several chunks"),
+            drive_file("b", "b.pdf", b"second document"),
+            drive_file("c", "c.pdf", b"third document"),
+            drive_file("d", "notes", b" of the notes", mime_type="application/vnd.google-apps.document"),
+            drive_file("e", "subfolder", b"", mime_type="application/vnd.google-apps.folder"),
+            drive_file("f", "f.pdf", b"outside the folder", parents=("other",)),
+        ]
+    }
+    LocalDriveHandler.changes = [{"fileId": "z", "removed": True}]
+    LocalDriveHandler.requests = []
+    LocalDriveHandler.missing = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalDriveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/drive/v3/"
+    server.shutdown()
+
+
+async def collect_drive(config, errors=None):
+    collector = DriveCollector(config)
+    await collector.connect()
+    contents, deleted = {}, []
+    async for result in collector.poll():
+        if result.is_error():
+            assert errors is not None
+            errors.append(result.file)
+        elif result.is_deleted():
+            deleted.append(result.file)
+        elif not result.eof:
+            contents[result.file] = contents.get(result.file, b"") + bytes(result.data)
+    return contents, deleted
+
+
+def incremental_config(local_drive, tmp_path):
+    return DriveCollectorConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "drive_refresh_token": "refresh",
+            "drive_token": "token",
+            "drive_scopes": "https://www.googleapis.com/auth/drive.readonly",
+            "chunk_size": "8",
+            "drive_client_id": "client",
+            "drive_client_secret": "secret",
+            "folder_to_crawl": "folder",
+            "name": "Drive-config",
+            "config": {
+                "drive_api_endpoint": local_drive,
+                "drive_changes_file": str(tmp_path / "drive_changes.json"),
+                "sync_manifest": str(tmp_path / "manifest.json"),
+                "sync_tombstones": "true",
+                "download_concurrency": "3",
+            },
+            "uri": "drive://",
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_drive_collector_pages_listing_and_syncs_changes(local_drive, tmp_path):
+    config = incremental_config(local_drive, tmp_path)
+    contents, deleted = await collect_drive(config)
+    exported = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    assert contents == {
+        "a.pdf": LocalDriveHandler.contents["a"],
+        "b.pdf": LocalDriveHandler.contents["b"],
+        "c.pdf": LocalDriveHandler.contents["c"],
+        "notes": f"exported {exported}".encode() + LocalDriveHandler.contents["d"],
+    }
+    assert deleted == []
+    listings = [query for path, query in LocalDriveHandler.requests if path == "files"]
+    assert [query.get("pageToken") for query in listings] == [None, "2", "4"]
+    assert listings[0]["q"] == "trashed = false and 'folder' in parents"
+
+    # Later runs only read the changes feed
+    LocalDriveHandler.requests = []
+    LocalDriveHandler.files["a"] = drive_file("a", "a.pdf", b"first document, edited", version="2")
+    LocalDriveHandler.changes += [
+        {"fileId": "a", "removed": False, "file": LocalDriveHandler.files["a"]},
+        {"fileId": "b", "removed": True},
+        {"fileId": "c", "removed": False, "file": dict(LocalDriveHandler.files["c"], parents=["other"])},
+        {"fileId": "g", "removed": False, "file": drive_file("g", "g.pdf", b"elsewhere", parents=("other",))},
+    ]
+    contents, deleted = await collect_drive(config)
+    assert contents == {"a.pdf": b"first document, edited"}
+    assert sorted(deleted) == ["b.pdf", "c.pdf"]
+    assert not any(path == "files" for path, _ in LocalDriveHandler.requests)
+
+    # Nothing changed since
+    LocalDriveHandler.requests = []
+    assert await collect_drive(config) == ({}, [])
+    assert [query["pageToken"] for path, query in LocalDriveHandler.requests] == ["5"]
+
+
+@pytest.mark.asyncio
+async def test_drive_changes_that_fail_to_download_are_read_again(local_drive, tmp_path):
+    config = incremental_config(local_drive, tmp_path)
+    await collect_drive(config)
+
+    LocalDriveHandler.files["a"] = drive_file("a", "a.pdf", b"first document, edited", version="2")
+    LocalDriveHandler.files["b"] = drive_file("b", "b.pdf", b"second document, edited", version="2")
+    LocalDriveHandler.changes += [
+        {"fileId": "a", "removed": False, "file": LocalDriveHandler.files["a"]},
+        {"fileId": "b", "removed": False, "file": LocalDriveHandler.files["b"]},
+    ]
+    LocalDriveHandler.missing = {"a"}
+    errors = []
+    contents, _ = await collect_drive(config, errors)
+    assert errors == ["a.pdf"]
+    assert contents == {"b.pdf": b"second document, edited"}
+
+    # The token was kept, so the failed change is read again; b is skipped by the manifest
+    LocalDriveHandler.missing = set()
+    LocalDriveHandler.requests = []
+    assert await collect_drive(config) == ({"a.pdf": b"first document, edited"}, [])
+    assert [query["pageToken"] for path, query in LocalDriveHandler.requests if path == "changes"] == ["1"]
+    LocalDriveHandler.requests = []
+    assert await collect_drive(config) == ({}, [])
+    assert [query["pageToken"] for path, query in LocalDriveHandler.requests if path == "changes"] == ["3"]
+
+
 if __name__ == "__main__":
     asyncio.run(test_google_drive_collector())
@@ -1,7 +1,12 @@
 import asyncio
+import json
+import re
+import socketserver
+import threading
 import pytest
 import os
 from querent.collectors.collector_resolver import CollectorResolver
+from querent.collectors.email.email_collector import EmailCollector
 from querent.config.collector.collector_config import (
     CollectorBackend,
     EmailCollectorConfig,
@@ -54,5 +59,160 @@ async def test_email_collector(email_config):
     await poll_and_print()
 
 
+class LocalImapHandler(socketserver.StreamRequestHandler):
+    """Minimal IMAP4rev1 server holding one folder, enough for UID SEARCH and UID FETCH."""
+
+    def send(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def uids(self, sequence_set, highest):
+        uids = set()
+        for part in sequence_set.split(","):
+            first, _, last = part.partition(":")
+            last = last or first
+            first = highest if first == "*" else int(first)
+            last = highest if last == "*" else int(last)
+            uids.update(range(min(first, last), max(first, last) + 1))
+        return sorted(uid for uid in uids if uid in self.server.messages)
+
+    def handle(self):
+        server = self.server
+        self.send("* OK IMAP4rev1 ready")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            tag, command, *args = line.split(" ", 2)
+            command = command.upper()
+            args = args[0] if args else ""
+            server.commands.append(f"{command} {args}")
+            if command == "CAPABILITY":
+                self.send("* CAPABILITY IMAP4rev1")
+            elif command == "SELECT":
+                self.send(f"* {len(server.messages)} EXISTS")
+                self.send(f"* OK [UIDVALIDITY {server.uid_validity}] UIDs valid")
+            elif command == "UID" and args.upper().startswith("SEARCH"):
+                sequence_set = args.split()[-1]
+                highest = max(server.messages, default=0)
+                self.send("* SEARCH " + " ".join(str(uid) for uid in self.uids(sequence_set, highest)))
+            elif command == "UID" and args.upper().startswith("FETCH"):
+                _, sequence_set, items = args.split(" ", 2)
+                highest = max(server.messages, default=0)
+                for uid in self.uids(sequence_set, highest):
+                    message = server.messages[uid]
+                    if "RFC822.SIZE" in items:
+                        self.send(f"* {uid} FETCH (UID {uid} RFC822.SIZE {len(message)})")
+                    else:
+                        self.wfile.write(f"* {uid} FETCH (UID {uid} BODY[] {{{len(message)}}}\r\n".encode())
+                        self.wfile.write(message + b")\r\n")
+            elif command == "LOGOUT":
+                self.send("* BYE")
+                self.send(f"{tag} OK LOGOUT completed")
+                return
+            self.send(f"{tag} OK {command} completed")
+
+
+@pytest.fixture
+def imap_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), LocalImapHandler)
+    server.daemon_threads = True
+    server.messages = {}
+    server.uid_validity = 7
+    server.commands = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def local_email_config(imap_server, **config):
+    return EmailCollectorConfig(
+        config_source={
+            "backend": "email",
+            "id": str(uuid.uuid4()),
+            "imap_server": "127.0.0.1",
+            "imap_port": imap_server.server_address[1],
+            "imap_username": "reader@querent.xyz",
+            "imap_password": "secret",
+            "imap_folder": "INBOX",
+            "name": "Email-config",
+            "config": dict(imap_ssl="false", **config),
+            "uri": "email://",
+        }
+    )
+
+
+async def collect_messages(config):
+    collector = EmailCollector(config)
+    await collector.connect()
+    messages = {}
+    async for result in collector.poll():
+        if result.data is not None:
+            messages[result.file] = result.data
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_email_collector_fetches_new_uids_in_batches(imap_server, tmp_path):
+    imap_server.messages = {uid: f"Subject: message {uid}\r\n\r\nbody {uid}".encode() for uid in range(1, 8)}
+    imap_server.messages[4] = b"Subject: large\r\n\r\n" + b"x" * 1000
+    watermark_file = str(tmp_path / "imap_watermark.json")
+    config = local_email_config(
+        imap_server, imap_batch_size="3", imap_max_message_size="500", imap_watermark_file=watermark_file
+    )
+
+    messages = await collect_messages(config)
+    assert sorted(messages) == [f"reader@querent.xyz:INBOX/{uid}.email" for uid in (1, 2, 3, 5, 6, 7)]
+    assert messages["reader@querent.xyz:INBOX/6.email"].endswith(b"body 6")
+    fetches = [command for command in imap_server.commands if command.startswith("UID FETCH")]
+    # Seven messages in batches of three: sizes then bodies, the large message left out
+    assert fetches == [
+        "UID FETCH 1:3 (RFC822.SIZE)",
+        "UID FETCH 1:3 (BODY.PEEK[])",
+        "UID FETCH 4:6 (RFC822.SIZE)",
+        "UID FETCH 5:6 (BODY.PEEK[])",
+        "UID FETCH 7 (RFC822.SIZE)",
+        "UID FETCH 7 (BODY.PEEK[])",
+    ]
+    with open(watermark_file, "r", encoding="utf-8") as f:
+        assert list(json.load(f).values()) == [{"uidvalidity": "7", "uid": 7}]
+
+    # Only messages delivered since are fetched on the next run
+    imap_server.commands.clear()
+    imap_server.messages[9] = b"Subject: new\r\n\r\nnew body"
+    messages = await collect_messages(config)
+    assert list(messages) == ["reader@querent.xyz:INBOX/9.email"]
+    assert "UID SEARCH UID 8:*" in imap_server.commands
+
+    # Nothing new: "8:*" still matches the highest UID, which must not be fetched again
+    imap_server.commands.clear()
+    assert await collect_messages(config) == {}
+    assert not any(command.startswith("UID FETCH") for command in imap_server.commands)
+
+    # A new UIDVALIDITY invalidates the watermark
+    imap_server.uid_validity = 8
+    messages = await collect_messages(config)
+    assert len(messages) == 7
+
+
+@pytest.mark.asyncio
+async def test_email_collector_caps_batches_by_message_size(imap_server):
+    imap_server.messages = {uid: b"x" * 40 for uid in range(1, 7)}
+    imap_server.messages[3] = b"x" * 200
+    config = local_email_config(imap_server, imap_batch_size="10", imap_batch_bytes="100")
+
+    messages = await collect_messages(config)
+    assert len(messages) == 6
+    fetches = [command for command in imap_server.commands if command.startswith("UID FETCH")]
+    # Two 40 byte messages fit in 100 bytes, the 200 byte message is fetched on its own
+    assert fetches == [
+        "UID FETCH 1:6 (RFC822.SIZE)",
+        "UID FETCH 1:2 (BODY.PEEK[])",
+        "UID FETCH 3 (BODY.PEEK[])",
+        "UID FETCH 4:5 (BODY.PEEK[])",
+        "UID FETCH 6 (BODY.PEEK[])",
+    ]
+
+
 if __name__ == "__main__":
     asyncio.run(test_email_collector())
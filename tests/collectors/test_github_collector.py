@@ -1,7 +1,13 @@
 import asyncio
+import hashlib
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 import os
 from querent.collectors.collector_resolver import CollectorResolver
+from querent.collectors.github.github_collector import GithubCollectorFactory
 from querent.config.collector.collector_config import GithubConfig
 from querent.common.uri import Uri
 import uuid
@@ -45,5 +51,162 @@ async def test_github_collector(github_config):
     await poll_and_print()
 
 
+
+class LocalGithubHandler(BaseHTTPRequestHandler):
+    """Serves the repository, git trees and git blobs endpoints with ETags."""
+
+    files = {}
+    requests = Counter()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, body):
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.requests[path.split("/")[5] if path.count("/") > 4 else "repo"] += 1
+        shas = {hashlib.sha1(data).hexdigest(): data for data in self.files.values()}
+        if path == "/repos/owner/repo":
+            self.send_json({"default_branch": "main"})
+        elif path == "/repos/owner/repo/git/trees/main":
+            self.send_json({
+                "truncated": False,
+                "tree": [{"path": "src", "type": "tree", "sha": "0"}] + [
+                    {"path": name, "type": "blob", "sha": hashlib.sha1(data).hexdigest(), "size": len(data)}
+                    for name, data in self.files.items()
+                ],
+            })
+        elif path.startswith("/repos/owner/repo/git/blobs/"):
+            data = shas[path.rsplit("/", 1)[1]]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+@pytest.mark.asyncio
+async def test_github_collector_lists_tree_once_and_revalidates(tmp_path):
+    LocalGithubHandler.files = {f"src/module{i}.py": f"print({i})\n".encode() for i in range(20)}
+    LocalGithubHandler.files["README.md"] = b"# repo\n"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalGithubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def collector():
+        config = GithubConfig(
+            config_source={
+                "id": str(uuid.uuid4()),
+                "github_username": "owner",
+                "repository": "repo",
+                "github_access_token": "token",
+                "name": "Github-config",
+                "config": {
+                    "github_api_url": f"http://127.0.0.1:{server.server_address[1]}",
+                    "github_etag_cache": str(tmp_path / "etags.json"),
+                    "sync_manifest": str(tmp_path / "manifest.db"),
+                },
+                "uri": "github://",
+            }
+        )
+        return GithubCollectorFactory().resolve(Uri("github://"), config)
+
+    async def collect():
+        contents = {}
+        async for result in collector().poll():
+            assert not result.is_error()
+            if result.data is not None:
+                contents[result.file] = result.data
+        return contents
+
+    LocalGithubHandler.requests = Counter()
+    assert await collect() == LocalGithubHandler.files
+    assert LocalGithubHandler.requests == Counter({"repo": 1, "trees": 1, "blobs": 21})
+
+    LocalGithubHandler.requests = Counter()
+    assert await collect() == {}
+    assert LocalGithubHandler.requests == Counter({"repo": 1, "trees": 1})
+
+    LocalGithubHandler.files["README.md"] = b"# changed\n"
+    LocalGithubHandler.requests = Counter()
+    assert await collect() == {"README.md": b"# changed\n"}
+    assert LocalGithubHandler.requests["blobs"] == 1
+    server.shutdown()
+
+class TimingOutBlobSession:
+    """Answers blob downloads from memory, timing out on the blobs listed in `timeouts`."""
+
+    def __init__(self, blobs, timeouts):
+        self.blobs = blobs
+        self.timeouts = timeouts
+
+    def get(self, url, headers=None):
+        session = self
+
+        class Response:
+            async def __aenter__(self):
+                sha = url.rsplit("/", 1)[1]
+                if sha in session.timeouts:
+                    raise asyncio.TimeoutError()
+                self.data = session.blobs[sha]
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+            def raise_for_status(self):
+                pass
+
+            async def read(self):
+                return self.data
+
+        return Response()
+
+
+@pytest.mark.asyncio
+async def test_github_collector_reports_blobs_that_time_out(tmp_path):
+    config = GithubConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "github_username": "owner",
+            "repository": "repo",
+            "github_access_token": "token",
+            "name": "Github-config",
+            "config": {"github_concurrency": "2", "github_etag_cache": str(tmp_path / "etags.json")},
+            "uri": "github://",
+        }
+    )
+    collector = GithubCollectorFactory().resolve(Uri("github://"), config)
+    files = {f"file{i}.txt": f"content {i}".encode() for i in range(5)}
+    blobs = [{"path": name, "sha": hashlib.sha1(data).hexdigest()} for name, data in files.items()]
+    session = TimingOutBlobSession(
+        {blob["sha"]: files[blob["path"]] for blob in blobs}, timeouts={blobs[1]["sha"], blobs[3]["sha"]}
+    )
+
+    async def fetch():
+        return [item async for item in collector.fetch_blobs(session, "http://github", blobs)]
+
+    items = await asyncio.wait_for(fetch(), timeout=10)
+    assert {item.file: item.data for item in items if item.data is not None} == {
+        name: files[name] for name in ["file0.txt", "file2.txt", "file4.txt"]
+    }
+    assert sorted(item.file for item in items if item.is_error()) == ["file1.txt", "file3.txt"]
+    assert sorted(item.file for item in items if item.eof) == sorted(files)
+
+
 if __name__ == "__main__":
     asyncio.run(test_github_collector())
@@ -1,8 +1,17 @@
 import asyncio
+import re
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
 import pytest
 from querent.collectors.collector_resolver import CollectorResolver
+from querent.collectors.jira.jira_collector import JiraCollector
 from querent.config.collector.collector_config import JiraCollectorConfig
+from querent.common.types.ingested_tokens import IngestedTokens
 from querent.common.uri import Uri
+from querent.ingestors.ingestor_manager import IngestorFactoryManager
 import uuid
 from dotenv import load_dotenv
 import os
@@ -48,5 +57,186 @@ async def test_jira_collector(jira_config):
     await poll_and_print()
 
 
+
+class AttachmentHandler(BaseHTTPRequestHandler):
+    missing = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in self.missing:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = f"contents of {self.path}".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ResultList(list):
+    def __init__(self, issues, total):
+        super().__init__(issues)
+        self.total = total
+
+
+class InMemoryJira:
+    """Answers search_issues like Jira, recording the JQL and pages requested."""
+
+    def __init__(self, issues, time_zone="Europe/Berlin"):
+        self.issues = issues
+        self.time_zone = time_zone
+        self.searches = []
+
+    def myself(self):
+        return {"timeZone": self.time_zone}
+
+    def search_issues(self, jql_str, startAt=0, maxResults=50, **kwargs):
+        self.searches.append((jql_str, startAt))
+        issues = self.issues
+        watermark = re.search(r'updated >= "(.+?)"', jql_str)
+        if watermark:
+            # JQL dates are in the user's time zone
+            since = datetime.strptime(watermark.group(1), "%Y/%m/%d %H:%M").replace(tzinfo=ZoneInfo(self.time_zone))
+            issues = [issue for issue in issues if JiraCollector.parse_time(issue.fields.updated) >= since]
+        return ResultList(issues[startAt : startAt + maxResults], len(issues))
+
+
+def in_memory_issues(base_url):
+    return [
+        SimpleNamespace(
+            key=f"Q-{i}",
+            raw={"key": f"Q-{i}"},
+            fields=SimpleNamespace(
+                updated=f"2024-01-0{i}T10:00:00.000+0000",
+                attachment=[SimpleNamespace(filename="notes.txt", content=f"{base_url}/Q-{i}/notes.txt")],
+            ),
+        )
+        for i in range(1, 6)
+    ]
+
+
+def incremental_config(base_url, tmp_path):
+    return JiraCollectorConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "jira_server": base_url,
+            "jira_username": "user",
+            "jira_api_token": "token",
+            "jira_project": "Q",
+            "jira_query": "project=Q ORDER BY created",
+            "jira_max_results": 2,
+            "jira_watermark_file": str(tmp_path / "watermark.json"),
+            "name": "Jira-config",
+            "config": {},
+            "uri": "jira://",
+        }
+    )
+
+
+async def collect_jira(config, issues):
+    collector = JiraCollector(config)
+    collector.jira = InMemoryJira(issues)
+    jira = collector.jira
+    contents = {}
+    async for result in collector.poll():
+        if result.data is not None:
+            contents[result.file] = result.data
+    return jira, contents
+
+
+@pytest.mark.asyncio
+async def test_jira_collector_pages_and_resumes_from_watermark(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AttachmentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    issues = in_memory_issues(base_url)
+    config = incremental_config(base_url, tmp_path)
+
+    jira, contents = await collect_jira(config, issues)
+    assert [start for _, start in jira.searches] == [0, 2, 4]
+    assert jira.searches[0][0] == "project=Q ORDER BY updated ASC"
+    assert len(contents) == 10
+    assert contents["jira_attachment_Q-3_notes.txt"] == b"contents of /Q-3/notes.txt"
+
+    # The watermark is 10:00 UTC, 11:00 in the user's time zone
+    jira, contents = await collect_jira(config, issues)
+    assert jira.searches[0][0] == '(project=Q) AND updated >= "2024/01/05 11:00" ORDER BY updated ASC'
+    assert [start for _, start in jira.searches] == [0]
+    assert set(contents) == {"jira_issue_Q-5.json.jira", "jira_attachment_Q-5_notes.txt"}
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_jira_watermark_stops_at_issues_with_failed_attachments(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AttachmentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    issues = in_memory_issues(base_url)
+    config = incremental_config(base_url, tmp_path)
+
+    AttachmentHandler.missing = {"/Q-3/notes.txt"}
+    _, contents = await collect_jira(config, issues)
+    assert len(contents) == 9 and "jira_attachment_Q-3_notes.txt" not in contents
+
+    # The issue whose attachment failed, and every issue updated after it, are fetched again
+    AttachmentHandler.missing = set()
+    _, contents = await collect_jira(config, issues)
+    assert contents["jira_attachment_Q-3_notes.txt"] == b"contents of /Q-3/notes.txt"
+    assert {file for file in contents if file.startswith("jira_issue")} == {
+        f"jira_issue_Q-{i}.json.jira" for i in range(3, 6)
+    }
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_jira_attachment_failing_mid_stream_is_not_ingested(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AttachmentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    collector = JiraCollector(incremental_config(base_url, tmp_path))
+    collector.jira = InMemoryJira(in_memory_issues(base_url))
+    download_attachment = collector.download_attachment
+
+    def truncated_download(attachment_url):
+        if not attachment_url.endswith("/Q-3/notes.txt"):
+            return download_attachment(attachment_url)
+
+        def read():
+            yield b"contents of"
+            raise IOError("connection reset")
+
+        return read()
+
+    collector.download_attachment = truncated_download
+    result_queue = asyncio.Queue()
+    await IngestorFactoryManager(collectors=[collector], result_queue=result_queue).ingest_all_async()
+    server.shutdown()
+
+    tokens = []
+    while not result_queue.empty():
+        result = result_queue.get_nowait()
+        if isinstance(result, IngestedTokens):
+            tokens.append(result)
+    failed = [token for token in tokens if token.file == "jira_attachment_Q-3_notes.txt"]
+    assert [token.data for token in failed] == [None] and "connection reset" in failed[0].error
+    assert ["contents of /Q-4/notes.txt"] in [token.data for token in tokens if token.file == "jira_attachment_Q-4_notes.txt"]
+    # The issue of the failed attachment is fetched again next run
+    assert collector.load_watermark() == "2024-01-03T10:00:00.000+0000"
+
+
+def test_jira_query_widens_the_watermark_without_the_user_time_zone(tmp_path):
+    collector = JiraCollector(incremental_config("http://jira", tmp_path))
+    assert collector.build_query("2024-01-05T10:00:00.000+0100") == (
+        '(project=Q) AND updated >= "2024/01/04 19:00" ORDER BY updated ASC'
+    )
+    collector.user_timezone = ZoneInfo("America/New_York")
+    assert collector.build_query("2024-01-05T10:00:00.000+0100") == (
+        '(project=Q) AND updated >= "2024/01/05 04:00" ORDER BY updated ASC'
+    )
+
+
 if __name__ == "__main__":
     asyncio.run(test_jira_collector())
@@ -1,4 +1,5 @@
 import asyncio
+import os
 from pathlib import Path
 import tempfile
 from querent.collectors.collector_resolver import CollectorResolver
@@ -41,6 +42,90 @@ def test_fs_collector_factory():
     assert factory.backend() == CollectorBackend.LocalFile
 
 
+
+@pytest.mark.asyncio
+async def test_fs_collector_reads_files_in_walk_order(temp_dir):
+    Path(temp_dir, "nested").mkdir()
+    Path(temp_dir, "__pycache__").mkdir()
+    Path(temp_dir, "__pycache__", "ignored.pyc").write_bytes(b"ignored")
+    Path(temp_dir, "nested", "large.bin").write_bytes(b"x" * 5000)
+    Path(temp_dir, "small.txt").write_bytes(b"small file")
+    fileConfig = FSCollectorConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "root_path": temp_dir,
+            "name": "Local-config",
+            "config": {},
+            "uri": "file://",
+        }
+    )
+    fileConfig.chunk_size = "1024"
+    fileConfig.max_concurrent_reads = "2"
+    fileConfig.mmap_threshold = "4096"
+    collector = FSCollectorFactory().resolve(Uri("file://" + temp_dir), fileConfig)
+
+    contents = {}
+    async for result in collector.poll():
+        if result.eof:
+            continue
+        contents.setdefault(result.file, b"")
+        contents[result.file] += bytes(result.data)
+
+    assert set(contents) == {
+        str(Path(temp_dir, "nested", "large.bin")),
+        str(Path(temp_dir, "small.txt")),
+    }
+    assert contents[str(Path(temp_dir, "nested", "large.bin"))] == b"x" * 5000
+    assert contents[str(Path(temp_dir, "small.txt"))] == b"small file"
+
+@pytest.mark.asyncio
+async def test_fs_collector_bounds_read_ahead_by_bytes(temp_dir, monkeypatch):
+    for i in range(4):
+        Path(temp_dir, f"file{i}.txt").write_bytes(b"%d" % i * 8)
+
+    async def first_chunk_and_reads(max_read_ahead_bytes):
+        fileConfig = FSCollectorConfig(
+            config_source={
+                "id": str(uuid.uuid4()),
+                "root_path": temp_dir,
+                "name": "Local-config",
+                "config": {},
+                "uri": "file://",
+            }
+        )
+        fileConfig.chunk_size = "4"
+        fileConfig.max_read_ahead_bytes = max_read_ahead_bytes
+        collector = FSCollectorFactory().resolve(Uri("file://" + temp_dir), fileConfig)
+        to_thread = asyncio.to_thread
+        reads = []
+
+        def counting_to_thread(function, *args):
+            if function == collector.read_file:
+                reads.append(args[0])
+            return to_thread(function, *args)
+
+        monkeypatch.setattr(asyncio, "to_thread", counting_to_thread)
+        poll = collector.poll()
+        first_chunk = await poll.__anext__()
+        reads_started = len(reads)
+        chunks = [first_chunk] + [chunk async for chunk in poll]
+        return first_chunk, reads_started, chunks
+
+    # Each 8 byte file fills the 10 byte budget, so a file is only read once the previous one was emitted
+    first_chunk, reads_started, chunks = await first_chunk_and_reads("10")
+    assert reads_started == 1
+    assert len(first_chunk.data) == 4
+    assert len([chunk for chunk in chunks if chunk.eof]) == 4
+    contents = {}
+    for chunk in chunks:
+        if not chunk.eof:
+            contents[chunk.file] = contents.get(chunk.file, b"") + bytes(chunk.data)
+    assert contents == {str(Path(temp_dir, f"file{i}.txt")): b"%d" % i * 8 for i in range(4)}
+
+    _, reads_started, _ = await first_chunk_and_reads("32")
+    assert reads_started == 4
+
+
 async def poll_and_print(collector):
     async for result in collector.poll():
         assert not result.is_error()
@@ -77,3 +162,51 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
+
+
+@pytest.mark.asyncio
+async def test_fs_collector_skips_unchanged_files_across_runs(temp_dir):
+    data_dir = Path(temp_dir, "data")
+    data_dir.mkdir()
+    Path(data_dir, "kept.txt").write_bytes(b"unchanged content")
+    Path(data_dir, "edited.txt").write_bytes(b"first version")
+    Path(data_dir, "removed.txt").write_bytes(b"removed later")
+
+    def collector():
+        fileConfig = FSCollectorConfig(
+            config_source={
+                "id": str(uuid.uuid4()),
+                "root_path": str(data_dir),
+                "name": "Local-config",
+                "config": {
+                    "sync_manifest": str(Path(temp_dir, "manifest.db")),
+                    "sync_tombstones": "true",
+                },
+                "uri": "file://",
+            }
+        )
+        return FSCollectorFactory().resolve(Uri("file://" + str(data_dir)), fileConfig)
+
+    async def collect():
+        emitted, deleted = set(), set()
+        async for result in collector().poll():
+            if result.is_deleted():
+                deleted.add(Path(result.file).name)
+            elif result.eof:
+                emitted.add(Path(result.file).name)
+        return emitted, deleted
+
+    assert await collect() == ({"kept.txt", "edited.txt", "removed.txt"}, set())
+    assert await collect() == (set(), set())
+
+    # A touched file keeps its content hash, so touching it again later is still not a change
+    for mtime in (1_000_000_000, 1_100_000_000):
+        os.utime(Path(data_dir, "kept.txt"), (mtime, mtime))
+        assert await collect() == (set(), set())
+        assert await collect() == (set(), set())
+
+    Path(data_dir, "edited.txt").write_bytes(b"second version")
+    Path(data_dir, "removed.txt").unlink()
+    Path(data_dir, "added.txt").write_bytes(b"new file")
+    assert await collect() == ({"edited.txt", "added.txt"}, {"removed.txt"})
+    assert await collect() == (set(), set())
@@ -0,0 +1,31 @@
+import sqlite3
+
+from querent.collectors.sync_manifest import SQLiteManifestStore, SyncManifest
+
+
+def test_sqlite_manifest_keeps_emitted_names_and_upgrades_old_manifests(tmp_path):
+    path = str(tmp_path / "manifest.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE manifest (source TEXT NOT NULL, key TEXT NOT NULL, version TEXT, size INTEGER, "
+        "content_hash TEXT, PRIMARY KEY (source, key))"
+    )
+    connection.execute("INSERT INTO manifest VALUES ('drive://folder', 'old-id', '1', 3, NULL)")
+    connection.commit()
+    connection.close()
+
+    manifest = SyncManifest(SQLiteManifestStore(path), "drive://folder", emit_tombstones=True)
+    assert not manifest.is_changed("old-id", "1", 3)
+    manifest.record("file-id", "1", 10, name="report.pdf")
+    manifest.record("same.txt", "1", 10, name="same.txt")
+    manifest.commit()
+    manifest.store.close()
+
+    manifest = SyncManifest(SQLiteManifestStore(path), "drive://folder", emit_tombstones=True)
+    assert manifest.entries["same.txt"].name is None
+    # Nothing was seen in this run, so every document is deleted under the name it was emitted as
+    assert sorted(tombstone.file for tombstone in manifest.tombstones("drive://folder")) == [
+        "old-id",
+        "report.pdf",
+        "same.txt",
+    ]
@@ -0,0 +1,99 @@
+import io
+import pytest
+from querent.common.types.chunk_buffer import BufferReader, ChunkBuffer
+from querent.common.types.collected_bytes import CollectedBytes
+from querent.ingestors.code import code_ingestor
+from querent.ingestors.csv import csv_ingestor
+from querent.ingestors.github import github_ingestor
+from querent.ingestors.html import html_ingestor
+from querent.ingestors.json import json_ingestor
+from querent.ingestors.texts import text_ingestor
+from querent.ingestors.xml import xml_ingestor
+
+
+def test_chunk_buffer_assembles_chunks_in_memory():
+    collected_bytes = ChunkBuffer()
+    for chunk in [b"first line\n", b"second line\n", b""]:
+        collected_bytes += chunk
+
+    assert not collected_bytes.is_spilled()
+    assert len(collected_bytes) == 23
+    assert str(collected_bytes.getbuffer(), "utf-8") == "first line\nsecond line\n"
+
+
+def test_chunk_buffer_spills_to_mapped_file():
+    collected_bytes = ChunkBuffer(spill_threshold=16)
+    chunks = [f"chunk {i}\n".encode() for i in range(10)]
+    for chunk in chunks:
+        collected_bytes += chunk
+
+    assert collected_bytes.is_spilled()
+    assert io.BytesIO(collected_bytes.getbuffer()).read() == b"".join(chunks)
+    assert collected_bytes.getvalue() == b"".join(chunks)
+
+
+def test_chunk_buffer_close_releases_the_spilled_file():
+    collected_bytes = ChunkBuffer(spill_threshold=4)
+    collected_bytes += b"spilled data"
+    view = collected_bytes.getbuffer()
+    spill_file = collected_bytes._spill_file
+
+    # A view still held by a consumer keeps the mapping alive, but does not stop the close
+    collected_bytes.close()
+    assert spill_file.closed
+    assert bytes(view) == b"spilled data"
+    assert len(collected_bytes) == 0 and not collected_bytes.is_spilled()
+
+
+def test_buffer_reader_reads_and_seeks_without_copying_up_front():
+    collected_bytes = ChunkBuffer(spill_threshold=8)
+    collected_bytes += b"0123456789abcdef"
+    with collected_bytes, BufferReader(collected_bytes.getbuffer()) as reader:
+        assert reader.read(4) == b"0123"
+        assert reader.seek(-3, io.SEEK_END) == 13
+        assert reader.read() == b"def"
+        assert reader.read(2) == b""
+        reader.seek(10)
+        target = bytearray(4)
+        assert reader.readinto(target) == 4 and target == b"abcd"
+        assert reader.tell() == 14
+    assert reader.closed
+
+
+class RecordingChunkBuffer(ChunkBuffer):
+    """A ChunkBuffer that spills at once, remembering every instance an ingestor opens."""
+
+    opened = []
+
+    def __init__(self):
+        super().__init__(spill_threshold=4)
+        RecordingChunkBuffer.opened.append(self)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "module, ingestor_class, extension, contents",
+    [
+        (text_ingestor, text_ingestor.TextIngestor, "txt", b"spilled text"),
+        (code_ingestor, code_ingestor.CodeIngestor, "py", b"print('spilled')"),
+        (github_ingestor, github_ingestor.GithubIngestor, "py", b"print('spilled')"),
+        (csv_ingestor, csv_ingestor.CsvIngestor, "csv", b"name,size\nbasin,4"),
+        (html_ingestor, html_ingestor.HtmlIngestor, "html", b"<p>spilled text</p>"),
+        (json_ingestor, json_ingestor.JsonIngestor, "json", b'{"name": "basin"}'),
+        (xml_ingestor, xml_ingestor.XmlIngestor, "xml", b"<basin>shale</basin>"),
+    ],
+)
+async def test_ingestors_close_the_buffer_of_every_file(monkeypatch, module, ingestor_class, extension, contents):
+    RecordingChunkBuffer.opened = []
+    monkeypatch.setattr(module, "ChunkBuffer", RecordingChunkBuffer)
+
+    async def poll():
+        for name in ("first", "second"):
+            yield CollectedBytes(file=f"{name}.{extension}", data=contents, doc_source="memory")
+
+    ingestor = ingestor_class(processors=[])
+    async for _ in ingestor.ingest(poll()):
+        pass
+
+    assert len(RecordingChunkBuffer.opened) >= 2
+    assert all(buffer._spill_file is None and len(buffer) == 0 for buffer in RecordingChunkBuffer.opened)
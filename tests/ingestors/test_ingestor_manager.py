@@ -0,0 +1,183 @@
+import asyncio
+import pytest
+from querent.collectors.collector_runtime import CollectorRuntime
+from querent.collectors.download_pool import DownloadItem, DownloadPool
+from querent.common.types.collected_bytes import CollectedBytes
+from querent.common.types.ingested_tokens import IngestedTokens
+from querent.ingestors.ingestor_manager import IngestorFactoryManager
+
+
+class InMemoryCollector:
+    def __init__(self, files, lines_per_file=20, interleave=False):
+        self.files = files
+        self.lines_per_file = lines_per_file
+        self.interleave = interleave
+
+    async def poll(self):
+        if self.interleave:
+            for line in range(self.lines_per_file):
+                for file in self.files:
+                    yield CollectedBytes(file=file, data=f"line {line} of {file}\n".encode(), doc_source="memory")
+            for file in self.files:
+                yield CollectedBytes(file=file, data=None, eof=True, doc_source="memory")
+        else:
+            for file in self.files:
+                for line in range(self.lines_per_file):
+                    yield CollectedBytes(file=file, data=f"line {line} of {file}\n".encode(), doc_source="memory")
+                yield CollectedBytes(file=file, data=None, eof=True, doc_source="memory")
+
+
+async def ingest(collectors, **kwargs):
+    result_queue = asyncio.Queue()
+    ingestor_factory_manager = IngestorFactoryManager(
+        collectors=collectors, result_queue=result_queue, **kwargs
+    )
+    await asyncio.wait_for(ingestor_factory_manager.ingest_all_async(), timeout=30)
+    results = []
+    while not result_queue.empty():
+        results.append(result_queue.get_nowait())
+    return ingestor_factory_manager, results
+
+
+@pytest.mark.asyncio
+async def test_streams_files_with_bounded_parallelism():
+    files = [f"/data/file{i}.txt" for i in range(6)]
+    manager, results = await ingest(
+        [InMemoryCollector(files)], max_parallel_files=2, channel_size=2
+    )
+
+    assert results[-1] is None
+    tokens = [result for result in results if isinstance(result, IngestedTokens) and result.data]
+    assert {token.file for token in tokens} == set(files)
+    assert manager._active_files == 0
+
+
+@pytest.mark.asyncio
+async def test_interleaved_files_do_not_deadlock():
+    files = [f"/data/file{i}.txt" for i in range(5)]
+    manager, results = await ingest(
+        [InMemoryCollector(files, interleave=True), InMemoryCollector(["/other/notes.txt"])],
+        max_parallel_files=2,
+        channel_size=1,
+    )
+
+    tokens = [result for result in results if isinstance(result, IngestedTokens) and result.data]
+    assert {token.file for token in tokens} == set(files) | {"/other/notes.txt"}
+    assert manager._active_files == 0
+
+
+class WholeFileCollector:
+    """Sends every file as a single chunk, like the email and GitHub collectors."""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+
+    async def poll(self):
+        for i, size in enumerate(self.sizes):
+            yield CollectedBytes(file=f"/data/blob{i}.txt", data=b"x" * (size - 1) + b"\n", doc_source="memory")
+        for i in range(len(self.sizes)):
+            yield CollectedBytes(file=f"/data/blob{i}.txt", data=None, eof=True, doc_source="memory")
+
+
+@pytest.mark.asyncio
+async def test_chunks_in_flight_share_a_byte_budget():
+    sizes = [1000] * 6 + [5000, 1000]
+    result_queue = asyncio.Queue()
+    manager = IngestorFactoryManager(
+        collectors=[WholeFileCollector(sizes)], result_queue=result_queue, max_parallel_files=8, byte_budget=2500
+    )
+    buffered = []
+    put_chunk = manager._put_chunk
+
+    async def recording_put_chunk(channel, chunk):
+        await put_chunk(channel, chunk)
+        buffered.append(manager._buffered)
+
+    manager._put_chunk = recording_put_chunk
+    await asyncio.wait_for(manager.ingest_all_async(), timeout=30)
+
+    # The channels hold at most two of the 1000 byte chunks; the larger chunk is let through alone
+    assert max(buffered) == 5000
+    assert max(size for size in buffered if size != 5000) <= 2500
+    assert manager._buffered == 0
+    files_ingested = set()
+    while not result_queue.empty():
+        result = result_queue.get_nowait()
+        if isinstance(result, IngestedTokens) and result.data:
+            files_ingested.add(result.file)
+    assert files_ingested == {f"/data/blob{i}.txt" for i in range(len(sizes))}
+
+
+@pytest.mark.asyncio
+async def test_failed_file_tasks_are_logged_without_stopping_other_files(caplog):
+    files = [f"/data/file{i}.txt" for i in range(3)]
+    result_queue = asyncio.Queue()
+    manager = IngestorFactoryManager(
+        collectors=[InMemoryCollector(files)], result_queue=result_queue, max_parallel_files=1
+    )
+    ingest_file_async = manager.ingest_file_async
+
+    async def failing_ingest_file_async(file, file_extension, channel):
+        await ingest_file_async(file, file_extension, channel)
+        if file == files[0]:
+            raise RuntimeError("result queue closed")
+
+    manager.ingest_file_async = failing_ingest_file_async
+    await asyncio.wait_for(manager.ingest_all_async(), timeout=30)
+
+    assert "Ingestion task for file /data/file0.txt failed: RuntimeError('result queue closed')" in caplog.text
+    files_ingested = set()
+    while not result_queue.empty():
+        result = result_queue.get_nowait()
+        if isinstance(result, IngestedTokens) and result.data:
+            files_ingested.add(result.file)
+    assert files_ingested == set(files)
+
+
+class FailingDownloadCollector:
+    """Streams a file through a DownloadPool, its source failing after the first chunks."""
+
+    def __init__(self, file, chunks):
+        self.file = file
+        self.chunks = chunks
+        self.runtime = CollectorRuntime(max_workers=2)
+
+    async def poll(self):
+        def open_failing():
+            yield from self.chunks
+            raise IOError("connection reset")
+
+        def open_complete():
+            yield b"complete file"
+
+        items = [
+            DownloadItem(file=self.file, open=open_failing, doc_source="memory"),
+            DownloadItem(file="b.txt", open=open_complete, doc_source="memory"),
+        ]
+        try:
+            async for collected_bytes in DownloadPool(self.runtime, block_size=1).download(items):
+                yield collected_bytes
+        finally:
+            self.runtime.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "file, chunks",
+    [
+        ("a.txt", [b"hello ", b"wor"]),
+        ("a.csv", [b"name,size\n", b"basin,4"]),
+        ("a.json", [b'{"name": ', b'"basin"}']),
+        ("a.xml", [b"<basin>", b"shale</basin>"]),
+        ("a.html", [b"<p>shale ", b"basin</p>"]),
+    ],
+)
+async def test_file_failing_mid_stream_is_reported_instead_of_ingested(file, chunks):
+    manager, results = await ingest([FailingDownloadCollector(file, chunks)])
+
+    tokens = [result for result in results if isinstance(result, IngestedTokens)]
+    failed = [token for token in tokens if token.file == file]
+    assert [token.data for token in failed] == [None]
+    assert "connection reset" in failed[0].error
+    assert [token.data for token in tokens if token.file == "b.txt"] == [["complete file"], None]
+    assert manager._active_files == 0
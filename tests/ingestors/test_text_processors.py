@@ -0,0 +1,36 @@
+import pytest
+
+from querent.processors.fused_text_processor import FusedTextProcessor
+from querent.processors.text_cleanup_processor import TextCleanupProcessor
+from querent.processors.text_processor import TextProcessor
+
+
+@pytest.fixture
+def vocabulary_path(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(["the", "reservoir", "rock", "porosity", "is", "high", "Basin"]))
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_in_one_pass():
+    processor = TextCleanupProcessor()
+    text = 'He said "so"\\nthen\x01\ttabs\\x0b and\r\nlines\\t.'
+    assert await processor.process_text(text) == "He said so then tabs and  lines ."
+
+
+@pytest.mark.asyncio
+async def test_fused_processor_matches_the_processor_chain(vocabulary_path):
+    cleanup = TextCleanupProcessor()
+    joiner = TextProcessor(vocabulary_path)
+    fused = FusedTextProcessor(vocabulary_path)
+    texts = [
+        "The reser voir rock poro sity is high",
+        "the Ba sin\nrock  is\\nhigh",
+        "Café\\x0c near the rock",
+        "",
+    ]
+    expected = [await joiner.process_text(await cleanup.process_text(text)) for text in texts]
+    assert expected[0] == "The reservoir rock porosity is high"
+    assert await fused.process_texts(texts) == expected
+    assert await fused.process_text(texts[2]) == "Cafe near the rock"
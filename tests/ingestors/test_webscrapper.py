@@ -1,8 +1,11 @@
 import asyncio
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import tempfile
+import threading
 from querent.collectors.collector_resolver import CollectorResolver
-from querent.collectors.webscaper.web_scraper_collector import WebScraperFactory
+from querent.collectors.webscaper.web_scraper_collector import WebScraperCollector, WebScraperFactory
 import pytest
 import uuid
 
@@ -51,3 +54,61 @@ def test_scrapping_data():
             assert not result.is_error()
 
     asyncio.run(poll_and_print())
+
+
+class LocalSiteHandler(BaseHTTPRequestHandler):
+    """A small site whose pages link back to each other, to an external host and to deep pages."""
+
+    pages = {
+        "/": '<a href="/a">a</a> <a href="b?y=2&x=1">b</a> <a href="https://example.org/">out</a>',
+        "/a": '<a href="/">home</a> <a href="/b?x=1&y=2#top">b</a> <a href="/deep/1">deep</a>',
+        "/b": '<a href="/a">a</a> <a href="mailto:someone@example.org">mail</a>',
+        "/deep/1": '<a href="/deep/2">deeper</a>',
+        "/deep/2": '<a href="/deep/3">deepest</a>',
+    }
+    requests = Counter()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.requests[path] += 1
+        body = self.pages.get(path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = f"<html><body>{body}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.mark.asyncio
+async def test_crawl_visits_each_page_once_within_depth():
+    LocalSiteHandler.requests = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    website_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    webscrapperConfig = WebScraperConfig(
+        config_source={
+            "website_url": website_url,
+            "id": str(uuid.uuid4()),
+            "name": "Webscrapper-config",
+            "config": {"max_depth": "2", "crawl_delay": "0", "crawl_concurrency": "3"},
+            "uri": website_url,
+        }
+    )
+    collector = WebScraperCollector(webscrapperConfig)
+
+    pages = []
+    async for result in collector.poll():
+        assert not result.is_error()
+        pages.append(result.data)
+    server.shutdown()
+
+    assert len(pages) == 4
+    assert LocalSiteHandler.requests == Counter({"/": 1, "/a": 1, "/b": 1, "/deep/1": 1})
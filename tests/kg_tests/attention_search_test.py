@@ -0,0 +1,105 @@
+import copy
+import random
+
+import pytest
+import torch
+
+from querent.kg.rel_helperfunctions.attn_based_relationship_seach_scope import (
+    EntityPair,
+    SearchContextualRelationship,
+    as_attention_columns,
+    perform_search,
+)
+
+
+class ReferenceRelationship:
+    """SearchContextualRelationship as it was before the search was vectorized."""
+
+    def __init__(self, initial_token_id):
+        self.current_token = initial_token_id
+        self.total_score = 0
+        self.visited_tokens = [initial_token_id]
+        self.relation_tokens = []
+
+    def add_token(self, token_id, score):
+        self.current_token = token_id
+        self.visited_tokens.append(token_id)
+        self.total_score += score
+        self.relation_tokens.append(token_id)
+
+    def mean_score(self):
+        if len(self.relation_tokens) == 0:
+            return 0
+        return self.total_score / len(self.relation_tokens)
+
+
+def reference_is_valid_token(token_id, pair, candidate_paths, current_path, score):
+    if pair.tail_entity['start_idx'] <= token_id <= pair.tail_entity['end_idx']:
+        if current_path.relation_tokens:
+            current_path.total_score += score
+            candidate_paths.append(current_path)
+            return False
+    return not (pair.head_entity['start_idx'] <= token_id <= pair.head_entity['end_idx'] or
+                pair.tail_entity['start_idx'] <= token_id <= pair.tail_entity['end_idx'])
+
+
+def reference_search(entity_start_index, attention_matrix, entity_pair, search_candidates, require_contiguous, max_relation_length, num_initial_tokens):
+    """perform_search as it was before the search was vectorized, over a torch tensor."""
+    queue = [ReferenceRelationship(entity_start_index)]
+    candidate_paths = []
+    visited_paths = set()
+    while len(queue) > 0:
+        current_path = queue.pop(0)
+        if len(current_path.relation_tokens) > max_relation_length:
+            continue
+        if require_contiguous and len(current_path.relation_tokens) > 1 and abs(current_path.relation_tokens[-2] - current_path.relation_tokens[-1]) != 1:
+            continue
+        new_paths = []
+        attention_scores = attention_matrix[:, current_path.current_token]
+        for i in range(num_initial_tokens, len(attention_scores) - 1):
+            next_path = tuple(current_path.visited_tokens + [i])
+            if reference_is_valid_token(i, entity_pair, candidate_paths, current_path, attention_scores[i].detach()) and next_path not in visited_paths and current_path.current_token != i:
+                new_paths.append(copy.deepcopy(current_path))
+                new_paths[-1].add_token(i, attention_scores[i].detach())
+                visited_paths.add(next_path)
+        new_paths.sort(key=lambda path: path.mean_score(), reverse=True)
+        queue += new_paths[:search_candidates]
+    return candidate_paths
+
+
+def random_case(rng):
+    num_tokens = rng.randint(6, 12)
+    # Few distinct levels, so many paths tie on their mean score
+    levels = rng.choice([4, 8, 1000])
+    attention = torch.tensor([[rng.randrange(levels) / levels for _ in range(num_tokens)] for _ in range(num_tokens)], dtype=torch.float32)
+    head_start = rng.randint(1, num_tokens - 5)
+    head_end = head_start + rng.randint(0, 1)
+    tail_start = rng.randint(head_end + 1, num_tokens - 2)
+    tail_end = min(tail_start + rng.randint(0, 2), num_tokens - 1)
+    return attention, (head_start, head_end), (tail_start, tail_end)
+
+
+def as_paths(candidates):
+    return [(tuple(path.visited_tokens), tuple(path.relation_tokens), path.current_token) for path in candidates]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_vectorized_search_matches_the_reference_search(seed):
+    rng = random.Random(seed)
+    attention, head, tail = random_case(rng)
+    search_candidates = rng.randint(1, 4)
+    require_contiguous = rng.random() < 0.5
+    max_relation_length = rng.randint(1, 3 if not require_contiguous else 6)
+    num_initial_tokens = rng.randint(0, 1)
+
+    def pair():
+        return EntityPair({'entity': 'head'}, {'entity': 'tail'}, "context", [head], [tail])
+
+    for start in (head[0], tail[0]):
+        expected = reference_search(start, attention, pair(), search_candidates, require_contiguous, max_relation_length, num_initial_tokens)
+        for matrix in (attention, as_attention_columns(attention).T):
+            found = perform_search(start, matrix, pair(), search_candidates, require_contiguous, max_relation_length, num_initial_tokens)
+            assert all(isinstance(path, SearchContextualRelationship) for path in found)
+            assert as_paths(found) == as_paths(expected)
+            assert [float(path.total_score) for path in found] == pytest.approx([float(path.total_score) for path in expected], rel=1e-6)
+            assert [path.mean_score() for path in found] == pytest.approx([float(path.mean_score()) for path in expected], rel=1e-6)
@@ -0,0 +1,48 @@
+import pickle
+
+import pytest
+import spacy
+
+from querent.kg.ner_helperfunctions.dependency_parsing import Dependency_Parsing
+from querent.kg.ner_helperfunctions.document_analysis import DocumentAnalysis, contextual_sentence
+
+
+@pytest.fixture
+def nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+TEXT = "Shale gas is found in Texas. The basin is deep. Porosity was measured in Texas. Nothing else happened."
+
+
+def test_analysis_keeps_sentences_and_offsets(nlp):
+    analysis = DocumentAnalysis.parse(nlp, TEXT)
+    assert analysis.sentence_texts[0] == "Shale gas is found in Texas."
+    for sentence in analysis.sentences:
+        assert TEXT[sentence.start_char:sentence.end_char] == sentence.text
+        assert [token.text for token in sentence][0] == sentence.tokens[0].text
+    restored = pickle.loads(pickle.dumps(analysis))
+    assert restored.sentence_texts == analysis.sentence_texts
+    assert restored.find_sentence("the basin\nis deep.") is restored.sentences[1]
+
+
+def test_select_with_context_adds_neighbours_once(nlp):
+    analysis = DocumentAnalysis.parse(nlp, TEXT)
+    selected = analysis.select_with_context(lambda sentence: "Texas" in sentence.text)
+    assert selected.sentence_texts == analysis.sentence_texts
+    selected = analysis.select_with_context(lambda sentence: "Nothing" in sentence.text)
+    assert selected.text == "Porosity was measured in Texas. Nothing else happened."
+    assert selected.sentences[0].start_char == analysis.sentences[2].start_char
+
+
+def test_helpers_use_precomputed_sentences_and_chunks():
+    sentences = ["Shale gas is found in Texas.", "The basin is deep."]
+    assert contextual_sentence("texas", "Shale", " ".join(sentences), sentences) == sentences[0]
+    assert contextual_sentence("texas", "basin", " ".join(sentences), sentences) == " ".join(sentences)
+
+    entities = [{"entity": "gas", "label": "B-GEO", "score": 0.912, "start_idx": 1}]
+    parsed = Dependency_Parsing(entities=entities, sentence=sentences[0], noun_chunks=["Shale gas", "Texas"])
+    assert parsed.entities[0]["noun_chunk"] == "Shale gas"
+    assert parsed.entities[0]["noun_chunk_length"] == 2
@@ -0,0 +1,64 @@
+import numpy as np
+
+from querent.kg.rel_helperfunctions.embedding_cache import EmbeddingCache
+from querent.kg.rel_helperfunctions.embedding_store import EmbeddingStore
+from querent.logging.logger import setup_logger
+
+
+class RecordingEmbeddings:
+    """Stands in for the fastembed model: one deterministic vector per text, every call recorded."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, batch_size=None):
+        self.calls.append((list(texts), batch_size))
+        for text in texts:
+            yield np.array([len(text), sum(map(ord, text)), text.count(" ")], dtype=np.float64)
+
+
+def make_store(cache=None, batch_size=256):
+    store = EmbeddingStore.__new__(EmbeddingStore)
+    store.logger = setup_logger("EmbeddingStore_config", "EmbeddingStore")
+    store.model_name = "model"
+    store.batch_size = batch_size
+    store.embeddings = RecordingEmbeddings()
+    store.cache = cache
+    return store
+
+
+def expected_rows(texts):
+    return np.array([[len(text), sum(map(ord, text)), text.count(" ")] for text in texts], dtype=np.float32)
+
+
+def test_embed_batch_embeds_each_text_once_in_input_order():
+    store = make_store(batch_size=8)
+    texts = ["emily stanton", "oxford", "emily stanton", "london basin", "oxford", "emily stanton"]
+
+    embeddings = store.embed_batch(texts)
+
+    assert store.embeddings.calls == [(["emily stanton", "oxford", "london basin"], 8)]
+    assert embeddings.dtype == np.float32 and embeddings.flags["C_CONTIGUOUS"]
+    assert np.array_equal(embeddings, expected_rows(texts))
+    assert store.get_embeddings(["oxford"]) == expected_rows(["oxford"]).tolist()
+
+
+def test_embed_batch_skips_cached_texts(tmp_path):
+    store = make_store(cache=EmbeddingCache("model", cache_dir=str(tmp_path)))
+    store.embed_batch(["a b", "c"])
+
+    embeddings = store.embed_batch(["c", "d e f", "a b", "d e f"], batch_size=2)
+
+    assert store.embeddings.calls[-1] == (["d e f"], 2)
+    assert np.array_equal(embeddings, expected_rows(["c", "d e f", "a b", "d e f"]))
+
+    # A store reopening the cache directory does not embed anything again
+    reopened = make_store(cache=EmbeddingCache("model", cache_dir=str(tmp_path)))
+    assert np.array_equal(reopened.embed_batch(["d e f", "c"]), expected_rows(["d e f", "c"]))
+    assert reopened.embeddings.calls == []
+
+
+def test_embed_batch_of_nothing_calls_no_model():
+    store = make_store()
+    assert store.embed_batch([]).shape == (0, 0)
+    assert store.embeddings.calls == []
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from querent.kg.rel_helperfunctions.embedding_cache import EmbeddingCache
+
+
+def _vectors(value, rows=1, dimension=4):
+    return np.full((rows, dimension), value, dtype=np.float32)
+
+
+def test_caches_sharing_a_directory_do_not_overwrite_rows(tmp_path):
+    a = EmbeddingCache("model", cache_dir=str(tmp_path))
+    b = EmbeddingCache("model", cache_dir=str(tmp_path))
+    a.put_many(["x"], _vectors(1))
+    b.put_many(["y"], _vectors(2))
+    a.memory.clear()
+    b.memory.clear()
+    assert np.array_equal(b.get_many(["y"])["y"], _vectors(2)[0])
+    assert np.array_equal(a.get_many(["x"])["x"], _vectors(1)[0])
+    # Each cache picks up the rows the other one stored
+    assert np.array_equal(a.get_many(["y"])["y"], _vectors(2)[0])
+    assert np.array_equal(b.get_many(["x"])["x"], _vectors(1)[0])
+    reopened = EmbeddingCache("model", cache_dir=str(tmp_path))
+    assert sorted(float(v[0]) for v in reopened.get_many(["x", "y"]).values()) == [1.0, 2.0]
+    assert reopened.stats()["disk_entries"] == 2
+
+
+@pytest.mark.parametrize("torn_file", ["vectors.f32", "index.bin"])
+def test_interrupted_writes_do_not_shift_later_rows(tmp_path, torn_file):
+    cache = EmbeddingCache("model", cache_dir=str(tmp_path))
+    cache.put_many(["x"], _vectors(1))
+    # A crash part way through a batch: a partial vector row, or a partial index record
+    with open(os.path.join(tmp_path, torn_file), "ab") as torn:
+        torn.write(b"\x07" * 5)
+    other = EmbeddingCache("model", cache_dir=str(tmp_path))
+    other.put_many(["y", "z"], np.concatenate([_vectors(2), _vectors(3)]))
+
+    reopened = EmbeddingCache("model", cache_dir=str(tmp_path))
+    found = reopened.get_many(["x", "y", "z"])
+    assert [float(found[text][0]) for text in ["x", "y", "z"]] == [1.0, 2.0, 3.0]
+
+
+def test_vectors_written_without_their_index_are_not_read(tmp_path):
+    cache = EmbeddingCache("model", cache_dir=str(tmp_path))
+    cache.put_many(["x"], _vectors(1))
+    # A crash between writing the vectors of a batch and writing its index records
+    with open(os.path.join(tmp_path, "vectors.f32"), "ab") as vectors:
+        vectors.write(_vectors(9).tobytes())
+    cache.put_many(["y"], _vectors(2))
+    reopened = EmbeddingCache("model", cache_dir=str(tmp_path))
+    found = reopened.get_many(["x", "y"])
+    assert float(found["x"][0]) == 1.0 and float(found["y"][0]) == 2.0
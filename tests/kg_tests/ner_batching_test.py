@@ -0,0 +1,83 @@
+import pytest
+import torch
+from transformers import BertConfig, BertForTokenClassification, BertTokenizerFast
+
+from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+
+LABELS = ["O", "B-MISC", "I-MISC", "B-PER", "I-PER", "B-ORG", "I-ORG", "B-LOC", "I-LOC"]
+WORDS = ["emily", "stanton", "joined", "the", "university", "of", "oxford", "in", "london", "as", "a", "geologist", "studying", "eocene", "basins"]
+
+
+@pytest.fixture(scope="module")
+def tiny_ner(tmp_path_factory):
+    vocabulary_file = tmp_path_factory.mktemp("ner") / "vocab.txt"
+    vocabulary_file.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocabulary_file), do_lower_case=True)
+    torch.manual_seed(7)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=len(LABELS),
+        id2label=dict(enumerate(LABELS)),
+        label2id={label: i for i, label in enumerate(LABELS)},
+    )
+    model = BertForTokenClassification(config).eval()
+    # Tags about half of the tokens, so the comparison covers both entities and "O"
+    with torch.no_grad():
+        model.classifier.bias[0] -= 0.05
+    return tokenizer, model
+
+
+def unbatched_entities(ner, chunk):
+    """The per-chunk inference NER_LLM ran before chunks were batched."""
+    results = []
+    input_ids = ner.ner_tokenizer.convert_tokens_to_ids(chunk)
+    input_tensor = torch.tensor([input_ids])
+    attention_mask = torch.ones(input_tensor.shape)
+    with torch.no_grad():
+        outputs = ner.ner_model(input_tensor, attention_mask=attention_mask)
+    predictions = torch.argmax(outputs[0], dim=2)
+    scores = torch.nn.functional.softmax(outputs[0], dim=2)
+    label_list = ner.ner_model.config.id2label
+    for idx, label_id in enumerate(predictions[0].tolist()):
+        label = label_list[label_id]
+        if label not in ["O", "[CLS]", "[SEP]", "[PAD]"]:
+            results.append({"entity": chunk[idx], "label": label, "score": scores[0][idx][label_id].item(), "start_idx": idx})
+    return results
+
+
+def test_padded_batches_match_unbatched_chunks(tiny_ner):
+    tokenizer, model = tiny_ner
+    ner = NER_LLM(provided_tokenizer=tokenizer, provided_model=model, batch_size=3)
+    chunks = [
+        WORDS[:9],
+        WORDS[3:5],
+        [],
+        WORDS,
+        WORDS[6:9],
+        WORDS[::-1],
+        WORDS[10:],
+    ]
+
+    batched = ner.extract_entities_from_chunks(chunks)
+
+    assert len(batched) == len(chunks)
+    assert batched[2] == []
+    assert sum(len(entities) for entities in batched) > 0
+    for chunk, entities in zip(chunks, batched):
+        expected = unbatched_entities(ner, chunk) if chunk else []
+        assert [(e["entity"], e["label"], e["start_idx"]) for e in entities] == [(e["entity"], e["label"], e["start_idx"]) for e in expected]
+        assert [e["score"] for e in entities] == pytest.approx([e["score"] for e in expected], abs=1e-5)
+
+
+def test_single_chunk_goes_through_the_batched_path(tiny_ner):
+    tokenizer, model = tiny_ner
+    ner = NER_LLM(provided_tokenizer=tokenizer, provided_model=model)
+    chunk = WORDS[:7]
+    entities = ner.extract_entities_from_chunk(chunk)
+    expected = unbatched_entities(ner, chunk)
+    assert [(e["entity"], e["label"]) for e in entities] == [(e["entity"], e["label"]) for e in expected]
+    assert [e["score"] for e in entities] == pytest.approx([e["score"] for e in expected], abs=1e-5)
@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+import spacy
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from querent.kg.ner_helperfunctions.ner_llm_transformer import NER_LLM
+from querent.kg.rel_helperfunctions.attn_based_relationship_filter import analyze_sentences, process_tokens
+from querent.kg.rel_helperfunctions.attn_based_relationship_model_getter import BertBasedModel
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
+
+SENTENCES = [
+    "Emily Stanton studied shale deposits near the Oxford basin.",
+    "The London survey mapped sandstone layers across the delta.",
+    "Organic carbon isotopes record the thermal maximum in Mexico.",
+]
+PAIRS = [
+    [("emily stanton", "shale"), ("shale", "oxford"), ("emily stanton", "oxford")],
+    [("london", "sandstone"), ("sandstone", "delta"), ("london", "delta")],
+    [("carbon", "thermal"), ("thermal", "mexico"), ("carbon", "mexico")],
+]
+
+
+class LemmaPipeline:
+    """A blank spaCy pipeline that lemmatizes to lower case, counting the sentences it parses."""
+
+    def __init__(self):
+        self.nlp = spacy.blank("en")
+        self.parsed = []
+
+    def _annotate(self, doc):
+        self.parsed.append(doc.text)
+        for token in doc:
+            token.lemma_ = token.lower_
+            token.pos_ = "PUNCT" if token.is_punct else "VERB"
+        return doc
+
+    def __call__(self, text):
+        return self._annotate(self.nlp(text))
+
+    def pipe(self, texts):
+        return (self._annotate(doc) for doc in self.nlp.pipe(texts))
+
+
+@pytest.fixture(scope="module")
+def language_model(tmp_path_factory):
+    basic = spacy.blank("en")
+    words = sorted({token.lower_ for sentence in SENTENCES for token in basic(sentence)})
+    vocabulary_file = tmp_path_factory.mktemp("attention") / "vocab.txt"
+    vocabulary_file.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocabulary_file), do_lower_case=True)
+    torch.manual_seed(3)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        attn_implementation="eager",
+    )
+    return tokenizer, BertModel(config).eval()
+
+
+@pytest.fixture
+def forward_passes(language_model):
+    calls = []
+    handle = language_model[1].register_forward_hook(lambda module, inputs, output: calls.append(1))
+    yield calls
+    handle.remove()
+
+
+def triples():
+    records = []
+    for sentence, pairs in zip(SENTENCES, PAIRS):
+        for subject, object in pairs:
+            records.append(TripleRecord(
+                subject,
+                object,
+                context=sentence,
+                current_sentence=sentence,
+                file_path="report.pdf",
+                entity1_nn_chunk=subject,
+                entity2_nn_chunk=object,
+                entity1_label="B-GEO",
+                entity2_label="B-LOC",
+            ))
+    return records
+
+
+def test_analyze_sentences_runs_each_distinct_sentence_once(language_model, forward_passes):
+    tokenizer, model = language_model
+    ner = NER_LLM(provided_tokenizer=tokenizer, provided_model=model)
+    extractor = BertBasedModel(tokenizer, model)
+    nlp_model = LemmaPipeline()
+    contexts = [sentence.lower() for sentence in SENTENCES for _ in range(3)]
+
+    analyses = analyze_sentences(ner, extractor, contexts, nlp_model)
+
+    assert list(analyses) == [sentence.lower() for sentence in SENTENCES]
+    assert len(forward_passes) == 1
+    assert sorted(nlp_model.parsed) == sorted(analyses)
+    for context, analysis in analyses.items():
+        assert analysis.token_ids == tokenizer.convert_tokens_to_ids(tokenizer.tokenize(context))
+        assert [token for token, _ in analysis.token_idx_with_word] == tokenizer.tokenize(context)
+        # Padding the sentences into one batch leaves each attention matrix unchanged
+        with torch.no_grad():
+            expected = extractor.attention_matrix(context).numpy()
+        assert analysis.attention_matrix.shape == expected.shape
+        assert np.allclose(analysis.attention_matrix, expected, atol=1e-5)
+
+
+def test_process_tokens_groups_pairs_by_sentence(language_model, forward_passes):
+    tokenizer, model = language_model
+    ner = NER_LLM(provided_tokenizer=tokenizer, provided_model=model)
+    extractor = BertBasedModel(tokenizer, model)
+
+    # Every pair analysed on its own, as process_tokens did before pairs were grouped by sentence
+    expected = []
+    for triple in triples():
+        expected.extend(process_tokens(ner, extractor, [triple], LemmaPipeline()))
+    assert len(forward_passes) == 9
+
+    forward_passes.clear()
+    nlp_model = LemmaPipeline()
+    found = process_tokens(ner, extractor, triples(), nlp_model)
+
+    assert len(forward_passes) == 1
+    assert len(nlp_model.parsed) == len(SENTENCES)
+    assert len(expected) > 0
+    assert [(t.subject, t.predicate, t.object, t.subject_type, t.object_type) for t in found] == [
+        (t.subject, t.predicate, t.object, t.subject_type, t.object_type) for t in expected
+    ]
+    assert [t.score for t in found] == pytest.approx([t.score for t in expected], abs=1e-5)
+
+
+def test_attention_batches_keep_one_matrix_per_sentence(language_model):
+    tokenizer, model = language_model
+    extractor = BertBasedModel(tokenizer, model)
+    sentence = SENTENCES[0].lower()
+    model_input = extractor.model_input_batch([extractor.tokenize_sentence(sentence)])
+    length = len(extractor.tokenize_sentence(sentence)) + 2
+
+    with torch.no_grad():
+        assert extractor.inference_attention_batch(model_input).shape == (1, length, length)
+        assert extractor.inference_attention(model_input).shape == (length, length)
+        # A batch of a single sentence, as the last batch of attention_matrices can be
+        matrices = extractor.attention_matrices(SENTENCES, batch_size=2)
+    assert [tuple(matrix.shape) for matrix in matrices] == [
+        (len(extractor.tokenize_sentence(s)) + 2,) * 2 for s in SENTENCES
+    ]
@@ -0,0 +1,54 @@
+import pytest
+import spacy
+
+from querent.kg.ner_helperfunctions.spacy_pipeline import (
+    ANALYSIS,
+    FULL,
+    LEMMAS,
+    NOUN_CHUNKS,
+    SENTENCES,
+    SpacyPipeline,
+    with_profile,
+)
+
+
+@pytest.fixture
+def trained_layout():
+    # Same components as en_core_web_lg; they are never called, only selected
+    nlp = spacy.blank("en")
+    for name in ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]:
+        nlp.add_pipe(name, config={"mode": "rule"} if name == "lemmatizer" else {})
+    nlp.disable_pipe("senter")
+    return nlp
+
+
+def test_profiles_disable_what_call_sites_do_not_read(trained_layout):
+    pipeline = SpacyPipeline(trained_layout)
+    assert pipeline.disabled(FULL) == ["senter"]
+    assert pipeline.disabled(ANALYSIS) == ["ner", "senter"]
+    assert pipeline.disabled(NOUN_CHUNKS) == ["lemmatizer", "ner", "senter"]
+    assert pipeline.disabled(LEMMAS) == ["parser", "ner"]
+    assert pipeline.disabled(SENTENCES) == ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+    with pytest.raises(ValueError):
+        pipeline.disabled("everything")
+
+
+def test_sentences_fall_back_to_the_parser():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("parser")
+    assert SpacyPipeline(nlp).disabled(SENTENCES) == []
+
+
+def test_profiled_pipeline_parses_and_pipes():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    pipeline = SpacyPipeline(nlp, batch_size=2)
+    sentences = with_profile(pipeline, SENTENCES)
+    assert [sent.text for sent in sentences("One here. Two there.").sents] == ["One here.", "Two there."]
+    docs = list(sentences.pipe(["One here. Two there.", "Three."]))
+    assert [len(list(doc.sents)) for doc in docs] == [2, 1]
+    # Without a parser, profiles that read sentences keep the sentencizer
+    assert len(list(pipeline("One here. Two there.", profile=ANALYSIS).sents)) == 2
+    assert with_profile(sentences, LEMMAS).name == LEMMAS
+    assert with_profile(nlp, SENTENCES) is nlp
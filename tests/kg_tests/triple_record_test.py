@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pytest
+
+from querent.kg.ner_helperfunctions.filter_triples import TripleFilter
+from querent.kg.rel_helperfunctions.attn_based_relationship_filter import create_semantic_triple, trim_triples
+from querent.kg.rel_helperfunctions.contextual_predicate import process_data
+from querent.kg.rel_helperfunctions.triple_record import TripleRecord
+from querent.kg.rel_helperfunctions.triple_to_json import TripleToJsonConverter
+
+
+def entity_pair(entity1, entity2, embedding1, embedding2, score=0.9):
+    context = f"{entity1} was found near {entity2}."
+    return (entity1, context, entity2, {
+        "entity1_score": score,
+        "entity2_score": score,
+        "entity1_label": "B-LOC",
+        "entity2_label": "B-GEO",
+        "entity1_nn_chunk": entity1,
+        "entity2_nn_chunk": entity2,
+        "entity1_attnscore": 0.4,
+        "entity2_attnscore": 0.5,
+        "pair_attnscore": 0.6,
+        "entity1_embedding": embedding1,
+        "entity2_embedding": embedding2,
+        "current_sentence": context,
+    })
+
+
+def test_process_data_keeps_embeddings_as_arrays():
+    embeddings = np.random.default_rng(0).random((2, 1536), dtype=np.float32)
+    triples = process_data([[entity_pair("basin", "shale", embeddings[0], embeddings[1])]], "report.pdf")
+
+    assert len(triples) == 1
+    triple = triples[0]
+    assert (triple.subject, triple.object, triple.file_path) == ("basin", "shale", "report.pdf")
+    assert triple.entity1_label == "B-LOC" and triple.pair_attnscore == 0.6
+    # The entity embeddings are the arrays the extractor produced, not copies
+    assert np.shares_memory(triple.entity1_embedding, embeddings)
+    with pytest.raises(AttributeError):
+        triple.unknown_field = 1
+
+
+def test_filter_and_cluster_records():
+    rng = np.random.default_rng(1)
+    pairs = [
+        entity_pair(f"entity{i}", f"other{i}", rng.random(32, dtype=np.float32), rng.random(32, dtype=np.float32), score)
+        for i, score in enumerate([0.9, 0.2, 0.8, 0.95, 0.85, 0.7])
+    ]
+    triples = process_data([pairs], "report.pdf")
+    triple_filter = TripleFilter(score_threshold=0.5, attention_score_threshold=0.1, similarity_threshold=0.5)
+
+    filtered, reduction_count = triple_filter.filter_triples(triples)
+    assert reduction_count == 1
+    assert all(isinstance(triple, TripleRecord) for triple in filtered)
+
+    cluster_output = triple_filter.cluster_triples(filtered)
+    assert set(map(id, cluster_output["filtered_triples"])) <= set(map(id, filtered))
+
+
+def test_relationship_records_serialize_once_at_emission():
+    metadata = process_data([[entity_pair("Basin", "Shale", [0.1, 0.2], [0.3, 0.4])]], "report.pdf")
+    trimmed = trim_triples(metadata)
+    assert trimmed[0].entity1_embedding is None
+
+    triple = create_semantic_triple(
+        head_entity="Basin",
+        tail_entity="Shale Gas",
+        predicate="contain",
+        score=0.42,
+        predicate_metadata=trimmed[0],
+        subject_type="B-LOC",
+        object_type="B-GEO",
+    )
+    graph_json = json.loads(json.dumps(TripleToJsonConverter.convert_graphjson(triple, event_id="event")))
+    assert graph_json == {
+        "event_id": "event",
+        "subject": "basin",
+        "subject_type": "b_loc",
+        "object": "shale_gas",
+        "object_type": "b_geo",
+        "predicate": "contain",
+        "predicate_type": "",
+        "sentence": "basin was found near shale.",
+        "score": 0.42,
+    }
+    vector_json = TripleToJsonConverter.convert_vectorjson(triple, embeddings=np.ones(4, dtype=np.float32), event_id="event")
+    assert vector_json["id"] == "basin-contain-shale_gas"
+    assert vector_json["size"] == 4 and vector_json["embeddings"] == [1.0] * 4
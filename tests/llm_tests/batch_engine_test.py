@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+import uuid
+import pytest
+from querent.callback.event_callback_interface import EventCallbackInterface
+from querent.common.types.ingested_code import IngestedCode
+from querent.common.types.ingested_images import IngestedImages
+from querent.common.types.ingested_messages import IngestedMessages
+from querent.common.types.ingested_table import IngestedTables
+from querent.common.types.ingested_tokens import IngestedTokens
+from querent.common.types.querent_event import EventState, EventType
+from querent.common.types.querent_queue import QuerentQueue
+from querent.config.engine.engine_config import EngineConfig
+from querent.core.base_engine import BaseEngine
+
+
+class BatchRecordingEngine(BaseEngine):
+    def __init__(self, input_queue: QuerentQueue, config: EngineConfig):
+        super().__init__(input_queue, config)
+        self.batches = []
+
+    async def process_tokens(self, data: IngestedTokens):
+        self.batches.append([data.data])
+
+    async def process_tokens_batch(self, batch):
+        self.batches.append([data.data for data in batch])
+
+    async def process_code(self, data: IngestedCode):
+        pass
+
+    async def process_messages(self, data: IngestedMessages):
+        pass
+
+    async def process_tables(self, data: IngestedTables):
+        pass
+
+    async def process_images(self, data: IngestedImages):
+        pass
+
+    def validate(self):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_worker_dequeues_micro_batches_without_sleeping():
+    input_queue = QuerentQueue()
+    config = EngineConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "name": "BatchEngine",
+            "batch_size": 3,
+            "batch_timeout_ms": 50,
+        }
+    )
+    engine = BatchRecordingEngine(input_queue, config)
+    for i in range(5):
+        await input_queue.put(IngestedTokens(file="dummy.txt", data=[f"data{i}"]))
+    await input_queue.put(None)
+    await input_queue.put(None)
+
+    start = time.time()
+    await asyncio.wait_for(engine._worker(), timeout=10)
+
+    assert engine.batches == [
+        [["data0"], ["data1"], ["data2"]],
+        [["data3"], ["data4"]],
+    ]
+    assert time.time() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_idle_workers_exit_when_another_worker_terminates():
+    input_queue = QuerentQueue()
+    config = EngineConfig(config_source={"id": str(uuid.uuid4()), "name": "BatchEngine", "num_workers": 3})
+    engine = BatchRecordingEngine(input_queue, config)
+    for i in range(3):
+        await input_queue.put(IngestedTokens(file="dummy.txt", data=[f"data{i}"]))
+    await input_queue.put(None)
+    await input_queue.put(None)
+
+    await asyncio.wait_for(asyncio.gather(*await engine._start_workers()), timeout=10)
+
+    assert sorted(batch[0][0] for batch in engine.batches) == ["data0", "data1", "data2"]
+    assert engine.termination_event.is_set()
+
+
+class PoolEchoEngine(BatchRecordingEngine):
+    async def process_tokens(self, data: IngestedTokens):
+        if self._process_pool is not None:
+            return await self._run_in_pool("_echo", data.data[0], data.file)
+        await self._echo(data.data[0], data.file)
+
+    async def process_tokens_batch(self, batch):
+        await asyncio.gather(*[self.process_tokens(data) for data in batch])
+
+    async def _echo(self, text, file):
+        await self.set_state(
+            EventState(EventType.Graph, time.time(), f"{text}:{os.getpid()}", file, doc_source="")
+        )
+
+
+@pytest.mark.asyncio
+async def test_workers_share_one_process_pool():
+    input_queue = QuerentQueue()
+    config = EngineConfig(
+        config_source={
+            "id": str(uuid.uuid4()),
+            "name": "PoolEngine",
+            "num_workers": 2,
+            "batch_size": 4,
+            "execution_mode": "process",
+        }
+    )
+    engine = PoolEchoEngine(input_queue, config)
+    # The pool has one process per worker unless process_workers is set
+    assert engine.process_workers == 2
+    payloads = []
+
+    class Collector(EventCallbackInterface):
+        def handle_event(self, event_type, event_state):
+            payloads.append(event_state["payload"])
+
+    engine.subscribe(EventType.Graph, Collector())
+    for i in range(4):
+        await input_queue.put(IngestedTokens(file="dummy.txt", data=[f"data{i}"]))
+    await input_queue.put(None)
+    await input_queue.put(None)
+
+    workers = await engine._start_workers()
+    pool = engine._process_pool
+    assert pool is not None and len(workers) == 2
+    await asyncio.wait_for(asyncio.gather(*workers), timeout=120)
+
+    assert sorted(payload.split(":")[0] for payload in payloads) == ["data0", "data1", "data2", "data3"]
+    assert str(os.getpid()) not in {payload.split(":")[1] for payload in payloads}
+    # Workers exiting leave the shared pool running, only _stop_workers shuts it down
+    assert engine._process_pool is pool
+    assert await asyncio.get_running_loop().run_in_executor(pool, os.getpid) != os.getpid()
+    await engine._stop_workers()
+    assert engine._process_pool is None